@@ -0,0 +1,164 @@
+#!/usr/bin/env bun
+/**
+ * Sandbox materialization benchmark.
+ *
+ * Builds a synthetic source tree (50k files by default), then compares:
+ * - the previous implementation (src/bench/legacy-sandbox.ts): cpSync copy + two-tree mtime scan
+ * - createSandbox: reflink/copy + diff against the creation manifest
+ *
+ * Usage: bun run scripts/bench-sandbox.ts [--files 50000] [--edits 50] [--json]
+ */
+import { mkdirSync, mkdtempSync, rmSync, unlinkSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { createCopySandbox, scanModifiedFiles } from "../src/bench/legacy-sandbox.ts";
+import { cleanupSandbox, createSandbox, getModifiedFiles } from "../src/execution/sandbox.ts";
+
+interface SandboxVariant {
+	name: string;
+	/** Create the sandbox, returning the materialization strategy */
+	create(originalDir: string, sandboxDir: string): Promise<string>;
+	detect(sandboxDir: string, originalDir: string): Promise<string[]>;
+}
+
+const VARIANTS: SandboxVariant[] = [
+	{
+		name: "cpSync + tree scan",
+		create: async (originalDir, sandboxDir) => {
+			await createCopySandbox(originalDir, sandboxDir);
+			return "cp";
+		},
+		detect: async (sandboxDir, originalDir) => scanModifiedFiles(sandboxDir, originalDir),
+	},
+	{
+		name: "manifest",
+		create: async (originalDir, sandboxDir) => {
+			const sandbox = await createSandbox({ originalDir, sandboxDir, agentNum: 1 });
+			return sandbox.strategy;
+		},
+		detect: getModifiedFiles,
+	},
+];
+
+interface BenchResult {
+	variant: string;
+	strategy: string;
+	createMs: number;
+	detectMs: number;
+	detected: number;
+}
+
+function readFlag(name: string, fallback: number): number {
+	const index = process.argv.indexOf(name);
+	if (index === -1) return fallback;
+	return Number.parseInt(process.argv[index + 1], 10) || fallback;
+}
+
+const fileCount = readFlag("--files", 50_000);
+const editCount = readFlag("--edits", 50);
+const asJson = process.argv.includes("--json");
+
+const FILES_PER_DIR = 100;
+const DIRS_PER_PARENT = 25;
+
+function buildTree(root: string): string[] {
+	const files: string[] = [];
+	for (let i = 0; i < fileCount; i++) {
+		const dirIndex = Math.floor(i / FILES_PER_DIR);
+		const relDir = join(
+			"src",
+			`pkg-${Math.floor(dirIndex / DIRS_PER_PARENT)}`,
+			`module-${dirIndex % DIRS_PER_PARENT}`,
+		);
+		if (i % FILES_PER_DIR === 0) {
+			mkdirSync(join(root, relDir), { recursive: true });
+		}
+		const relPath = join(relDir, `file-${i}.ts`);
+		writeFileSync(join(root, relPath), `export const value${i} = ${i};\n`.repeat(8));
+		files.push(relPath);
+	}
+	writeFileSync(join(root, "package.json"), '{ "name": "bench" }\n');
+	return files;
+}
+
+/**
+ * Simulate an agent: edit, add and delete a handful of files
+ */
+function applyEdits(sandboxDir: string, files: string[]): void {
+	const step = Math.max(1, Math.floor(files.length / editCount));
+	for (let i = 0; i < editCount; i++) {
+		const relPath = files[(i * step) % files.length];
+		if (i % 5 === 4) {
+			unlinkSync(join(sandboxDir, relPath));
+		} else {
+			writeFileSync(join(sandboxDir, relPath), `// edited by agent\n${i}\n`);
+		}
+	}
+	for (let i = 0; i < Math.max(1, Math.floor(editCount / 10)); i++) {
+		writeFileSync(join(sandboxDir, "src", `new-${i}.ts`), `export const added = ${i};\n`);
+	}
+}
+
+async function runVariant(
+	variant: SandboxVariant,
+	originalDir: string,
+	sandboxDir: string,
+	files: string[],
+): Promise<BenchResult> {
+	const createStart = performance.now();
+	const strategy = await variant.create(originalDir, sandboxDir);
+	const createMs = performance.now() - createStart;
+
+	applyEdits(sandboxDir, files);
+
+	const detectStart = performance.now();
+	const modified = await variant.detect(sandboxDir, originalDir);
+	const detectMs = performance.now() - detectStart;
+
+	await cleanupSandbox(sandboxDir);
+
+	return {
+		variant: variant.name,
+		strategy,
+		createMs: Math.round(createMs),
+		detectMs: Math.round(detectMs),
+		detected: modified.length,
+	};
+}
+
+async function main(): Promise<void> {
+	const root = mkdtempSync(join(tmpdir(), "ralphy-bench-sandbox-"));
+	const originalDir = join(root, "repo");
+	mkdirSync(originalDir, { recursive: true });
+
+	try {
+		const buildStart = performance.now();
+		const files = buildTree(originalDir);
+		const buildMs = Math.round(performance.now() - buildStart);
+
+		const results: BenchResult[] = [];
+		for (const [index, variant] of VARIANTS.entries()) {
+			results.push(await runVariant(variant, originalDir, join(root, `sandbox-${index}`), files));
+		}
+
+		if (asJson) {
+			console.log(
+				JSON.stringify({ files: fileCount, edits: editCount, buildMs, results }, null, 2),
+			);
+			return;
+		}
+
+		console.log(`Synthetic tree: ${fileCount} files (built in ${buildMs}ms), ${editCount} edits`);
+		console.log("");
+		console.log("variant              strategy   create (ms)  detect (ms)  detected");
+		for (const r of results) {
+			console.log(
+				`${r.variant.padEnd(20)} ${r.strategy.padEnd(10)} ${String(r.createMs).padStart(11)}  ${String(r.detectMs).padStart(11)}  ${String(r.detected).padStart(8)}`,
+			);
+		}
+	} finally {
+		rmSync(root, { recursive: true, force: true });
+	}
+}
+
+await main();
@@ -0,0 +1,151 @@
+#!/usr/bin/env bun
+/**
+ * Task source benchmark.
+ *
+ * Writes 10k-task PRDs (markdown file, markdown folder, YAML, JSON), then runs
+ * the scheduling loop of a sequential run against each source:
+ * getNextTask + countRemaining + countCompleted + markComplete per iteration.
+ *
+ * Usage: bun run scripts/bench-tasks.ts [--tasks 10000] [--iterations 1000] [--json]
+ */
+import { mkdirSync, mkdtempSync, rmSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import YAML from "yaml";
+import {
+	CachedTaskSource,
+	JsonTaskSource,
+	MarkdownFolderTaskSource,
+	MarkdownTaskSource,
+	type TaskSource,
+	YamlTaskSource,
+} from "../src/tasks/index.ts";
+
+interface BenchResult {
+	source: string;
+	cached: boolean;
+	loadMs: number;
+	iterations: number;
+	totalMs: number;
+	perIterationMs: number;
+}
+
+function readFlag(name: string, fallback: number): number {
+	const index = process.argv.indexOf(name);
+	if (index === -1) return fallback;
+	return Number.parseInt(process.argv[index + 1], 10) || fallback;
+}
+
+const taskCount = readFlag("--tasks", 10_000);
+const iterations = Math.min(readFlag("--iterations", 1000), taskCount);
+const asJson = process.argv.includes("--json");
+
+const TASKS_PER_FOLDER_FILE = 100;
+const GROUP_SIZE = 25;
+
+function title(i: number): string {
+	return `Implement feature ${i} of the synthetic PRD`;
+}
+
+function writeFixtures(root: string): Record<string, () => TaskSource> {
+	const markdownLines = ["# Tasks", ""];
+	for (let i = 0; i < taskCount; i++) {
+		markdownLines.push(`- [ ] ${title(i)}`);
+	}
+	writeFileSync(join(root, "PRD.md"), `${markdownLines.join("\n")}\n`);
+
+	const folder = join(root, "prd");
+	mkdirSync(folder);
+	for (let start = 0; start < taskCount; start += TASKS_PER_FOLDER_FILE) {
+		const lines = [`# Part ${start / TASKS_PER_FOLDER_FILE}`, ""];
+		for (let i = start; i < Math.min(start + TASKS_PER_FOLDER_FILE, taskCount); i++) {
+			lines.push(`- [ ] ${title(i)}`);
+		}
+		const name = `part-${String(start / TASKS_PER_FOLDER_FILE).padStart(4, "0")}.md`;
+		writeFileSync(join(folder, name), `${lines.join("\n")}\n`);
+	}
+
+	const tasks = Array.from({ length: taskCount }, (_, i) => ({
+		title: title(i),
+		completed: false,
+		parallel_group: Math.floor(i / GROUP_SIZE) + 1,
+		description: `Details for task ${i}`,
+	}));
+	writeFileSync(join(root, "tasks.yaml"), YAML.stringify({ tasks }));
+	writeFileSync(join(root, "PRD.json"), JSON.stringify({ name: "bench", tasks }, null, 2));
+
+	return {
+		markdown: () => new MarkdownTaskSource(join(root, "PRD.md")),
+		"markdown-folder": () => new MarkdownFolderTaskSource(folder),
+		yaml: () => new YamlTaskSource(join(root, "tasks.yaml")),
+		json: () => new JsonTaskSource(join(root, "PRD.json")),
+	};
+}
+
+/**
+ * Sequential run loop: pick the next task, report progress, complete it
+ */
+async function runLoop(source: TaskSource, cached: boolean, name: string): Promise<BenchResult> {
+	const taskSource = cached ? new CachedTaskSource(source, { flushIntervalMs: 0 }) : source;
+
+	const loadStart = performance.now();
+	await taskSource.countRemaining();
+	const loadMs = performance.now() - loadStart;
+
+	const start = performance.now();
+	for (let i = 0; i < iterations; i++) {
+		const task = await taskSource.getNextTask();
+		if (!task) break;
+		await taskSource.countRemaining();
+		await taskSource.countCompleted();
+		await taskSource.markComplete(task.id);
+	}
+	if (taskSource instanceof CachedTaskSource) {
+		await taskSource.flush();
+	}
+	const totalMs = performance.now() - start;
+
+	return {
+		source: name,
+		cached,
+		loadMs: Math.round(loadMs),
+		iterations,
+		totalMs: Math.round(totalMs),
+		perIterationMs: Math.round((totalMs / iterations) * 1000) / 1000,
+	};
+}
+
+async function main(): Promise<void> {
+	const root = mkdtempSync(join(tmpdir(), "ralphy-bench-tasks-"));
+
+	try {
+		const results: BenchResult[] = [];
+		for (const cached of [false, true]) {
+			// Fresh fixtures per pass, so both passes start with every task open
+			const passDir = join(root, cached ? "cached" : "direct");
+			mkdirSync(passDir);
+			const sources = writeFixtures(passDir);
+			for (const [name, create] of Object.entries(sources)) {
+				results.push(await runLoop(create(), cached, name));
+			}
+		}
+
+		if (asJson) {
+			console.log(JSON.stringify({ tasks: taskCount, iterations, results }, null, 2));
+			return;
+		}
+
+		console.log(`Synthetic PRDs: ${taskCount} tasks, ${iterations} completions per source`);
+		console.log("");
+		console.log("source            cached  load (ms)  total (ms)  per iteration (ms)");
+		for (const r of results) {
+			console.log(
+				`${r.source.padEnd(17)} ${String(r.cached).padEnd(6)} ${String(r.loadMs).padStart(10)}  ${String(r.totalMs).padStart(10)}  ${String(r.perIterationMs).padStart(18)}`,
+			);
+		}
+	} finally {
+		rmSync(root, { recursive: true, force: true });
+	}
+}
+
+await main();
@@ -0,0 +1,124 @@
+import { mkdirSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import simpleGit from "simple-git";
+import type { TaskSourceType } from "../tasks/types.ts";
+
+/**
+ * PRD layouts exercised by the benchmark
+ * - markdown: one PRD.md checklist
+ * - folder: a folder of markdown PRDs
+ * - yaml: a YAML task file with parallel groups
+ */
+export type BenchFixture = "markdown" | "folder" | "yaml";
+
+export const BENCH_FIXTURES: BenchFixture[] = ["markdown", "folder", "yaml"];
+
+export interface FixtureOptions {
+	/** Number of tasks in the PRD */
+	tasks: number;
+	/** Number of source files in the fixture repo */
+	files: number;
+	/** Tasks per parallel group (yaml fixture) */
+	groupSize: number;
+}
+
+export interface FixtureRepo {
+	/** Git repository the agents work in */
+	workDir: string;
+	prdSource: TaskSourceType;
+	/**
+	 * PRD path relative to workDir, as in a real run. The PRD is gitignored, so
+	 * agent branches only carry the mock engine's edits and merge without conflicts.
+	 */
+	prdFile: string;
+	prdIsFolder: boolean;
+	baseBranch: string;
+}
+
+const FILES_PER_DIR = 50;
+const FOLDER_PRD_FILES = 4;
+const PRD_PATHS: Record<BenchFixture, string> = {
+	markdown: "PRD.md",
+	folder: "prd",
+	yaml: "tasks.yaml",
+};
+
+function taskTitle(index: number): string {
+	return `Implement feature ${String(index + 1).padStart(3, "0")}`;
+}
+
+function writePrd(workDir: string, fixture: BenchFixture, options: FixtureOptions): void {
+	const titles = Array.from({ length: options.tasks }, (_, i) => taskTitle(i));
+	const prdPath = join(workDir, PRD_PATHS[fixture]);
+
+	switch (fixture) {
+		case "markdown": {
+			const checklist = titles.map((title) => `- [ ] ${title}`).join("\n");
+			writeFileSync(prdPath, `# Benchmark PRD\n\n## Tasks\n\n${checklist}\n`);
+			return;
+		}
+		case "folder": {
+			mkdirSync(prdPath, { recursive: true });
+			const perFile = Math.ceil(titles.length / FOLDER_PRD_FILES);
+			for (let i = 0; i * perFile < titles.length; i++) {
+				const chunk = titles.slice(i * perFile, (i + 1) * perFile);
+				const checklist = chunk.map((title) => `- [ ] ${title}`).join("\n");
+				writeFileSync(join(prdPath, `${String(i + 1).padStart(2, "0")}-part.md`), `${checklist}\n`);
+			}
+			return;
+		}
+		case "yaml": {
+			const groupSize = Math.max(1, options.groupSize);
+			const entries = titles.map(
+				(title, i) => `  - title: ${title}\n    parallel_group: ${Math.floor(i / groupSize) + 1}`,
+			);
+			writeFileSync(prdPath, `tasks:\n${entries.join("\n")}\n`);
+			return;
+		}
+	}
+}
+
+/**
+ * Create a git repository with a synthetic source tree and an ignored PRD in it
+ */
+export async function createFixtureRepo(
+	root: string,
+	fixture: BenchFixture,
+	options: FixtureOptions,
+): Promise<FixtureRepo> {
+	const workDir = join(root, "repo");
+	mkdirSync(workDir, { recursive: true });
+
+	for (let i = 0; i < options.files; i++) {
+		const dir = join(workDir, "src", `module-${Math.floor(i / FILES_PER_DIR)}`);
+		if (i % FILES_PER_DIR === 0) {
+			mkdirSync(dir, { recursive: true });
+		}
+		writeFileSync(join(dir, `file-${i}.ts`), `export const value${i} = ${i};\n`.repeat(10));
+	}
+	writeFileSync(join(workDir, "package.json"), '{ "name": "ralphy-bench-fixture" }\n');
+	writeFileSync(join(workDir, "README.md"), "# Benchmark fixture\n");
+	writeFileSync(
+		join(workDir, ".gitignore"),
+		`.ralphy/\n.ralphy-worktrees/\n.ralphy-sandboxes/\n/${PRD_PATHS[fixture]}\n`,
+	);
+	writePrd(workDir, fixture, options);
+
+	const baseBranch = "main";
+	const git = simpleGit(workDir);
+	await git.init();
+	await git.raw(["symbolic-ref", "HEAD", `refs/heads/${baseBranch}`]);
+	await git.addConfig("user.name", "Ralphy Bench");
+	await git.addConfig("user.email", "bench@ralphy.local");
+	await git.addConfig("commit.gpgsign", "false");
+	await git.add(".");
+	await git.commit("Initial commit");
+
+	return {
+		workDir,
+		prdSource: fixture === "folder" ? "markdown-folder" : fixture,
+		prdFile: PRD_PATHS[fixture],
+		prdIsFolder: fixture === "folder",
+		baseBranch,
+	};
+}
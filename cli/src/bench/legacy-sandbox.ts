@@ -0,0 +1,88 @@
+import {
+	copyFileSync,
+	cpSync,
+	existsSync,
+	lstatSync,
+	mkdirSync,
+	readdirSync,
+	statSync,
+	symlinkSync,
+	utimesSync,
+} from "node:fs";
+import { join, sep } from "node:path";
+import { DEFAULT_SYMLINK_DIRS, rmRF } from "../execution/sandbox.ts";
+
+/**
+ * The sandbox implementation used before manifests, kept as a benchmark
+ * baseline: directories are copied with cpSync (timestamps preserved) and
+ * changes are found by scanning both trees and comparing mtime and size.
+ * Not used by ralphy itself.
+ */
+
+/**
+ * Create a sandbox by copying the original directory, symlinking symlinkDirs
+ */
+export async function createCopySandbox(
+	originalDir: string,
+	sandboxDir: string,
+	symlinkDirs: string[] = DEFAULT_SYMLINK_DIRS,
+): Promise<void> {
+	await rmRF(sandboxDir);
+	mkdirSync(sandboxDir, { recursive: true });
+
+	for (const item of readdirSync(originalDir)) {
+		const originalPath = join(originalDir, item);
+		const sandboxPath = join(sandboxDir, item);
+		const stat = lstatSync(originalPath);
+
+		if (symlinkDirs.includes(item)) {
+			symlinkSync(originalPath, sandboxPath, stat.isDirectory() ? "junction" : "file");
+		} else if (stat.isDirectory()) {
+			cpSync(originalPath, sandboxPath, { recursive: true, preserveTimestamps: true });
+		} else if (stat.isFile()) {
+			copyFileSync(originalPath, sandboxPath);
+			utimesSync(sandboxPath, stat.atime, stat.mtime);
+		}
+	}
+}
+
+/**
+ * Files in the sandbox that are new or differ from the original by mtime or size.
+ * Files deleted in the sandbox are not reported.
+ */
+export function scanModifiedFiles(
+	sandboxDir: string,
+	originalDir: string,
+	symlinkDirs: string[] = DEFAULT_SYMLINK_DIRS,
+): string[] {
+	const modified: string[] = [];
+
+	function scanDir(relPath: string) {
+		const sandboxPath = join(sandboxDir, relPath);
+		const stat = lstatSync(sandboxPath);
+
+		// Symlinks are shared with the original, not modified
+		if (stat.isSymbolicLink() || symlinkDirs.includes(relPath.split(sep)[0])) return;
+
+		if (stat.isDirectory()) {
+			for (const item of readdirSync(sandboxPath)) {
+				scanDir(join(relPath, item));
+			}
+		} else if (stat.isFile()) {
+			const originalPath = join(originalDir, relPath);
+			if (!existsSync(originalPath)) {
+				modified.push(relPath);
+			} else {
+				const originalStat = statSync(originalPath);
+				if (stat.mtimeMs !== originalStat.mtimeMs || stat.size !== originalStat.size) {
+					modified.push(relPath);
+				}
+			}
+		}
+	}
+
+	for (const item of readdirSync(sandboxDir)) {
+		scanDir(item);
+	}
+	return modified;
+}
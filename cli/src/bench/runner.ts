@@ -0,0 +1,210 @@
+import { mkdtempSync, rmSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { MockEngine, type MockEngineOptions } from "../engines/mock.ts";
+import { runParallel } from "../execution/parallel.ts";
+import type { PhaseTimings } from "../execution/phases.ts";
+import type { SchedulerMode } from "../execution/scheduler.ts";
+import { type ExecutionOptions, runSequential } from "../execution/sequential.ts";
+import { CachedTaskSource, createTaskSource } from "../tasks/index.ts";
+import { VERSION } from "../version.ts";
+import { type BenchFixture, createFixtureRepo } from "./fixtures.ts";
+
+/**
+ * How tasks are executed
+ * - sequential: one agent in the repo itself
+ * - worktree: parallel agents in git worktrees
+ * - sandbox: parallel agents in lightweight sandboxes
+ */
+export type BenchMode = "sequential" | "worktree" | "sandbox";
+
+export const BENCH_MODES: BenchMode[] = ["sequential", "worktree", "sandbox"];
+
+export interface BenchOptions {
+	fixtures: BenchFixture[];
+	modes: BenchMode[];
+	/** Tasks per fixture PRD */
+	tasks: number;
+	/** Source files in each fixture repo */
+	files: number;
+	maxParallel: number;
+	scheduler: SchedulerMode;
+	maxRetries: number;
+	/** Base retry delay in seconds (0 measures orchestration without backoff) */
+	retryDelay: number;
+	engine: MockEngineOptions;
+	/** Keep fixture repos for inspection */
+	keep?: boolean;
+}
+
+export interface BenchScenarioResult {
+	fixture: BenchFixture;
+	mode: BenchMode;
+	tasks: number;
+	completed: number;
+	failed: number;
+	/** Time to create the fixture repo (not part of wallMs) */
+	setupMs: number;
+	/** Wall time of the run, including the merge phase */
+	wallMs: number;
+	/** Summed per-phase time; parallel phases overlap, so this can exceed wallMs */
+	phases: PhaseTimings;
+	/** Highest RSS of this process sampled during the run */
+	peakRssMb: number;
+	tasksPerMinute: number;
+	/** Slot utilization of parallel runs, between 0 and 1 */
+	slotUtilization?: number;
+	workDir?: string;
+}
+
+export interface BenchReport {
+	version: 1;
+	ralphyVersion: string;
+	startedAt: string;
+	platform: string;
+	runtime: string;
+	options: BenchOptions;
+	scenarios: BenchScenarioResult[];
+	/** Peak RSS of the whole benchmark process */
+	maxRssMb: number;
+}
+
+const RSS_SAMPLE_INTERVAL_MS = 25;
+
+function toMb(bytes: number): number {
+	return Math.round((bytes / (1024 * 1024)) * 10) / 10;
+}
+
+/**
+ * Sample this process's RSS until the returned function is called
+ */
+function samplePeakRss(): () => number {
+	let peak = process.memoryUsage.rss();
+	const timer = setInterval(() => {
+		peak = Math.max(peak, process.memoryUsage.rss());
+	}, RSS_SAMPLE_INTERVAL_MS);
+
+	return () => {
+		clearInterval(timer);
+		return toMb(Math.max(peak, process.memoryUsage.rss()));
+	};
+}
+
+/**
+ * Run one fixture in one mode against a fresh fixture repo
+ */
+export async function runBenchScenario(
+	fixture: BenchFixture,
+	mode: BenchMode,
+	options: BenchOptions,
+): Promise<BenchScenarioResult> {
+	const root = mkdtempSync(join(tmpdir(), `ralphy-bench-${fixture}-${mode}-`));
+
+	try {
+		const setupStart = performance.now();
+		const repo = await createFixtureRepo(root, fixture, {
+			tasks: options.tasks,
+			files: options.files,
+			groupSize: options.maxParallel,
+		});
+		const setupMs = performance.now() - setupStart;
+
+		const taskSource = new CachedTaskSource(
+			createTaskSource({ type: repo.prdSource, filePath: join(repo.workDir, repo.prdFile) }),
+		);
+		const execution: ExecutionOptions = {
+			engine: new MockEngine(options.engine),
+			taskSource,
+			workDir: repo.workDir,
+			skipTests: true,
+			skipLint: true,
+			dryRun: false,
+			maxIterations: 0,
+			maxRetries: options.maxRetries,
+			retryDelay: options.retryDelay,
+			branchPerTask: false,
+			baseBranch: repo.baseBranch,
+			createPr: false,
+			draftPr: false,
+			autoCommit: true,
+			browserEnabled: "false",
+			prdFile: repo.prdFile,
+		};
+
+		const stopSampling = samplePeakRss();
+		const start = performance.now();
+		const result =
+			mode === "sequential"
+				? await runSequential(execution)
+				: await runParallel({
+						...execution,
+						maxParallel: options.maxParallel,
+						scheduler: options.scheduler,
+						prdSource: repo.prdSource,
+						prdIsFolder: repo.prdIsFolder,
+						prdFile: repo.prdFile,
+						useSandbox: mode === "sandbox",
+					});
+		await taskSource.flush();
+		taskSource.dispose();
+		const wallMs = performance.now() - start;
+		const peakRssMb = stopSampling();
+
+		const { phaseTimings, schedulerStats } = result;
+		if (!phaseTimings) {
+			throw new Error(`No phase timings reported for ${mode} run`);
+		}
+
+		return {
+			fixture,
+			mode,
+			tasks: options.tasks,
+			completed: result.tasksCompleted,
+			failed: result.tasksFailed,
+			setupMs: Math.round(setupMs),
+			wallMs: Math.round(wallMs),
+			phases: phaseTimings,
+			peakRssMb,
+			tasksPerMinute:
+				wallMs > 0 ? Math.round((result.tasksCompleted / wallMs) * 60_000 * 10) / 10 : 0,
+			slotUtilization: schedulerStats
+				? Math.round(schedulerStats.utilization * 100) / 100
+				: undefined,
+			workDir: options.keep ? repo.workDir : undefined,
+		};
+	} finally {
+		if (!options.keep) {
+			rmSync(root, { recursive: true, force: true });
+		}
+	}
+}
+
+/**
+ * Run every fixture in every mode, one scenario at a time
+ */
+export async function runBench(
+	options: BenchOptions,
+	onScenario?: (result: BenchScenarioResult) => void,
+): Promise<BenchReport> {
+	const startedAt = new Date().toISOString();
+	const scenarios: BenchScenarioResult[] = [];
+
+	for (const fixture of options.fixtures) {
+		for (const mode of options.modes) {
+			const result = await runBenchScenario(fixture, mode, options);
+			scenarios.push(result);
+			onScenario?.(result);
+		}
+	}
+
+	return {
+		version: 1,
+		ralphyVersion: VERSION,
+		startedAt,
+		platform: `${process.platform}-${process.arch}`,
+		runtime: typeof Bun !== "undefined" ? `bun ${Bun.version}` : `node ${process.versions.node}`,
+		options,
+		scenarios,
+		maxRssMb: toMb(process.resourceUsage().maxRSS * 1024),
+	};
+}
@@ -1,7 +1,11 @@
 import { existsSync, statSync } from "node:fs";
-import { Command } from "commander";
+import { Command, type OptionValues } from "commander";
 import type { RuntimeOptions } from "../config/types.ts";
 import { VERSION } from "../version.ts";
+import { type BenchArgs, createBenchProgram, parseBenchOptions } from "./commands/bench.ts";
+
+/** Where --trace writes traces when no directory is given */
+const DEFAULT_TRACE_DIR = ".ralphy/traces";
 
 /**
  * Create the CLI program with all options
@@ -30,8 +34,13 @@ export function createProgram(name = "ralphy"): Command {
 		.option("--droid", "Use Factory Droid")
 		.option("--copilot", "Use GitHub Copilot")
 		.option("--gemini", "Use Gemini CLI")
+		.option("--mock", "Use the mock engine (no AI calls, for benchmarks)")
 		.option("--dry-run", "Show what would be done without executing")
-		.option("--max-iterations <n>", "Maximum iterations (0 = unlimited)", "0")
+		.option(
+			"--max-iterations <n>",
+			"Maximum iterations (0 = unlimited); in parallel mode each iteration runs up to --max-parallel tasks",
+			"0",
+		)
 		.option("--max-retries <n>", "Maximum retries per task", "3")
 		.option("--retry-delay <n>", "Delay between retries in seconds", "5")
 		.option("--parallel", "Run tasks in parallel using worktrees")
@@ -40,6 +49,17 @@ export function createProgram(name = "ralphy"): Command {
 			"Use lightweight sandboxes instead of git worktrees (faster for large repos)",
 		)
 		.option("--max-parallel <n>", "Maximum parallel agents", "3")
+		.option(
+			"--scheduler <mode>",
+			"Parallel scheduler: batch (wait for each batch) or continuous (refill free slots)",
+			"batch",
+		)
+		.option(
+			"--pool-size <n>",
+			"Keep N sandboxes/worktrees pre-warmed and reuse them between agents (0 = off)",
+			"0",
+		)
+		.option("--pool-max-reuse <n>", "Tasks a pooled sandbox/worktree serves before renewal", "5")
 		.option("--branch-per-task", "Create a branch for each task")
 		.option("--base-branch <branch>", "Base branch for PRs")
 		.option("--create-pr", "Create pull request after each task")
@@ -56,6 +76,8 @@ export function createProgram(name = "ralphy"): Command {
 		.option("--model <name>", "Override default model for the engine")
 		.option("--sonnet", "Shortcut for --claude --model sonnet")
 		.option("--no-merge", "Skip automatic branch merging after parallel execution")
+		.option("--trace [dir]", "Write span traces (OTLP JSON + Chrome trace) to dir")
+		.option("--metrics-port <port>", "Serve Prometheus metrics at localhost:<port>/metrics")
 		.option("-v, --verbose", "Verbose output")
 		.allowUnknownOption();
 
@@ -71,6 +93,7 @@ export function parseArgs(args: string[]): {
 	initMode: boolean | string;
 	showConfig: boolean;
 	addRule: string | undefined;
+	bench: BenchArgs | undefined;
 } {
 	// Find the -- separator and extract engine-specific arguments
 	const separatorIndex = args.indexOf("--");
@@ -82,7 +105,17 @@ export function parseArgs(args: string[]): {
 		ralphyArgs = args.slice(0, separatorIndex);
 	}
 
-	const program = createProgram();
+	let bench: BenchArgs | undefined;
+	const program = createProgram()
+		// Options after `bench` belong to the subcommand
+		.enablePositionalOptions()
+		// Required once a subcommand is registered; main() dispatches on the result
+		.action(() => {});
+	program.addCommand(
+		createBenchProgram().action((benchOpts: OptionValues) => {
+			bench = parseBenchOptions(benchOpts);
+		}),
+	);
 	program.parse(ralphyArgs);
 
 	const opts = program.opts();
@@ -98,6 +131,7 @@ export function parseArgs(args: string[]): {
 	else if (opts.droid) aiEngine = "droid";
 	else if (opts.copilot) aiEngine = "copilot";
 	else if (opts.gemini) aiEngine = "gemini";
+	else if (opts.mock) aiEngine = "mock";
 
 	// Determine model override (--sonnet is shortcut for --model sonnet)
 	const modelOverride = opts.sonnet ? "sonnet" : opts.model || undefined;
@@ -131,6 +165,7 @@ export function parseArgs(args: string[]): {
 	// Handle --fast
 	const skipTests = opts.fast || opts.skipTests;
 	const skipLint = opts.fast || opts.skipLint;
+	const metricsPort = Number.parseInt(opts.metricsPort, 10);
 
 	const options: RuntimeOptions = {
 		skipTests,
@@ -147,6 +182,9 @@ export function parseArgs(args: string[]): {
 		draftPr: opts.draftPr || false,
 		parallel: opts.parallel || false,
 		maxParallel: Number.parseInt(opts.maxParallel, 10) || 3,
+		scheduler: opts.scheduler === "continuous" ? "continuous" : "batch",
+		poolSize: Math.max(0, Number.parseInt(opts.poolSize, 10) || 0),
+		poolMaxReuse: Number.parseInt(opts.poolMaxReuse, 10) || 5,
 		prdSource,
 		prdFile,
 		prdIsFolder,
@@ -159,6 +197,8 @@ export function parseArgs(args: string[]): {
 		skipMerge: opts.merge === false,
 		useSandbox: opts.sandbox || false,
 		engineArgs,
+		traceDir: opts.trace === true ? DEFAULT_TRACE_DIR : opts.trace || undefined,
+		metricsPort: Number.isNaN(metricsPort) ? undefined : metricsPort,
 	};
 
 	return {
@@ -167,6 +207,7 @@ export function parseArgs(args: string[]): {
 		initMode: opts.init || false,
 		showConfig: opts.config || false,
 		addRule: opts.addRule,
+		bench,
 	};
 }
 
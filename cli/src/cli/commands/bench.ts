@@ -0,0 +1,197 @@
+import { mkdirSync, writeFileSync } from "node:fs";
+import { dirname } from "node:path";
+import { Command, type OptionValues } from "commander";
+import pc from "picocolors";
+import {
+	BENCH_FIXTURES,
+	BENCH_MODES,
+	type BenchFixture,
+	type BenchMode,
+	type BenchOptions,
+	type BenchReport,
+	type BenchScenarioResult,
+	runBench,
+} from "../../bench/index.ts";
+import { EXECUTION_PHASES } from "../../execution/phases.ts";
+import { logInfo, logSuccess, logWarn, setQuiet, setVerbose } from "../../ui/logger.ts";
+import { setNotificationsEnabled } from "../../ui/notify.ts";
+
+/**
+ * Parsed `ralphy bench` arguments
+ */
+export interface BenchArgs {
+	options: BenchOptions;
+	json: boolean;
+	output?: string;
+	verbose: boolean;
+}
+
+/**
+ * Create the `bench` subcommand
+ */
+export function createBenchProgram(): Command {
+	return new Command("bench")
+		.description("Benchmark orchestration overhead with the mock engine on fixture PRDs")
+		.option("--fixtures <list>", "PRD fixtures: markdown, folder, yaml", BENCH_FIXTURES.join(","))
+		.option("--modes <list>", "Modes: sequential, worktree, sandbox", BENCH_MODES.join(","))
+		.option("--tasks <n>", "Tasks per fixture", "12")
+		.option("--files <n>", "Source files in each fixture repo", "200")
+		.option("--max-parallel <n>", "Parallel agents (worktree/sandbox modes)", "4")
+		.option("--scheduler <mode>", "Parallel scheduler: batch or continuous", "batch")
+		.option("--max-retries <n>", "Maximum retries per task", "3")
+		.option("--retry-delay <n>", "Base retry delay in seconds", "0")
+		.option("--latency <ms>", "Mock agent run time per attempt", "50")
+		.option("--jitter <fraction>", "Random variation of the latency", "0.2")
+		.option("--output-bytes <n>", "Synthetic stream-json output per attempt", "8192")
+		.option("--edits <n>", "Files written per task", "1")
+		.option("--failure-rate <p>", "Probability of a permanent failure per attempt", "0")
+		.option("--retry-rate <p>", "Probability of a retryable failure per attempt", "0")
+		.option("--transcript <path>", "Replay a recorded stream-json transcript (file or folder)")
+		.option("--seed <n>", "Random seed", "1")
+		.option("--json", "Print the report as JSON")
+		.option("-o, --output <file>", "Write the JSON report to a file")
+		.option("--keep", "Keep fixture repos for inspection")
+		.option("-v, --verbose", "Show run logs");
+}
+
+function parseList<T extends string>(value: string, allowed: T[], name: string): T[] {
+	const items = value.split(",").map((item) => item.trim()) as T[];
+	for (const item of items) {
+		if (!allowed.includes(item)) {
+			throw new Error(`Unknown ${name}: ${item}. Expected one of: ${allowed.join(", ")}`);
+		}
+	}
+	return items;
+}
+
+/**
+ * Convert the parsed `bench` subcommand options into BenchArgs
+ */
+export function parseBenchOptions(opts: OptionValues): BenchArgs {
+	const options: BenchOptions = {
+		fixtures: parseList<BenchFixture>(opts.fixtures, BENCH_FIXTURES, "fixture"),
+		modes: parseList<BenchMode>(opts.modes, BENCH_MODES, "mode"),
+		tasks: Math.max(1, Number.parseInt(opts.tasks, 10) || 12),
+		files: Math.max(0, Number.parseInt(opts.files, 10) || 0),
+		maxParallel: Math.max(1, Number.parseInt(opts.maxParallel, 10) || 4),
+		scheduler: opts.scheduler === "continuous" ? "continuous" : "batch",
+		maxRetries: Math.max(1, Number.parseInt(opts.maxRetries, 10) || 3),
+		retryDelay: Math.max(0, Number.parseFloat(opts.retryDelay) || 0),
+		engine: {
+			latencyMs: Math.max(0, Number.parseFloat(opts.latency) || 0),
+			latencyJitter: Math.max(0, Number.parseFloat(opts.jitter) || 0),
+			outputBytes: Math.max(0, Number.parseInt(opts.outputBytes, 10) || 0),
+			edits: Math.max(0, Number.parseInt(opts.edits, 10) || 0),
+			failureRate: Math.max(0, Number.parseFloat(opts.failureRate) || 0),
+			retryRate: Math.max(0, Number.parseFloat(opts.retryRate) || 0),
+			transcript: opts.transcript,
+			seed: Number.parseInt(opts.seed, 10) || 1,
+		},
+		keep: opts.keep || false,
+	};
+
+	return { options, json: opts.json || false, output: opts.output, verbose: opts.verbose || false };
+}
+
+function formatRow(cells: Array<string | number>, widths: number[]): string {
+	return cells
+		.map((cell, i) => {
+			const text = String(cell);
+			return i === 0 ? text.padEnd(widths[i]) : text.padStart(widths[i]);
+		})
+		.join("  ");
+}
+
+const TABLE_HEADER = [
+	"scenario",
+	"done",
+	"fail",
+	"wall ms",
+	...EXECUTION_PHASES.map((phase) => `${phase} ms`),
+	"peak MB",
+	"tasks/min",
+];
+const TABLE_WIDTHS = TABLE_HEADER.map((header, i) => (i === 0 ? 22 : Math.max(header.length, 6)));
+
+function scenarioRow(result: BenchScenarioResult): string {
+	return formatRow(
+		[
+			`${result.fixture}/${result.mode}`,
+			result.completed,
+			result.failed,
+			result.wallMs,
+			...EXECUTION_PHASES.map((phase) => result.phases[phase].totalMs),
+			result.peakRssMb,
+			result.tasksPerMinute,
+		],
+		TABLE_WIDTHS,
+	);
+}
+
+function printReport(report: BenchReport): void {
+	console.log("");
+	console.log(pc.bold("Benchmark results"));
+	console.log(
+		pc.dim(
+			`ralphy ${report.ralphyVersion}, ${report.runtime}, ${report.platform}, ${report.options.tasks} tasks, ${report.options.maxParallel} agents, ${report.options.engine.latencyMs}ms mock latency`,
+		),
+	);
+	console.log("");
+	console.log(formatRow(TABLE_HEADER, TABLE_WIDTHS));
+	for (const result of report.scenarios) {
+		console.log(scenarioRow(result));
+	}
+	console.log("");
+	console.log(pc.dim("Phase times are summed over agents; parallel phases overlap."));
+	console.log(`  Max RSS: ${report.maxRssMb} MB`);
+}
+
+/**
+ * Handle `ralphy bench`
+ */
+export async function runBenchCommand(args: BenchArgs): Promise<void> {
+	const { options, json, output, verbose } = args;
+
+	if (!json) {
+		logInfo(
+			`Benchmarking ${options.fixtures.length} fixture(s) x ${options.modes.length} mode(s) with the mock engine...`,
+		);
+	}
+
+	setVerbose(verbose);
+	setQuiet(!verbose);
+	setNotificationsEnabled(false);
+
+	let report: BenchReport;
+	try {
+		report = await runBench(options, (result) => {
+			if (!json && !verbose) {
+				console.log(`  ${result.fixture}/${result.mode}: ${result.wallMs}ms`);
+			}
+		});
+	} finally {
+		setQuiet(false);
+	}
+
+	if (output) {
+		mkdirSync(dirname(output), { recursive: true });
+		writeFileSync(output, `${JSON.stringify(report, null, 2)}\n`, "utf-8");
+	}
+
+	if (json) {
+		console.log(JSON.stringify(report, null, 2));
+		return;
+	}
+
+	printReport(report);
+	if (output) {
+		logSuccess(`Report written to ${output}`);
+	}
+
+	const unfinished = report.scenarios.filter((s) => s.completed + s.failed < s.tasks);
+	if (unfinished.length > 0) {
+		logWarn(
+			`${unfinished.length} scenario(s) stopped before finishing all tasks (retryable failures stop a run early)`,
+		);
+	}
+}
@@ -2,3 +2,4 @@ export * from "./init.ts";
 export * from "./config.ts";
 export * from "./task.ts";
 export * from "./run.ts";
+export * from "./bench.ts";
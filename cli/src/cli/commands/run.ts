@@ -8,17 +8,22 @@ import { runParallel } from "../../execution/parallel.ts";
 import { type ExecutionResult, runSequential } from "../../execution/sequential.ts";
 import { getDefaultBaseBranch } from "../../git/branch.ts";
 import { sendNotifications } from "../../notifications/webhook.ts";
-import { CachedTaskSource, createTaskSource } from "../../tasks/index.ts";
+import { CachedTaskSource, GitHubTaskSource, createTaskSource } from "../../tasks/index.ts";
+import { startMetricsServer } from "../../telemetry/metrics.ts";
+import { writeTraceFiles } from "../../telemetry/trace-export.ts";
+import { startTracing, stopTracing, withSpan } from "../../telemetry/tracing.ts";
 import {
 	formatDuration,
 	formatTokens,
 	logError,
 	logInfo,
 	logSuccess,
+	logWarn,
 	setVerbose,
 } from "../../ui/logger.ts";
 import { notifyAllComplete } from "../../ui/notify.ts";
 import { buildActiveSettings } from "../../ui/settings.ts";
+import { VERSION } from "../../version.ts";
 
 /**
  * Run the PRD loop (multiple tasks from file/GitHub)
@@ -98,7 +103,8 @@ export async function runLoop(options: RuntimeOptions): Promise<void> {
 	logInfo(`Starting Ralphy with ${engine.name}`);
 	logInfo(`Tasks remaining: ${remaining}`);
 	if (options.parallel) {
-		logInfo(`Mode: Parallel (max ${options.maxParallel} agents)`);
+		const schedulerNote = options.scheduler === "continuous" ? ", continuous scheduler" : "";
+		logInfo(`Mode: Parallel (max ${options.maxParallel} agents${schedulerNote})`);
 	} else {
 		logInfo("Mode: Sequential");
 	}
@@ -110,65 +116,103 @@ export async function runLoop(options: RuntimeOptions): Promise<void> {
 	// Build active settings for display
 	const activeSettings = buildActiveSettings(options);
 
-	// Run tasks
-	let result: ExecutionResult;
-	if (options.parallel) {
-		result = await runParallel({
-			engine,
-			taskSource,
-			workDir,
-			skipTests: options.skipTests,
-			skipLint: options.skipLint,
-			dryRun: options.dryRun,
-			maxIterations: options.maxIterations,
-			maxRetries: options.maxRetries,
-			retryDelay: options.retryDelay,
-			branchPerTask: options.branchPerTask,
-			baseBranch,
-			createPr: options.createPr,
-			draftPr: options.draftPr,
-			autoCommit: options.autoCommit,
-			browserEnabled: options.browserEnabled,
-			maxParallel: options.maxParallel,
-			prdSource: options.prdSource,
-			prdFile: options.prdFile,
-			prdIsFolder: options.prdIsFolder,
-			activeSettings,
-			useSandbox: options.useSandbox,
-			modelOverride: options.modelOverride,
-			skipMerge: options.skipMerge,
-			engineArgs: options.engineArgs,
-			syncIssue: options.syncIssue,
-		});
-	} else {
-		result = await runSequential({
-			engine,
-			taskSource,
-			workDir,
-			skipTests: options.skipTests,
-			skipLint: options.skipLint,
-			dryRun: options.dryRun,
-			maxIterations: options.maxIterations,
-			maxRetries: options.maxRetries,
-			retryDelay: options.retryDelay,
-			branchPerTask: options.branchPerTask,
-			baseBranch,
-			createPr: options.createPr,
-			draftPr: options.draftPr,
-			autoCommit: options.autoCommit,
-			browserEnabled: options.browserEnabled,
-			activeSettings,
-			prdFile: options.prdFile,
-			modelOverride: options.modelOverride,
-			skipMerge: options.skipMerge,
-			engineArgs: options.engineArgs,
-			syncIssue: options.syncIssue,
-		});
+	// Tracing and live metrics (both off unless requested)
+	if (options.traceDir) {
+		startTracing();
 	}
+	const metricsServer =
+		options.metricsPort !== undefined ? await startMetricsServer(options.metricsPort) : null;
+	if (metricsServer) {
+		logInfo(`Serving metrics at ${metricsServer.url}`);
+	}
+	const runAttributes = {
+		engine: engine.name,
+		mode: options.parallel ? "parallel" : "sequential",
+	};
 
-	// Flush any pending task completions to disk and cleanup
-	await taskSource.flush();
-	taskSource.dispose();
+	// Run tasks. The trace is written and the metrics server stopped even if the
+	// run throws, since failed runs are the ones worth tracing.
+	let result: ExecutionResult;
+	try {
+		if (options.parallel) {
+			result = await withSpan("run", runAttributes, () =>
+				runParallel({
+					engine,
+					taskSource,
+					workDir,
+					skipTests: options.skipTests,
+					skipLint: options.skipLint,
+					dryRun: options.dryRun,
+					maxIterations: options.maxIterations,
+					maxRetries: options.maxRetries,
+					retryDelay: options.retryDelay,
+					branchPerTask: options.branchPerTask,
+					baseBranch,
+					createPr: options.createPr,
+					draftPr: options.draftPr,
+					autoCommit: options.autoCommit,
+					browserEnabled: options.browserEnabled,
+					maxParallel: options.maxParallel,
+					scheduler: options.scheduler,
+					poolSize: options.poolSize,
+					poolMaxReuse: options.poolMaxReuse,
+					prdSource: options.prdSource,
+					prdFile: options.prdFile,
+					prdIsFolder: options.prdIsFolder,
+					activeSettings,
+					useSandbox: options.useSandbox,
+					modelOverride: options.modelOverride,
+					skipMerge: options.skipMerge,
+					engineArgs: options.engineArgs,
+					syncIssue: options.syncIssue,
+				}),
+			);
+		} else {
+			result = await withSpan("run", runAttributes, () =>
+				runSequential({
+					engine,
+					taskSource,
+					workDir,
+					skipTests: options.skipTests,
+					skipLint: options.skipLint,
+					dryRun: options.dryRun,
+					maxIterations: options.maxIterations,
+					maxRetries: options.maxRetries,
+					retryDelay: options.retryDelay,
+					branchPerTask: options.branchPerTask,
+					baseBranch,
+					createPr: options.createPr,
+					draftPr: options.draftPr,
+					autoCommit: options.autoCommit,
+					browserEnabled: options.browserEnabled,
+					activeSettings,
+					prdFile: options.prdFile,
+					modelOverride: options.modelOverride,
+					skipMerge: options.skipMerge,
+					engineArgs: options.engineArgs,
+					syncIssue: options.syncIssue,
+				}),
+			);
+		}
+
+		// Flush any pending task completions to disk and cleanup
+		await taskSource.flush();
+		taskSource.dispose();
+	} finally {
+		const tracer = stopTracing();
+		if (tracer && options.traceDir) {
+			try {
+				const traceFiles = await writeTraceFiles(tracer, options.traceDir, {
+					"service.version": VERSION,
+					...runAttributes,
+				});
+				logInfo(`Trace written to ${traceFiles.chrome} (Perfetto) and ${traceFiles.otlp} (OTLP)`);
+			} catch (error) {
+				logWarn(`Failed to write trace: ${error instanceof Error ? error.message : error}`);
+			}
+		}
+		await metricsServer?.close();
+	}
 
 	// Summary
 	const duration = Date.now() - startTime;
@@ -181,6 +225,16 @@ export async function runLoop(options: RuntimeOptions): Promise<void> {
 	if (result.totalInputTokens > 0 || result.totalOutputTokens > 0) {
 		console.log(`  Tokens:    ${formatTokens(result.totalInputTokens, result.totalOutputTokens)}`);
 	}
+	if (result.schedulerStats && result.schedulerStats.tasks.length > 0) {
+		const utilization = Math.round(result.schedulerStats.utilization * 100);
+		console.log(`  Slots:     ${utilization}% utilized (${result.schedulerStats.slots} agents)`);
+	}
+	if (innerTaskSource instanceof GitHubTaskSource) {
+		const api = innerTaskSource.getSyncStats();
+		console.log(
+			`  GitHub:    ${api.requests} API requests (${api.notModified} not modified, ~${api.requestsSaved} saved)`,
+		);
+	}
 	console.log("=".repeat(50));
 
 	// Send webhook notifications
@@ -91,6 +91,12 @@ export interface RuntimeOptions {
 	parallel: boolean;
 	/** Maximum parallel agents */
 	maxParallel: number;
+	/** Parallel scheduler: batch barriers or continuous slot refilling */
+	scheduler?: "batch" | "continuous";
+	/** Number of sandboxes/worktrees to keep pre-warmed and reuse (0 = disabled) */
+	poolSize?: number;
+	/** How many tasks a pooled sandbox/worktree may serve before it is replaced */
+	poolMaxReuse?: number;
 	/** PRD source type */
 	prdSource: "markdown" | "markdown-folder" | "yaml" | "json" | "github";
 	/** PRD file or folder path */
@@ -115,6 +121,10 @@ export interface RuntimeOptions {
 	useSandbox?: boolean;
 	/** Additional arguments to pass to the engine CLI */
 	engineArgs?: string[];
+	/** Write span traces (OTLP JSON and Chrome trace) to this directory */
+	traceDir?: string;
+	/** Serve Prometheus metrics on this local port */
+	metricsPort?: number;
 }
 
 /**
@@ -1,4 +1,5 @@
 import { spawn, spawnSync } from "node:child_process";
+import { LineFramer, type StreamJsonEvent, parseStreamJson } from "./stream-json.ts";
 import type { AIEngine, AIResult, EngineOptions, ProgressCallback } from "./types.ts";
 
 // Check if running in Bun
@@ -28,127 +29,23 @@ export async function commandExists(command: string): Promise<boolean> {
 }
 
 /**
- * Execute a command and return stdout
- * @param stdinContent - Optional content to pass via stdin (useful for multi-line prompts on Windows)
- */
-export async function execCommand(
-	command: string,
-	args: string[],
-	workDir: string,
-	env?: Record<string, string>,
-	stdinContent?: string,
-): Promise<{ stdout: string; stderr: string; exitCode: number }> {
-	if (isBun) {
-		// On Windows, run through cmd.exe to handle .cmd wrappers (npm global packages)
-		const spawnArgs = isWindows ? ["cmd.exe", "/c", command, ...args] : [command, ...args];
-		const proc = Bun.spawn(spawnArgs, {
-			cwd: workDir,
-			stdin: stdinContent ? "pipe" : "ignore",
-			stdout: "pipe",
-			stderr: "pipe",
-			env: { ...process.env, ...env },
-		});
-
-		// Write stdin content if provided
-		if (stdinContent && proc.stdin) {
-			proc.stdin.write(stdinContent);
-			proc.stdin.end();
-		}
-
-		const [stdout, stderr, exitCode] = await Promise.all([
-			new Response(proc.stdout).text(),
-			new Response(proc.stderr).text(),
-			proc.exited,
-		]);
-
-		return { stdout, stderr, exitCode };
-	}
-
-	// Node.js fallback - use shell on Windows to execute .cmd wrappers
-	return new Promise((resolve) => {
-		const proc = spawn(command, args, {
-			cwd: workDir,
-			env: { ...process.env, ...env },
-			stdio: [stdinContent ? "pipe" : "ignore", "pipe", "pipe"],
-			shell: isWindows, // Required on Windows for npm global commands (.cmd wrappers)
-		});
-
-		// Write stdin content if provided
-		if (stdinContent && proc.stdin) {
-			proc.stdin.write(stdinContent);
-			proc.stdin.end();
-		}
-
-		let stdout = "";
-		let stderr = "";
-
-		proc.stdout?.on("data", (data) => {
-			stdout += data.toString();
-		});
-
-		proc.stderr?.on("data", (data) => {
-			stderr += data.toString();
-		});
-
-		proc.on("close", (exitCode) => {
-			resolve({ stdout, stderr, exitCode: exitCode ?? 1 });
-		});
-
-		proc.on("error", (err) => {
-			// Maintain backward compatibility - don't reject, include error in stderr
-			stderr += `\nSpawn error: ${err.message}`;
-			resolve({ stdout, stderr, exitCode: 1 });
-		});
-	});
-}
-
-/**
- * Parse token counts from stream-json output (Claude/Qwen format)
+ * Parse token counts from stream-json output (Claude/Qwen format).
+ * Engines parse output as it arrives with StreamJsonParser; this is for complete output.
  */
 export function parseStreamJsonResult(output: string): {
 	response: string;
 	inputTokens: number;
 	outputTokens: number;
 } {
-	const lines = output.split("\n").filter(Boolean);
-	let response = "";
-	let inputTokens = 0;
-	let outputTokens = 0;
-
-	for (const line of lines) {
-		try {
-			const parsed = JSON.parse(line);
-			if (parsed.type === "result") {
-				response = parsed.result || "Task completed";
-				inputTokens = parsed.usage?.input_tokens || 0;
-				outputTokens = parsed.usage?.output_tokens || 0;
-			}
-		} catch {
-			// Ignore non-JSON lines
-		}
-	}
-
-	return { response: response || "Task completed", inputTokens, outputTokens };
+	const { response, inputTokens, outputTokens } = parseStreamJson(output).getResult();
+	return { response, inputTokens, outputTokens };
 }
 
 /**
  * Check for errors in stream-json output
  */
 export function checkForErrors(output: string): string | null {
-	const lines = output.split("\n").filter(Boolean);
-
-	for (const line of lines) {
-		try {
-			const parsed = JSON.parse(line);
-			if (parsed.type === "error") {
-				return parsed.error?.message || parsed.message || "Unknown error";
-			}
-		} catch {
-			// Ignore non-JSON lines
-		}
-	}
-
-	return null;
+	return parseStreamJson(output).getError();
 }
 
 /**
@@ -157,54 +54,7 @@ export function checkForErrors(output: string): string | null {
  * Returns the clean error message if found, null otherwise.
  */
 export function extractAuthenticationError(output: string): string | null {
-	const lines = output.split("\n").filter(Boolean);
-
-	for (const line of lines) {
-		try {
-			const parsed = JSON.parse(line);
-
-			// Check if this is any kind of error response
-			if (
-				parsed.type === "error" ||
-				parsed.is_error === true ||
-				parsed.error === "authentication_failed"
-			) {
-				// Extract message from content array (assistant type) or standard fields
-				let message = "";
-				const content = parsed.message?.content;
-				if (Array.isArray(content)) {
-					const textItem = content.find(
-						(item: { type?: string; text?: string }) => item.type === "text" && item.text,
-					);
-					if (textItem) message = textItem.text;
-				}
-				if (!message) {
-					message = parsed.result || parsed.error?.message || parsed.message || "";
-				}
-
-				if (message && isAuthenticationMessage(message.toLowerCase())) {
-					return message;
-				}
-			}
-		} catch {
-			// Ignore non-JSON lines
-		}
-	}
-
-	return null;
-}
-
-/**
- * Check if a message contains authentication-related keywords
- */
-function isAuthenticationMessage(messageLower: string): boolean {
-	return (
-		messageLower.includes("invalid api key") ||
-		messageLower.includes("authentication") ||
-		messageLower.includes("not authenticated") ||
-		messageLower.includes("unauthorized") ||
-		messageLower.includes("/login")
-	);
+	return parseStreamJson(output).getAuthenticationError();
 }
 
 /**
@@ -238,19 +88,15 @@ async function readStream(
 ): Promise<void> {
 	const reader = stream.getReader();
 	const decoder = new TextDecoder();
-	let buffer = "";
+	const framer = new LineFramer(onLine);
 	try {
 		while (true) {
 			const { done, value } = await reader.read();
 			if (done) break;
-			buffer += decoder.decode(value, { stream: true });
-			const lines = buffer.split("\n");
-			buffer = lines.pop() || "";
-			for (const line of lines) {
-				if (line.trim()) onLine(line);
-			}
+			framer.push(decoder.decode(value, { stream: true }));
 		}
-		if (buffer.trim()) onLine(buffer);
+		framer.push(decoder.decode());
+		framer.end();
 	} finally {
 		reader.releaseLock();
 	}
@@ -307,32 +153,24 @@ export async function execCommandStreaming(
 			proc.stdin.end();
 		}
 
-		let stdoutBuffer = "";
-		let stderrBuffer = "";
-
-		const processBuffer = (buffer: string, isStderr = false) => {
-			const lines = buffer.split("\n");
-			const remaining = lines.pop() || "";
-			for (const line of lines) {
-				if (line.trim()) onLine(line);
-			}
-			return remaining;
-		};
-
-		proc.stdout?.on("data", (data) => {
-			stdoutBuffer += data.toString();
-			stdoutBuffer = processBuffer(stdoutBuffer);
+		const stdoutFramer = new LineFramer(onLine);
+		const stderrFramer = new LineFramer(onLine);
+
+		proc.stdout?.setEncoding("utf8");
+		proc.stderr?.setEncoding("utf8");
+
+		proc.stdout?.on("data", (data: string) => {
+			stdoutFramer.push(data);
 		});
 
-		proc.stderr?.on("data", (data) => {
-			stderrBuffer += data.toString();
-			stderrBuffer = processBuffer(stderrBuffer, true);
+		proc.stderr?.on("data", (data: string) => {
+			stderrFramer.push(data);
 		});
 
 		proc.on("close", (exitCode) => {
 			// Process any remaining data
-			if (stdoutBuffer.trim()) onLine(stdoutBuffer);
-			if (stderrBuffer.trim()) onLine(stderrBuffer);
+			stdoutFramer.end();
+			stderrFramer.end();
 			resolve({ exitCode: exitCode ?? 1 });
 		});
 
@@ -369,73 +207,89 @@ export function detectStepFromOutput(line: string): string | null {
 	}
 
 	try {
-		const parsed = JSON.parse(trimmed);
-
-		// Extract specific fields for pattern matching (avoid stringifying entire object)
-		const toolName =
-			parsed.tool?.toLowerCase() ||
-			parsed.name?.toLowerCase() ||
-			parsed.tool_name?.toLowerCase() ||
-			"";
-		const command = parsed.command?.toLowerCase() || "";
-		const filePath = (parsed.file_path || parsed.filePath || parsed.path || "").toLowerCase();
-		const description = (parsed.description || "").toLowerCase();
-
-		// Check tool name first to determine operation type
-		const isReadOperation = toolName === "read" || toolName === "glob" || toolName === "grep";
-		const isWriteOperation = toolName === "write" || toolName === "edit";
-
-		// Reading code - check this early to avoid misclassifying reads of test files
-		if (isReadOperation) {
-			return "Reading code";
-		}
+		return detectStepFromEvent(JSON.parse(trimmed));
+	} catch {
+		return null;
+	}
+}
 
-		// Git commit
-		if (command.includes("git commit") || description.includes("git commit")) {
-			return "Committing";
-		}
+/**
+ * First string value among the given fields, lowercased
+ */
+function lowerField(event: StreamJsonEvent, ...keys: string[]): string {
+	for (const key of keys) {
+		const value = event[key];
+		if (typeof value === "string" && value) return value.toLowerCase();
+	}
+	return "";
+}
 
-		// Git add/staging
-		if (command.includes("git add") || description.includes("git add")) {
-			return "Staging";
-		}
+/**
+ * Detect the current step from an already parsed event (see StreamJsonParser.pushLine)
+ */
+export function detectStepFromEvent(event: StreamJsonEvent): string | null {
+	if (!event || typeof event !== "object") {
+		return null;
+	}
 
-		// Linting - check command for lint tools
-		if (
-			command.includes("lint") ||
-			command.includes("eslint") ||
-			command.includes("biome") ||
-			command.includes("prettier")
-		) {
-			return "Linting";
-		}
+	// Extract specific fields for pattern matching (avoid stringifying entire object)
+	const toolName = lowerField(event, "tool", "name", "tool_name");
+	const command = lowerField(event, "command");
+	const filePath = lowerField(event, "file_path", "filePath", "path");
+	const description = lowerField(event, "description");
 
-		// Testing - check command for test runners
-		if (
-			command.includes("vitest") ||
-			command.includes("jest") ||
-			command.includes("bun test") ||
-			command.includes("npm test") ||
-			command.includes("pytest") ||
-			command.includes("go test")
-		) {
-			return "Testing";
-		}
+	// Check tool name first to determine operation type
+	const isReadOperation = toolName === "read" || toolName === "glob" || toolName === "grep";
+	const isWriteOperation = toolName === "write" || toolName === "edit";
 
-		// Writing tests - only for write operations to test files
-		if (isWriteOperation && isTestFile(filePath)) {
-			return "Writing tests";
-		}
+	// Reading code - check this early to avoid misclassifying reads of test files
+	if (isReadOperation) {
+		return "Reading code";
+	}
 
-		// Writing/Editing code
-		if (isWriteOperation) {
-			return "Implementing";
-		}
+	// Git commit
+	if (command.includes("git commit") || description.includes("git commit")) {
+		return "Committing";
+	}
 
-		return null;
-	} catch {
-		return null;
+	// Git add/staging
+	if (command.includes("git add") || description.includes("git add")) {
+		return "Staging";
+	}
+
+	// Linting - check command for lint tools
+	if (
+		command.includes("lint") ||
+		command.includes("eslint") ||
+		command.includes("biome") ||
+		command.includes("prettier")
+	) {
+		return "Linting";
+	}
+
+	// Testing - check command for test runners
+	if (
+		command.includes("vitest") ||
+		command.includes("jest") ||
+		command.includes("bun test") ||
+		command.includes("npm test") ||
+		command.includes("pytest") ||
+		command.includes("go test")
+	) {
+		return "Testing";
 	}
+
+	// Writing tests - only for write operations to test files
+	if (isWriteOperation && isTestFile(filePath)) {
+		return "Writing tests";
+	}
+
+	// Writing/Editing code
+	if (isWriteOperation) {
+		return "Implementing";
+	}
+
+	return null;
 }
 
 /**
@@ -1,6 +1,7 @@
 import { existsSync, readFileSync, rmSync, unlinkSync } from "node:fs";
 import { join } from "node:path";
-import { BaseAIEngine, execCommand, formatCommandError } from "./base.ts";
+import { BaseAIEngine, execCommandStreaming, formatCommandError } from "./base.ts";
+import { StreamJsonParser } from "./stream-json.ts";
 import type { AIResult, EngineOptions } from "./types.ts";
 
 const isWindows = process.platform === "win32";
@@ -34,16 +35,26 @@ export class CodexEngine extends BaseAIEngine {
 				args.push(prompt);
 			}
 
-			const { stdout, stderr, exitCode } = await execCommand(
+			// Parse JSON events as they arrive instead of buffering all output
+			let itemError: string | null = null;
+			const parser = new StreamJsonParser({
+				onEvent: (event) => {
+					// Errors may also be reported as nested items
+					const item = event.item as { type?: string; message?: string } | undefined;
+					if (itemError === null && item?.type === "error") {
+						itemError = item.message || "Unknown error";
+					}
+				},
+			});
+			const { exitCode } = await execCommandStreaming(
 				this.cliCommand,
 				args,
 				workDir,
+				(line) => parser.pushLine(line),
 				undefined,
 				stdinContent,
 			);
 
-			const output = stdout + stderr;
-
 			// Read the last message from the file
 			let response = "";
 			if (existsSync(lastMessageFile)) {
@@ -59,14 +70,14 @@ export class CodexEngine extends BaseAIEngine {
 			}
 
 			// Check for errors in output
-			if (output.includes('"type":"error"')) {
-				const errorMatch = output.match(/"message":"([^"]+)"/);
+			const error = parser.getError() ?? itemError;
+			if (error) {
 				return {
 					success: false,
 					response: "",
 					inputTokens: 0,
 					outputTokens: 0,
-					error: errorMatch?.[1] || "Unknown error",
+					error,
 				};
 			}
 
@@ -77,7 +88,7 @@ export class CodexEngine extends BaseAIEngine {
 					response: response || "Task completed",
 					inputTokens: 0,
 					outputTokens: 0,
-					error: formatCommandError(exitCode, output),
+					error: formatCommandError(exitCode, parser.getRecentOutput()),
 				};
 			}
 
@@ -2,7 +2,7 @@ import { afterEach, beforeEach, describe, expect, it, spyOn } from "bun:test";
 import { existsSync, mkdirSync, readFileSync, rmSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
-import * as baseModule from "./base.ts";
+import * as execModule from "../utils/exec.ts";
 import { CopilotEngine } from "./copilot.ts";
 
 describe("CopilotEngine", () => {
@@ -27,7 +27,7 @@ describe("CopilotEngine", () => {
 				rmSync(tempDir, { recursive: true, force: true });
 			}
 
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 10 in, 5 out, 0 cached\nTask completed successfully",
 				stderr: "",
 				exitCode: 0,
@@ -42,7 +42,7 @@ describe("CopilotEngine", () => {
 
 		it("should create unique filenames for parallel execution", async () => {
 			const capturedPaths: string[] = [];
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -79,7 +79,7 @@ describe("CopilotEngine", () => {
 			let capturedFilePath = "";
 			let fileContentDuringExec = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -128,7 +128,7 @@ function test() {
 			let capturedFilePath = "";
 			let fileContentDuringExec = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -159,7 +159,7 @@ function test() {
 		it("should clean up temporary file after execution", async () => {
 			let capturedFilePath = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -184,7 +184,7 @@ function test() {
 		it("should clean up temporary file even when execution fails", async () => {
 			let capturedFilePath = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -209,7 +209,7 @@ function test() {
 		it("should handle cleanup errors gracefully", async () => {
 			let capturedFilePath = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					const pIndex = args.indexOf("-p");
 					if (pIndex !== -1 && pIndex + 1 < args.length) {
@@ -236,7 +236,7 @@ function test() {
 			// Ensure temp directory exists to simulate race condition
 			mkdirSync(tempDir, { recursive: true });
 
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 10 in, 5 out, 0 cached\nTask completed",
 				stderr: "",
 				exitCode: 0,
@@ -254,7 +254,7 @@ function test() {
 		it("should build command with --yolo flag", async () => {
 			let capturedArgs: string[] = [];
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					capturedArgs = args;
 					return {
@@ -275,7 +275,7 @@ function test() {
 		it("should pass prompt file path with -p flag", async () => {
 			let capturedArgs: string[] = [];
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					capturedArgs = args;
 					return {
@@ -301,7 +301,7 @@ function test() {
 		it("should include model override when specified", async () => {
 			let capturedArgs: string[] = [];
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					capturedArgs = args;
 					return {
@@ -324,7 +324,7 @@ function test() {
 		it("should include additional engine args when specified", async () => {
 			let capturedArgs: string[] = [];
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					capturedArgs = args;
 					return {
@@ -346,7 +346,7 @@ function test() {
 		it("should pass file paths without quotes for cross-platform compatibility", async () => {
 			let capturedArgs: string[] = [];
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, args: string[]) => {
 					capturedArgs = args;
 					return {
@@ -373,7 +373,7 @@ function test() {
 
 	describe("Output Parsing", () => {
 		it("should parse token counts correctly", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 1000 in, 500 out, 200 cached\nTask completed",
 				stderr: "",
 				exitCode: 0,
@@ -388,7 +388,7 @@ function test() {
 		});
 
 		it("should parse token counts with k suffix", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 17.5k in, 2.3k out, 1k cached\nTask completed",
 				stderr: "",
 				exitCode: 0,
@@ -403,7 +403,7 @@ function test() {
 		});
 
 		it("should parse token counts with m suffix", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 1.5m in, 0.5m out, 0.1m cached\nTask completed",
 				stderr: "",
 				exitCode: 0,
@@ -418,7 +418,7 @@ function test() {
 		});
 
 		it("should filter out CLI artifacts from response", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `? Select option
 ❯ Option 1
 Thinking...
@@ -438,7 +438,7 @@ model-name 500 in, 300 out, 100 cached`,
 		});
 
 		it("should return 'Task completed' when no meaningful response", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "model-name 100 in, 50 out, 0 cached\n",
 				stderr: "",
 				exitCode: 0,
@@ -454,7 +454,7 @@ model-name 500 in, 300 out, 100 cached`,
 		it("should not filter user content that mentions token formats", async () => {
 			// This tests that the token count line filter is specific enough
 			// to not accidentally filter valid response content about tokens
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `Here's how token counting works:
 The model uses 17.5k in tokens for context
 You can see "500 in, 300 out" format in logs
@@ -478,7 +478,7 @@ model-name 100 in, 50 out, 25 cached`,
 		});
 
 		it("should filter token count stats lines with various model names", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `Response content here
 gpt-4-turbo 17.5k in, 2.3k out, 1k cached
 claude-3-opus 500 in, 300 out, 100 cached
@@ -505,7 +505,7 @@ o1-preview 1.5m in, 0.5m out, 0.1m cached`,
 		// is authentication errors (which we've observed in practice).
 
 		it("should detect authentication errors when output starts with auth message", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "Not authenticated. Please login first.",
 				stderr: "",
 				exitCode: 0, // We don't know if Copilot uses non-zero exit codes
@@ -521,7 +521,7 @@ o1-preview 1.5m in, 0.5m out, 0.1m cached`,
 		});
 
 		it("should detect 'no authentication' variant", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "No authentication found. Please run /login.",
 				stderr: "",
 				exitCode: 0,
@@ -538,7 +538,7 @@ o1-preview 1.5m in, 0.5m out, 0.1m cached`,
 		it("should NOT treat rate limit in response content as CLI error", async () => {
 			// We don't know what Copilot's rate limit error looks like
 			// So we don't detect it - it could be valid response content
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `The API has rate limiting:
 Rate limit exceeded errors should be handled gracefully
 model-name 1000 in, 500 out, 200 cached`,
@@ -557,7 +557,7 @@ model-name 1000 in, 500 out, 200 cached`,
 		it("should NOT treat network error in response content as CLI error", async () => {
 			// Network error appearing in response content should not be treated as a CLI error
 			// This could be test output, error handling code, or discussion about network issues
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `Test results:
 - network error handling: PASS
 - connection refused retry: PASS
@@ -577,7 +577,7 @@ model-name 1000 in, 500 out, 200 cached`,
 		it("should NOT treat 'Error:' in response content as CLI error", async () => {
 			// "Error:" appearing in response should not be treated as error
 			// We don't know if Copilot uses "Error:" prefix for CLI errors
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: `Here's the fix for the code:
 Error: connection timeout - this needs to be caught
 Error: file not found - handle this case too
@@ -597,7 +597,7 @@ model-name 1000 in, 500 out, 200 cached`,
 		it("should handle non-zero exit codes (even though we don't know if Copilot uses them)", async () => {
 			// We still check exit codes as a fallback, but we don't know
 			// if Copilot actually uses them for errors
-			const spy = spyOn(baseModule, "execCommand").mockResolvedValue({
+			const spy = spyOn(execModule, "execCommand").mockResolvedValue({
 				stdout: "Some output before failure",
 				stderr: "",
 				exitCode: 127,
@@ -614,7 +614,7 @@ model-name 1000 in, 500 out, 200 cached`,
 
 	describe("Success Cases", () => {
 		it("should return success result with correct data", async () => {
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(async () => {
+			const spy = spyOn(execModule, "execCommand").mockImplementation(async () => {
 				// Add small delay to ensure durationMs > 0
 				await new Promise((resolve) => setTimeout(resolve, 10));
 				return {
@@ -639,7 +639,7 @@ model-name 1000 in, 500 out, 200 cached`,
 		it("should execute with correct working directory", async () => {
 			let capturedWorkDir = "";
 
-			const spy = spyOn(baseModule, "execCommand").mockImplementation(
+			const spy = spyOn(execModule, "execCommand").mockImplementation(
 				async (_cmd: string, _args: string[], workDir: string) => {
 					capturedWorkDir = workDir;
 					return {
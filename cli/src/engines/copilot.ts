@@ -3,7 +3,8 @@ import { mkdirSync, unlinkSync, writeFileSync } from "node:fs";
 import { tmpdir } from "node:os";
 import { join } from "node:path";
 import { logDebug } from "../ui/logger.ts";
-import { BaseAIEngine, checkForErrors, execCommand, formatCommandError } from "./base.ts";
+import { execCommand } from "../utils/exec.ts";
+import { BaseAIEngine, checkForErrors, formatCommandError } from "./base.ts";
 import type { AIResult, EngineOptions } from "./types.ts";
 
 /** Directory for temporary prompt files */
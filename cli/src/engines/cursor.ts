@@ -1,11 +1,10 @@
 import {
 	BaseAIEngine,
-	checkForErrors,
-	detectStepFromOutput,
-	execCommand,
+	detectStepFromEvent,
 	execCommandStreaming,
 	formatCommandError,
 } from "./base.ts";
+import { StreamJsonParser } from "./stream-json.ts";
 import type { AIResult, EngineOptions, ProgressCallback } from "./types.ts";
 
 const isWindows = process.platform === "win32";
@@ -35,18 +34,19 @@ export class CursorEngine extends BaseAIEngine {
 			args.push(prompt);
 		}
 
-		const { stdout, stderr, exitCode } = await execCommand(
+		// Parse output as it arrives instead of buffering all of it
+		const parser = new StreamJsonParser();
+		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
+			(line) => parser.pushLine(line),
 			undefined,
 			stdinContent,
 		);
 
-		const output = stdout + stderr;
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -58,7 +58,7 @@ export class CursorEngine extends BaseAIEngine {
 		}
 
 		// Parse Cursor output
-		const { response, durationMs } = this.parseOutput(output);
+		const { response, durationMs } = this.parseOutput(parser);
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -67,7 +67,7 @@ export class CursorEngine extends BaseAIEngine {
 				response,
 				inputTokens: 0,
 				outputTokens: 0,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
@@ -80,38 +80,15 @@ export class CursorEngine extends BaseAIEngine {
 		};
 	}
 
-	private parseOutput(output: string): { response: string; durationMs: number } {
-		const lines = output.split("\n").filter(Boolean);
-		let response = "";
-		let durationMs = 0;
-
-		for (const line of lines) {
-			try {
-				const parsed = JSON.parse(line);
-
-				// Check result line
-				if (parsed.type === "result") {
-					response = parsed.result || "Task completed";
-					if (typeof parsed.duration_ms === "number") {
-						durationMs = parsed.duration_ms;
-					}
-				}
+	private parseOutput(parser: StreamJsonParser): { response: string; durationMs: number } {
+		const { response, durationMs } = parser.getResult();
 
-				// Check assistant message as fallback
-				if (parsed.type === "assistant" && !response) {
-					const content = parsed.message?.content;
-					if (Array.isArray(content) && content[0]?.text) {
-						response = content[0].text;
-					} else if (typeof content === "string") {
-						response = content;
-					}
-				}
-			} catch {
-				// Ignore non-JSON lines
-			}
+		// Use the first assistant message as fallback when there was no result line
+		if (!parser.hasResult()) {
+			return { response: parser.getAssistantText() || "Task completed", durationMs };
 		}
 
-		return { response: response || "Task completed", durationMs };
+		return { response, durationMs };
 	}
 
 	async executeStreaming(
@@ -137,17 +114,17 @@ export class CursorEngine extends BaseAIEngine {
 			args.push(prompt);
 		}
 
-		const outputLines: string[] = [];
+		const parser = new StreamJsonParser();
 
 		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
 			(line) => {
-				outputLines.push(line);
+				const event = parser.pushLine(line);
 
 				// Detect and report step changes
-				const step = detectStepFromOutput(line);
+				const step = event ? detectStepFromEvent(event) : null;
 				if (step) {
 					onProgress(step);
 				}
@@ -156,10 +133,8 @@ export class CursorEngine extends BaseAIEngine {
 			stdinContent,
 		);
 
-		const output = outputLines.join("\n");
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -171,7 +146,7 @@ export class CursorEngine extends BaseAIEngine {
 		}
 
 		// Parse Cursor output
-		const { response, durationMs } = this.parseOutput(output);
+		const { response, durationMs } = this.parseOutput(parser);
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -180,7 +155,7 @@ export class CursorEngine extends BaseAIEngine {
 				response,
 				inputTokens: 0,
 				outputTokens: 0,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
@@ -1,11 +1,10 @@
 import {
 	BaseAIEngine,
-	checkForErrors,
-	detectStepFromOutput,
-	execCommand,
+	detectStepFromEvent,
 	execCommandStreaming,
 	formatCommandError,
 } from "./base.ts";
+import { StreamJsonParser } from "./stream-json.ts";
 import type { AIResult, EngineOptions, ProgressCallback } from "./types.ts";
 
 const isWindows = process.platform === "win32";
@@ -35,18 +34,19 @@ export class DroidEngine extends BaseAIEngine {
 			args.push(prompt);
 		}
 
-		const { stdout, stderr, exitCode } = await execCommand(
+		// Parse output as it arrives instead of buffering all of it
+		const { parser, completion } = this.createParser();
+		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
+			(line) => parser.pushLine(line),
 			undefined,
 			stdinContent,
 		);
 
-		const output = stdout + stderr;
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -58,7 +58,8 @@ export class DroidEngine extends BaseAIEngine {
 		}
 
 		// Parse Droid output
-		const { response, durationMs } = this.parseOutput(output);
+		const response = completion.response || "Task completed";
+		const { durationMs } = completion;
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -67,7 +68,7 @@ export class DroidEngine extends BaseAIEngine {
 				response,
 				inputTokens: 0,
 				outputTokens: 0,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
@@ -80,28 +81,27 @@ export class DroidEngine extends BaseAIEngine {
 		};
 	}
 
-	private parseOutput(output: string): { response: string; durationMs: number } {
-		const lines = output.split("\n").filter(Boolean);
-		let response = "";
-		let durationMs = 0;
-
-		for (const line of lines) {
-			try {
-				const parsed = JSON.parse(line);
-
+	/**
+	 * Create an output parser that also picks up Droid's completion event
+	 */
+	private createParser(): {
+		parser: StreamJsonParser;
+		completion: { response: string; durationMs: number };
+	} {
+		const completion = { response: "", durationMs: 0 };
+		const parser = new StreamJsonParser({
+			onEvent: (event) => {
 				// Check completion event
-				if (parsed.type === "completion") {
-					response = parsed.finalText || "Task completed";
-					if (typeof parsed.durationMs === "number") {
-						durationMs = parsed.durationMs;
+				if (event.type === "completion") {
+					completion.response =
+						(typeof event.finalText === "string" && event.finalText) || "Task completed";
+					if (typeof event.durationMs === "number") {
+						completion.durationMs = event.durationMs;
 					}
 				}
-			} catch {
-				// Ignore non-JSON lines
-			}
-		}
-
-		return { response: response || "Task completed", durationMs };
+			},
+		});
+		return { parser, completion };
 	}
 
 	async executeStreaming(
@@ -127,17 +127,17 @@ export class DroidEngine extends BaseAIEngine {
 			args.push(prompt);
 		}
 
-		const outputLines: string[] = [];
+		const { parser, completion } = this.createParser();
 
 		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
 			(line) => {
-				outputLines.push(line);
+				const event = parser.pushLine(line);
 
 				// Detect and report step changes
-				const step = detectStepFromOutput(line);
+				const step = event ? detectStepFromEvent(event) : null;
 				if (step) {
 					onProgress(step);
 				}
@@ -146,10 +146,8 @@ export class DroidEngine extends BaseAIEngine {
 			stdinContent,
 		);
 
-		const output = outputLines.join("\n");
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -161,7 +159,8 @@ export class DroidEngine extends BaseAIEngine {
 		}
 
 		// Parse Droid output
-		const { response, durationMs } = this.parseOutput(output);
+		const response = completion.response || "Task completed";
+		const { durationMs } = completion;
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -170,7 +169,7 @@ export class DroidEngine extends BaseAIEngine {
 				response,
 				inputTokens: 0,
 				outputTokens: 0,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
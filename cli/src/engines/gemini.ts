@@ -1,12 +1,10 @@
 import {
 	BaseAIEngine,
-	checkForErrors,
-	detectStepFromOutput,
-	execCommand,
+	detectStepFromEvent,
 	execCommandStreaming,
 	formatCommandError,
-	parseStreamJsonResult,
 } from "./base.ts";
+import { StreamJsonParser } from "./stream-json.ts";
 import type { AIResult, EngineOptions, ProgressCallback } from "./types.ts";
 
 const isWindows = process.platform === "win32";
@@ -38,18 +36,19 @@ export class GeminiEngine extends BaseAIEngine {
 			args.push("-p", prompt);
 		}
 
-		const { stdout, stderr, exitCode } = await execCommand(
+		// Parse output as it arrives instead of buffering all of it
+		const parser = new StreamJsonParser();
+		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
+			(line) => parser.pushLine(line),
 			undefined,
 			stdinContent,
 		);
 
-		const output = stdout + stderr;
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -61,7 +60,7 @@ export class GeminiEngine extends BaseAIEngine {
 		}
 
 		// Parse result (same format as Claude/Qwen)
-		const { response, inputTokens, outputTokens } = parseStreamJsonResult(output);
+		const { response, inputTokens, outputTokens } = parser.getResult();
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -70,7 +69,7 @@ export class GeminiEngine extends BaseAIEngine {
 				response,
 				inputTokens,
 				outputTokens,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
@@ -106,17 +105,17 @@ export class GeminiEngine extends BaseAIEngine {
 			args.push("-p", prompt);
 		}
 
-		const outputLines: string[] = [];
+		const parser = new StreamJsonParser();
 
 		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
 			(line) => {
-				outputLines.push(line);
+				const event = parser.pushLine(line);
 
 				// Detect and report step changes
-				const step = detectStepFromOutput(line);
+				const step = event ? detectStepFromEvent(event) : null;
 				if (step) {
 					onProgress(step);
 				}
@@ -125,10 +124,8 @@ export class GeminiEngine extends BaseAIEngine {
 			stdinContent,
 		);
 
-		const output = outputLines.join("\n");
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -140,7 +137,7 @@ export class GeminiEngine extends BaseAIEngine {
 		}
 
 		// Parse result (same format as Claude/Qwen)
-		const { response, inputTokens, outputTokens } = parseStreamJsonResult(output);
+		const { response, inputTokens, outputTokens } = parser.getResult();
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -149,7 +146,7 @@ export class GeminiEngine extends BaseAIEngine {
 				response,
 				inputTokens,
 				outputTokens,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
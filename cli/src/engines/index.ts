@@ -1,5 +1,6 @@
 export * from "./types.ts";
 export * from "./base.ts";
+export * from "./stream-json.ts";
 export * from "./claude.ts";
 export * from "./opencode.ts";
 export * from "./cursor.ts";
@@ -8,6 +9,7 @@ export * from "./qwen.ts";
 export * from "./droid.ts";
 export * from "./copilot.ts";
 export * from "./gemini.ts";
+export * from "./mock.ts";
 
 import { ClaudeEngine } from "./claude.ts";
 import { CodexEngine } from "./codex.ts";
@@ -15,6 +17,7 @@ import { CopilotEngine } from "./copilot.ts";
 import { CursorEngine } from "./cursor.ts";
 import { DroidEngine } from "./droid.ts";
 import { GeminiEngine } from "./gemini.ts";
+import { MockEngine } from "./mock.ts";
 import { OpenCodeEngine } from "./opencode.ts";
 import { QwenEngine } from "./qwen.ts";
 import type { AIEngine, AIEngineName } from "./types.ts";
@@ -40,6 +43,8 @@ export function createEngine(name: AIEngineName): AIEngine {
 			return new CopilotEngine();
 		case "gemini":
 			return new GeminiEngine();
+		case "mock":
+			return new MockEngine();
 		default:
 			throw new Error(`Unknown AI engine: ${name}`);
 	}
@@ -0,0 +1,105 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, mkdtempSync, readFileSync, rmSync, writeFileSync } from "node:fs";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { isRetryableError } from "../execution/retry.ts";
+import {
+	MOCK_FAILURE_ERROR,
+	MOCK_RETRYABLE_ERROR,
+	MockEngine,
+	parseMockEngineArgs,
+} from "./mock.ts";
+
+const PROMPT = "## Task\nImplement feature 001\n\n## Instructions\n1. Do it";
+
+describe("parseMockEngineArgs", () => {
+	it("should parse numeric flags and the transcript path", () => {
+		expect(
+			parseMockEngineArgs(["--latency", "200", "--edits", "3", "--transcript", "t.jsonl", "--x"]),
+		).toEqual({ latencyMs: 200, edits: 3, transcript: "t.jsonl" });
+	});
+
+	it("should ignore non-numeric values", () => {
+		expect(parseMockEngineArgs(["--seed", "abc"])).toEqual({});
+	});
+});
+
+describe("MockEngine", () => {
+	let workDir: string;
+
+	beforeEach(() => {
+		workDir = mkdtempSync(join(tmpdir(), "ralphy-mock-"));
+	});
+
+	afterEach(() => {
+		rmSync(workDir, { recursive: true, force: true });
+	});
+
+	it("should write the requested edits and report a result", async () => {
+		const engine = new MockEngine({ latencyMs: 0, edits: 2 });
+		const result = await engine.execute(PROMPT, workDir);
+
+		expect(result.success).toBe(true);
+		expect(result.response).toBe("Completed: Implement feature 001");
+		expect(result.outputTokens).toBeGreaterThan(0);
+		const edit = join(workDir, "src", "mock", "implement-feature-001", "edit-2.ts");
+		expect(readFileSync(edit, "utf-8")).toContain("Implement feature 001");
+	});
+
+	it("should fail permanently at a failure rate of 1", async () => {
+		const engine = new MockEngine({ latencyMs: 0, failureRate: 1 });
+		const result = await engine.execute(PROMPT, workDir);
+
+		expect(result.success).toBe(false);
+		expect(result.error).toBe(MOCK_FAILURE_ERROR);
+		expect(isRetryableError(result.error ?? "")).toBe(false);
+		expect(existsSync(join(workDir, "src"))).toBe(false);
+	});
+
+	it("should fail with a retryable error at a retry rate of 1", async () => {
+		const engine = new MockEngine({ latencyMs: 0, retryRate: 1 });
+		const result = await engine.execute(PROMPT, workDir);
+
+		expect(result.error).toBe(MOCK_RETRYABLE_ERROR);
+		expect(isRetryableError(result.error ?? "")).toBe(true);
+	});
+
+	it("should give identical outcomes for identical seeds", async () => {
+		const outcomes = async (seed: number) => {
+			const engine = new MockEngine({ latencyMs: 0, edits: 0, failureRate: 0.5, seed });
+			const results = [];
+			for (let i = 0; i < 8; i++) {
+				results.push((await engine.execute(`TASK: Task ${i}`, workDir)).success);
+			}
+			return results;
+		};
+
+		expect(await outcomes(7)).toEqual(await outcomes(7));
+	});
+
+	it("should let engine args override constructor options", async () => {
+		const engine = new MockEngine({ latencyMs: 0, failureRate: 1 });
+		const result = await engine.execute(PROMPT, workDir, {
+			engineArgs: ["--failure-rate", "0", "--edits", "0"],
+		});
+
+		expect(result.success).toBe(true);
+	});
+
+	it("should replay a recorded transcript", async () => {
+		const transcript = join(workDir, "run.jsonl");
+		writeFileSync(
+			transcript,
+			[
+				JSON.stringify({ type: "system", subtype: "init" }),
+				JSON.stringify({ type: "result", result: "replayed", usage: { input_tokens: 5 } }),
+			].join("\n"),
+		);
+
+		const engine = new MockEngine({ latencyMs: 0, transcript });
+		const result = await engine.execute(PROMPT, workDir);
+
+		expect(result.response).toBe("replayed");
+		expect(result.inputTokens).toBe(5);
+	});
+});
@@ -0,0 +1,337 @@
+import { existsSync, mkdirSync, readFileSync, readdirSync, statSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import simpleGit from "simple-git";
+import { slugify } from "../git/branch.ts";
+import { BaseAIEngine, detectStepFromEvent } from "./base.ts";
+import { type StreamJsonEvent, StreamJsonParser } from "./stream-json.ts";
+import type { AIResult, EngineOptions, ProgressCallback } from "./types.ts";
+
+/**
+ * Behaviour of the mock engine. Every value can also be set per run through
+ * engine args, e.g. `ralphy --mock -- --latency 200 --edits 3 --retry-rate 0.1`.
+ */
+export interface MockEngineOptions {
+	/** Recorded stream-json transcript to replay (.jsonl file, or a directory of them) */
+	transcript?: string;
+	/** Simulated run time per attempt in ms (default: 50) */
+	latencyMs?: number;
+	/** Random variation of the latency, as a fraction of it (default: 0.2) */
+	latencyJitter?: number;
+	/** Approximate size of the synthetic stream-json output per attempt (default: 8192) */
+	outputBytes?: number;
+	/** Files written per task (default: 1) */
+	edits?: number;
+	/** Probability that an attempt fails with a permanent error (default: 0) */
+	failureRate?: number;
+	/** Probability that an attempt fails with a retryable rate-limit error (default: 0) */
+	retryRate?: number;
+	/** Seed for the random generator; equal seeds give identical runs (default: 1) */
+	seed?: number;
+}
+
+const DEFAULT_OPTIONS: Required<Omit<MockEngineOptions, "transcript">> = {
+	latencyMs: 50,
+	latencyJitter: 0.2,
+	outputBytes: 8192,
+	edits: 1,
+	failureRate: 0,
+	retryRate: 0,
+	seed: 1,
+};
+
+/** Error messages of simulated failures (the retryable one matches isRetryableError) */
+export const MOCK_RETRYABLE_ERROR = "Rate limit exceeded (simulated by mock engine)";
+export const MOCK_FAILURE_ERROR = "Mock agent failed to complete the task (simulated)";
+
+/** Latency is spread over at most this many pauses between events */
+const MAX_PAUSES = 10;
+const TEXT_CHUNK_BYTES = 512;
+
+const ENGINE_ARG_FLAGS: Record<string, keyof MockEngineOptions> = {
+	"--transcript": "transcript",
+	"--latency": "latencyMs",
+	"--jitter": "latencyJitter",
+	"--output-bytes": "outputBytes",
+	"--edits": "edits",
+	"--failure-rate": "failureRate",
+	"--retry-rate": "retryRate",
+	"--seed": "seed",
+};
+
+/**
+ * Parse mock engine options from engine args (`--latency 200 --edits 3 ...`)
+ */
+export function parseMockEngineArgs(args: string[]): MockEngineOptions {
+	const options: MockEngineOptions = {};
+	for (let i = 0; i < args.length - 1; i++) {
+		const key = ENGINE_ARG_FLAGS[args[i]];
+		if (!key) continue;
+
+		const value = args[++i];
+		if (key === "transcript") {
+			options.transcript = value;
+		} else if (Number.isFinite(Number(value))) {
+			options[key] = Number(value);
+		}
+	}
+	return options;
+}
+
+/**
+ * FNV-1a hash, used to derive per-task random streams
+ */
+function hashString(text: string): number {
+	let hash = 0x811c9dc5;
+	for (let i = 0; i < text.length; i++) {
+		hash ^= text.charCodeAt(i);
+		hash = Math.imul(hash, 0x01000193);
+	}
+	return hash >>> 0;
+}
+
+/**
+ * Small seeded PRNG (mulberry32) returning floats in [0, 1)
+ */
+function createRandom(seed: number): () => number {
+	let state = seed >>> 0;
+	return () => {
+		state = (state + 0x6d2b79f5) >>> 0;
+		let t = state;
+		t = Math.imul(t ^ (t >>> 15), t | 1);
+		t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+		return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+	};
+}
+
+/**
+ * Task title from a prompt built by buildPrompt or buildParallelPrompt
+ */
+function taskFromPrompt(prompt: string): string {
+	const match = prompt.match(/^TASK: (.+)$/m) ?? prompt.match(/^## Task\n(.+)$/m);
+	return match?.[1].trim() || "task";
+}
+
+function toolUse(id: string, name: string, input: Record<string, unknown>): StreamJsonEvent {
+	return { type: "assistant", message: { content: [{ type: "tool_use", id, name, input }] } };
+}
+
+function toolResult(id: string): StreamJsonEvent {
+	return {
+		type: "user",
+		message: { content: [{ type: "tool_result", tool_use_id: id, text: "ok" }] },
+	};
+}
+
+function errorLine(outcome: "failed" | "retryable"): string {
+	const message = outcome === "retryable" ? MOCK_RETRYABLE_ERROR : MOCK_FAILURE_ERROR;
+	return JSON.stringify({ type: "error", error: { message } });
+}
+
+/**
+ * Mock AI Engine - deterministic stand-in for a real agent CLI.
+ *
+ * Replays a recorded stream-json transcript or synthesizes one, writes (and,
+ * when the prompt asks for it, commits) a configurable number of files, and
+ * fails or hits rate limits at configurable rates. Used by `ralphy bench` to
+ * measure orchestration overhead without spending tokens.
+ */
+export class MockEngine extends BaseAIEngine {
+	name = "Mock";
+	cliCommand = "mock";
+	private options: MockEngineOptions;
+	/** Attempts per prompt, so retries draw fresh outcomes */
+	private attempts = new Map<number, number>();
+	private transcripts = new Map<string, string[]>();
+
+	constructor(options: MockEngineOptions = {}) {
+		super();
+		this.options = options;
+	}
+
+	async isAvailable(): Promise<boolean> {
+		return true;
+	}
+
+	async execute(prompt: string, workDir: string, options?: EngineOptions): Promise<AIResult> {
+		return this.run(prompt, workDir, undefined, options);
+	}
+
+	async executeStreaming(
+		prompt: string,
+		workDir: string,
+		onProgress: ProgressCallback,
+		options?: EngineOptions,
+	): Promise<AIResult> {
+		return this.run(prompt, workDir, onProgress, options);
+	}
+
+	private async run(
+		prompt: string,
+		workDir: string,
+		onProgress?: ProgressCallback,
+		engineOptions?: EngineOptions,
+	): Promise<AIResult> {
+		const options = {
+			...DEFAULT_OPTIONS,
+			...this.options,
+			...parseMockEngineArgs(engineOptions?.engineArgs ?? []),
+		};
+
+		const promptHash = hashString(prompt);
+		const attempt = (this.attempts.get(promptHash) ?? 0) + 1;
+		this.attempts.set(promptHash, attempt);
+		const random = createRandom(hashString(`${options.seed}:${promptHash}:${attempt}`));
+
+		// Decide the outcome up front so it doesn't depend on the output size
+		const roll = random();
+		const outcome =
+			roll < options.retryRate
+				? "retryable"
+				: roll < options.retryRate + options.failureRate
+					? "failed"
+					: "success";
+
+		const task = taskFromPrompt(prompt);
+		const files =
+			outcome === "success"
+				? Array.from({ length: Math.max(0, options.edits) }, (_, i) =>
+						join("src", "mock", slugify(task) || String(promptHash), `edit-${i + 1}.ts`),
+					)
+				: [];
+
+		let lines: string[];
+		if (options.transcript) {
+			lines = this.replayLines(options.transcript, promptHash);
+			if (outcome !== "success") {
+				lines = [...lines, errorLine(outcome)];
+			}
+		} else {
+			lines = this.syntheticLines(task, files, options.outputBytes, outcome);
+		}
+
+		const jitter = 1 + (random() * 2 - 1) * options.latencyJitter;
+		const latencyMs = Math.max(0, options.latencyMs * jitter);
+		const pauses = Math.min(MAX_PAUSES, lines.length);
+		const pauseEvery = Math.max(1, Math.ceil(lines.length / Math.max(1, pauses)));
+
+		const parser = new StreamJsonParser();
+		for (const [index, line] of lines.entries()) {
+			if (latencyMs > 0 && index % pauseEvery === 0) {
+				await new Promise((resolve) => setTimeout(resolve, latencyMs / pauses));
+			}
+
+			const event = parser.pushLine(line);
+			const step = event && onProgress ? detectStepFromEvent(event) : null;
+			if (step) {
+				onProgress?.(step);
+			}
+		}
+
+		if (outcome === "success") {
+			await this.applyEdits(prompt, task, workDir, files);
+		}
+
+		const error = parser.getError();
+		if (error) {
+			return { success: false, response: "", inputTokens: 0, outputTokens: 0, error };
+		}
+
+		const { response, inputTokens, outputTokens } = parser.getResult();
+		return { success: true, response, inputTokens, outputTokens };
+	}
+
+	/**
+	 * Lines of a recorded transcript; with a directory, each prompt maps to one file
+	 */
+	private replayLines(transcript: string, promptHash: number): string[] {
+		let path = transcript;
+		if (statSync(transcript).isDirectory()) {
+			const files = readdirSync(transcript)
+				.filter((name) => name.endsWith(".jsonl"))
+				.sort();
+			if (files.length === 0) {
+				throw new Error(`No .jsonl transcripts in ${transcript}`);
+			}
+			path = join(transcript, files[promptHash % files.length]);
+		}
+
+		let lines = this.transcripts.get(path);
+		if (!lines) {
+			lines = readFileSync(path, "utf-8").split("\n").filter(Boolean);
+			this.transcripts.set(path, lines);
+		}
+		return lines;
+	}
+
+	/**
+	 * Build a Claude-style stream-json transcript: a read, one write per edited
+	 * file, assistant text up to the requested size, and a result or error event
+	 */
+	private syntheticLines(
+		task: string,
+		files: string[],
+		outputBytes: number,
+		outcome: "success" | "failed" | "retryable",
+	): string[] {
+		const lines = [JSON.stringify({ type: "system", subtype: "init", model: "mock" })];
+		let bytes = lines[0].length;
+		const push = (event: StreamJsonEvent) => {
+			const line = JSON.stringify(event);
+			lines.push(line);
+			bytes += line.length + 1;
+		};
+
+		push(toolUse("mock-read", "Read", { file_path: "README.md" }));
+		push(toolResult("mock-read"));
+
+		if (outcome !== "success") {
+			lines.push(errorLine(outcome));
+			return lines;
+		}
+
+		for (const [index, file] of files.entries()) {
+			const id = `mock-write-${index + 1}`;
+			push(toolUse(id, "Write", { file_path: file, content: `// ${task}\n` }));
+			push(toolResult(id));
+		}
+
+		const filler = "lorem ipsum ".repeat(TEXT_CHUNK_BYTES / 8).slice(0, TEXT_CHUNK_BYTES);
+		while (bytes < outputBytes) {
+			push({ type: "assistant", message: { content: [{ type: "text", text: filler }] } });
+		}
+
+		push({
+			type: "result",
+			subtype: "success",
+			result: `Completed: ${task}`,
+			usage: { input_tokens: Math.round(outputBytes / 2), output_tokens: Math.round(bytes / 4) },
+			duration_ms: 0,
+		});
+		return lines;
+	}
+
+	/**
+	 * Write the task's files, and commit them when the prompt asks for a commit
+	 */
+	private async applyEdits(
+		prompt: string,
+		task: string,
+		workDir: string,
+		files: string[],
+	): Promise<void> {
+		if (files.length === 0) return;
+
+		for (const file of files) {
+			const path = join(workDir, file);
+			mkdirSync(join(path, ".."), { recursive: true });
+			writeFileSync(path, `// ${task}\nexport const done = true;\n`);
+		}
+
+		const shouldCommit = prompt.includes("Commit your changes");
+		if (shouldCommit && existsSync(join(workDir, ".git"))) {
+			const git = simpleGit(workDir);
+			await git.add(files);
+			await git.commit(`feat: ${task}`);
+		}
+	}
+}
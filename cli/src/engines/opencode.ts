@@ -1,6 +1,17 @@
-import { BaseAIEngine, checkForErrors, execCommand, formatCommandError } from "./base.ts";
+import { BaseAIEngine, execCommandStreaming, formatCommandError } from "./base.ts";
+import { type StreamJsonEvent, StreamJsonParser } from "./stream-json.ts";
 import type { AIResult, EngineOptions } from "./types.ts";
 
+/**
+ * Values collected from OpenCode's JSON events
+ */
+interface OpenCodeOutput {
+	inputTokens: number;
+	outputTokens: number;
+	cost?: string;
+	textParts: string[];
+}
+
 const isWindows = process.platform === "win32";
 
 /**
@@ -28,18 +39,20 @@ export class OpenCodeEngine extends BaseAIEngine {
 			args.push(prompt);
 		}
 
-		const { stdout, stderr, exitCode } = await execCommand(
+		// Parse output as it arrives instead of buffering all of it
+		const output: OpenCodeOutput = { inputTokens: 0, outputTokens: 0, textParts: [] };
+		const parser = new StreamJsonParser({ onEvent: (event) => this.handleEvent(event, output) });
+		const { exitCode } = await execCommandStreaming(
 			this.cliCommand,
 			args,
 			workDir,
+			(line) => parser.pushLine(line),
 			{ OPENCODE_PERMISSION: '{"*":"allow"}' },
 			stdinContent,
 		);
 
-		const output = stdout + stderr;
-
 		// Check for errors
-		const error = checkForErrors(output);
+		const error = parser.getError();
 		if (error) {
 			return {
 				success: false,
@@ -51,7 +64,8 @@ export class OpenCodeEngine extends BaseAIEngine {
 		}
 
 		// Parse OpenCode JSON format
-		const { response, inputTokens, outputTokens, cost } = this.parseOutput(output);
+		const { inputTokens, outputTokens, cost } = output;
+		const response = output.textParts.join("") || "Task completed";
 
 		// If command failed with non-zero exit code, provide a meaningful error
 		if (exitCode !== 0) {
@@ -60,7 +74,7 @@ export class OpenCodeEngine extends BaseAIEngine {
 				response,
 				inputTokens,
 				outputTokens,
-				error: formatCommandError(exitCode, output),
+				error: formatCommandError(exitCode, parser.getRecentOutput()),
 			};
 		}
 
@@ -73,49 +87,25 @@ export class OpenCodeEngine extends BaseAIEngine {
 		};
 	}
 
-	private parseOutput(output: string): {
-		response: string;
-		inputTokens: number;
-		outputTokens: number;
-		cost?: string;
-	} {
-		const lines = output.split("\n").filter(Boolean);
-		let response = "";
-		let inputTokens = 0;
-		let outputTokens = 0;
-		let cost: string | undefined;
+	private handleEvent(event: StreamJsonEvent, output: OpenCodeOutput): void {
+		const part = (event.part ?? {}) as {
+			tokens?: { input?: number; output?: number };
+			cost?: number | string;
+			text?: string;
+		};
 
-		// Find step_finish for token counts
-		for (const line of lines) {
-			try {
-				const parsed = JSON.parse(line);
-				if (parsed.type === "step_finish") {
-					inputTokens = parsed.part?.tokens?.input || 0;
-					outputTokens = parsed.part?.tokens?.output || 0;
-					if (parsed.part?.cost) {
-						cost = String(parsed.part.cost);
-					}
-				}
-			} catch {
-				// Ignore non-JSON lines
+		// step_finish carries token counts
+		if (event.type === "step_finish") {
+			output.inputTokens = part.tokens?.input || 0;
+			output.outputTokens = part.tokens?.output || 0;
+			if (part.cost) {
+				output.cost = String(part.cost);
 			}
 		}
 
-		// Get text response from text events
-		const textParts: string[] = [];
-		for (const line of lines) {
-			try {
-				const parsed = JSON.parse(line);
-				if (parsed.type === "text" && parsed.part?.text) {
-					textParts.push(parsed.part.text);
-				}
-			} catch {
-				// Ignore non-JSON lines
-			}
+		// Text response comes from text events
+		if (event.type === "text" && part.text) {
+			output.textParts.push(part.text);
 		}
-
-		response = textParts.join("") || "Task completed";
-
-		return { response, inputTokens, outputTokens, cost };
 	}
 }
@@ -0,0 +1,140 @@
+import { afterEach, describe, expect, it } from "bun:test";
+import { getMetrics, initTelemetry } from "../telemetry/index.ts";
+import { checkForErrors, formatCommandError, parseStreamJsonResult } from "./base.ts";
+import { LineFramer, StreamJsonParser } from "./stream-json.ts";
+
+describe("LineFramer", () => {
+	it("should join lines split across chunks", () => {
+		const lines: string[] = [];
+		const framer = new LineFramer((line) => lines.push(line));
+
+		framer.push('{"type":');
+		framer.push('"assistant"}\n{"type"');
+		framer.push(':"result"}\n\n');
+		framer.push("trailing");
+		framer.end();
+
+		expect(lines).toEqual(['{"type":"assistant"}', '{"type":"result"}', "trailing"]);
+	});
+});
+
+describe("StreamJsonParser", () => {
+	afterEach(() => {
+		initTelemetry("claude", "single", { enabled: false });
+	});
+
+	it("should keep the last result and its usage", () => {
+		const parser = new StreamJsonParser();
+
+		parser.pushLine('{"type":"result","result":"First","usage":{"input_tokens":1}}');
+		parser.pushLine(
+			'{"type":"result","result":"Final","usage":{"input_tokens":200,"output_tokens":75},"duration_ms":42}',
+		);
+
+		expect(parser.hasResult()).toBe(true);
+		expect(parser.getResult()).toEqual({
+			response: "Final",
+			inputTokens: 200,
+			outputTokens: 75,
+			durationMs: 42,
+		});
+	});
+
+	it("should default the response when there is no result", () => {
+		const parser = new StreamJsonParser();
+
+		parser.pushLine('{"type":"assistant","message":{"content":[{"type":"text","text":"Hi"}]}}');
+
+		expect(parser.hasResult()).toBe(false);
+		expect(parser.getResult().response).toBe("Task completed");
+		expect(parser.getAssistantText()).toBe("Hi");
+	});
+
+	it("should report the first error and authentication error", () => {
+		const parser = new StreamJsonParser();
+
+		parser.pushLine('{"type":"error","error":{"message":"Invalid API key · Please run /login"}}');
+		parser.pushLine('{"type":"error","message":"Second error"}');
+
+		expect(parser.getError()).toBe("Invalid API key · Please run /login");
+		expect(parser.getAuthenticationError()).toBe("Invalid API key · Please run /login");
+	});
+
+	it("should keep only the most recent lines", () => {
+		const parser = new StreamJsonParser({ maxRecentLines: 3 });
+
+		for (let i = 1; i <= 10; i++) {
+			parser.pushLine(`line ${i}`);
+		}
+
+		expect(parser.lineCount).toBe(10);
+		expect(parser.getRecentOutput()).toBe("line 8\nline 9\nline 10");
+	});
+
+	it("should keep an authentication error that scrolled out of the buffer", () => {
+		const parser = new StreamJsonParser({ maxRecentLines: 2 });
+
+		parser.pushLine('{"type":"error","message":"Not authenticated"}');
+		parser.pushLine("noise 1");
+		parser.pushLine("noise 2");
+
+		expect(parser.getRecentOutput()).toContain("Not authenticated");
+	});
+
+	it("should truncate very long lines in the recent lines buffer", () => {
+		const parser = new StreamJsonParser();
+
+		parser.pushLine("x".repeat(100_000));
+
+		expect(parser.getRecentOutput().length).toBeLessThan(5000);
+	});
+
+	it("should pass every event to onEvent", () => {
+		const types: (string | undefined)[] = [];
+		const parser = new StreamJsonParser({ onEvent: (event) => types.push(event.type) });
+
+		parser.push('{"type":"step_start"}\nnot json\n{"type":"step_finish"}\n');
+
+		expect(types).toEqual(["step_start", "step_finish"]);
+	});
+
+	it("should feed tool calls to telemetry as they complete", () => {
+		initTelemetry("claude", "single", { enabled: true, outputDir: "/tmp/ralphy-stream-json-test" });
+		const parser = new StreamJsonParser();
+
+		parser.pushLine(
+			'{"type":"assistant","message":{"content":[{"type":"tool_use","id":"t1","name":"Read","input":{"file_path":"a.ts"}}]}}',
+		);
+		expect(getMetrics()?.toolCallCount).toBe(0);
+
+		parser.pushLine(
+			'{"type":"user","message":{"content":[{"type":"tool_result","tool_use_id":"t1"}]}}',
+		);
+		parser.pushLine('{"type":"tool_use","tool_id":"g1","tool_name":"Shell","parameters":{}}');
+		parser.pushLine('{"type":"tool_result","tool_id":"g1","status":"error"}');
+
+		expect(getMetrics()?.toolCallCount).toBe(2);
+	});
+
+	it("should count each tool call once when a failed run is re-parsed", () => {
+		initTelemetry("claude", "single", { enabled: true, outputDir: "/tmp/ralphy-stream-json-test" });
+		const parser = new StreamJsonParser();
+
+		parser.push(
+			[
+				'{"type":"assistant","message":{"content":[{"type":"tool_use","id":"t1","name":"Read","input":{}}]}}',
+				'{"type":"user","message":{"content":[{"type":"tool_result","tool_use_id":"t1"}]}}',
+				'{"type":"error","message":"Something broke"}',
+				"",
+			].join("\n"),
+		);
+		parser.end();
+
+		const output = parser.getRecentOutput();
+		expect(formatCommandError(1, output)).toContain("Something broke");
+		expect(checkForErrors(output)).toBe("Something broke");
+		parseStreamJsonResult(output);
+
+		expect(getMetrics()?.toolCallCount).toBe(1);
+	});
+});
@@ -0,0 +1,404 @@
+import { trackToolCall } from "../telemetry/index.ts";
+
+/**
+ * Content item of an assistant/user message
+ */
+interface StreamJsonContentItem {
+	type?: string;
+	text?: string;
+	/** tool_use */
+	id?: string;
+	name?: string;
+	input?: Record<string, unknown>;
+	/** tool_result */
+	tool_use_id?: string;
+	is_error?: boolean;
+}
+
+/**
+ * A parsed stream-json event (one JSON object per output line).
+ * Only the fields read by the parser are typed.
+ */
+export interface StreamJsonEvent {
+	type?: string;
+	result?: string;
+	usage?: { input_tokens?: number; output_tokens?: number };
+	duration_ms?: number;
+	is_error?: boolean;
+	error?: string | { message?: string };
+	message?: string | { content?: string | StreamJsonContentItem[] };
+	/** Top-level tool events (Gemini) */
+	tool_id?: string;
+	tool_name?: string;
+	parameters?: Record<string, unknown>;
+	status?: string;
+	[key: string]: unknown;
+}
+
+/** Recent lines kept for error reporting */
+const DEFAULT_RECENT_LINES = 100;
+/** Longest line kept in the recent lines buffer; longer lines are truncated */
+const MAX_RECENT_LINE_LENGTH = 4096;
+/** Tool calls waiting for their result before the oldest are dropped */
+const MAX_PENDING_TOOL_CALLS = 256;
+
+/**
+ * Split chunks of text into lines as they arrive.
+ *
+ * Only the unterminated tail of the stream is buffered, and each chunk is
+ * scanned once, so a long line arriving in many chunks is not re-split.
+ */
+export class LineFramer {
+	private pending: string[] = [];
+
+	constructor(private onLine: (line: string) => void) {}
+
+	push(chunk: string): void {
+		let start = 0;
+		let newline = chunk.indexOf("\n");
+		while (newline !== -1) {
+			this.pending.push(chunk.slice(start, newline));
+			this.emit(this.pending.join(""));
+			this.pending = [];
+			start = newline + 1;
+			newline = chunk.indexOf("\n", start);
+		}
+		if (start < chunk.length) {
+			this.pending.push(chunk.slice(start));
+		}
+	}
+
+	/**
+	 * Emit the last line if the stream did not end with a newline
+	 */
+	end(): void {
+		if (this.pending.length > 0) {
+			this.emit(this.pending.join(""));
+			this.pending = [];
+		}
+	}
+
+	private emit(line: string): void {
+		if (line.trim()) this.onLine(line);
+	}
+}
+
+interface PendingToolCall {
+	toolName: string;
+	startTime: number;
+	parameters?: Record<string, unknown>;
+}
+
+export interface StreamJsonParserOptions {
+	/** Number of recent lines kept for error reporting (default: 100) */
+	maxRecentLines?: number;
+	/** Called for every JSON event, e.g. for engine-specific event types */
+	onEvent?: (event: StreamJsonEvent) => void;
+	/**
+	 * Feed tool calls to telemetry (default: true). Disable for parsers that
+	 * re-read output a live parser has already reported.
+	 */
+	trackTools?: boolean;
+}
+
+/**
+ * Incremental parser for stream-json engine output (Claude/Qwen/Gemini format,
+ * and the similar formats of the other engines).
+ *
+ * Lines are parsed once as they arrive. Instead of the whole output, the parser
+ * keeps the final result event, its usage counters, the first error, and a
+ * ring buffer of the most recent lines. Tool calls are fed to telemetry live,
+ * unless trackTools is false.
+ */
+export class StreamJsonParser {
+	private recent: string[];
+	private recentStart = 0;
+	private recentCount = 0;
+	private framer = new LineFramer((line) => this.pushLine(line));
+	private onEvent?: (event: StreamJsonEvent) => void;
+	private reportTools: boolean;
+
+	private resultSeen = false;
+	private response = "";
+	private inputTokens = 0;
+	private outputTokens = 0;
+	private durationMs = 0;
+	private error: string | null = null;
+	private authError: string | null = null;
+	private assistantText = "";
+	private pendingToolCalls = new Map<string, PendingToolCall>();
+
+	/** Total number of non-empty lines seen */
+	lineCount = 0;
+
+	constructor(options: StreamJsonParserOptions = {}) {
+		this.recent = new Array(Math.max(1, options.maxRecentLines ?? DEFAULT_RECENT_LINES));
+		this.onEvent = options.onEvent;
+		this.reportTools = options.trackTools ?? true;
+	}
+
+	/**
+	 * Feed a chunk of raw output (may contain partial lines)
+	 */
+	push(chunk: string): void {
+		this.framer.push(chunk);
+	}
+
+	/**
+	 * Flush a trailing line without a newline
+	 */
+	end(): void {
+		this.framer.end();
+	}
+
+	/**
+	 * Feed one complete line. Returns the parsed event, or null for non-JSON lines.
+	 */
+	pushLine(line: string): StreamJsonEvent | null {
+		if (!line.trim()) return null;
+		this.lineCount++;
+		this.remember(line);
+
+		// Fast path: skip non-JSON lines
+		const trimmed = line.trim();
+		if (!trimmed.startsWith("{")) return null;
+
+		let event: StreamJsonEvent;
+		try {
+			event = JSON.parse(trimmed);
+		} catch {
+			// Ignore non-JSON lines
+			return null;
+		}
+		if (!event || typeof event !== "object" || Array.isArray(event)) return null;
+
+		this.handleEvent(event);
+		this.onEvent?.(event);
+		return event;
+	}
+
+	/**
+	 * Final result and token counts, same as parseStreamJsonResult
+	 */
+	getResult(): {
+		response: string;
+		inputTokens: number;
+		outputTokens: number;
+		durationMs: number;
+	} {
+		return {
+			response: this.response || "Task completed",
+			inputTokens: this.inputTokens,
+			outputTokens: this.outputTokens,
+			durationMs: this.durationMs,
+		};
+	}
+
+	/**
+	 * Whether a result event was seen
+	 */
+	hasResult(): boolean {
+		return this.resultSeen;
+	}
+
+	/**
+	 * First error event message, same as checkForErrors
+	 */
+	getError(): string | null {
+		return this.error;
+	}
+
+	/**
+	 * First authentication error message, same as extractAuthenticationError
+	 */
+	getAuthenticationError(): string | null {
+		return this.authError;
+	}
+
+	/**
+	 * Text of the first assistant message (fallback response for some engines)
+	 */
+	getAssistantText(): string {
+		return this.assistantText;
+	}
+
+	/**
+	 * The most recent lines, oldest first. An authentication error is prepended
+	 * so formatCommandError still reports it after it scrolled out of the buffer.
+	 */
+	getRecentOutput(): string {
+		const lines: string[] = [];
+		for (let i = 0; i < this.recentCount; i++) {
+			lines.push(this.recent[(this.recentStart + i) % this.recent.length]);
+		}
+		if (this.authError) {
+			lines.unshift(JSON.stringify({ type: "error", message: this.authError }));
+		}
+		return lines.join("\n");
+	}
+
+	private remember(line: string): void {
+		const kept =
+			line.length > MAX_RECENT_LINE_LENGTH ? `${line.slice(0, MAX_RECENT_LINE_LENGTH)}…` : line;
+		const capacity = this.recent.length;
+		if (this.recentCount < capacity) {
+			this.recent[(this.recentStart + this.recentCount) % capacity] = kept;
+			this.recentCount++;
+		} else {
+			this.recent[this.recentStart] = kept;
+			this.recentStart = (this.recentStart + 1) % capacity;
+		}
+	}
+
+	private handleEvent(event: StreamJsonEvent): void {
+		if (event.type === "result") {
+			this.resultSeen = true;
+			this.response = event.result || "Task completed";
+			this.inputTokens = event.usage?.input_tokens || 0;
+			this.outputTokens = event.usage?.output_tokens || 0;
+			if (typeof event.duration_ms === "number") {
+				this.durationMs = event.duration_ms;
+			}
+		}
+
+		if (event.type === "error" && this.error === null) {
+			this.error = errorMessage(event) || "Unknown error";
+		}
+
+		if (this.authError === null) {
+			this.authError = authenticationErrorFromEvent(event);
+		}
+
+		const content = messageContent(event);
+		if (event.type === "assistant" && !this.assistantText) {
+			if (Array.isArray(content) && content[0]?.text) {
+				this.assistantText = content[0].text;
+			} else if (typeof content === "string") {
+				this.assistantText = content;
+			}
+		}
+
+		this.trackTools(event, Array.isArray(content) ? content : []);
+	}
+
+	/**
+	 * Feed tool calls to telemetry. Handles tool_use/tool_result content items
+	 * (Claude/Qwen) and top-level tool_use/tool_result events (Gemini).
+	 */
+	private trackTools(event: StreamJsonEvent, content: StreamJsonContentItem[]): void {
+		if (!this.reportTools) return;
+
+		if (event.type === "tool_use") {
+			this.startTool(event.tool_id, event.tool_name, event.parameters);
+		} else if (event.type === "tool_result") {
+			this.endTool(event.tool_id, event.status !== "error");
+		}
+
+		for (const item of content) {
+			if (item?.type === "tool_use") {
+				this.startTool(item.id, item.name, item.input);
+			} else if (item?.type === "tool_result") {
+				this.endTool(item.tool_use_id, item.is_error !== true);
+			}
+		}
+	}
+
+	private startTool(id?: string, toolName?: string, parameters?: Record<string, unknown>): void {
+		if (typeof id !== "string" || typeof toolName !== "string") return;
+
+		if (this.pendingToolCalls.size >= MAX_PENDING_TOOL_CALLS) {
+			// Drop the oldest call that never got a result
+			const oldest = this.pendingToolCalls.keys().next().value;
+			if (oldest !== undefined) this.pendingToolCalls.delete(oldest);
+		}
+
+		this.pendingToolCalls.set(id, {
+			toolName,
+			startTime: Date.now(),
+			parameters: parameters && typeof parameters === "object" ? parameters : undefined,
+		});
+	}
+
+	private endTool(id: string | undefined, success: boolean): void {
+		if (typeof id !== "string") return;
+		const call = this.pendingToolCalls.get(id);
+		if (!call) return;
+		this.pendingToolCalls.delete(id);
+
+		trackToolCall(call.toolName, Date.now() - call.startTime, success, {
+			errorType: success ? undefined : "tool_error",
+			parameterKeys: call.parameters ? Object.keys(call.parameters) : undefined,
+			parameters: call.parameters,
+		});
+	}
+}
+
+function messageContent(event: StreamJsonEvent): string | StreamJsonContentItem[] | undefined {
+	return typeof event.message === "object" && event.message !== null
+		? event.message.content
+		: undefined;
+}
+
+/**
+ * Message of an error event: error.message, or a plain message field
+ */
+function errorMessage(event: StreamJsonEvent): string {
+	if (typeof event.error === "object" && event.error !== null && event.error.message) {
+		return event.error.message;
+	}
+	return typeof event.message === "string" ? event.message : "";
+}
+
+/**
+ * Authentication error message from a single event, or null
+ */
+function authenticationErrorFromEvent(event: StreamJsonEvent): string | null {
+	// Check if this is any kind of error response
+	if (
+		event.type !== "error" &&
+		event.is_error !== true &&
+		event.error !== "authentication_failed"
+	) {
+		return null;
+	}
+
+	// Extract message from content array (assistant type) or standard fields
+	let message = "";
+	const content = messageContent(event);
+	if (Array.isArray(content)) {
+		const textItem = content.find((item) => item.type === "text" && item.text);
+		if (textItem?.text) message = textItem.text;
+	}
+	if (!message) {
+		message = (typeof event.result === "string" && event.result) || errorMessage(event);
+	}
+
+	if (message && isAuthenticationMessage(message.toLowerCase())) {
+		return message;
+	}
+	return null;
+}
+
+/**
+ * Check if a message contains authentication-related keywords
+ */
+function isAuthenticationMessage(messageLower: string): boolean {
+	return (
+		messageLower.includes("invalid api key") ||
+		messageLower.includes("authentication") ||
+		messageLower.includes("not authenticated") ||
+		messageLower.includes("unauthorized") ||
+		messageLower.includes("/login")
+	);
+}
+
+/**
+ * Parse a complete output string (for callers that already hold the output).
+ * Tool calls are not reported: the engine's live parser has already seen them.
+ */
+export function parseStreamJson(output: string): StreamJsonParser {
+	const parser = new StreamJsonParser({ trackTools: false });
+	parser.push(output);
+	parser.end();
+	return parser;
+}
@@ -2,3 +2,6 @@ export * from "./prompt.ts";
 export * from "./retry.ts";
 export * from "./sequential.ts";
 export * from "./parallel.ts";
+export * from "./scheduler.ts";
+export * from "./merge-pipeline.ts";
+export * from "./phases.ts";
@@ -0,0 +1,204 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, mkdirSync, readFileSync, rmSync, unlinkSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import simpleGit from "simple-git";
+import { IsolationPool } from "./isolation-pool.ts";
+import { createSandbox, resyncSandbox } from "./sandbox.ts";
+
+const TEST_DIR = "/tmp/ralphy-isolation-pool-test";
+const ORIGINAL_DIR = join(TEST_DIR, "repo");
+const POOL_DIR = join(TEST_DIR, "pool");
+
+describe("IsolationPool (sandbox mode)", () => {
+	beforeEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+		mkdirSync(join(ORIGINAL_DIR, "src"), { recursive: true });
+		mkdirSync(POOL_DIR, { recursive: true });
+		writeFileSync(join(ORIGINAL_DIR, "src", "index.ts"), "export const a = 1;\n");
+		writeFileSync(join(ORIGINAL_DIR, "src", "util.ts"), "export const b = 2;\n");
+		writeFileSync(join(ORIGINAL_DIR, "package.json"), "{}\n");
+	});
+
+	afterEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	function createPool(size: number, maxReuse = 5): IsolationPool {
+		return new IsolationPool({
+			mode: "sandbox",
+			workDir: ORIGINAL_DIR,
+			baseDir: POOL_DIR,
+			baseBranch: "main",
+			size,
+			maxReuse,
+		});
+	}
+
+	it("should serve pre-warmed sandboxes", async () => {
+		const pool = createPool(2);
+		pool.warm();
+
+		const lease = await pool.acquire("task", 1);
+
+		expect(lease.warm).toBe(true);
+		expect(readFileSync(join(lease.dir, "src", "index.ts"), "utf-8")).toBe("export const a = 1;\n");
+
+		await pool.release(lease.dir);
+		await pool.drain();
+		expect(existsSync(lease.dir)).toBe(false);
+	});
+
+	it("should reset a returned sandbox and reuse it", async () => {
+		const pool = createPool(0);
+
+		const first = await pool.acquire("first", 1);
+		writeFileSync(join(first.dir, "src", "index.ts"), "export const a = 42;\n");
+		writeFileSync(join(first.dir, "src", "new.ts"), "export const c = 3;\n");
+		unlinkSync(join(first.dir, "src", "util.ts"));
+		await pool.release(first.dir);
+
+		const second = await pool.acquire("second", 2);
+
+		expect(second.dir).toBe(first.dir);
+		expect(second.warm).toBe(true);
+		expect(readFileSync(join(second.dir, "src", "index.ts"), "utf-8")).toBe(
+			"export const a = 1;\n",
+		);
+		expect(existsSync(join(second.dir, "src", "new.ts"))).toBe(false);
+		expect(existsSync(join(second.dir, "src", "util.ts"))).toBe(true);
+
+		await pool.release(second.dir);
+		await pool.drain();
+		expect(pool.getStats().reused).toBe(1);
+	});
+
+	it("should retire sandboxes that reached the reuse limit", async () => {
+		const pool = createPool(0, 1);
+
+		const lease = await pool.acquire("task", 1);
+		await pool.release(lease.dir);
+		await pool.drain();
+
+		expect(existsSync(lease.dir)).toBe(false);
+		expect(pool.getStats().retired).toBe(1);
+		expect(pool.getStats().reused).toBe(0);
+	});
+
+	it("should not touch forgotten sandboxes", async () => {
+		const pool = createPool(0);
+
+		const lease = await pool.acquire("task", 1);
+		pool.forget(lease.dir);
+		await pool.drain();
+
+		expect(existsSync(lease.dir)).toBe(true);
+		expect(pool.owns(lease.dir)).toBe(false);
+	});
+});
+
+describe("IsolationPool (worktree mode)", () => {
+	beforeEach(async () => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+		mkdirSync(join(ORIGINAL_DIR, "src"), { recursive: true });
+		mkdirSync(POOL_DIR, { recursive: true });
+
+		const git = simpleGit(ORIGINAL_DIR);
+		await git.init(["-b", "main"]);
+		await git.addConfig("user.name", "Test");
+		await git.addConfig("user.email", "test@example.com");
+		writeFileSync(join(ORIGINAL_DIR, "src", "index.ts"), "export const a = 1;\n");
+		await git.add(".");
+		await git.commit("init");
+	});
+
+	afterEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	function createPool(): IsolationPool {
+		return new IsolationPool({
+			mode: "worktree",
+			workDir: ORIGINAL_DIR,
+			baseDir: POOL_DIR,
+			baseBranch: "main",
+			size: 0,
+		});
+	}
+
+	it("should reset a returned worktree onto a fresh branch and keep the old one", async () => {
+		const pool = createPool();
+
+		const first = await pool.acquire("first", 1);
+		expect((await simpleGit(first.dir).revparse(["--abbrev-ref", "HEAD"])).trim()).toBe(
+			first.branchName,
+		);
+		writeFileSync(join(first.dir, "src", "index.ts"), "export const a = 42;\n");
+		writeFileSync(join(first.dir, "src", "new.ts"), "export const c = 3;\n");
+		await simpleGit(first.dir).add(".");
+		await simpleGit(first.dir).commit("agent work");
+		expect(await pool.release(first.dir)).toEqual({ leftInPlace: false });
+
+		const second = await pool.acquire("second", 2);
+
+		expect(second.dir).toBe(first.dir);
+		expect(second.warm).toBe(true);
+		expect(second.branchName).not.toBe(first.branchName);
+		expect((await simpleGit(second.dir).revparse(["--abbrev-ref", "HEAD"])).trim()).toBe(
+			second.branchName,
+		);
+		expect(readFileSync(join(second.dir, "src", "index.ts"), "utf-8")).toBe(
+			"export const a = 1;\n",
+		);
+		expect(existsSync(join(second.dir, "src", "new.ts"))).toBe(false);
+
+		const branches = await simpleGit(ORIGINAL_DIR).branchLocal();
+		expect(branches.all).toContain(first.branchName);
+
+		await pool.release(second.dir);
+		await pool.drain();
+		expect(existsSync(second.dir)).toBe(false);
+		expect(pool.getStats().reused).toBe(1);
+	});
+
+	it("should leave a worktree with uncommitted changes in place", async () => {
+		const pool = createPool();
+
+		const lease = await pool.acquire("task", 1);
+		writeFileSync(join(lease.dir, "src", "index.ts"), "export const a = 42;\n");
+
+		expect(await pool.release(lease.dir)).toEqual({ leftInPlace: true });
+		await pool.drain();
+
+		expect(readFileSync(join(lease.dir, "src", "index.ts"), "utf-8")).toBe(
+			"export const a = 42;\n",
+		);
+		expect(pool.owns(lease.dir)).toBe(false);
+		expect(pool.getStats().reused).toBe(0);
+	});
+});
+
+describe("resyncSandbox", () => {
+	afterEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	it("should return 0 when nothing changed", async () => {
+		const original = join(TEST_DIR, "a");
+		const sandbox = join(TEST_DIR, "b");
+		mkdirSync(original, { recursive: true });
+		writeFileSync(join(original, "a.ts"), "export const a = 1;\n");
+		await createSandbox({ originalDir: original, sandboxDir: sandbox, agentNum: 1 });
+
+		expect(await resyncSandbox(sandbox, original)).toBe(0);
+	});
+});
@@ -0,0 +1,314 @@
+import { join } from "node:path";
+import simpleGit from "simple-git";
+import {
+	assignWorktreeBranch,
+	cleanupAgentWorktree,
+	createDetachedWorktree,
+	resetWorktree,
+} from "../git/worktree.ts";
+import { detachSpan } from "../telemetry/tracing.ts";
+import { logDebug, logWarn } from "../ui/logger.ts";
+import { cleanupSandbox, createSandbox, resyncSandbox } from "./sandbox.ts";
+
+export type IsolationMode = "sandbox" | "worktree";
+
+export interface IsolationPoolOptions {
+	/** Which kind of isolation dir the pool manages */
+	mode: IsolationMode;
+	/** Original working directory */
+	workDir: string;
+	/** Directory the pooled dirs are created in (sandbox or worktree base) */
+	baseDir: string;
+	/** Branch worktrees are created from and reset to */
+	baseBranch: string;
+	/** Number of dirs to keep prepared in the background */
+	size: number;
+	/** How many tasks a dir may serve before it is deleted and replaced (default: 5) */
+	maxReuse?: number;
+}
+
+/**
+ * A leased isolation dir
+ */
+export interface IsolationLease {
+	dir: string;
+	/** Agent branch checked out in the dir (worktree mode only) */
+	branchName: string;
+	/** Whether the dir was prepared ahead of time or reused */
+	warm: boolean;
+}
+
+export interface IsolationPoolStats {
+	/** Dirs created from scratch */
+	created: number;
+	/** Leases served by a prepared or reset dir */
+	warmLeases: number;
+	/** Leases that had to wait for a dir to be created */
+	coldLeases: number;
+	/** Dirs reset and returned to the pool */
+	reused: number;
+	/** Dirs deleted after reaching the reuse limit or failing to reset */
+	retired: number;
+}
+
+interface PooledDir {
+	dir: string;
+	uses: number;
+}
+
+interface PendingDir {
+	/** Resolves with the prepared or reset dir (null on failure) */
+	promise: Promise<PooledDir | null>;
+	/** Resolves once the result has been claimed, pooled or deleted */
+	settled: Promise<void>;
+	claimed: boolean;
+}
+
+/**
+ * Pool of pre-warmed, reusable sandboxes or worktrees.
+ *
+ * While agents run, the pool prepares the next dirs in the background. Returned
+ * dirs are reset cheaply instead of deleted: worktrees with reset --hard + clean,
+ * sandboxes by resyncing only the files that changed. After maxReuse uses a dir
+ * is deleted and replaced to bound drift.
+ *
+ * Background work is detached from the caller's span, since it outlives the
+ * agent phase that triggered it; it is traced as root spans instead.
+ */
+export class IsolationPool {
+	private options: Required<IsolationPoolOptions>;
+	private idle: PooledDir[] = [];
+	private pending: PendingDir[] = [];
+	private leased = new Map<string, PooledDir>();
+	private retiring = new Set<Promise<null>>();
+	private closed = false;
+	private counter = 0;
+	private stats: IsolationPoolStats = {
+		created: 0,
+		warmLeases: 0,
+		coldLeases: 0,
+		reused: 0,
+		retired: 0,
+	};
+
+	constructor(options: IsolationPoolOptions) {
+		this.options = {
+			...options,
+			size: Math.max(0, options.size),
+			maxReuse: Math.max(1, options.maxReuse ?? 5),
+		};
+	}
+
+	get mode(): IsolationMode {
+		return this.options.mode;
+	}
+
+	/**
+	 * Start preparing dirs in the background until the pool is full
+	 */
+	warm(): void {
+		while (!this.closed && this.idle.length + this.unclaimedPending() < this.options.size) {
+			this.track(detachSpan(() => this.prepare()));
+		}
+	}
+
+	/**
+	 * Lease a dir for an agent. Uses an idle or in-flight prepared dir when
+	 * available, otherwise creates one on the spot.
+	 */
+	async acquire(taskName: string, agentNum: number): Promise<IsolationLease> {
+		let pooled = this.idle.pop() ?? null;
+		let warm = pooled !== null;
+
+		if (!pooled) {
+			const next = this.pending.find((p) => !p.claimed);
+			if (next) {
+				next.claimed = true;
+				pooled = await next.promise;
+				warm = pooled !== null;
+			}
+		}
+
+		if (!pooled) {
+			pooled = await this.create();
+		}
+
+		if (warm) {
+			this.stats.warmLeases++;
+		} else {
+			this.stats.coldLeases++;
+		}
+
+		pooled.uses++;
+		this.leased.set(pooled.dir, pooled);
+
+		// Top up for the next agents while this one works
+		this.warm();
+
+		let branchName = "";
+		if (this.options.mode === "worktree") {
+			try {
+				branchName = await assignWorktreeBranch(
+					taskName,
+					agentNum,
+					this.options.baseBranch,
+					pooled.dir,
+				);
+			} catch (error) {
+				this.leased.delete(pooled.dir);
+				this.retireInBackground(pooled);
+				throw error;
+			}
+		}
+
+		logDebug(
+			`Agent ${agentNum}: Leased ${warm ? "warm" : "cold"} ${this.options.mode} ${pooled.dir}`,
+		);
+		return { dir: pooled.dir, branchName, warm };
+	}
+
+	/**
+	 * Return a leased dir. The dir is reset in the background and handed to the
+	 * next agent, or deleted once it reaches the reuse limit.
+	 *
+	 * Worktrees with uncommitted changes are left in place, like cleanupAgentWorktree.
+	 */
+	async release(dir: string): Promise<{ leftInPlace: boolean }> {
+		const pooled = this.leased.get(dir);
+		if (!pooled) {
+			return { leftInPlace: false };
+		}
+		this.leased.delete(dir);
+
+		if (this.options.mode === "worktree") {
+			const status = await simpleGit(dir).status();
+			if (status.files.length > 0) {
+				return { leftInPlace: true };
+			}
+		}
+
+		if (this.closed || pooled.uses >= this.options.maxReuse) {
+			this.retireInBackground(pooled);
+		} else {
+			this.track(detachSpan(() => this.reset(pooled)));
+		}
+		return { leftInPlace: false };
+	}
+
+	/**
+	 * Whether a dir is currently leased from this pool
+	 */
+	owns(dir: string): boolean {
+		return this.leased.has(dir);
+	}
+
+	/**
+	 * Drop a leased dir from the pool without touching it (e.g. preserved for manual review)
+	 */
+	forget(dir: string): void {
+		this.leased.delete(dir);
+	}
+
+	/**
+	 * Wait for background work to finish and delete all idle dirs
+	 */
+	async drain(): Promise<void> {
+		this.closed = true;
+
+		await Promise.all(this.pending.map((p) => p.settled));
+
+		const idle = this.idle.splice(0);
+		await Promise.all([...idle.map((pooled) => this.retire(pooled)), ...this.retiring]);
+	}
+
+	getStats(): IsolationPoolStats {
+		return { ...this.stats };
+	}
+
+	private unclaimedPending(): number {
+		return this.pending.filter((p) => !p.claimed).length;
+	}
+
+	/**
+	 * Track background work; unclaimed results go to the idle list
+	 */
+	private track(promise: Promise<PooledDir | null>): void {
+		const entry: PendingDir = { promise, settled: Promise.resolve(), claimed: false };
+		entry.settled = promise
+			.then(async (pooled) => {
+				if (!pooled || entry.claimed) return;
+				if (this.closed) {
+					await this.retire(pooled);
+				} else {
+					this.idle.push(pooled);
+				}
+			})
+			.finally(() => {
+				this.pending = this.pending.filter((p) => p !== entry);
+			});
+		this.pending.push(entry);
+	}
+
+	private retireInBackground(pooled: PooledDir): void {
+		const retiring = detachSpan(() => this.retire(pooled));
+		this.retiring.add(retiring);
+		retiring.finally(() => this.retiring.delete(retiring));
+	}
+
+	private async prepare(): Promise<PooledDir | null> {
+		try {
+			return await this.create();
+		} catch (error) {
+			const errorMsg = error instanceof Error ? error.message : String(error);
+			logWarn(`Failed to prepare pooled ${this.options.mode}: ${errorMsg}`);
+			return null;
+		}
+	}
+
+	private async create(): Promise<PooledDir> {
+		this.counter++;
+		const uniqueSuffix = Math.random().toString(36).substring(2, 8);
+		const dir = join(this.options.baseDir, `pool-${this.counter}-${uniqueSuffix}`);
+
+		if (this.options.mode === "worktree") {
+			await createDetachedWorktree(dir, this.options.baseBranch, this.options.workDir);
+		} else {
+			await createSandbox({ originalDir: this.options.workDir, sandboxDir: dir, agentNum: 0 });
+		}
+
+		this.stats.created++;
+		return { dir, uses: 0 };
+	}
+
+	private async reset(pooled: PooledDir): Promise<PooledDir | null> {
+		try {
+			if (this.options.mode === "worktree") {
+				await resetWorktree(pooled.dir, this.options.baseBranch);
+			} else {
+				const resynced = await resyncSandbox(pooled.dir, this.options.workDir);
+				logDebug(`Resynced ${resynced} file(s) in ${pooled.dir}`);
+			}
+			this.stats.reused++;
+			return pooled;
+		} catch (error) {
+			const errorMsg = error instanceof Error ? error.message : String(error);
+			logDebug(`Failed to reset ${pooled.dir}, retiring it: ${errorMsg}`);
+			await this.retire(pooled);
+			return null;
+		}
+	}
+
+	private async retire(pooled: PooledDir): Promise<null> {
+		this.stats.retired++;
+		if (this.options.mode === "worktree") {
+			await cleanupAgentWorktree(pooled.dir, "", this.options.workDir).catch(() => {
+				// Ignore cleanup failures
+			});
+		} else {
+			await cleanupSandbox(pooled.dir).catch(() => {
+				// Ignore cleanup failures
+			});
+		}
+		return null;
+	}
+}
@@ -0,0 +1,293 @@
+import type { AIEngine } from "../engines/types.ts";
+import {
+	type PreMergeAnalysis,
+	abortMerge,
+	analyzePreMerge,
+	deleteLocalBranch,
+	getPotentialConflictFiles,
+	isMergeTreeSupported,
+	mergeAgentBranch,
+	mergeBranchesTreewise,
+	planMergeBatches,
+	sortByConflictLikelihood,
+	testMerge,
+} from "../git/merge.ts";
+import { formatDuration, logDebug, logError, logInfo, logSuccess, logWarn } from "../ui/logger.ts";
+import { resolveConflictsWithAI } from "./conflict-resolution.ts";
+
+/**
+ * Time spent in each merge stage
+ */
+export interface MergeStageTimings {
+	/** Pre-merge analysis and batch planning */
+	analyzeMs: number;
+	/** In-memory test merges against the target */
+	testMergeMs: number;
+	/** Tree-wise merges of conflict-free batches */
+	integrateMs: number;
+	/** Working-tree merges, including AI conflict resolution */
+	resolveMs: number;
+	/** Branch deletion */
+	cleanupMs: number;
+	totalMs: number;
+}
+
+export interface MergeStats {
+	/** merge-tree: in-memory batches; sequential: one working-tree merge per branch */
+	strategy: "merge-tree" | "sequential";
+	branches: number;
+	merged: number;
+	failed: number;
+	/** Conflict-free batches merged tree-wise */
+	batches: number;
+	/** Branches that needed AI conflict resolution */
+	aiResolutions: number;
+	stages: MergeStageTimings;
+}
+
+/**
+ * Merge completed branches back to the base branch.
+ *
+ * Merge pipeline:
+ * 1. Parallel pre-merge analysis (git diff doesn't require locks)
+ * 2. Split branches into batches that don't share changed files (file-overlap graph)
+ * 3. Per batch: test-merge against the target in memory (git merge-tree), then merge
+ *    the clean branches tree-wise in parallel and fast-forward the target
+ * 4. Sequential working-tree merges for the rest; only real conflicts go to AI resolution
+ * 5. Parallel branch deletion
+ *
+ * Without merge-tree support (git < 2.38) every branch takes the sequential path.
+ */
+export async function mergeCompletedBranches(
+	branches: string[],
+	targetBranch: string,
+	engine: AIEngine,
+	workDir: string,
+	modelOverride?: string,
+	engineArgs?: string[],
+): Promise<MergeStats> {
+	const stats: MergeStats = {
+		strategy: "sequential",
+		branches: branches.length,
+		merged: 0,
+		failed: 0,
+		batches: 0,
+		aiResolutions: 0,
+		stages: {
+			analyzeMs: 0,
+			testMergeMs: 0,
+			integrateMs: 0,
+			resolveMs: 0,
+			cleanupMs: 0,
+			totalMs: 0,
+		},
+	};
+	if (branches.length === 0) {
+		return stats;
+	}
+
+	const mergeStartTime = Date.now();
+	logInfo(`\nMerge phase: merging ${branches.length} branch(es) into ${targetBranch}`);
+
+	// Stage 1: Parallel pre-merge analysis
+	// Run git diff for all branches in parallel (doesn't require locks)
+	let stageStart = Date.now();
+	logDebug("Analyzing branches for potential conflicts...");
+	const analyses = await Promise.all(
+		branches.map((branch) => analyzePreMerge(branch, targetBranch, workDir)),
+	);
+
+	// Sort by conflict likelihood (merge clean ones first)
+	// This reduces the chance of early conflicts blocking later clean merges
+	const sortedAnalyses = sortByConflictLikelihood(analyses);
+	if (sortedAnalyses[0]?.branch !== branches[0]) {
+		logDebug("Reordered branches to minimize conflicts");
+	}
+	stats.stages.analyzeMs = Date.now() - stageStart;
+
+	const merged: string[] = [];
+	const failed: string[] = [];
+	const integrationBranches: string[] = [];
+	let remaining = sortedAnalyses;
+
+	// Stages 2-3: In-memory merges of conflict-free batches
+	if (await isMergeTreeSupported(workDir)) {
+		stats.strategy = "merge-tree";
+		remaining = await mergeInBatches(sortedAnalyses, targetBranch, workDir, stats, {
+			merged,
+			integrationBranches,
+		});
+	} else {
+		logDebug("git merge-tree --write-tree is not available, merging branches one by one");
+	}
+
+	// Stage 4: Sequential merges (git operations on the working tree require this)
+	stageStart = Date.now();
+	for (const analysis of remaining) {
+		const branch = analysis.branch;
+		const fileCount = analysis.fileCount;
+		logInfo(`Merging ${branch}... (${fileCount} file${fileCount === 1 ? "" : "s"} changed)`);
+
+		const mergeResult = await mergeAgentBranch(branch, targetBranch, workDir);
+
+		if (mergeResult.success) {
+			logSuccess(`Merged ${branch}`);
+			merged.push(branch);
+		} else if (mergeResult.hasConflicts && mergeResult.conflictedFiles) {
+			// Try AI-assisted conflict resolution
+			logWarn(`Merge conflict in ${branch}, attempting AI resolution...`);
+			stats.aiResolutions++;
+
+			const resolved = await resolveConflictsWithAI(
+				engine,
+				mergeResult.conflictedFiles,
+				branch,
+				workDir,
+				modelOverride,
+				engineArgs,
+			);
+
+			if (resolved) {
+				logSuccess(`Resolved conflicts and merged ${branch}`);
+				merged.push(branch);
+			} else {
+				logError(`Failed to resolve conflicts for ${branch}`);
+				await abortMerge(workDir);
+				failed.push(branch);
+			}
+		} else {
+			logError(`Failed to merge ${branch}: ${mergeResult.error || "Unknown error"}`);
+			failed.push(branch);
+		}
+	}
+	stats.stages.resolveMs = Date.now() - stageStart;
+
+	// Stage 5: Parallel branch deletion
+	// Delete all successfully merged branches and integration branches in parallel
+	stageStart = Date.now();
+	const toDelete = [...merged, ...integrationBranches];
+	if (toDelete.length > 0) {
+		const deleteResults = await Promise.all(
+			toDelete.map(async (branch) => {
+				const deleted = await deleteLocalBranch(branch, workDir, true);
+				return { branch, deleted };
+			}),
+		);
+
+		for (const { branch, deleted } of deleteResults) {
+			if (deleted) {
+				logDebug(`Deleted merged branch: ${branch}`);
+			}
+		}
+	}
+	stats.stages.cleanupMs = Date.now() - stageStart;
+
+	stats.merged = merged.length;
+	stats.failed = failed.length;
+	stats.stages.totalMs = Date.now() - mergeStartTime;
+
+	// Summary
+	const mergeDuration = formatDuration(stats.stages.totalMs);
+	if (merged.length > 0) {
+		logSuccess(`Successfully merged ${merged.length} branch(es) in ${mergeDuration}`);
+	}
+	if (failed.length > 0) {
+		logWarn(`Failed to merge ${failed.length} branch(es): ${failed.join(", ")}`);
+		logInfo("These branches have been preserved for manual review.");
+	}
+	logMergeStats(stats);
+
+	return stats;
+}
+
+/**
+ * Merge branches batch by batch without touching the working tree.
+ * Returns the branches left for sequential merging: predicted conflicts, and
+ * branches whose batch could not be merged in memory.
+ */
+async function mergeInBatches(
+	analyses: PreMergeAnalysis[],
+	targetBranch: string,
+	workDir: string,
+	stats: MergeStats,
+	out: { merged: string[]; integrationBranches: string[] },
+): Promise<PreMergeAnalysis[]> {
+	let stageStart = Date.now();
+	const batches = planMergeBatches(analyses);
+	stats.stages.analyzeMs += Date.now() - stageStart;
+	logDebug(`Planned ${batches.length} conflict-free merge batch(es)`);
+
+	const remaining: PreMergeAnalysis[] = [];
+
+	for (const [index, batch] of batches.entries()) {
+		// Test-merge against the current target. Branches that share no changed files
+		// with the target merge cleanly, so only overlapping ones need merge-tree.
+		stageStart = Date.now();
+		const checks = await Promise.all(
+			batch.map(async (analysis) => {
+				const overlap = await getPotentialConflictFiles(analysis.branch, targetBranch, workDir);
+				if (overlap.length === 0) {
+					return { analysis, result: null };
+				}
+				return { analysis, result: await testMerge(targetBranch, analysis.branch, workDir) };
+			}),
+		);
+		stats.stages.testMergeMs += Date.now() - stageStart;
+
+		const clean: PreMergeAnalysis[] = [];
+		for (const { analysis, result } of checks) {
+			if (!result || result.clean) {
+				clean.push(analysis);
+			} else {
+				if (result.conflictedFiles.length > 0) {
+					logDebug(
+						`Conflict predicted for ${analysis.branch}: ${result.conflictedFiles.join(", ")}`,
+					);
+				} else {
+					logDebug(`Test merge failed for ${analysis.branch}: ${result.error}`);
+				}
+				remaining.push(analysis);
+			}
+		}
+
+		if (clean.length === 0) {
+			continue;
+		}
+
+		stageStart = Date.now();
+		const cleanBranches = clean.map((a) => a.branch);
+		logInfo(
+			`Merging ${cleanBranches.length} branch(es) in memory (batch ${index + 1}/${batches.length})...`,
+		);
+		const result = await mergeBranchesTreewise(index + 1, cleanBranches, targetBranch, workDir);
+		stats.stages.integrateMs += Date.now() - stageStart;
+
+		if (result.success) {
+			stats.batches++;
+			for (const branch of cleanBranches) {
+				logSuccess(`Merged ${branch}`);
+				out.merged.push(branch);
+			}
+			if (result.integrationBranch) {
+				out.integrationBranches.push(result.integrationBranch);
+			}
+		} else {
+			logDebug(
+				`In-memory merge of batch ${index + 1} failed, merging its branches one by one: ${result.error ?? result.conflictedFiles?.join(", ")}`,
+			);
+			remaining.push(...clean);
+		}
+	}
+
+	return remaining;
+}
+
+/**
+ * Log the time spent in each merge stage
+ */
+function logMergeStats(stats: MergeStats): void {
+	const { stages } = stats;
+	logInfo(
+		`Merge stages (${stats.strategy}): analyze ${formatDuration(stages.analyzeMs)}, test-merge ${formatDuration(stages.testMergeMs)}, integrate ${formatDuration(stages.integrateMs)} (${stats.batches} batch(es)), resolve ${formatDuration(stages.resolveMs)} (${stats.aiResolutions} AI resolution(s)), cleanup ${formatDuration(stages.cleanupMs)}`,
+	);
+}
@@ -1,18 +1,11 @@
 import { copyFileSync, cpSync, existsSync, mkdirSync } from "node:fs";
-import { join } from "node:path";
+import { join, normalize, sep } from "node:path";
 import simpleGit from "simple-git";
 import { PROGRESS_FILE, RALPHY_DIR } from "../config/loader.ts";
 import { logTaskProgress } from "../config/writer.ts";
 import type { AIEngine, AIResult } from "../engines/types.ts";
 import { getCurrentBranch, returnToBaseBranch } from "../git/branch.ts";
 import { syncPrdToIssue } from "../git/issue-sync.ts";
-import {
-	abortMerge,
-	analyzePreMerge,
-	deleteLocalBranch,
-	mergeAgentBranch,
-	sortByConflictLikelihood,
-} from "../git/merge.ts";
 import {
 	canUseWorktrees,
 	cleanupAgentWorktree,
@@ -20,14 +13,31 @@ import {
 	getWorktreeBase,
 } from "../git/worktree.ts";
 import type { Task, TaskSource } from "../tasks/types.ts";
+import { incrementMetric } from "../telemetry/metrics.ts";
+import { withSpan } from "../telemetry/tracing.ts";
 import { formatDuration, logDebug, logError, logInfo, logSuccess, logWarn } from "../ui/logger.ts";
 import { notifyTaskComplete, notifyTaskFailed } from "../ui/notify.ts";
-import { resolveConflictsWithAI } from "./conflict-resolution.ts";
 import { clearDeferredTask, recordDeferredTask } from "./deferred.ts";
+import { IsolationPool } from "./isolation-pool.ts";
+import { mergeCompletedBranches } from "./merge-pipeline.ts";
+import { PhaseTimer } from "./phases.ts";
 import { buildParallelPrompt } from "./prompt.ts";
 import { isRetryableError, withRetry } from "./retry.ts";
 import { commitSandboxChanges } from "./sandbox-git.ts";
-import { cleanupSandbox, createSandbox, getModifiedFiles, getSandboxBase } from "./sandbox.ts";
+import {
+	cleanupSandbox,
+	createSandbox,
+	forgetSandboxManifest,
+	getModifiedFiles,
+	getSandboxBase,
+} from "./sandbox.ts";
+import {
+	type GroupedTaskSource,
+	type SchedulerMode,
+	type SchedulerStats,
+	SlotTracker,
+	pickEligibleTasks,
+} from "./scheduler.ts";
 import type { ExecutionOptions, ExecutionResult } from "./sequential.ts";
 
 interface ParallelAgentResult {
@@ -41,6 +51,42 @@ interface ParallelAgentResult {
 	usedSandbox?: boolean;
 }
 
+/**
+ * Copy the PRD file or folder into an agent's worktree or sandbox
+ */
+async function copyPrd(
+	originalDir: string,
+	agentDir: string,
+	prdSource: string,
+	prdFile: string,
+	prdIsFolder: boolean,
+): Promise<void> {
+	const isFile = prdSource === "markdown" || prdSource === "yaml" || prdSource === "json";
+	const isFolder = prdSource === "markdown-folder" && prdIsFolder;
+	const srcPath = join(originalDir, prdFile);
+	if ((!isFile && !isFolder) || !existsSync(srcPath)) {
+		return;
+	}
+
+	await withSpan("prd.copy", { prdSource }, async () => {
+		const destPath = join(agentDir, prdFile);
+		if (isFile) {
+			copyFileSync(srcPath, destPath);
+		} else {
+			cpSync(srcPath, destPath, { recursive: true });
+		}
+	});
+}
+
+/**
+ * Drop the PRD copy made by copyPrd from a sandbox's changes. Task state lives in
+ * the original PRD; committing the agent's copy would overwrite it.
+ */
+function withoutPrdCopy(files: string[], prdFile: string): string[] {
+	const prdPath = normalize(prdFile);
+	return files.filter((file) => file !== prdPath && !file.startsWith(`${prdPath}${sep}`));
+}
+
 /**
  * Run a single agent in a worktree
  */
@@ -59,46 +105,45 @@ async function runAgentInWorktree(
 	skipTests: boolean,
 	skipLint: boolean,
 	browserEnabled: "auto" | "true" | "false",
+	phases: PhaseTimer,
 	modelOverride?: string,
 	engineArgs?: string[],
+	pool?: IsolationPool,
 ): Promise<ParallelAgentResult> {
 	let worktreeDir = "";
 	let branchName = "";
+	const setupStart = performance.now();
 
 	try {
-		// Create worktree
-		const worktree = await createAgentWorktree(
-			task.title,
-			agentNum,
-			baseBranch,
-			worktreeBase,
-			originalDir,
-		);
-		worktreeDir = worktree.worktreeDir;
-		branchName = worktree.branchName;
+		if (pool) {
+			// Lease a pre-warmed worktree and check out a fresh agent branch
+			const lease = await pool.acquire(task.title, agentNum);
+			worktreeDir = lease.dir;
+			branchName = lease.branchName;
+		} else {
+			// Create worktree
+			const worktree = await createAgentWorktree(
+				task.title,
+				agentNum,
+				baseBranch,
+				worktreeBase,
+				originalDir,
+			);
+			worktreeDir = worktree.worktreeDir;
+			branchName = worktree.branchName;
 
-		logDebug(`Agent ${agentNum}: Created worktree at ${worktreeDir}`);
+			logDebug(`Agent ${agentNum}: Created worktree at ${worktreeDir}`);
+		}
 
 		// Copy PRD file or folder to worktree
-		if (prdSource === "markdown" || prdSource === "yaml" || prdSource === "json") {
-			const srcPath = join(originalDir, prdFile);
-			const destPath = join(worktreeDir, prdFile);
-			if (existsSync(srcPath)) {
-				copyFileSync(srcPath, destPath);
-			}
-		} else if (prdSource === "markdown-folder" && prdIsFolder) {
-			const srcPath = join(originalDir, prdFile);
-			const destPath = join(worktreeDir, prdFile);
-			if (existsSync(srcPath)) {
-				cpSync(srcPath, destPath, { recursive: true });
-			}
-		}
+		await copyPrd(originalDir, worktreeDir, prdSource, prdFile, prdIsFolder);
 
 		// Ensure .ralphy/ exists in worktree
 		const ralphyDir = join(worktreeDir, RALPHY_DIR);
 		if (!existsSync(ralphyDir)) {
 			mkdirSync(ralphyDir, { recursive: true });
 		}
+		phases.record("isolation", performance.now() - setupStart);
 
 		// Build prompt
 		const prompt = buildParallelPrompt({
@@ -115,15 +160,17 @@ async function runAgentInWorktree(
 			...(modelOverride && { modelOverride }),
 			...(engineArgs && engineArgs.length > 0 && { engineArgs }),
 		};
-		const result = await withRetry(
-			async () => {
-				const res = await engine.execute(prompt, worktreeDir, engineOptions);
-				if (!res.success && res.error && isRetryableError(res.error)) {
-					throw new Error(res.error);
-				}
-				return res;
-			},
-			{ maxRetries, retryDelay },
+		const result = await phases.time("agent", () =>
+			withRetry(
+				async () => {
+					const res = await engine.execute(prompt, worktreeDir, engineOptions);
+					if (!res.success && res.error && isRetryableError(res.error)) {
+						throw new Error(res.error);
+					}
+					return res;
+				},
+				{ maxRetries, retryDelay },
+			),
 		);
 
 		return { task, agentNum, worktreeDir, branchName, result };
@@ -153,45 +200,42 @@ async function runAgentInSandbox(
 	skipTests: boolean,
 	skipLint: boolean,
 	browserEnabled: "auto" | "true" | "false",
+	phases: PhaseTimer,
 	modelOverride?: string,
 	engineArgs?: string[],
+	pool?: IsolationPool,
 ): Promise<ParallelAgentResult> {
 	const uniqueSuffix = Math.random().toString(36).substring(2, 8);
-	const sandboxDir = join(sandboxBase, `agent-${agentNum}-${uniqueSuffix}`);
+	let sandboxDir = join(sandboxBase, `agent-${agentNum}-${uniqueSuffix}`);
 	const branchName = "";
+	const setupStart = performance.now();
 
 	try {
-		// Create sandbox
-		const sandboxResult = await createSandbox({
-			originalDir,
-			sandboxDir,
-			agentNum,
-		});
+		if (pool) {
+			// Lease a pre-warmed sandbox
+			sandboxDir = (await pool.acquire(task.title, agentNum)).dir;
+		} else {
+			// Create sandbox
+			const sandboxResult = await createSandbox({
+				originalDir,
+				sandboxDir,
+				agentNum,
+			});
 
-		logDebug(
-			`Agent ${agentNum}: Created sandbox (${sandboxResult.symlinksCreated} symlinks, ${sandboxResult.filesCopied} copies)`,
-		);
+			logDebug(
+				`Agent ${agentNum}: Created sandbox (${sandboxResult.symlinksCreated} symlinks, ${sandboxResult.filesCopied} copies)`,
+			);
+		}
 
 		// Copy PRD file or folder to sandbox (same as worktree mode)
-		if (prdSource === "markdown" || prdSource === "yaml" || prdSource === "json") {
-			const srcPath = join(originalDir, prdFile);
-			const destPath = join(sandboxDir, prdFile);
-			if (existsSync(srcPath)) {
-				copyFileSync(srcPath, destPath);
-			}
-		} else if (prdSource === "markdown-folder" && prdIsFolder) {
-			const srcPath = join(originalDir, prdFile);
-			const destPath = join(sandboxDir, prdFile);
-			if (existsSync(srcPath)) {
-				cpSync(srcPath, destPath, { recursive: true });
-			}
-		}
+		await copyPrd(originalDir, sandboxDir, prdSource, prdFile, prdIsFolder);
 
 		// Ensure .ralphy/ exists in sandbox
 		const ralphyDir = join(sandboxDir, RALPHY_DIR);
 		if (!existsSync(ralphyDir)) {
 			mkdirSync(ralphyDir, { recursive: true });
 		}
+		phases.record("isolation", performance.now() - setupStart);
 
 		// Build prompt
 		const prompt = buildParallelPrompt({
@@ -209,15 +253,17 @@ async function runAgentInSandbox(
 			...(modelOverride && { modelOverride }),
 			...(engineArgs && engineArgs.length > 0 && { engineArgs }),
 		};
-		const result = await withRetry(
-			async () => {
-				const res = await engine.execute(prompt, sandboxDir, engineOptions);
-				if (!res.success && res.error && isRetryableError(res.error)) {
-					throw new Error(res.error);
-				}
-				return res;
-			},
-			{ maxRetries, retryDelay },
+		const result = await phases.time("agent", () =>
+			withRetry(
+				async () => {
+					const res = await engine.execute(prompt, sandboxDir, engineOptions);
+					if (!res.success && res.error && isRetryableError(res.error)) {
+						throw new Error(res.error);
+					}
+					return res;
+				},
+				{ maxRetries, retryDelay },
+			),
 		);
 
 		return { task, agentNum, worktreeDir: sandboxDir, branchName, result, usedSandbox: true };
@@ -235,6 +281,185 @@ async function runAgentInSandbox(
 	}
 }
 
+/**
+ * Outcome of post-processing a finished agent
+ */
+interface SettledAgent {
+	/** The failure is temporary (rate limit, network) and the run should stop early */
+	retryableFailure: boolean;
+	/** Whether the task was completed successfully */
+	completed: boolean;
+	/** Worktree that still needs to be removed */
+	worktree?: { worktreeDir: string; branchName: string };
+}
+
+/**
+ * Remove finished worktrees in parallel (or return them to the pool), logging any left in place
+ */
+async function cleanupWorktrees(
+	worktrees: Array<{ worktreeDir: string; branchName: string }>,
+	workDir: string,
+	pool?: IsolationPool,
+): Promise<void> {
+	if (worktrees.length === 0) {
+		return;
+	}
+
+	const cleanupResults = await Promise.all(
+		worktrees.map(({ worktreeDir, branchName }) => {
+			const cleanup = pool?.owns(worktreeDir)
+				? pool.release(worktreeDir)
+				: cleanupAgentWorktree(worktreeDir, branchName, workDir);
+			return cleanup.then(({ leftInPlace }) => ({ worktreeDir, leftInPlace }));
+		}),
+	);
+
+	// Log any worktrees left in place
+	for (const { worktreeDir, leftInPlace } of cleanupResults) {
+		if (leftInPlace) {
+			logInfo(`Worktree left in place (uncommitted changes): ${worktreeDir}`);
+		}
+	}
+}
+
+/**
+ * Log slot utilization and queue-wait time for a parallel run
+ */
+function logSchedulerStats(stats: SchedulerStats): void {
+	if (stats.tasks.length === 0) {
+		return;
+	}
+
+	const utilization = Math.round(stats.utilization * 100);
+	logInfo(
+		`Scheduler (${stats.mode}): ${utilization}% slot utilization across ${stats.slots} slots, queue wait avg ${formatDuration(stats.avgQueueWaitMs)} / max ${formatDuration(stats.maxQueueWaitMs)}`,
+	);
+	for (const timing of stats.tasks) {
+		logDebug(
+			`  Agent ${timing.agentNum}: "${timing.title}" waited ${formatDuration(timing.queueWaitMs)}, ran ${formatDuration(timing.runMs)}`,
+		);
+	}
+}
+
+/**
+ * Continuous scheduler: keeps maxParallel agents in flight and refills a slot
+ * as soon as an agent finishes, instead of waiting for a whole batch.
+ * Parallel group boundaries are respected: a new group only starts once the
+ * running group has drained. As in batch mode, an iteration is worth up to
+ * maxParallel tasks, so both schedulers stop after the same number of tasks.
+ */
+async function runContinuousSchedule(options: {
+	taskSource: TaskSource;
+	maxParallel: number;
+	maxIterations: number;
+	dryRun: boolean;
+	tracker: SlotTracker;
+	launch: (task: Task, agentNum: number) => Promise<ParallelAgentResult>;
+	settle: (agentResult: ParallelAgentResult) => Promise<SettledAgent>;
+	cleanup: (worktree: { worktreeDir: string; branchName: string }) => Promise<void>;
+}): Promise<void> {
+	const { taskSource, maxParallel, maxIterations, dryRun, tracker, launch, settle, cleanup } =
+		options;
+
+	const inFlight = new Map<number, Promise<ParallelAgentResult>>();
+	const claimed = new Set<string>();
+	let activeGroup: number | null = null;
+	let dispatched = 0;
+	let agentNum = 0;
+	let stopDispatching = false;
+	let stoppedForRetry = false;
+	let queueDrained = false;
+	const maxTasks = maxIterations * maxParallel;
+
+	const fillSlots = async (): Promise<void> => {
+		while (!stopDispatching && inFlight.size < maxParallel) {
+			if (maxTasks > 0 && dispatched >= maxTasks) {
+				logInfo(`Reached max iterations (${maxIterations})`);
+				stopDispatching = true;
+				return;
+			}
+
+			let freeSlots = maxParallel - inFlight.size;
+			if (maxTasks > 0) {
+				freeSlots = Math.min(freeSlots, maxTasks - dispatched);
+			}
+
+			const eligible = await pickEligibleTasks(taskSource, {
+				claimed,
+				freeSlots,
+				inFlight: inFlight.size,
+				activeGroup,
+			});
+			tracker.observe(eligible.pending);
+
+			if (eligible.pending.length === 0) {
+				queueDrained = true;
+			}
+			if (eligible.tasks.length === 0) {
+				return;
+			}
+			activeGroup = eligible.group;
+
+			for (const task of eligible.tasks) {
+				claimed.add(task.id);
+				dispatched++;
+
+				if (dryRun) {
+					logInfo(`(dry run) Skipping ${task.title}`);
+					continue;
+				}
+
+				agentNum++;
+				const num = agentNum;
+				tracker.dispatch(task, num);
+				logInfo(`Agent ${num} started (${inFlight.size + 1}/${maxParallel} slots): ${task.title}`);
+				inFlight.set(
+					num,
+					launch(task, num).catch((error) => ({
+						task,
+						agentNum: num,
+						worktreeDir: "",
+						branchName: "",
+						result: null,
+						error: error instanceof Error ? error.message : String(error),
+					})),
+				);
+			}
+		}
+	};
+
+	await fillSlots();
+
+	while (inFlight.size > 0) {
+		const finished = await Promise.race(inFlight.values());
+		inFlight.delete(finished.agentNum);
+		const timing = tracker.finish(finished.agentNum);
+		if (timing) {
+			logDebug(`Agent ${finished.agentNum} finished in ${formatDuration(timing.runMs)}`);
+		}
+
+		const settled = await settle(finished);
+		if (settled.retryableFailure && !stoppedForRetry) {
+			logWarn("Retryable error: not starting new agents, waiting for running agents to finish.");
+			stoppedForRetry = true;
+			stopDispatching = true;
+		}
+
+		// Hand the freed slot to the next task before slower cleanup work
+		await fillSlots();
+
+		if (settled.worktree) {
+			await cleanup(settled.worktree);
+		}
+	}
+
+	if (stoppedForRetry) {
+		logWarn("Stopping early due to retryable errors. Try again later.");
+	} else if (queueDrained) {
+		logSuccess("All tasks completed!");
+	}
+}
+
 /**
  * Run tasks in parallel using worktrees or sandboxes
  */
@@ -244,6 +469,12 @@ export async function runParallel(
 		prdSource: string;
 		prdFile: string;
 		prdIsFolder?: boolean;
+		/** How tasks are handed to agents (default: batch) */
+		scheduler?: SchedulerMode;
+		/** Number of sandboxes/worktrees to keep pre-warmed (0 = create per agent) */
+		poolSize?: number;
+		/** How many tasks a pooled sandbox/worktree may serve before it is replaced */
+		poolMaxReuse?: number;
 	},
 ): Promise<ExecutionResult> {
 	const {
@@ -267,6 +498,9 @@ export async function runParallel(
 		useSandbox = false,
 		engineArgs,
 		syncIssue,
+		scheduler = "batch",
+		poolSize = 0,
+		poolMaxReuse,
 	} = options;
 
 	const shouldFallbackToSandbox = (error: string | undefined): boolean => {
@@ -304,113 +538,39 @@ export async function runParallel(
 	// Track completed branches for merge phase
 	const completedBranches: string[] = [];
 
-	// Global agent counter to ensure unique numbering across batches
-	let globalAgentNum = 0;
-
-	// Track processed tasks in dry-run mode (since we don't modify the source file)
-	const dryRunProcessedIds = new Set<string>();
-
-	// Process tasks in batches
-	let iteration = 0;
-
-	while (true) {
-		// Check iteration limit
-		if (maxIterations > 0 && iteration >= maxIterations) {
-			logInfo(`Reached max iterations (${maxIterations})`);
-			break;
-		}
-
-		// Get tasks for this batch
-		let tasks: Task[] = [];
-
-		const taskSourceWithGroups = taskSource as TaskSource & {
-			getParallelGroup?: (title: string) => Promise<number>;
-			getTasksInGroup?: (group: number) => Promise<Task[]>;
-		};
-
-		if (taskSourceWithGroups.getParallelGroup && taskSourceWithGroups.getTasksInGroup) {
-			let nextTask = await taskSource.getNextTask();
-			if (dryRun && nextTask && dryRunProcessedIds.has(nextTask.id)) {
-				const allTasks = await taskSource.getAllTasks();
-				nextTask = allTasks.find((task) => !dryRunProcessedIds.has(task.id)) || null;
-			}
-			if (!nextTask) break;
-
-			const group = await taskSourceWithGroups.getParallelGroup(nextTask.title);
-			if (group > 0) {
-				tasks = await taskSourceWithGroups.getTasksInGroup(group);
-				if (dryRun) {
-					tasks = tasks.filter((task) => !dryRunProcessedIds.has(task.id));
-				}
-			} else {
-				tasks = [nextTask];
-			}
-		} else {
-			tasks = await taskSource.getAllTasks();
-			if (dryRun) {
-				tasks = tasks.filter((task) => !dryRunProcessedIds.has(task.id));
-			}
-		}
-
-		if (tasks.length === 0) {
-			logSuccess("All tasks completed!");
-			break;
-		}
-
-		// Limit to maxParallel
-		const batch = tasks.slice(0, maxParallel);
-		iteration++;
+	// Slot utilization and queue-wait tracking
+	const tracker = new SlotTracker(scheduler, maxParallel);
+	const phases = new PhaseTimer();
 
-		const batchStartTime = Date.now();
-		logInfo(`Batch ${iteration}: ${batch.length} tasks in parallel`);
-
-		if (dryRun) {
-			logInfo("(dry run) Skipping batch");
-			// Track processed tasks to avoid infinite loop
-			for (const task of batch) {
-				dryRunProcessedIds.add(task.id);
-			}
-			continue;
-		}
-
-		// Log task names being processed
-		for (const task of batch) {
-			logInfo(`  -> ${task.title}`);
-		}
-
-		// Run agents in parallel (using sandbox or worktree mode)
-		const promises = batch.map((task) => {
-			globalAgentNum++;
-
-			const runInSandbox = () =>
-				runAgentInSandbox(
-					engine,
-					task,
-					globalAgentNum,
-					getSandboxBase(workDir),
+	// Pre-warm isolation dirs in the background while agents run
+	const pool =
+		poolSize > 0 && !dryRun
+			? new IsolationPool({
+					mode: effectiveUseSandbox ? "sandbox" : "worktree",
 					workDir,
-					prdSource,
-					prdFile,
-					prdIsFolder,
-					maxRetries,
-					retryDelay,
-					skipTests,
-					skipLint,
-					browserEnabled,
-					modelOverride,
-					engineArgs,
-				);
-
-			if (effectiveUseSandbox) {
-				return runInSandbox();
-			}
-
-			return runAgentInWorktree(
+					baseDir: isolationBase,
+					baseBranch: originalBaseBranch,
+					size: poolSize,
+					maxReuse: poolMaxReuse,
+				})
+			: undefined;
+	if (pool) {
+		logDebug(`Isolation pool: keeping ${poolSize} ${pool.mode}(s) warm`);
+		pool.warm();
+	}
+	const sandboxPool = pool?.mode === "sandbox" ? pool : undefined;
+	const worktreePool = pool?.mode === "worktree" ? pool : undefined;
+
+	/**
+	 * Start an agent for a task (sandbox or worktree, with sandbox fallback)
+	 */
+	const startAgent = (task: Task, agentNum: number): Promise<ParallelAgentResult> => {
+		const runInSandbox = () =>
+			runAgentInSandbox(
 				engine,
 				task,
-				globalAgentNum,
-				baseBranch,
-				isolationBase,
+				agentNum,
+				getSandboxBase(workDir),
 				workDir,
 				prdSource,
 				prdFile,
@@ -420,212 +580,381 @@ export async function runParallel(
 				skipTests,
 				skipLint,
 				browserEnabled,
+				phases,
 				modelOverride,
 				engineArgs,
-			).then((res) => {
-				if (shouldFallbackToSandbox(res.error)) {
-					logWarn(`Agent ${globalAgentNum}: Worktree unavailable, retrying in sandbox mode.`);
-					if (res.worktreeDir) {
-						cleanupAgentWorktree(res.worktreeDir, res.branchName, workDir).catch(() => {
-							// Ignore cleanup failures during fallback
-						});
-					}
-					return runInSandbox();
+				sandboxPool,
+			);
+
+		if (effectiveUseSandbox) {
+			return runInSandbox();
+		}
+
+		return runAgentInWorktree(
+			engine,
+			task,
+			agentNum,
+			baseBranch,
+			isolationBase,
+			workDir,
+			prdSource,
+			prdFile,
+			prdIsFolder,
+			maxRetries,
+			retryDelay,
+			skipTests,
+			skipLint,
+			browserEnabled,
+			phases,
+			modelOverride,
+			engineArgs,
+			worktreePool,
+		).then((res) => {
+			if (shouldFallbackToSandbox(res.error)) {
+				logWarn(`Agent ${agentNum}: Worktree unavailable, retrying in sandbox mode.`);
+				if (res.worktreeDir) {
+					cleanupWorktrees([res], workDir, worktreePool).catch(() => {
+						// Ignore cleanup failures during fallback
+					});
 				}
-				return res;
-			});
+				return runInSandbox();
+			}
+			return res;
 		});
+	};
 
-		const results = await Promise.all(promises);
-
-		// Process results and collect worktrees for parallel cleanup
-		let sawRetryableFailure = false;
-		const worktreesToCleanup: Array<{ worktreeDir: string; branchName: string }> = [];
+	/**
+	 * Start an agent inside a per-task span, so its isolation, agent and retry
+	 * spans nest under it
+	 */
+	const launchAgent = (task: Task, agentNum: number): Promise<ParallelAgentResult> =>
+		withSpan("task", { "task.title": task.title, agent: agentNum }, () =>
+			startAgent(task, agentNum),
+		);
 
-		for (const agentResult of results) {
-			const {
-				task,
-				agentNum,
-				worktreeDir,
-				result: aiResult,
-				error,
-				usedSandbox: agentUsedSandbox,
-			} = agentResult;
-			let branchName = agentResult.branchName;
-			let failureReason: string | undefined = error;
-			let retryableFailure = false;
-			let preserveSandbox = false;
-
-			if (!failureReason && aiResult?.success && agentUsedSandbox && worktreeDir) {
-				try {
-					const modifiedFiles = await getModifiedFiles(worktreeDir, workDir);
-					if (modifiedFiles.length > 0) {
-						const commitResult = await commitSandboxChanges(
-							workDir,
-							modifiedFiles,
-							worktreeDir,
-							task.title,
-							agentNum,
-							originalBaseBranch,
+	/**
+	 * Commit sandbox changes, record the task outcome and clean up the sandbox.
+	 * Worktrees are returned to the caller so they can be removed in parallel.
+	 */
+	const settleAgent = async (agentResult: ParallelAgentResult): Promise<SettledAgent> => {
+		const {
+			task,
+			agentNum,
+			worktreeDir,
+			result: aiResult,
+			error,
+			usedSandbox: agentUsedSandbox,
+		} = agentResult;
+		let branchName = agentResult.branchName;
+		let failureReason: string | undefined = error;
+		let retryableFailure = false;
+		let preserveSandbox = false;
+		let completed = false;
+
+		if (!failureReason && aiResult?.success && agentUsedSandbox && worktreeDir) {
+			const commitStart = performance.now();
+			try {
+				const modifiedFiles = withoutPrdCopy(await getModifiedFiles(worktreeDir, workDir), prdFile);
+				if (modifiedFiles.length > 0) {
+					const commitResult = await commitSandboxChanges(
+						workDir,
+						modifiedFiles,
+						worktreeDir,
+						task.title,
+						agentNum,
+						originalBaseBranch,
+					);
+
+					if (commitResult.success) {
+						branchName = commitResult.branchName;
+						logDebug(
+							`Agent ${agentNum}: Committed ${commitResult.filesCommitted} files to ${branchName}`,
 						);
-
-						if (commitResult.success) {
-							branchName = commitResult.branchName;
-							logDebug(
-								`Agent ${agentNum}: Committed ${commitResult.filesCommitted} files to ${branchName}`,
-							);
-						} else {
-							failureReason = commitResult.error || "Failed to commit sandbox changes";
-							preserveSandbox = true; // Preserve work for manual recovery
-						}
+					} else {
+						failureReason = commitResult.error || "Failed to commit sandbox changes";
+						preserveSandbox = true; // Preserve work for manual recovery
 					}
-				} catch (commitErr) {
-					failureReason = commitErr instanceof Error ? commitErr.message : String(commitErr);
-					preserveSandbox = true; // Preserve work for manual recovery
 				}
+			} catch (commitErr) {
+				failureReason = commitErr instanceof Error ? commitErr.message : String(commitErr);
+				preserveSandbox = true; // Preserve work for manual recovery
+			} finally {
+				phases.record("commit", performance.now() - commitStart);
 			}
+		}
 
-			if (failureReason) {
-				retryableFailure = isRetryableError(failureReason);
-				if (retryableFailure) {
-					const deferrals = recordDeferredTask(taskSource.type, task, workDir, prdFile);
-					if (deferrals >= maxRetries) {
-						logError(`Task "${task.title}" failed after ${deferrals} deferrals: ${failureReason}`);
-						logTaskProgress(task.title, "failed", workDir);
-						result.tasksFailed++;
-						notifyTaskFailed(task.title, failureReason);
-						await taskSource.markComplete(task.id);
-						clearDeferredTask(taskSource.type, task, workDir, prdFile);
-						retryableFailure = false;
-					} else {
-						logWarn(`Task "${task.title}" deferred (${deferrals}/${maxRetries}): ${failureReason}`);
-						result.tasksFailed++;
-					}
-				} else {
-					logError(`Task "${task.title}" failed: ${failureReason}`);
+		if (failureReason) {
+			retryableFailure = isRetryableError(failureReason);
+			if (retryableFailure) {
+				const deferrals = recordDeferredTask(taskSource.type, task, workDir, prdFile);
+				if (deferrals >= maxRetries) {
+					logError(`Task "${task.title}" failed after ${deferrals} deferrals: ${failureReason}`);
 					logTaskProgress(task.title, "failed", workDir);
 					result.tasksFailed++;
 					notifyTaskFailed(task.title, failureReason);
-
-					// Mark failed task as complete to remove it from the queue
-					// This prevents infinite retry loops - the task has already been retried maxRetries times
 					await taskSource.markComplete(task.id);
 					clearDeferredTask(taskSource.type, task, workDir, prdFile);
+					retryableFailure = false;
+				} else {
+					logWarn(`Task "${task.title}" deferred (${deferrals}/${maxRetries}): ${failureReason}`);
+					result.tasksFailed++;
 				}
-			} else if (aiResult?.success) {
-				logSuccess(`Task "${task.title}" completed`);
-				result.totalInputTokens += aiResult.inputTokens;
-				result.totalOutputTokens += aiResult.outputTokens;
+			} else {
+				logError(`Task "${task.title}" failed: ${failureReason}`);
+				logTaskProgress(task.title, "failed", workDir);
+				result.tasksFailed++;
+				notifyTaskFailed(task.title, failureReason);
 
+				// Mark failed task as complete to remove it from the queue
+				// This prevents infinite retry loops - the task has already been retried maxRetries times
 				await taskSource.markComplete(task.id);
-				logTaskProgress(task.title, "completed", workDir);
-				result.tasksCompleted++;
-
-				notifyTaskComplete(task.title);
 				clearDeferredTask(taskSource.type, task, workDir, prdFile);
-
-				// Track successful branch for merge phase
-				if (branchName) {
-					completedBranches.push(branchName);
-				}
-			} else {
-				const errMsg = aiResult?.error || "Unknown error";
-				retryableFailure = isRetryableError(errMsg);
-				if (retryableFailure) {
-					const deferrals = recordDeferredTask(taskSource.type, task, workDir, prdFile);
-					if (deferrals >= maxRetries) {
-						logError(`Task "${task.title}" failed after ${deferrals} deferrals: ${errMsg}`);
-						logTaskProgress(task.title, "failed", workDir);
-						result.tasksFailed++;
-						notifyTaskFailed(task.title, errMsg);
-						failureReason = errMsg;
-						await taskSource.markComplete(task.id);
-						clearDeferredTask(taskSource.type, task, workDir, prdFile);
-						retryableFailure = false;
-					} else {
-						logWarn(`Task "${task.title}" deferred (${deferrals}/${maxRetries}): ${errMsg}`);
-						result.tasksFailed++;
-						failureReason = errMsg;
-					}
-				} else {
-					logError(`Task "${task.title}" failed: ${errMsg}`);
+			}
+		} else if (aiResult?.success) {
+			logSuccess(`Task "${task.title}" completed`);
+			result.totalInputTokens += aiResult.inputTokens;
+			result.totalOutputTokens += aiResult.outputTokens;
+
+			await taskSource.markComplete(task.id);
+			logTaskProgress(task.title, "completed", workDir);
+			result.tasksCompleted++;
+			completed = true;
+
+			notifyTaskComplete(task.title);
+			clearDeferredTask(taskSource.type, task, workDir, prdFile);
+
+			// Track successful branch for merge phase
+			if (branchName) {
+				completedBranches.push(branchName);
+			}
+		} else {
+			const errMsg = aiResult?.error || "Unknown error";
+			retryableFailure = isRetryableError(errMsg);
+			if (retryableFailure) {
+				const deferrals = recordDeferredTask(taskSource.type, task, workDir, prdFile);
+				if (deferrals >= maxRetries) {
+					logError(`Task "${task.title}" failed after ${deferrals} deferrals: ${errMsg}`);
 					logTaskProgress(task.title, "failed", workDir);
 					result.tasksFailed++;
 					notifyTaskFailed(task.title, errMsg);
 					failureReason = errMsg;
-
-					// Mark failed task as complete to remove it from the queue
-					// This prevents infinite retry loops - the task has already been retried maxRetries times
 					await taskSource.markComplete(task.id);
 					clearDeferredTask(taskSource.type, task, workDir, prdFile);
+					retryableFailure = false;
+				} else {
+					logWarn(`Task "${task.title}" deferred (${deferrals}/${maxRetries}): ${errMsg}`);
+					result.tasksFailed++;
+					failureReason = errMsg;
 				}
+			} else {
+				logError(`Task "${task.title}" failed: ${errMsg}`);
+				logTaskProgress(task.title, "failed", workDir);
+				result.tasksFailed++;
+				notifyTaskFailed(task.title, errMsg);
+				failureReason = errMsg;
+
+				// Mark failed task as complete to remove it from the queue
+				// This prevents infinite retry loops - the task has already been retried maxRetries times
+				await taskSource.markComplete(task.id);
+				clearDeferredTask(taskSource.type, task, workDir, prdFile);
 			}
+		}
 
-			// Cleanup sandbox inline or collect worktree for parallel cleanup
-			if (worktreeDir) {
-				if (agentUsedSandbox) {
-					if (failureReason || preserveSandbox) {
-						logWarn(`Sandbox preserved for manual review: ${worktreeDir}`);
-					} else {
-						// Sandbox cleanup is simpler - just delete the directory
-						await cleanupSandbox(worktreeDir);
-						logDebug(`Cleaned up sandbox: ${worktreeDir}`);
+		incrementMetric("ralphy_tasks_total", {
+			status: completed ? "completed" : retryableFailure ? "deferred" : "failed",
+		});
+
+		// Cleanup sandbox inline or hand the worktree back for parallel cleanup
+		if (worktreeDir) {
+			if (agentUsedSandbox) {
+				if (failureReason || preserveSandbox) {
+					pool?.forget(worktreeDir);
+					forgetSandboxManifest(worktreeDir);
+					logWarn(`Sandbox preserved for manual review: ${worktreeDir}`);
+				} else if (pool?.owns(worktreeDir)) {
+					// Reset in the background and hand to the next agent
+					await phases.time("cleanup", () => pool.release(worktreeDir));
+					logDebug(`Returned sandbox to pool: ${worktreeDir}`);
+				} else {
+					// Sandbox cleanup is simpler - just delete the directory
+					await phases.time("cleanup", () => cleanupSandbox(worktreeDir));
+					logDebug(`Cleaned up sandbox: ${worktreeDir}`);
+				}
+			} else {
+				return { retryableFailure, completed, worktree: { worktreeDir, branchName } };
+			}
+		}
+
+		return { retryableFailure, completed };
+	};
+
+	if (scheduler === "continuous") {
+		logInfo(`Continuous scheduler: keeping up to ${maxParallel} agents in flight`);
+		await runContinuousSchedule({
+			taskSource,
+			maxParallel,
+			maxIterations,
+			dryRun,
+			tracker,
+			launch: launchAgent,
+			settle: async (agentResult) => {
+				const settled = await settleAgent(agentResult);
+				// Sync PRD to GitHub issue after each completion, as in sequential mode
+				if (settled.completed && syncIssue && prdFile) {
+					await syncPrdToIssue(prdFile, syncIssue, workDir);
+				}
+				return settled;
+			},
+			cleanup: (worktree) =>
+				phases.time("cleanup", () => cleanupWorktrees([worktree], workDir, worktreePool)),
+		});
+	} else {
+		// Global agent counter to ensure unique numbering across batches
+		let globalAgentNum = 0;
+
+		// Track processed tasks in dry-run mode (since we don't modify the source file)
+		const dryRunProcessedIds = new Set<string>();
+
+		// Process tasks in batches
+		let iteration = 0;
+
+		while (true) {
+			// Check iteration limit
+			if (maxIterations > 0 && iteration >= maxIterations) {
+				logInfo(`Reached max iterations (${maxIterations})`);
+				break;
+			}
+
+			// Get tasks for this batch
+			let tasks: Task[] = [];
+
+			const taskSourceWithGroups = taskSource as GroupedTaskSource;
+
+			if (taskSourceWithGroups.getParallelGroup && taskSourceWithGroups.getTasksInGroup) {
+				let nextTask = await taskSource.getNextTask();
+				if (dryRun && nextTask && dryRunProcessedIds.has(nextTask.id)) {
+					const allTasks = await taskSource.getAllTasks();
+					nextTask = allTasks.find((task) => !dryRunProcessedIds.has(task.id)) || null;
+				}
+				if (!nextTask) break;
+
+				const group = await taskSourceWithGroups.getParallelGroup(nextTask.title);
+				if (group > 0) {
+					tasks = await taskSourceWithGroups.getTasksInGroup(group);
+					if (dryRun) {
+						tasks = tasks.filter((task) => !dryRunProcessedIds.has(task.id));
 					}
 				} else {
-					// Collect worktree for parallel cleanup below
-					worktreesToCleanup.push({ worktreeDir, branchName });
+					tasks = [nextTask];
+				}
+			} else {
+				tasks = await taskSource.getAllTasks();
+				if (dryRun) {
+					tasks = tasks.filter((task) => !dryRunProcessedIds.has(task.id));
 				}
 			}
 
-			if (retryableFailure) {
-				sawRetryableFailure = true;
+			if (tasks.length === 0) {
+				logSuccess("All tasks completed!");
+				break;
 			}
-		}
 
-		// Cleanup all worktrees in parallel
-		if (worktreesToCleanup.length > 0) {
-			const cleanupResults = await Promise.all(
-				worktreesToCleanup.map(({ worktreeDir, branchName }) =>
-					cleanupAgentWorktree(worktreeDir, branchName, workDir).then((cleanup) => ({
-						worktreeDir,
-						leftInPlace: cleanup.leftInPlace,
-					})),
-				),
-			);
+			// Limit to maxParallel
+			const batch = tasks.slice(0, maxParallel);
+			iteration++;
+
+			const batchStartTime = Date.now();
+			logInfo(`Batch ${iteration}: ${batch.length} tasks in parallel`);
 
-			// Log any worktrees left in place
-			for (const { worktreeDir, leftInPlace } of cleanupResults) {
-				if (leftInPlace) {
-					logInfo(`Worktree left in place (uncommitted changes): ${worktreeDir}`);
+			if (dryRun) {
+				logInfo("(dry run) Skipping batch");
+				// Track processed tasks to avoid infinite loop
+				for (const task of batch) {
+					dryRunProcessedIds.add(task.id);
 				}
+				continue;
 			}
-		}
 
-		// Sync PRD to GitHub issue once per batch (after all tasks processed)
-		// This prevents multiple concurrent syncs and reduces API calls
-		if (syncIssue && prdFile && result.tasksCompleted > 0) {
-			await syncPrdToIssue(prdFile, syncIssue, workDir);
-		}
+			// Log task names being processed
+			tracker.observe(tasks);
+			for (const task of batch) {
+				logInfo(`  -> ${task.title}`);
+			}
+
+			// Run agents in parallel (using sandbox or worktree mode)
+			const promises = batch.map((task) => {
+				globalAgentNum++;
+				const agentNum = globalAgentNum;
+				tracker.dispatch(task, agentNum);
+				return launchAgent(task, agentNum).then((res) => {
+					tracker.finish(agentNum);
+					return res;
+				});
+			});
+
+			const results = await Promise.all(promises);
+
+			// Process results and collect worktrees for parallel cleanup
+			let sawRetryableFailure = false;
+			const worktreesToCleanup: Array<{ worktreeDir: string; branchName: string }> = [];
+
+			for (const agentResult of results) {
+				const settled = await settleAgent(agentResult);
+				if (settled.worktree) {
+					worktreesToCleanup.push(settled.worktree);
+				}
+				if (settled.retryableFailure) {
+					sawRetryableFailure = true;
+				}
+			}
+
+			// Cleanup all worktrees in parallel
+			await phases.time("cleanup", () =>
+				cleanupWorktrees(worktreesToCleanup, workDir, worktreePool),
+			);
+
+			// Sync PRD to GitHub issue once per batch (after all tasks processed)
+			// This prevents multiple concurrent syncs and reduces API calls
+			if (syncIssue && prdFile && result.tasksCompleted > 0) {
+				await syncPrdToIssue(prdFile, syncIssue, workDir);
+			}
 
-		// Log batch completion time
-		const batchDuration = formatDuration(Date.now() - batchStartTime);
-		logInfo(`Batch ${iteration} completed in ${batchDuration}`);
-		// If any retryable failure occurred, stop the run to allow retry later
-		if (sawRetryableFailure) {
-			logWarn("Stopping early due to retryable errors. Try again later.");
-			break;
+			// Log batch completion time
+			const batchDuration = formatDuration(Date.now() - batchStartTime);
+			logInfo(`Batch ${iteration} completed in ${batchDuration}`);
+			// If any retryable failure occurred, stop the run to allow retry later
+			if (sawRetryableFailure) {
+				logWarn("Stopping early due to retryable errors. Try again later.");
+				break;
+			}
 		}
 	}
 
+	if (!dryRun) {
+		result.schedulerStats = tracker.getStats();
+		logSchedulerStats(result.schedulerStats);
+	}
+
+	if (pool) {
+		await pool.drain();
+		const stats = pool.getStats();
+		logDebug(
+			`Isolation pool: ${stats.warmLeases} warm / ${stats.coldLeases} cold leases, ${stats.created} created, ${stats.reused} reset, ${stats.retired} retired`,
+		);
+	}
+
 	// Merge phase: merge completed branches back to base branch
 	if (!skipMerge && !dryRun && completedBranches.length > 0) {
+		const mergeStart = performance.now();
 		const git = simpleGit(workDir);
 		let stashed = false;
 		try {
 			const status = await git.status();
 			const hasChanges = status.files.length > 0 || status.not_added.length > 0;
 			if (hasChanges) {
-				await git.stash(["push", "-u", "-m", "ralphy-merge-stash"]);
+				await withSpan("git.stash", {}, () =>
+					git.stash(["push", "-u", "-m", "ralphy-merge-stash"]),
+				);
 				stashed = true;
 				logDebug("Stashed local changes before merge phase");
 			}
@@ -634,7 +963,7 @@ export async function runParallel(
 		}
 
 		try {
-			await mergeCompletedBranches(
+			result.mergeStats = await mergeCompletedBranches(
 				completedBranches,
 				originalBaseBranch,
 				engine,
@@ -652,123 +981,16 @@ export async function runParallel(
 		} finally {
 			if (stashed) {
 				try {
-					await git.stash(["pop"]);
+					await withSpan("git.stash_pop", {}, () => git.stash(["pop"]));
 					logDebug("Restored stashed changes after merge phase");
 				} catch (stashErr) {
 					logWarn(`Failed to restore stashed changes: ${stashErr}`);
 				}
 			}
 		}
+		phases.record("merge", performance.now() - mergeStart);
 	}
 
+	result.phaseTimings = phases.getTimings();
 	return result;
 }
-
-/**
- * Merge completed branches back to the base branch.
- *
- * Optimized merge phase:
- * 1. Parallel pre-merge analysis (git diff doesn't require locks)
- * 2. Sort branches by conflict likelihood (merge clean ones first)
- * 3. Sequential merges (git locking requirement)
- * 4. Parallel branch deletion
- */
-async function mergeCompletedBranches(
-	branches: string[],
-	targetBranch: string,
-	engine: AIEngine,
-	workDir: string,
-	modelOverride?: string,
-	engineArgs?: string[],
-): Promise<void> {
-	if (branches.length === 0) {
-		return;
-	}
-
-	const mergeStartTime = Date.now();
-	logInfo(`\nMerge phase: merging ${branches.length} branch(es) into ${targetBranch}`);
-
-	// Stage 1: Parallel pre-merge analysis
-	// Run git diff for all branches in parallel (doesn't require locks)
-	logDebug("Analyzing branches for potential conflicts...");
-	const analyses = await Promise.all(
-		branches.map((branch) => analyzePreMerge(branch, targetBranch, workDir)),
-	);
-
-	// Stage 2: Sort by conflict likelihood (merge clean ones first)
-	// This reduces the chance of early conflicts blocking later clean merges
-	const sortedAnalyses = sortByConflictLikelihood(analyses);
-	const sortedBranches = sortedAnalyses.map((a) => a.branch);
-
-	if (sortedBranches[0] !== branches[0]) {
-		logDebug("Reordered branches to minimize conflicts");
-	}
-
-	// Stage 3: Sequential merges (git operations require this)
-	const merged: string[] = [];
-	const failed: string[] = [];
-
-	for (const branch of sortedBranches) {
-		const analysis = analyses.find((a) => a.branch === branch);
-		const fileCount = analysis?.fileCount ?? 0;
-		logInfo(`Merging ${branch}... (${fileCount} file${fileCount === 1 ? "" : "s"} changed)`);
-
-		const mergeResult = await mergeAgentBranch(branch, targetBranch, workDir);
-
-		if (mergeResult.success) {
-			logSuccess(`Merged ${branch}`);
-			merged.push(branch);
-		} else if (mergeResult.hasConflicts && mergeResult.conflictedFiles) {
-			// Try AI-assisted conflict resolution
-			logWarn(`Merge conflict in ${branch}, attempting AI resolution...`);
-
-			const resolved = await resolveConflictsWithAI(
-				engine,
-				mergeResult.conflictedFiles,
-				branch,
-				workDir,
-				modelOverride,
-				engineArgs,
-			);
-
-			if (resolved) {
-				logSuccess(`Resolved conflicts and merged ${branch}`);
-				merged.push(branch);
-			} else {
-				logError(`Failed to resolve conflicts for ${branch}`);
-				await abortMerge(workDir);
-				failed.push(branch);
-			}
-		} else {
-			logError(`Failed to merge ${branch}: ${mergeResult.error || "Unknown error"}`);
-			failed.push(branch);
-		}
-	}
-
-	// Stage 4: Parallel branch deletion
-	// Delete all successfully merged branches in parallel
-	if (merged.length > 0) {
-		const deleteResults = await Promise.all(
-			merged.map(async (branch) => {
-				const deleted = await deleteLocalBranch(branch, workDir, true);
-				return { branch, deleted };
-			}),
-		);
-
-		for (const { branch, deleted } of deleteResults) {
-			if (deleted) {
-				logDebug(`Deleted merged branch: ${branch}`);
-			}
-		}
-	}
-
-	// Summary
-	const mergeDuration = formatDuration(Date.now() - mergeStartTime);
-	if (merged.length > 0) {
-		logSuccess(`Successfully merged ${merged.length} branch(es) in ${mergeDuration}`);
-	}
-	if (failed.length > 0) {
-		logWarn(`Failed to merge ${failed.length} branch(es): ${failed.join(", ")}`);
-		logInfo("These branches have been preserved for manual review.");
-	}
-}
@@ -0,0 +1,30 @@
+import { describe, expect, it } from "bun:test";
+import { PhaseTimer } from "./phases.ts";
+
+describe("PhaseTimer", () => {
+	it("should accumulate count, total and max per phase", () => {
+		const phases = new PhaseTimer();
+		phases.record("agent", 100.4);
+		phases.record("agent", 50.2);
+		phases.record("merge", 7);
+
+		const timings = phases.getTimings();
+		expect(timings.agent).toEqual({ count: 2, totalMs: 151, maxMs: 100 });
+		expect(timings.merge).toEqual({ count: 1, totalMs: 7, maxMs: 7 });
+		expect(timings.cleanup).toEqual({ count: 0, totalMs: 0, maxMs: 0 });
+	});
+
+	it("should time functions that throw", async () => {
+		let now = 0;
+		const phases = new PhaseTimer(() => now);
+
+		await expect(
+			phases.time("isolation", async () => {
+				now = 25;
+				throw new Error("worktree failed");
+			}),
+		).rejects.toThrow("worktree failed");
+
+		expect(phases.getTimings().isolation).toEqual({ count: 1, totalMs: 25, maxMs: 25 });
+	});
+});
@@ -0,0 +1,84 @@
+import { observeMetric } from "../telemetry/metrics.ts";
+import { type SpanAttributes, withSpan } from "../telemetry/tracing.ts";
+
+/**
+ * Execution phases timed during a run
+ * - isolation: creating (or leasing) a worktree/sandbox, or a task branch in sequential mode
+ * - agent: the engine working on the task, including retries
+ * - commit: collecting sandbox changes into a branch
+ * - merge: merging completed branches back into the base branch
+ * - cleanup: removing worktrees/sandboxes, or returning to the base branch
+ */
+export type ExecutionPhase = "isolation" | "agent" | "commit" | "merge" | "cleanup";
+
+export const EXECUTION_PHASES: ExecutionPhase[] = [
+	"isolation",
+	"agent",
+	"commit",
+	"merge",
+	"cleanup",
+];
+
+/**
+ * Accumulated time spent in one phase.
+ * Parallel agents overlap, so totalMs is the sum over agents, not wall time.
+ */
+export interface PhaseTiming {
+	count: number;
+	totalMs: number;
+	maxMs: number;
+}
+
+export type PhaseTimings = Record<ExecutionPhase, PhaseTiming>;
+
+/**
+ * Collects per-phase timings for a run. Phases are also reported as
+ * `phase.<name>` spans and to the phase latency histogram when enabled.
+ */
+export class PhaseTimer {
+	private timings: PhaseTimings;
+	private now: () => number;
+
+	constructor(now: () => number = () => performance.now()) {
+		this.now = now;
+		this.timings = Object.fromEntries(
+			EXECUTION_PHASES.map((phase) => [phase, { count: 0, totalMs: 0, maxMs: 0 }]),
+		) as PhaseTimings;
+	}
+
+	/**
+	 * Record one occurrence of a phase
+	 */
+	record(phase: ExecutionPhase, durationMs: number): void {
+		const timing = this.timings[phase];
+		timing.count++;
+		timing.totalMs += durationMs;
+		timing.maxMs = Math.max(timing.maxMs, durationMs);
+		observeMetric("ralphy_phase_duration_seconds", durationMs / 1000, { phase });
+	}
+
+	/**
+	 * Run fn in a span and record its duration, whether it resolves or throws
+	 */
+	async time<T>(
+		phase: ExecutionPhase,
+		fn: () => Promise<T>,
+		attributes: SpanAttributes = {},
+	): Promise<T> {
+		const start = this.now();
+		try {
+			return await withSpan(`phase.${phase}`, attributes, fn);
+		} finally {
+			this.record(phase, this.now() - start);
+		}
+	}
+
+	getTimings(): PhaseTimings {
+		return Object.fromEntries(
+			EXECUTION_PHASES.map((phase) => {
+				const { count, totalMs, maxMs } = this.timings[phase];
+				return [phase, { count, totalMs: Math.round(totalMs), maxMs: Math.round(maxMs) }];
+			}),
+		) as PhaseTimings;
+	}
+}
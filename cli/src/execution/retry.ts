@@ -1,3 +1,5 @@
+import { incrementMetric } from "../telemetry/metrics.ts";
+import { withSpan } from "../telemetry/tracing.ts";
 import { logDebug, logWarn } from "../ui/logger.ts";
 
 interface RetryOptions {
@@ -90,7 +92,9 @@ export async function withRetry<T>(fn: () => Promise<T>, options: RetryOptions):
 				onRetry?.(attempt, errorMsg, delayMs);
 
 				logDebug(`Waiting ${delaySecs}s before retry (exponential backoff)...`);
-				await sleep(delayMs);
+				incrementMetric("ralphy_retries_total");
+				incrementMetric("ralphy_retry_backoff_seconds_total", undefined, delayMs / 1000);
+				await withSpan("retry.backoff", { attempt, delayMs }, () => sleep(delayMs));
 			}
 		}
 	}
@@ -2,6 +2,7 @@ import { existsSync, mkdirSync, readFileSync, writeFileSync } from "node:fs";
 import { dirname, join } from "node:path";
 import simpleGit, { type SimpleGit } from "simple-git";
 import { slugify } from "../git/branch.ts";
+import { withSpan } from "../telemetry/tracing.ts";
 import { logDebug } from "../ui/logger.ts";
 
 /**
@@ -38,6 +39,13 @@ function generateUniqueId(): string {
 	return `${timestamp}-${random}`;
 }
 
+function parseFileList(output: string): string[] {
+	return output
+		.split("\n")
+		.map((line) => line.trim())
+		.filter((line) => line.length > 0);
+}
+
 /**
  * Result of committing sandbox changes to a branch
  */
@@ -54,7 +62,8 @@ export interface SandboxCommitResult {
  * This:
  * 1. Creates a new branch from the base branch
  * 2. Copies modified files from sandbox to original
- * 3. Stages and commits the changes
+ * 3. Stages and commits the changes (tracked files missing from the sandbox are
+ *    committed as deletions; manifest-based change detection reports them)
  * 4. Returns to the original branch
  */
 export async function commitSandboxChanges(
@@ -64,6 +73,27 @@ export async function commitSandboxChanges(
 	taskName: string,
 	agentNum: number,
 	baseBranch: string,
+): Promise<SandboxCommitResult> {
+	const attributes = { agent: agentNum, files: modifiedFiles.length };
+	return withSpan("sandbox.commit", attributes, () =>
+		commitSandboxChangesImpl(
+			originalDir,
+			modifiedFiles,
+			sandboxDir,
+			taskName,
+			agentNum,
+			baseBranch,
+		),
+	);
+}
+
+async function commitSandboxChangesImpl(
+	originalDir: string,
+	modifiedFiles: string[],
+	sandboxDir: string,
+	taskName: string,
+	agentNum: number,
+	baseBranch: string,
 ): Promise<SandboxCommitResult> {
 	if (modifiedFiles.length === 0) {
 		return {
@@ -88,6 +118,8 @@ export async function commitSandboxChanges(
 			await git.checkout(["-B", branchName, baseBranch]);
 
 			// Copy modified files from sandbox to original
+			const changedFiles: string[] = [];
+			const deletedFiles: string[] = [];
 			for (const relPath of modifiedFiles) {
 				const sandboxPath = join(sandboxDir, relPath);
 				const originalPath = join(originalDir, relPath);
@@ -101,17 +133,32 @@ export async function commitSandboxChanges(
 					// Read from sandbox and write to original
 					const content = readFileSync(sandboxPath);
 					writeFileSync(originalPath, content);
+					changedFiles.push(relPath);
+				} else {
+					deletedFiles.push(relPath);
 				}
 			}
 
 			// Stage all modified files
-			await git.add(modifiedFiles);
+			if (changedFiles.length > 0) {
+				await git.add(changedFiles);
+			}
+
+			// Only delete files git tracks; untracked files (e.g. .env) stay untouched
+			let removedFiles: string[] = [];
+			if (deletedFiles.length > 0) {
+				removedFiles = parseFileList(await git.raw(["ls-files", "--", ...deletedFiles]));
+				if (removedFiles.length > 0) {
+					await git.rm(removedFiles);
+				}
+			}
+			const filesCommitted = changedFiles.length + removedFiles.length;
 
 			// Commit
 			const commitMessage = `feat: ${taskName}\n\nAutomated commit by Ralphy agent ${agentNum}`;
 			await git.commit(commitMessage);
 
-			logDebug(`Agent ${agentNum}: Committed ${modifiedFiles.length} files to ${branchName}`);
+			logDebug(`Agent ${agentNum}: Committed ${filesCommitted} files to ${branchName}`);
 
 			// Return to original branch
 			await git.checkout(currentBranch);
@@ -119,7 +166,7 @@ export async function commitSandboxChanges(
 			return {
 				success: true,
 				branchName,
-				filesCommitted: modifiedFiles.length,
+				filesCommitted,
 			};
 		} catch (error) {
 			const errorMsg = error instanceof Error ? error.message : String(error);
@@ -0,0 +1,105 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, mkdirSync, renameSync, rmSync, unlinkSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import {
+	cleanupSandbox,
+	createSandbox,
+	forgetSandboxManifest,
+	getModifiedFiles,
+	getSandboxManifest,
+} from "./sandbox.ts";
+
+const TEST_DIR = "/tmp/ralphy-sandbox-manifest-test";
+const ORIGINAL_DIR = join(TEST_DIR, "repo");
+const SANDBOX_DIR = join(TEST_DIR, "sandbox");
+
+describe("createSandbox with manifest", () => {
+	beforeEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+		mkdirSync(join(ORIGINAL_DIR, "src", "nested"), { recursive: true });
+		writeFileSync(join(ORIGINAL_DIR, "src", "a.ts"), "export const a = 1;\n");
+		writeFileSync(join(ORIGINAL_DIR, "src", "b.ts"), "export const b = 2;\n");
+		writeFileSync(join(ORIGINAL_DIR, "src", "nested", "c.ts"), "export const c = 3;\n");
+		writeFileSync(join(ORIGINAL_DIR, "package.json"), "{}\n");
+	});
+
+	afterEach(async () => {
+		await cleanupSandbox(SANDBOX_DIR);
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	it("should record every copied file and directory", async () => {
+		const result = await createSandbox({
+			originalDir: ORIGINAL_DIR,
+			sandboxDir: SANDBOX_DIR,
+			agentNum: 1,
+		});
+
+		const manifest = getSandboxManifest(SANDBOX_DIR);
+		expect(["reflink", "copy"]).toContain(result.strategy);
+		expect(manifest?.files.size).toBe(4);
+		expect(manifest?.dirs.has(join("src", "nested"))).toBe(true);
+		expect(manifest?.dirs.has("")).toBe(true);
+	});
+
+	it("should drop the manifest of a preserved sandbox but keep its files", async () => {
+		await createSandbox({ originalDir: ORIGINAL_DIR, sandboxDir: SANDBOX_DIR, agentNum: 1 });
+
+		forgetSandboxManifest(SANDBOX_DIR);
+
+		expect(getSandboxManifest(SANDBOX_DIR)).toBeUndefined();
+		expect(existsSync(join(SANDBOX_DIR, "src", "a.ts"))).toBe(true);
+	});
+
+	it("should report nothing for an untouched sandbox", async () => {
+		await createSandbox({ originalDir: ORIGINAL_DIR, sandboxDir: SANDBOX_DIR, agentNum: 1 });
+
+		expect(await getModifiedFiles(SANDBOX_DIR, ORIGINAL_DIR)).toEqual([]);
+	});
+
+	it("should report edited, added, replaced and deleted files", async () => {
+		await createSandbox({ originalDir: ORIGINAL_DIR, sandboxDir: SANDBOX_DIR, agentNum: 1 });
+
+		writeFileSync(join(SANDBOX_DIR, "src", "a.ts"), "export const a = 42;\n");
+		unlinkSync(join(SANDBOX_DIR, "src", "b.ts"));
+		writeFileSync(join(SANDBOX_DIR, "src", "nested", "tmp.ts"), "export const c = 30;\n");
+		renameSync(
+			join(SANDBOX_DIR, "src", "nested", "tmp.ts"),
+			join(SANDBOX_DIR, "src", "nested", "c.ts"),
+		);
+		mkdirSync(join(SANDBOX_DIR, "src", "feature"));
+		writeFileSync(join(SANDBOX_DIR, "src", "feature", "d.ts"), "export const d = 4;\n");
+
+		const modified = await getModifiedFiles(SANDBOX_DIR, ORIGINAL_DIR);
+
+		expect(modified.sort()).toEqual(
+			[
+				join("src", "a.ts"),
+				join("src", "b.ts"),
+				join("src", "feature", "d.ts"),
+				join("src", "nested", "c.ts"),
+			].sort(),
+		);
+	});
+
+	it("should not be affected by changes to the original tree", async () => {
+		await createSandbox({ originalDir: ORIGINAL_DIR, sandboxDir: SANDBOX_DIR, agentNum: 1 });
+
+		writeFileSync(join(ORIGINAL_DIR, "src", "a.ts"), "export const a = 'checked out';\n");
+
+		expect(await getModifiedFiles(SANDBOX_DIR, ORIGINAL_DIR)).toEqual([]);
+	});
+
+	it("should reject sandboxes without a manifest", async () => {
+		await createSandbox({ originalDir: ORIGINAL_DIR, sandboxDir: SANDBOX_DIR, agentNum: 1 });
+		forgetSandboxManifest(SANDBOX_DIR);
+
+		await expect(getModifiedFiles(SANDBOX_DIR, ORIGINAL_DIR)).rejects.toThrow(
+			"No manifest recorded",
+		);
+	});
+});
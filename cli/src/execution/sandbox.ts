@@ -1,6 +1,6 @@
 import {
+	constants,
 	copyFileSync,
-	cpSync,
 	existsSync,
 	lstatSync,
 	mkdirSync,
@@ -11,7 +11,9 @@ import {
 	symlinkSync,
 	utimesSync,
 } from "node:fs";
-import { dirname, join, sep } from "node:path";
+import { dirname, join } from "node:path";
+import { incrementMetric } from "../telemetry/metrics.ts";
+import { withSpan } from "../telemetry/tracing.ts";
 import { logDebug, logWarn } from "../ui/logger.ts";
 
 /**
@@ -44,6 +46,7 @@ export async function rmRF(path: string): Promise<void> {
 			if (isLockError && i < retries - 1) {
 				// Wait with exponential backoff: 500, 1000, 2000, 4000...
 				const delay = 500 * 2 ** i;
+				incrementMetric("ralphy_cleanup_retries_total");
 				await new Promise((resolve) => setTimeout(resolve, delay));
 				continue;
 			}
@@ -127,6 +130,8 @@ export interface SandboxOptions {
 	symlinkDirs?: string[];
 	/** Additional directories/files to copy */
 	copyPatterns?: string[];
+	/** How copied files are materialized (default: auto) */
+	materialize?: SandboxMaterialization;
 }
 
 export interface SandboxResult {
@@ -136,6 +141,141 @@ export interface SandboxResult {
 	symlinksCreated: number;
 	/** Number of files/dirs copied */
 	filesCopied: number;
+	/** Strategy used to materialize files */
+	strategy: SandboxManifest["strategy"];
+}
+
+/**
+ * How copied files are materialized:
+ * - auto: reflink (copy-on-write clone via FICLONE) when the filesystem supports it, plain copy otherwise
+ * - reflink: always reflink (fails on filesystems without reflink support)
+ * - copy: always copy file contents
+ */
+export type SandboxMaterialization = "auto" | "reflink" | "copy";
+
+/**
+ * State of a copied file right after materialization
+ */
+export interface SandboxManifestEntry {
+	size: number;
+	mtimeMs: number;
+	ino: number;
+}
+
+/**
+ * Snapshot of a sandbox taken at creation time.
+ * Change detection diffs the sandbox against this instead of rescanning the original tree.
+ */
+export interface SandboxManifest {
+	/** Strategy actually used (auto resolves to reflink or copy) */
+	strategy: "reflink" | "copy";
+	/** Copied files by relative path */
+	files: Map<string, SandboxManifestEntry>;
+	/** Copied directories by relative path ("" is the sandbox root) and their mtime */
+	dirs: Map<string, number>;
+}
+
+const sandboxManifests = new Map<string, SandboxManifest>();
+
+/**
+ * Get the manifest recorded when a sandbox was created (if any)
+ */
+export function getSandboxManifest(sandboxDir: string): SandboxManifest | undefined {
+	return sandboxManifests.get(sandboxDir);
+}
+
+function requireSandboxManifest(sandboxDir: string): SandboxManifest {
+	const manifest = sandboxManifests.get(sandboxDir);
+	if (!manifest) {
+		throw new Error(`No manifest recorded for sandbox ${sandboxDir}`);
+	}
+	return manifest;
+}
+
+/**
+ * Drop the manifest of a sandbox that is kept on disk but no longer tracked
+ * (e.g. preserved for manual review), so it does not stay in memory for the run.
+ */
+export function forgetSandboxManifest(sandboxDir: string): void {
+	sandboxManifests.delete(sandboxDir);
+}
+
+/**
+ * Copy files and directories into a sandbox, recording each copy in the manifest.
+ */
+function createMaterializer(
+	originalDir: string,
+	sandboxDir: string,
+	requested: SandboxMaterialization,
+	agentNum: number,
+) {
+	const manifest: SandboxManifest = {
+		strategy: requested === "copy" ? "copy" : "reflink",
+		files: new Map(),
+		dirs: new Map(),
+	};
+	// In auto mode the first file decides whether the filesystem supports reflinks
+	let reflinkProbed = requested !== "auto";
+
+	function copyFile(src: string, dest: string) {
+		if (manifest.strategy === "reflink") {
+			if (reflinkProbed) {
+				const mode =
+					requested === "reflink" ? constants.COPYFILE_FICLONE_FORCE : constants.COPYFILE_FICLONE;
+				copyFileSync(src, dest, mode);
+				return;
+			}
+			reflinkProbed = true;
+			try {
+				copyFileSync(src, dest, constants.COPYFILE_FICLONE_FORCE);
+				logDebug(`Agent ${agentNum}: Filesystem supports reflinks, using copy-on-write`);
+				return;
+			} catch {
+				manifest.strategy = "copy";
+				logDebug(`Agent ${agentNum}: Reflinks unsupported, falling back to plain copy`);
+			}
+		}
+		copyFileSync(src, dest);
+	}
+
+	function materialize(relPath: string) {
+		const originalPath = join(originalDir, relPath);
+		const sandboxPath = join(sandboxDir, relPath);
+		const stat = lstatSync(originalPath);
+
+		if (stat.isSymbolicLink()) {
+			symlinkSync(readlinkSync(originalPath), sandboxPath);
+		} else if (stat.isDirectory()) {
+			mkdirSync(sandboxPath, { recursive: true });
+			for (const item of readdirSync(originalPath)) {
+				materialize(join(relPath, item));
+			}
+			// Record after the children exist: creating entries bumps the directory mtime
+			recordDir(relPath, stat.mtimeMs);
+		} else if (stat.isFile()) {
+			copyFile(originalPath, sandboxPath);
+			utimesSync(sandboxPath, stat.atime, stat.mtime);
+			const copied = lstatSync(sandboxPath);
+			manifest.files.set(relPath, {
+				size: copied.size,
+				mtimeMs: copied.mtimeMs,
+				ino: copied.ino,
+			});
+		}
+	}
+
+	/**
+	 * Record a directory's mtime. The mtime is first moved at least a second into the
+	 * past, so an entry the agent adds within the same timestamp tick still changes it.
+	 */
+	function recordDir(relPath: string, mtimeMs: number) {
+		const sandboxPath = join(sandboxDir, relPath);
+		const settledMs = Math.min(mtimeMs, Date.now() - 1000);
+		utimesSync(sandboxPath, settledMs / 1000, settledMs / 1000);
+		manifest.dirs.set(relPath, lstatSync(sandboxPath).mtimeMs);
+	}
+
+	return { manifest, materialize, recordDir };
 }
 
 /**
@@ -148,12 +288,17 @@ export interface SandboxResult {
  * dependency directories.
  */
 export async function createSandbox(options: SandboxOptions): Promise<SandboxResult> {
+	return withSpan("sandbox.create", { agent: options.agentNum }, () => createSandboxImpl(options));
+}
+
+async function createSandboxImpl(options: SandboxOptions): Promise<SandboxResult> {
 	const {
 		originalDir,
 		sandboxDir,
 		agentNum,
 		symlinkDirs = DEFAULT_SYMLINK_DIRS,
 		// copyPatterns is reserved for future selective copying based on glob patterns
+		materialize = "auto",
 	} = options;
 
 	let symlinksCreated = 0;
@@ -161,9 +306,12 @@ export async function createSandbox(options: SandboxOptions): Promise<SandboxRes
 
 	// Create sandbox directory
 	// Robust cleanup of existing directory
+	sandboxManifests.delete(sandboxDir);
 	await rmRF(sandboxDir);
 	mkdirSync(sandboxDir, { recursive: true });
 
+	const materializer = createMaterializer(originalDir, sandboxDir, materialize, agentNum);
+
 	try {
 		// Get all items in the original directory
 		const items = readdirSync(originalDir);
@@ -215,18 +363,9 @@ export async function createSandbox(options: SandboxOptions): Promise<SandboxRes
 					} else {
 						logDebug(`Agent ${agentNum}: Skipping broken symlink ${item} -> ${target}`);
 					}
-				} else if (stat.isDirectory()) {
-					// Copy directory recursively, preserving timestamps for change detection
-					cpSync(originalPath, sandboxPath, { recursive: true, preserveTimestamps: true });
-					filesCopied++;
-				} else if (stat.isFile()) {
-					// Copy file and preserve timestamps for change detection
-					copyFileSync(originalPath, sandboxPath);
-					try {
-						utimesSync(sandboxPath, stat.atime, stat.mtime);
-					} catch (utimeErr) {
-						logDebug(`Agent ${agentNum}: Failed to preserve timestamps for ${item}: ${utimeErr}`);
-					}
+				} else if (stat.isDirectory() || stat.isFile()) {
+					// Reflink/copy and record in the manifest for change detection
+					materializer.materialize(item);
 					filesCopied++;
 				}
 			} catch (err) {
@@ -234,10 +373,14 @@ export async function createSandbox(options: SandboxOptions): Promise<SandboxRes
 			}
 		}
 
+		materializer.recordDir("", lstatSync(originalDir).mtimeMs);
+		sandboxManifests.set(sandboxDir, materializer.manifest);
+
 		return {
 			sandboxDir,
 			symlinksCreated,
 			filesCopied,
+			strategy: materializer.manifest.strategy,
 		};
 	} catch (err) {
 		// Cleanup partial sandbox on failure
@@ -269,67 +412,126 @@ export function verifySandboxIsolation(sandboxDir: string, symlinkDirs: string[]
 }
 
 /**
- * Get list of files modified in the sandbox compared to original.
- * Uses file modification time comparison.
+ * Diff a sandbox against its creation manifest.
+ *
+ * Every recorded file is compared by size, mtime and inode (editors that save via
+ * rename get a new inode). Only directories whose mtime changed can contain new
+ * files, so unchanged directories are never listed and the original tree is
+ * never touched. Deleted files are reported too.
  */
-export async function getModifiedFiles(
+function diffAgainstManifest(
 	sandboxDir: string,
-	originalDir: string,
-	symlinkDirs: string[] = DEFAULT_SYMLINK_DIRS,
-): Promise<string[]> {
+	manifest: SandboxManifest,
+	symlinkDirs: string[],
+): string[] {
 	const modified: string[] = [];
 
-	function scanDir(relPath: string) {
-		const sandboxPath = join(sandboxDir, relPath);
-		const originalPath = join(originalDir, relPath);
-
-		if (!existsSync(sandboxPath)) return;
+	for (const [relPath, entry] of manifest.files) {
+		let stat: ReturnType<typeof lstatSync>;
+		try {
+			stat = lstatSync(join(sandboxDir, relPath));
+		} catch {
+			// Deleted by the agent
+			modified.push(relPath);
+			continue;
+		}
+		if (
+			!stat.isFile() ||
+			stat.size !== entry.size ||
+			stat.mtimeMs !== entry.mtimeMs ||
+			stat.ino !== entry.ino
+		) {
+			modified.push(relPath);
+		}
+	}
 
-		const stat = lstatSync(sandboxPath);
+	function collectNewFiles(relDir: string) {
+		for (const item of readdirSync(join(sandboxDir, relDir))) {
+			if (relDir === "" && symlinkDirs.includes(item)) continue;
 
-		// Skip symlinks (they're shared, not modified)
-		if (stat.isSymbolicLink()) return;
+			const relPath = relDir ? join(relDir, item) : item;
+			if (manifest.files.has(relPath)) continue;
 
-		// Skip known symlink directories
-		const topLevel = relPath.split(sep)[0];
-		if (symlinkDirs.includes(topLevel)) return;
+			const stat = lstatSync(join(sandboxDir, relPath));
+			if (stat.isSymbolicLink()) continue;
 
-		if (stat.isDirectory()) {
-			const items = readdirSync(sandboxPath);
-			for (const item of items) {
-				scanDir(join(relPath, item));
-			}
-		} else if (stat.isFile()) {
-			// Check if file is new or modified
-			if (!existsSync(originalPath)) {
-				modified.push(relPath);
-			} else {
-				const originalStat = statSync(originalPath);
-				if (stat.mtimeMs !== originalStat.mtimeMs || stat.size !== originalStat.size) {
-					modified.push(relPath);
+			if (stat.isDirectory()) {
+				// Known directories are checked through their own mtime
+				if (!manifest.dirs.has(relPath)) {
+					collectNewFiles(relPath);
 				}
+			} else if (stat.isFile()) {
+				modified.push(relPath);
 			}
 		}
 	}
 
-	// Start scanning from root
-	const items = readdirSync(sandboxDir);
-	for (const item of items) {
-		// Skip symlinked directories
-		const itemPath = join(sandboxDir, item);
-		const itemStat = lstatSync(itemPath);
-		if (itemStat.isSymbolicLink()) continue;
-
-		if (itemStat.isDirectory()) {
-			scanDir(item);
-		} else if (itemStat.isFile()) {
-			scanDir(item);
+	for (const [relDir, mtimeMs] of manifest.dirs) {
+		let stat: ReturnType<typeof lstatSync>;
+		try {
+			stat = lstatSync(join(sandboxDir, relDir));
+		} catch {
+			// Directory removed: its files were reported as deleted above
+			continue;
+		}
+		if (stat.isDirectory() && stat.mtimeMs !== mtimeMs) {
+			collectNewFiles(relDir);
 		}
 	}
 
 	return modified;
 }
 
+/**
+ * Update manifest entries after files in the sandbox were deliberately changed
+ * (e.g. restored by resyncSandbox), so they are no longer reported as modified.
+ */
+function refreshManifest(sandboxDir: string, manifest: SandboxManifest, relPaths: string[]): void {
+	const touchedDirs = new Set<string>([""]);
+
+	for (const relPath of relPaths) {
+		const sandboxPath = join(sandboxDir, relPath);
+		if (existsSync(sandboxPath)) {
+			const stat = lstatSync(sandboxPath);
+			manifest.files.set(relPath, { size: stat.size, mtimeMs: stat.mtimeMs, ino: stat.ino });
+		} else {
+			manifest.files.delete(relPath);
+		}
+
+		let parent = dirname(relPath);
+		while (parent !== "." && parent !== "") {
+			touchedDirs.add(parent);
+			parent = dirname(parent);
+		}
+	}
+
+	for (const relDir of touchedDirs) {
+		const dirPath = join(sandboxDir, relDir);
+		if (existsSync(dirPath)) {
+			const settledMs = Math.min(lstatSync(dirPath).mtimeMs, Date.now() - 1000);
+			utimesSync(dirPath, settledMs / 1000, settledMs / 1000);
+			manifest.dirs.set(relDir, lstatSync(dirPath).mtimeMs);
+		}
+	}
+}
+
+/**
+ * Get list of files modified in the sandbox compared to original.
+ *
+ * The sandbox is diffed against the manifest createSandbox recorded, so the
+ * original tree is never scanned. Deleted files are included.
+ */
+export async function getModifiedFiles(
+	sandboxDir: string,
+	_originalDir: string,
+	symlinkDirs: string[] = DEFAULT_SYMLINK_DIRS,
+	manifest: SandboxManifest = requireSandboxManifest(sandboxDir),
+): Promise<string[]> {
+	return withSpan("sandbox.diff", {}, async () =>
+		diffAgainstManifest(sandboxDir, manifest, symlinkDirs),
+	);
+}
+
 /**
  * Sync modified files from sandbox back to original directory.
  */
@@ -360,11 +562,56 @@ export async function syncSandboxToOriginal(
 	return synced;
 }
 
+/**
+ * Bring a used sandbox back in line with the original directory so it can be reused.
+ *
+ * Only touches what differs: files getModifiedFiles reports are restored from the
+ * original (or removed if the agent created them). Timestamps are preserved and
+ * the manifest is refreshed so later change detection keeps working.
+ *
+ * Returns the number of files restored or removed.
+ */
+export async function resyncSandbox(
+	sandboxDir: string,
+	originalDir: string,
+	symlinkDirs: string[] = DEFAULT_SYMLINK_DIRS,
+): Promise<number> {
+	let resynced = 0;
+
+	const restoreFile = (relPath: string, originalStat: ReturnType<typeof statSync>) => {
+		const sandboxPath = join(sandboxDir, relPath);
+		const parentDir = dirname(sandboxPath);
+		if (!existsSync(parentDir)) {
+			mkdirSync(parentDir, { recursive: true });
+		}
+		copyFileSync(join(originalDir, relPath), sandboxPath);
+		utimesSync(sandboxPath, originalStat.atime, originalStat.mtime);
+		resynced++;
+	};
+
+	// Restore modified and deleted files, remove files the agent created
+	const manifest = requireSandboxManifest(sandboxDir);
+	const modifiedFiles = await getModifiedFiles(sandboxDir, originalDir, symlinkDirs, manifest);
+	for (const relPath of modifiedFiles) {
+		const originalPath = join(originalDir, relPath);
+		if (existsSync(originalPath)) {
+			restoreFile(relPath, statSync(originalPath));
+		} else {
+			rmSync(join(sandboxDir, relPath), { force: true });
+			resynced++;
+		}
+	}
+
+	refreshManifest(sandboxDir, manifest, modifiedFiles);
+	return resynced;
+}
+
 /**
  * Clean up a sandbox directory.
  */
 export async function cleanupSandbox(sandboxDir: string): Promise<void> {
-	await rmRF(sandboxDir);
+	sandboxManifests.delete(sandboxDir);
+	await withSpan("sandbox.cleanup", {}, () => rmRF(sandboxDir));
 }
 
 /**
@@ -0,0 +1,168 @@
+import { describe, expect, it } from "bun:test";
+import type { Task, TaskSource } from "../tasks/types.ts";
+import { disableMetrics, enableMetrics } from "../telemetry/metrics.ts";
+import { SlotTracker, pickEligibleTasks, supportsParallelGroups } from "./scheduler.ts";
+
+function makeTask(id: string, parallelGroup?: number): Task {
+	return { id, title: id, parallelGroup, completed: false };
+}
+
+function makeSource(tasks: Task[], withGroups: boolean): TaskSource {
+	const source: TaskSource & {
+		getParallelGroup?: (title: string) => Promise<number>;
+	} = {
+		type: withGroups ? "yaml" : "markdown",
+		getAllTasks: async () => tasks,
+		getNextTask: async () => tasks[0] ?? null,
+		markComplete: async () => {},
+		countRemaining: async () => tasks.length,
+		countCompleted: async () => 0,
+	};
+	if (withGroups) {
+		source.getParallelGroup = async (title) =>
+			tasks.find((t) => t.title === title)?.parallelGroup ?? 0;
+		source.getTasksInGroup = async (group) =>
+			tasks.filter((t) => (t.parallelGroup ?? 0) === group);
+	}
+	return source;
+}
+
+describe("supportsParallelGroups", () => {
+	it("should defer to supportsParallelGroups() when available", () => {
+		const source = {
+			...makeSource([], true),
+			supportsParallelGroups: () => false,
+		};
+		expect(supportsParallelGroups(source)).toBe(false);
+	});
+
+	it("should detect group methods", () => {
+		expect(supportsParallelGroups(makeSource([], true))).toBe(true);
+		expect(supportsParallelGroups(makeSource([], false))).toBe(false);
+	});
+});
+
+describe("pickEligibleTasks", () => {
+	it("should fill free slots from sources without groups", async () => {
+		const source = makeSource([makeTask("a"), makeTask("b"), makeTask("c")], false);
+
+		const eligible = await pickEligibleTasks(source, {
+			claimed: new Set(["a"]),
+			freeSlots: 1,
+			inFlight: 1,
+			activeGroup: null,
+		});
+
+		expect(eligible.tasks.map((t) => t.id)).toEqual(["b"]);
+		expect(eligible.pending.map((t) => t.id)).toEqual(["b", "c"]);
+	});
+
+	it("should keep dispatching within the active group", async () => {
+		const source = makeSource([makeTask("a", 1), makeTask("b", 1), makeTask("c", 2)], true);
+
+		const eligible = await pickEligibleTasks(source, {
+			claimed: new Set(["a"]),
+			freeSlots: 2,
+			inFlight: 1,
+			activeGroup: 1,
+		});
+
+		expect(eligible.tasks.map((t) => t.id)).toEqual(["b"]);
+		expect(eligible.group).toBe(1);
+	});
+
+	it("should wait for the running group to drain before starting the next group", async () => {
+		const source = makeSource([makeTask("a", 1), makeTask("c", 2), makeTask("d", 2)], true);
+
+		const waiting = await pickEligibleTasks(source, {
+			claimed: new Set(["a"]),
+			freeSlots: 2,
+			inFlight: 1,
+			activeGroup: 1,
+		});
+		expect(waiting.tasks).toEqual([]);
+
+		const drained = await pickEligibleTasks(source, {
+			claimed: new Set(["a"]),
+			freeSlots: 3,
+			inFlight: 0,
+			activeGroup: 1,
+		});
+		expect(drained.tasks.map((t) => t.id)).toEqual(["c", "d"]);
+		expect(drained.group).toBe(2);
+	});
+
+	it("should run group 0 tasks on their own", async () => {
+		const source = makeSource([makeTask("a"), makeTask("b")], true);
+
+		const first = await pickEligibleTasks(source, {
+			claimed: new Set(),
+			freeSlots: 3,
+			inFlight: 0,
+			activeGroup: null,
+		});
+		expect(first.tasks.map((t) => t.id)).toEqual(["a"]);
+
+		const second = await pickEligibleTasks(source, {
+			claimed: new Set(["a"]),
+			freeSlots: 2,
+			inFlight: 1,
+			activeGroup: 0,
+		});
+		expect(second.tasks).toEqual([]);
+	});
+});
+
+describe("SlotTracker", () => {
+	it("should report queue wait and slot utilization", () => {
+		let now = 0;
+		const tracker = new SlotTracker("continuous", 2, () => now);
+		const a = makeTask("a");
+		const b = makeTask("b");
+
+		tracker.observe([a, b]);
+		tracker.dispatch(a, 1);
+		now = 100;
+		tracker.dispatch(b, 2);
+		now = 200;
+		tracker.finish(1);
+		now = 300;
+		tracker.finish(2);
+
+		const stats = tracker.getStats();
+		expect(stats.wallTimeMs).toBe(300);
+		expect(stats.busyTimeMs).toBe(400);
+		expect(stats.utilization).toBeCloseTo(400 / 600);
+		expect(stats.avgQueueWaitMs).toBe(50);
+		expect(stats.maxQueueWaitMs).toBe(100);
+		expect(stats.tasks.map((t) => t.runMs)).toEqual([200, 200]);
+	});
+
+	it("should publish active agents and queue depth", () => {
+		const registry = enableMetrics();
+		try {
+			const tracker = new SlotTracker("batch", 2);
+			const tasks = [makeTask("a"), makeTask("b"), makeTask("c")];
+
+			tracker.observe(tasks);
+			tracker.dispatch(tasks[0], 1);
+			tracker.dispatch(tasks[1], 2);
+			expect(tracker.queueDepth).toBe(1);
+			expect(registry.getValue("ralphy_queue_depth")).toBe(1);
+			expect(registry.getValue("ralphy_agents_active")).toBe(2);
+
+			tracker.finish(1);
+			tracker.observe(tasks.slice(1));
+			expect(tracker.queueDepth).toBe(1);
+			expect(registry.getValue("ralphy_agents_active")).toBe(1);
+		} finally {
+			disableMetrics();
+		}
+	});
+
+	it("should ignore unknown agents", () => {
+		const tracker = new SlotTracker("batch", 1);
+		expect(tracker.finish(42)).toBeNull();
+		expect(tracker.getStats().utilization).toBe(0);
+	});
+});
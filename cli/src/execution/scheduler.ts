@@ -0,0 +1,252 @@
+import type { Task, TaskSource } from "../tasks/types.ts";
+import { setMetric } from "../telemetry/metrics.ts";
+
+/**
+ * How runParallel hands tasks to agents:
+ * - batch: take up to maxParallel tasks, wait for the whole batch, then fetch the next one
+ * - continuous: keep maxParallel agents in flight, refilling a slot as soon as it frees up
+ */
+export type SchedulerMode = "batch" | "continuous";
+
+/**
+ * Task source with optional parallel group support (YAML/JSON, or a CachedTaskSource wrapping them)
+ */
+export type GroupedTaskSource = TaskSource & {
+	getParallelGroup?: (title: string) => Promise<number>;
+	getTasksInGroup?: (group: number) => Promise<Task[]>;
+	supportsParallelGroups?: () => boolean;
+};
+
+/**
+ * Check whether a task source actually understands parallel groups.
+ * CachedTaskSource always exposes the group methods, so ask it directly when possible.
+ */
+export function supportsParallelGroups(taskSource: TaskSource): boolean {
+	const source = taskSource as GroupedTaskSource;
+	if (typeof source.supportsParallelGroups === "function") {
+		return source.supportsParallelGroups();
+	}
+	return Boolean(source.getParallelGroup && source.getTasksInGroup);
+}
+
+export interface EligibleTasksOptions {
+	/** Task IDs already dispatched during this run */
+	claimed: Set<string>;
+	/** Number of free agent slots */
+	freeSlots: number;
+	/** Number of agents currently running */
+	inFlight: number;
+	/** Parallel group of the running agents (null when nothing has been dispatched yet) */
+	activeGroup: number | null;
+}
+
+export interface EligibleTasks {
+	/** Tasks that can be dispatched right now */
+	tasks: Task[];
+	/** Parallel group the dispatched tasks belong to (null for sources without groups) */
+	group: number | null;
+	/** All remaining tasks that have not been dispatched yet */
+	pending: Task[];
+}
+
+/**
+ * Pick the tasks that may start now without crossing a parallel group boundary.
+ *
+ * Rules (mirroring the batch scheduler):
+ * - Sources without groups: any pending task is eligible
+ * - Group > 0: tasks of the same group run together; a different group waits until
+ *   every running agent has finished
+ * - Group 0: the task runs on its own
+ */
+export async function pickEligibleTasks(
+	taskSource: TaskSource,
+	options: EligibleTasksOptions,
+): Promise<EligibleTasks> {
+	const { claimed, freeSlots, inFlight, activeGroup } = options;
+
+	const pending = (await taskSource.getAllTasks()).filter((task) => !claimed.has(task.id));
+	if (freeSlots <= 0 || pending.length === 0) {
+		return { tasks: [], group: activeGroup, pending };
+	}
+
+	const source = taskSource as GroupedTaskSource;
+	if (!supportsParallelGroups(taskSource) || !source.getParallelGroup || !source.getTasksInGroup) {
+		return { tasks: pending.slice(0, freeSlots), group: null, pending };
+	}
+
+	const next = pending[0];
+	const group = await source.getParallelGroup(next.title);
+
+	// Wait for the running group to drain before crossing a group boundary
+	if (inFlight > 0 && group !== activeGroup) {
+		return { tasks: [], group: activeGroup, pending };
+	}
+
+	if (group === 0) {
+		return { tasks: inFlight === 0 ? [next] : [], group: 0, pending };
+	}
+
+	const groupTasks = (await source.getTasksInGroup(group)).filter((task) => !claimed.has(task.id));
+	return { tasks: groupTasks.slice(0, freeSlots), group, pending };
+}
+
+/**
+ * Scheduling timings for a single task
+ */
+export interface TaskScheduleTiming {
+	taskId: string;
+	title: string;
+	agentNum: number;
+	/** Time between the scheduler first seeing the task and an agent picking it up */
+	queueWaitMs: number;
+	/** Time the agent held its slot */
+	runMs: number;
+}
+
+/**
+ * Slot utilization and queue-wait statistics for a parallel run
+ */
+export interface SchedulerStats {
+	mode: SchedulerMode;
+	slots: number;
+	/** Wall time from the first dispatch to the last agent finishing */
+	wallTimeMs: number;
+	/** Sum of time every slot was occupied by an agent */
+	busyTimeMs: number;
+	/** busyTimeMs / (slots * wallTimeMs), between 0 and 1 */
+	utilization: number;
+	avgQueueWaitMs: number;
+	maxQueueWaitMs: number;
+	tasks: TaskScheduleTiming[];
+}
+
+interface RunningSlot {
+	task: Task;
+	dispatchedAt: number;
+	queueWaitMs: number;
+}
+
+/**
+ * Tracks when tasks become visible, when agents pick them up and when slots free up.
+ * Active agents and queue depth are also published as gauges when metrics are enabled.
+ */
+export class SlotTracker {
+	private mode: SchedulerMode;
+	private slots: number;
+	private now: () => number;
+	private firstSeen = new Map<string, number>();
+	private running = new Map<number, RunningSlot>();
+	/** Pending tasks not yet picked up by an agent */
+	private waiting = new Set<string>();
+	private finished: TaskScheduleTiming[] = [];
+	private firstDispatchAt: number | null = null;
+	private lastFinishAt: number | null = null;
+
+	constructor(mode: SchedulerMode, slots: number, now: () => number = Date.now) {
+		this.mode = mode;
+		this.slots = Math.max(1, slots);
+		this.now = now;
+	}
+
+	/**
+	 * Record tasks the scheduler has seen as pending (first sighting wins)
+	 */
+	observe(tasks: Task[]): void {
+		const now = this.now();
+		const running = new Set([...this.running.values()].map((slot) => slot.task.id));
+		this.waiting.clear();
+		for (const task of tasks) {
+			if (!this.firstSeen.has(task.id)) {
+				this.firstSeen.set(task.id, now);
+			}
+			if (!running.has(task.id)) {
+				this.waiting.add(task.id);
+			}
+		}
+		setMetric("ralphy_queue_depth", this.waiting.size);
+	}
+
+	/**
+	 * Record an agent picking up a task
+	 */
+	dispatch(task: Task, agentNum: number): void {
+		const now = this.now();
+		const seenAt = this.firstSeen.get(task.id) ?? now;
+		this.firstSeen.set(task.id, seenAt);
+		if (this.firstDispatchAt === null) {
+			this.firstDispatchAt = now;
+		}
+		this.running.set(agentNum, { task, dispatchedAt: now, queueWaitMs: now - seenAt });
+		this.waiting.delete(task.id);
+		setMetric("ralphy_agents_active", this.running.size);
+		setMetric("ralphy_queue_depth", this.waiting.size);
+	}
+
+	/**
+	 * Record an agent releasing its slot
+	 */
+	finish(agentNum: number): TaskScheduleTiming | null {
+		const slot = this.running.get(agentNum);
+		if (!slot) return null;
+
+		const now = this.now();
+		this.running.delete(agentNum);
+		this.lastFinishAt = now;
+		setMetric("ralphy_agents_active", this.running.size);
+
+		const timing: TaskScheduleTiming = {
+			taskId: slot.task.id,
+			title: slot.task.title,
+			agentNum,
+			queueWaitMs: slot.queueWaitMs,
+			runMs: now - slot.dispatchedAt,
+		};
+		this.finished.push(timing);
+		return timing;
+	}
+
+	/**
+	 * Number of agents currently holding a slot
+	 */
+	get activeCount(): number {
+		return this.running.size;
+	}
+
+	/**
+	 * Number of pending tasks no agent has picked up yet
+	 */
+	get queueDepth(): number {
+		return this.waiting.size;
+	}
+
+	getStats(): SchedulerStats {
+		const now = this.now();
+		const end = this.running.size > 0 ? now : (this.lastFinishAt ?? now);
+		const wallTimeMs = this.firstDispatchAt === null ? 0 : end - this.firstDispatchAt;
+
+		let busyTimeMs = 0;
+		for (const timing of this.finished) {
+			busyTimeMs += timing.runMs;
+		}
+		for (const slot of this.running.values()) {
+			busyTimeMs += now - slot.dispatchedAt;
+		}
+
+		const waits = [
+			...this.finished.map((t) => t.queueWaitMs),
+			...[...this.running.values()].map((s) => s.queueWaitMs),
+		];
+		const totalWait = waits.reduce((sum, wait) => sum + wait, 0);
+
+		return {
+			mode: this.mode,
+			slots: this.slots,
+			wallTimeMs,
+			busyTimeMs,
+			utilization: wallTimeMs > 0 ? Math.min(1, busyTimeMs / (this.slots * wallTimeMs)) : 0,
+			avgQueueWaitMs: waits.length > 0 ? Math.round(totalWait / waits.length) : 0,
+			maxQueueWaitMs: waits.length > 0 ? Math.max(...waits) : 0,
+			tasks: [...this.finished],
+		};
+	}
+}
@@ -4,12 +4,16 @@ import { createTaskBranch, returnToBaseBranch } from "../git/branch.ts";
 import { syncPrdToIssue } from "../git/issue-sync.ts";
 import { createPullRequest } from "../git/pr.ts";
 import type { Task, TaskSource } from "../tasks/types.ts";
+import { incrementMetric, setMetric } from "../telemetry/metrics.ts";
 import { logDebug, logError, logInfo, logSuccess, logWarn } from "../ui/logger.ts";
 import { notifyTaskComplete, notifyTaskFailed } from "../ui/notify.ts";
 import { ProgressSpinner } from "../ui/spinner.ts";
 import { clearDeferredTask, recordDeferredTask } from "./deferred.ts";
+import type { MergeStats } from "./merge-pipeline.ts";
+import { PhaseTimer, type PhaseTimings } from "./phases.ts";
 import { buildPrompt } from "./prompt.ts";
 import { isFatalError, isRetryableError, sleep, withRetry } from "./retry.ts";
+import type { SchedulerStats } from "./scheduler.ts";
 
 export interface ExecutionOptions {
 	engine: AIEngine;
@@ -51,6 +55,12 @@ export interface ExecutionResult {
 	tasksFailed: number;
 	totalInputTokens: number;
 	totalOutputTokens: number;
+	/** Slot utilization and queue-wait statistics (parallel mode only) */
+	schedulerStats?: SchedulerStats;
+	/** Merge phase statistics and stage timings (parallel mode only) */
+	mergeStats?: MergeStats;
+	/** Time spent per execution phase (isolation, agent, commit, merge, cleanup) */
+	phaseTimings?: PhaseTimings;
 }
 
 /**
@@ -86,6 +96,7 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 		totalOutputTokens: 0,
 	};
 
+	const phases = new PhaseTimer();
 	let iteration = 0;
 	let abortDueToRetryableFailure = false;
 
@@ -106,13 +117,17 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 		iteration++;
 		const remaining = await taskSource.countRemaining();
 		logInfo(`Task ${iteration}: ${task.title} (${remaining} remaining)`);
+		setMetric("ralphy_queue_depth", remaining);
+		const completedBefore = result.tasksCompleted;
 
 		// Create branch if needed
 		let branch: string | null = null;
 		if (branchPerTask && baseBranch) {
 			try {
 				const branchFn = options.branchCreator || createTaskBranch;
-				branch = await branchFn(task.title, baseBranch, workDir);
+				branch = await phases.time("isolation", () => branchFn(task.title, baseBranch, workDir), {
+					"task.title": task.title,
+				});
 				logDebug(`Created branch: ${branch}`);
 			} catch (error) {
 				logError(`Failed to create branch: ${error}`);
@@ -143,41 +158,44 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 			spinner.success("(dry run) Skipped");
 		} else {
 			try {
-				aiResult = await withRetry(
-					async () => {
-						spinner.updateStep("Working");
+				aiResult = await phases.time("agent", () =>
+					withRetry(
+						async () => {
+							spinner.updateStep("Working");
 
-						// Use streaming if available
-						const engineOptions = {
-							...(modelOverride && { modelOverride }),
-							...(engineArgs && engineArgs.length > 0 && { engineArgs }),
-						};
-						if (engine.executeStreaming) {
-							return await engine.executeStreaming(
-								prompt,
-								workDir,
-								(step) => {
-									spinner.updateStep(step);
-								},
-								engineOptions,
-							);
-						}
+							// Use streaming if available
+							const engineOptions = {
+								...(modelOverride && { modelOverride }),
+								...(engineArgs && engineArgs.length > 0 && { engineArgs }),
+							};
+							if (engine.executeStreaming) {
+								return await engine.executeStreaming(
+									prompt,
+									workDir,
+									(step) => {
+										spinner.updateStep(step);
+									},
+									engineOptions,
+								);
+							}
 
-						const res = await engine.execute(prompt, workDir, engineOptions);
+							const res = await engine.execute(prompt, workDir, engineOptions);
 
-						if (!res.success && res.error && isRetryableError(res.error)) {
-							throw new Error(res.error);
-						}
+							if (!res.success && res.error && isRetryableError(res.error)) {
+								throw new Error(res.error);
+							}
 
-						return res;
-					},
-					{
-						maxRetries,
-						retryDelay,
-						onRetry: (attempt) => {
-							spinner.updateStep(`Retry ${attempt}`);
+							return res;
+						},
+						{
+							maxRetries,
+							retryDelay,
+							onRetry: (attempt) => {
+								spinner.updateStep(`Retry ${attempt}`);
+							},
 						},
-					},
+					),
+					{ "task.title": task.title },
 				);
 
 				if (aiResult.success) {
@@ -237,6 +255,8 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 						logError("Aborting remaining tasks due to configuration/authentication issue.");
 						result.tasksFailed++;
 						notifyTaskFailed(task.title, errMsg);
+						incrementMetric("ralphy_tasks_total", { status: "failed" });
+						result.phaseTimings = phases.getTimings();
 						return result; // Exit immediately
 					} else {
 						spinner.error(errMsg);
@@ -272,6 +292,8 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 					logError("Aborting remaining tasks due to configuration/authentication issue.");
 					result.tasksFailed++;
 					notifyTaskFailed(task.title, errorMsg);
+					incrementMetric("ralphy_tasks_total", { status: "failed" });
+					result.phaseTimings = phases.getTimings();
 					return result; // Exit immediately
 				} else {
 					spinner.error(errorMsg);
@@ -285,9 +307,21 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 			}
 		}
 
+		if (!dryRun) {
+			const status =
+				result.tasksCompleted > completedBefore
+					? "completed"
+					: abortDueToRetryableFailure
+						? "deferred"
+						: "failed";
+			incrementMetric("ralphy_tasks_total", { status });
+		}
+
 		// Return to base branch if we created one
 		if (branchPerTask && baseBranch) {
-			await returnToBaseBranch(baseBranch, workDir);
+			await phases.time("cleanup", () => returnToBaseBranch(baseBranch, workDir), {
+				"task.title": task.title,
+			});
 		}
 
 		if (abortDueToRetryableFailure) {
@@ -295,5 +329,6 @@ export async function runSequential(options: ExecutionOptions): Promise<Executio
 		}
 	}
 
+	result.phaseTimings = phases.getTimings();
 	return result;
 }
@@ -0,0 +1,134 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, mkdirSync, readFileSync, rmSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import simpleGit from "simple-git";
+import {
+	type PreMergeAnalysis,
+	buildOverlapGraph,
+	mergeBranchesTreewise,
+	planMergeBatches,
+	testMerge,
+} from "./merge.ts";
+
+function analysis(branch: string, filesChanged: string[]): PreMergeAnalysis {
+	return { branch, filesChanged, fileCount: filesChanged.length };
+}
+
+describe("buildOverlapGraph", () => {
+	it("should connect branches that change the same file", () => {
+		const graph = buildOverlapGraph([
+			analysis("a", ["src/x.ts"]),
+			analysis("b", ["src/x.ts", "src/y.ts"]),
+			analysis("c", ["src/z.ts"]),
+		]);
+
+		expect([...(graph.get("a") ?? [])]).toEqual(["b"]);
+		expect([...(graph.get("b") ?? [])]).toEqual(["a"]);
+		expect(graph.get("c")?.size).toBe(0);
+	});
+});
+
+describe("planMergeBatches", () => {
+	it("should put non-overlapping branches in the same batch", () => {
+		const batches = planMergeBatches([
+			analysis("a", ["x.ts"]),
+			analysis("b", ["y.ts"]),
+			analysis("c", ["x.ts"]),
+			analysis("d", ["x.ts", "y.ts"]),
+		]);
+
+		expect(batches.map((batch) => batch.map((a) => a.branch))).toEqual([
+			["a", "b"],
+			["c"],
+			["d"],
+		]);
+	});
+});
+
+const TEST_DIR = "/tmp/ralphy-merge-tree-test";
+
+describe("in-memory merges", () => {
+	beforeEach(async () => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+		mkdirSync(TEST_DIR, { recursive: true });
+
+		const git = simpleGit(TEST_DIR);
+		await git.init(["-b", "main"]);
+		await git.addConfig("user.name", "Test");
+		await git.addConfig("user.email", "test@example.com");
+		for (const file of ["a.txt", "b.txt", "shared.txt"]) {
+			writeFileSync(join(TEST_DIR, file), `${file}\n`);
+		}
+		await git.add(".");
+		await git.commit("init");
+
+		for (const [branch, file, content] of [
+			["agent-a", "a.txt", "from a\n"],
+			["agent-b", "b.txt", "from b\n"],
+			["agent-c", "shared.txt", "from c\n"],
+			["agent-d", "shared.txt", "from d\n"],
+		]) {
+			await git.checkout(["-b", branch, "main"]);
+			writeFileSync(join(TEST_DIR, file), content);
+			await git.commit(branch, [file]);
+		}
+		await git.checkout("main");
+	});
+
+	afterEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	it("should report conflicts without touching the working tree", async () => {
+		await mergeBranchesTreewise(1, ["agent-c"], "main", TEST_DIR);
+
+		const result = await testMerge("main", "agent-d", TEST_DIR);
+
+		expect(result.clean).toBe(false);
+		expect(result.conflictedFiles).toEqual(["shared.txt"]);
+		expect((await simpleGit(TEST_DIR).status()).isClean()).toBe(true);
+	});
+
+	it("should merge a batch into the target with one merge commit", async () => {
+		const result = await mergeBranchesTreewise(
+			1,
+			["agent-a", "agent-b", "agent-c"],
+			"main",
+			TEST_DIR,
+		);
+
+		expect(result.success).toBe(true);
+		expect(result.integrationBranch).toBe("ralphy/integration-group-1");
+		expect(readFileSync(join(TEST_DIR, "a.txt"), "utf-8")).toBe("from a\n");
+		expect(readFileSync(join(TEST_DIR, "shared.txt"), "utf-8")).toBe("from c\n");
+
+		const parents = await simpleGit(TEST_DIR).raw(["rev-list", "--parents", "-n", "1", "main"]);
+		expect(parents.trim().split(" ")).toHaveLength(5);
+	});
+
+	it("should not overwrite an existing integration branch", async () => {
+		const git = simpleGit(TEST_DIR);
+		await git.branch(["ralphy/integration-group-1", "agent-d"]);
+		const userHead = await git.revparse(["ralphy/integration-group-1"]);
+
+		const result = await mergeBranchesTreewise(1, ["agent-a"], "main", TEST_DIR);
+
+		expect(result.success).toBe(true);
+		expect(result.integrationBranch).toBe("ralphy/integration-group-1-2");
+		expect(await git.revparse(["ralphy/integration-group-1"])).toBe(userHead);
+	});
+
+	it("should leave the target alone when branches conflict", async () => {
+		const before = await simpleGit(TEST_DIR).revparse(["main"]);
+
+		const result = await mergeBranchesTreewise(1, ["agent-c", "agent-d"], "main", TEST_DIR);
+
+		expect(result.success).toBe(false);
+		expect(result.hasConflicts).toBe(true);
+		expect(await simpleGit(TEST_DIR).revparse(["main"])).toBe(before);
+	});
+});
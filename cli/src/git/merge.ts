@@ -1,4 +1,6 @@
 import simpleGit, { type SimpleGit } from "simple-git";
+import { withSpan } from "../telemetry/tracing.ts";
+import { execCommand } from "../utils/exec.ts";
 
 /**
  * Result of a merge operation
@@ -18,7 +20,10 @@ function parseGitFileList(output: string): string[] {
 		.filter((line) => line.length > 0);
 }
 
-async function getPotentialConflictFiles(
+/**
+ * Files changed both on a branch and on the target since they diverged
+ */
+export async function getPotentialConflictFiles(
 	branchName: string,
 	targetBranch: string,
 	workDir: string,
@@ -58,6 +63,16 @@ export async function mergeAgentBranch(
 	branchName: string,
 	targetBranch: string,
 	workDir: string,
+): Promise<MergeResult> {
+	return withSpan("git.merge", { branch: branchName }, () =>
+		mergeAgentBranchImpl(branchName, targetBranch, workDir),
+	);
+}
+
+async function mergeAgentBranchImpl(
+	branchName: string,
+	targetBranch: string,
+	workDir: string,
 ): Promise<MergeResult> {
 	const git: SimpleGit = simpleGit(workDir);
 	const potentialConflictFiles = await getPotentialConflictFiles(branchName, targetBranch, workDir);
@@ -96,6 +111,13 @@ export async function mergeAgentBranch(
 	}
 }
 
+/**
+ * Name of the integration branch for a parallel group
+ */
+export function getIntegrationBranchName(groupNum: number): string {
+	return `ralphy/integration-group-${groupNum}`;
+}
+
 /**
  * Create an integration branch for a parallel group
  */
@@ -105,7 +127,7 @@ export async function createIntegrationBranch(
 	workDir: string,
 ): Promise<string> {
 	const git: SimpleGit = simpleGit(workDir);
-	const branchName = `ralphy/integration-group-${groupNum}`;
+	const branchName = getIntegrationBranchName(groupNum);
 
 	// Checkout base branch first
 	await git.checkout(baseBranch);
@@ -327,3 +349,257 @@ export function sortByConflictLikelihood(analyses: PreMergeAnalysis[]): PreMerge
 
 	return withScores.map((ws) => ws.analysis);
 }
+
+/**
+ * Result of an in-memory merge (git merge-tree --write-tree)
+ */
+export interface TreeMergeResult {
+	clean: boolean;
+	/** Tree of the merge result (contains conflict markers when not clean) */
+	tree: string;
+	conflictedFiles: string[];
+	error?: string;
+}
+
+const OBJECT_ID_PATTERN = /^[0-9a-f]{40}([0-9a-f]{24})?$/;
+
+let mergeTreeSupported: Promise<boolean> | null = null;
+
+/**
+ * Check whether git supports merge-tree --write-tree (git 2.38+)
+ */
+export function isMergeTreeSupported(workDir: string): Promise<boolean> {
+	if (!mergeTreeSupported) {
+		mergeTreeSupported = execCommand(
+			"git",
+			["merge-tree", "--write-tree", "--name-only", "--no-messages", "HEAD", "HEAD"],
+			workDir,
+		)
+			.then(({ exitCode }) => exitCode === 0)
+			.catch(() => false);
+	}
+	return mergeTreeSupported;
+}
+
+/**
+ * Merge two commits in memory with git merge-tree --write-tree.
+ * Neither the working tree nor the index is touched, so merges can run in parallel.
+ */
+export async function testMerge(
+	ours: string,
+	theirs: string,
+	workDir: string,
+): Promise<TreeMergeResult> {
+	const { stdout, stderr, exitCode } = await execCommand(
+		"git",
+		["merge-tree", "--write-tree", "--name-only", "--no-messages", ours, theirs],
+		workDir,
+	);
+	const [tree = "", ...conflictedFiles] = parseGitFileList(stdout);
+
+	if (exitCode === 0 && OBJECT_ID_PATTERN.test(tree)) {
+		return { clean: true, tree, conflictedFiles: [] };
+	}
+	// Exit code 1 with a tree means the merge has conflicts
+	if (exitCode === 1 && OBJECT_ID_PATTERN.test(tree)) {
+		return { clean: false, tree, conflictedFiles: [...new Set(conflictedFiles)] };
+	}
+	return {
+		clean: false,
+		tree: "",
+		conflictedFiles: [],
+		error: stderr.trim() || `git merge-tree exited with code ${exitCode}`,
+	};
+}
+
+/**
+ * Create a commit object for a tree without touching any branch
+ */
+async function commitTree(
+	tree: string,
+	parents: string[],
+	message: string,
+	workDir: string,
+): Promise<string> {
+	const git: SimpleGit = simpleGit(workDir);
+	const parentArgs = parents.flatMap((parent) => ["-p", parent]);
+	return (await git.raw(["commit-tree", tree, ...parentArgs, "-m", message])).trim();
+}
+
+/**
+ * Merge branches into a target branch without touching the working tree.
+ *
+ * The target and branch heads are merged pairwise with merge-tree, level by level,
+ * with each level's merges running in parallel. The combined tree is committed as a
+ * single merge commit whose parents are the target and every branch (the octopus
+ * merge git merge would create), recorded on the group's integration branch, and the
+ * target is fast-forwarded to it. If that branch name is already taken, a numeric
+ * suffix is added rather than overwriting it.
+ */
+export async function mergeBranchesTreewise(
+	groupNum: number,
+	branches: string[],
+	targetBranch: string,
+	workDir: string,
+): Promise<MergeResult & { integrationBranch?: string }> {
+	return withSpan("git.merge_tree", { group: groupNum, branches: branches.length }, () =>
+		mergeBranchesTreewiseImpl(groupNum, branches, targetBranch, workDir),
+	);
+}
+
+async function mergeBranchesTreewiseImpl(
+	groupNum: number,
+	branches: string[],
+	targetBranch: string,
+	workDir: string,
+): Promise<MergeResult & { integrationBranch?: string }> {
+	const git: SimpleGit = simpleGit(workDir);
+	let integrationBranch = "";
+
+	try {
+		const heads = await Promise.all(
+			[targetBranch, ...branches].map(async (ref) => (await git.revparse([ref])).trim()),
+		);
+
+		let level = heads;
+		while (level.length > 1) {
+			const pairs: string[][] = [];
+			for (let i = 0; i < level.length; i += 2) {
+				pairs.push(level.slice(i, i + 2));
+			}
+
+			const merged = await Promise.all(
+				pairs.map(async ([ours, theirs]) => {
+					if (!theirs) return { commit: ours, result: null };
+					const result = await testMerge(ours, theirs, workDir);
+					if (!result.clean) return { commit: "", result };
+					const commit = await commitTree(
+						result.tree,
+						[ours, theirs],
+						"Intermediate merge",
+						workDir,
+					);
+					return { commit, result };
+				}),
+			);
+
+			const failedMerge = merged.find((m) => m.result && !m.result.clean)?.result;
+			if (failedMerge) {
+				return {
+					success: false,
+					hasConflicts: failedMerge.conflictedFiles.length > 0,
+					conflictedFiles: failedMerge.conflictedFiles,
+					error: failedMerge.error,
+				};
+			}
+			level = merged.map((m) => m.commit);
+		}
+
+		const tree = (await git.revparse([`${level[0]}^{tree}`])).trim();
+		const message =
+			branches.length === 1
+				? `Merge ${branches[0]} into ${targetBranch}`
+				: `Merge ${branches.length} branches into ${targetBranch}\n\n${branches.map((b) => `- ${b}`).join("\n")}`;
+		const commit = await commitTree(tree, heads, message, workDir);
+
+		// Never move an existing branch: a user may own one with the same name
+		const baseName = getIntegrationBranchName(groupNum);
+		let candidate = baseName;
+		for (let suffix = 2; await branchExists(candidate, workDir); suffix++) {
+			candidate = `${baseName}-${suffix}`;
+		}
+		await git.raw(["branch", candidate, commit]);
+		integrationBranch = candidate;
+
+		await fastForwardBranch(targetBranch, commit, heads[0], workDir);
+		return { success: true, hasConflicts: false, integrationBranch };
+	} catch (error) {
+		if (integrationBranch) {
+			await deleteLocalBranch(integrationBranch, workDir, true);
+		}
+		const errorMsg = error instanceof Error ? error.message : String(error);
+		return { success: false, hasConflicts: false, error: errorMsg };
+	}
+}
+
+/**
+ * Move a branch forward to a commit. A checked out branch is fast-forwarded with
+ * git merge --ff-only so the working tree follows; otherwise only the ref is updated.
+ */
+async function fastForwardBranch(
+	branch: string,
+	commit: string,
+	expectedHead: string,
+	workDir: string,
+): Promise<void> {
+	const git: SimpleGit = simpleGit(workDir);
+	const currentBranch = (await git.revparse(["--abbrev-ref", "HEAD"])).trim();
+
+	if (currentBranch === branch) {
+		await git.merge(["--ff-only", commit]);
+	} else {
+		// Fails if the branch moved since the merge was computed
+		await git.raw(["update-ref", `refs/heads/${branch}`, commit, expectedHead]);
+	}
+}
+
+/**
+ * Build the file-overlap graph: each branch maps to the branches it shares changed files with
+ */
+export function buildOverlapGraph(analyses: PreMergeAnalysis[]): Map<string, Set<string>> {
+	const graph = new Map<string, Set<string>>();
+	const branchesByFile = new Map<string, string[]>();
+
+	for (const analysis of analyses) {
+		graph.set(analysis.branch, new Set());
+		for (const file of analysis.filesChanged) {
+			const touching = branchesByFile.get(file);
+			if (touching) {
+				touching.push(analysis.branch);
+			} else {
+				branchesByFile.set(file, [analysis.branch]);
+			}
+		}
+	}
+
+	for (const touching of branchesByFile.values()) {
+		for (const branch of touching) {
+			for (const other of touching) {
+				if (other !== branch) graph.get(branch)?.add(other);
+			}
+		}
+	}
+
+	return graph;
+}
+
+/**
+ * Split branches into batches of branches that don't share changed files.
+ * Branches are placed in order into the first batch without an overlapping branch
+ * (a greedy coloring of the overlap graph), so passing them sorted by conflict
+ * likelihood keeps the clean ones together in the first batch.
+ */
+export function planMergeBatches(analyses: PreMergeAnalysis[]): PreMergeAnalysis[][] {
+	const graph = buildOverlapGraph(analyses);
+	const batches: PreMergeAnalysis[][] = [];
+	const batchMembers: Set<string>[] = [];
+
+	for (const analysis of analyses) {
+		const neighbours = graph.get(analysis.branch) ?? new Set<string>();
+		let index = batchMembers.findIndex((members) => {
+			for (const neighbour of neighbours) {
+				if (members.has(neighbour)) return false;
+			}
+			return true;
+		});
+		if (index === -1) {
+			index = batches.length;
+			batches.push([]);
+			batchMembers.push(new Set());
+		}
+		batches[index].push(analysis);
+		batchMembers[index].add(analysis.branch);
+	}
+
+	return batches;
+}
@@ -1,5 +1,5 @@
 import simpleGit, { type SimpleGit } from "simple-git";
-import { execCommand } from "../engines/base.ts";
+import { execCommand } from "../utils/exec.ts";
 
 /**
  * Push a branch to origin
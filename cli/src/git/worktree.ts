@@ -1,6 +1,7 @@
 import { existsSync, lstatSync, mkdirSync, rmSync } from "node:fs";
 import { join } from "node:path";
 import simpleGit, { type SimpleGit } from "simple-git";
+import { withSpan } from "../telemetry/tracing.ts";
 import { logDebug } from "../ui/logger.ts";
 import { slugify } from "./branch.ts";
 
@@ -25,6 +26,18 @@ export async function createAgentWorktree(
 	baseBranch: string,
 	worktreeBase: string,
 	originalDir: string,
+): Promise<{ worktreeDir: string; branchName: string }> {
+	return withSpan("worktree.create", { agent: agentNum }, () =>
+		createAgentWorktreeImpl(taskName, agentNum, baseBranch, worktreeBase, originalDir),
+	);
+}
+
+async function createAgentWorktreeImpl(
+	taskName: string,
+	agentNum: number,
+	baseBranch: string,
+	worktreeBase: string,
+	originalDir: string,
 ): Promise<{ worktreeDir: string; branchName: string }> {
 	const uniqueId = generateUniqueId();
 	const branchName = `ralphy/agent-${agentNum}-${uniqueId}-${slugify(taskName)}`;
@@ -47,6 +60,57 @@ export async function createAgentWorktree(
 	return { worktreeDir, branchName };
 }
 
+/**
+ * Create a detached worktree at the base branch (used by the isolation pool).
+ * The task branch is checked out later with assignWorktreeBranch.
+ */
+export async function createDetachedWorktree(
+	worktreeDir: string,
+	baseBranch: string,
+	originalDir: string,
+): Promise<void> {
+	const git: SimpleGit = simpleGit(originalDir);
+
+	// Remove leftovers from previous failed runs
+	if (existsSync(worktreeDir)) {
+		rmSync(worktreeDir, { recursive: true, force: true });
+		await git.raw(["worktree", "prune"]);
+	}
+
+	await git.raw(["worktree", "add", "--detach", worktreeDir, baseBranch]);
+}
+
+/**
+ * Check out a fresh agent branch in an existing, clean worktree
+ */
+export async function assignWorktreeBranch(
+	taskName: string,
+	agentNum: number,
+	baseBranch: string,
+	worktreeDir: string,
+): Promise<string> {
+	const branchName = `ralphy/agent-${agentNum}-${generateUniqueId()}-${slugify(taskName)}`;
+	const git: SimpleGit = simpleGit(worktreeDir);
+	await git.raw(["checkout", "-B", branchName, baseBranch]);
+	return branchName;
+}
+
+/**
+ * Detach a worktree from its agent branch and reset it to the base branch for reuse.
+ *
+ * Uses reset --hard + clean -fd, so ignored files (installed dependencies, build
+ * caches) survive and the next agent starts warm. Detaching releases the agent
+ * branch so it can be merged and deleted from the main working tree.
+ */
+export async function resetWorktree(worktreeDir: string, baseBranch: string): Promise<void> {
+	const git: SimpleGit = simpleGit(worktreeDir);
+	await withSpan("worktree.reset", {}, async () => {
+		await git.raw(["reset", "--hard"]);
+		await git.raw(["clean", "-fd"]);
+		await git.raw(["checkout", "--detach", baseBranch]);
+	});
+}
+
 /**
  * Cleanup a worktree after agent completes
  */
@@ -54,6 +118,13 @@ export async function cleanupAgentWorktree(
 	worktreeDir: string,
 	_branchName: string,
 	originalDir: string,
+): Promise<{ leftInPlace: boolean }> {
+	return withSpan("worktree.cleanup", {}, () => cleanupAgentWorktreeImpl(worktreeDir, originalDir));
+}
+
+async function cleanupAgentWorktreeImpl(
+	worktreeDir: string,
+	originalDir: string,
 ): Promise<{ leftInPlace: boolean }> {
 	// Check for uncommitted changes
 	if (existsSync(worktreeDir)) {
@@ -1,5 +1,6 @@
 #!/usr/bin/env bun
 import { parseArgs } from "./cli/args.ts";
+import { runBenchCommand } from "./cli/commands/bench.ts";
 import { addRule, showConfig } from "./cli/commands/config.ts";
 import { runInit } from "./cli/commands/init.ts";
 import { runLoop } from "./cli/commands/run.ts";
@@ -15,8 +16,15 @@ async function main(): Promise<void> {
 			initMode,
 			showConfig: showConfigMode,
 			addRule: rule,
+			bench,
 		} = parseArgs(process.argv);
 
+		// Handle `ralphy bench [options]`
+		if (bench) {
+			await runBenchCommand(bench);
+			return;
+		}
+
 		// Handle --init
 		if (initMode) {
 			await runInit();
@@ -1,5 +1,7 @@
+import { withSpan } from "../telemetry/tracing.ts";
 import { logError } from "../ui/logger.ts";
 import { JsonTaskSource } from "./json.ts";
+import { TaskQueue } from "./task-index.ts";
 import type { Task, TaskSource, TaskSourceType } from "./types.ts";
 import { YamlTaskSource } from "./yaml.ts";
 
@@ -14,8 +16,8 @@ interface CachedTaskSourceOptions {
 
 /**
  * A caching wrapper around any TaskSource that:
- * - Loads tasks once and caches them in memory
- * - Tracks completions in memory for instant filtering
+ * - Loads tasks once and caches them in an ordered queue with per-group buckets
+ * - Tracks completions in memory, so next task and counts are O(1)
  * - Batches markComplete() writes with debouncing
  *
  * IMPORTANT: Caller must call flush() before process exit to persist changes.
@@ -24,7 +26,7 @@ interface CachedTaskSourceOptions {
  */
 export class CachedTaskSource implements TaskSource {
 	private inner: TaskSource;
-	private cachedTasks: Task[] | null = null;
+	private cachedTasks: TaskQueue | null = null;
 	private pendingCompletions: Set<string> = new Set();
 	private flushTimer: ReturnType<typeof setTimeout> | null = null;
 	private flushIntervalMs: number;
@@ -70,27 +72,35 @@ export class CachedTaskSource implements TaskSource {
 		return this.inner instanceof YamlTaskSource || this.inner instanceof JsonTaskSource;
 	}
 
-	async getAllTasks(): Promise<Task[]> {
+	/**
+	 * Remaining tasks, with pending completions already removed
+	 */
+	private async getQueue(): Promise<TaskQueue> {
 		if (!this.cachedTasks) {
-			this.cachedTasks = await this.inner.getAllTasks();
+			const tasks = await withSpan("tasks.load", { source: this.inner.type }, () =>
+				this.inner.getAllTasks(),
+			);
+			this.cachedTasks = new TaskQueue(tasks.filter((t) => !this.pendingCompletions.has(t.id)));
 		}
-		// Filter out tasks that have been marked complete (pending flush)
-		return this.cachedTasks.filter((t) => !this.pendingCompletions.has(t.id));
+		return this.cachedTasks;
+	}
+
+	async getAllTasks(): Promise<Task[]> {
+		return (await this.getQueue()).toArray();
 	}
 
 	async getNextTask(): Promise<Task | null> {
-		const tasks = await this.getAllTasks();
-		return tasks[0] ?? null;
+		return (await this.getQueue()).peek();
 	}
 
 	async markComplete(id: string): Promise<void> {
 		this.pendingCompletions.add(id);
+		this.cachedTasks?.complete(id);
 		this.scheduleFlush();
 	}
 
 	async countRemaining(): Promise<number> {
-		const tasks = await this.getAllTasks();
-		return tasks.length;
+		return (await this.getQueue()).remainingCount;
 	}
 
 	async countCompleted(): Promise<number> {
@@ -106,8 +116,7 @@ export class CachedTaskSource implements TaskSource {
 		if (!this.inner.getTasksInGroup) {
 			throw new Error("Inner task source does not support getTasksInGroup");
 		}
-		const tasks = await this.inner.getTasksInGroup(group);
-		return tasks.filter((t) => !this.pendingCompletions.has(t.id));
+		return (await this.getQueue()).inGroup(group);
 	}
 
 	/**
@@ -146,12 +155,16 @@ export class CachedTaskSource implements TaskSource {
 			}
 
 			// Write pending completions, removing each after success to avoid duplicates on retry
-			for (const id of this.pendingCompletions) {
-				await this.inner.markComplete(id);
-				this.pendingCompletions.delete(id);
-			}
-
-			// Invalidate cache so next read picks up any external changes
+			const attributes = { source: this.inner.type, tasks: this.pendingCompletions.size };
+			await withSpan("tasks.flush", attributes, async () => {
+				for (const id of this.pendingCompletions) {
+					await this.inner.markComplete(id);
+					this.pendingCompletions.delete(id);
+				}
+			});
+
+			// Invalidate cache so next read picks up any external changes.
+			// File sources only reparse files that actually changed.
 			this.cachedTasks = null;
 		} finally {
 			this.isFlushing = false;
@@ -0,0 +1,239 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, rmSync } from "node:fs";
+import { type Server, createServer } from "node:http";
+import type { AddressInfo } from "node:net";
+import { GitHubTaskSource, type GitHubTaskSourceOptions } from "./github.ts";
+
+const CACHE_DIR = "/tmp/ralphy-github-test";
+
+interface StubIssue {
+	number: number;
+	title: string;
+	body?: string;
+	state: "open" | "closed";
+	labels: string[];
+	updated_at: string;
+}
+
+/**
+ * Minimal GitHub REST API stub: issue listing (with `since` and ETags),
+ * issue updates and issue search
+ */
+class GitHubStub {
+	issues: StubIssue[] = [];
+	requests: string[] = [];
+	/** Listings of all open issues */
+	fullListings = 0;
+	private server: Server;
+	private clock = Date.parse("2026-01-01T00:00:00Z");
+
+	constructor() {
+		this.server = createServer((req, res) => {
+			const url = new URL(req.url ?? "/", "http://localhost");
+			this.requests.push(`${req.method} ${url.pathname}`);
+
+			let body = "";
+			req.on("data", (chunk) => {
+				body += chunk;
+			});
+			req.on("end", () => {
+				const headers = {
+					"content-type": "application/json",
+					"x-ratelimit-remaining": String(5000 - this.requests.length),
+				};
+
+				if (req.method === "PATCH") {
+					const number = Number(url.pathname.split("/").pop());
+					const issue = this.issues.find((i) => i.number === number);
+					if (issue) {
+						Object.assign(issue, JSON.parse(body), { updated_at: this.tick() });
+					}
+					res.writeHead(200, headers).end(JSON.stringify(issue ?? {}));
+					return;
+				}
+
+				if (url.pathname === "/search/issues") {
+					const label = url.searchParams.get("q")?.match(/label:"([^"]+)"/)?.[1];
+					const total = this.issues.filter(
+						(i) => i.state === "closed" && (!label || i.labels.includes(label)),
+					).length;
+					res.writeHead(200, headers).end(JSON.stringify({ total_count: total, items: [] }));
+					return;
+				}
+
+				const state = url.searchParams.get("state");
+				const label = url.searchParams.get("labels");
+				const since = url.searchParams.get("since");
+				if (state === "open") {
+					this.fullListings++;
+				}
+				const listed = this.issues
+					.filter((i) => state === "all" || i.state === state)
+					.filter((i) => !label || i.labels.includes(label))
+					.filter((i) => !since || i.updated_at >= since)
+					.map((i) => ({ ...i, labels: i.labels.map((name) => ({ name })) }));
+				const payload = JSON.stringify(listed);
+				const etag = `"${Buffer.from(payload).toString("base64").slice(-16)}"`;
+
+				if (req.headers["if-none-match"] === etag) {
+					res.writeHead(304, { etag }).end();
+					return;
+				}
+				res
+					.writeHead(200, { ...headers, etag, date: new Date(this.clock).toUTCString() })
+					.end(payload);
+			});
+		});
+	}
+
+	tick(): string {
+		this.clock += 1000;
+		return new Date(this.clock).toISOString();
+	}
+
+	add(number: number, labels: string[] = ["ready"], state: "open" | "closed" = "open"): void {
+		this.issues.push({ number, title: `Issue ${number}`, state, labels, updated_at: this.tick() });
+	}
+
+	async listen(): Promise<string> {
+		await new Promise<void>((resolve) => this.server.listen(0, "127.0.0.1", resolve));
+		return `http://127.0.0.1:${(this.server.address() as AddressInfo).port}`;
+	}
+
+	close(): void {
+		this.server.close();
+	}
+}
+
+describe("GitHubTaskSource", () => {
+	let stub: GitHubStub;
+	let baseUrl: string;
+
+	function createSource(options: GitHubTaskSourceOptions = {}): GitHubTaskSource {
+		return new GitHubTaskSource("owner/repo", "ready", {
+			baseUrl,
+			cacheDir: CACHE_DIR,
+			pollIntervalMs: 0,
+			...options,
+		});
+	}
+
+	beforeEach(async () => {
+		if (existsSync(CACHE_DIR)) {
+			rmSync(CACHE_DIR, { recursive: true, force: true });
+		}
+		stub = new GitHubStub();
+		baseUrl = await stub.listen();
+	});
+
+	afterEach(() => {
+		stub.close();
+		rmSync(CACHE_DIR, { recursive: true, force: true });
+	});
+
+	it("should answer unchanged polls from the cache with 304s", async () => {
+		stub.add(1);
+		stub.add(2);
+		stub.add(3, ["other"]);
+
+		const source = createSource();
+		expect((await source.getAllTasks()).map((t) => t.title)).toEqual(["Issue 1", "Issue 2"]);
+
+		// First incremental poll stores the ETag, the next ones are 304s
+		await source.getAllTasks();
+		await source.getAllTasks();
+		await source.getAllTasks();
+
+		const stats = source.getSyncStats();
+		expect(stats.requests).toBe(4);
+		expect(stats.notModified).toBe(2);
+		expect(stats.rateLimitRemaining).toBeDefined();
+	});
+
+	it("should apply updates from incremental syncs", async () => {
+		stub.add(1);
+		stub.add(2);
+
+		const source = createSource();
+		await source.getAllTasks();
+
+		stub.add(3);
+		stub.add(4, ["other"]);
+		const closed = stub.issues[0];
+		closed.state = "closed";
+		closed.updated_at = stub.tick();
+
+		const tasks = await source.getAllTasks();
+		expect(tasks.map((t) => t.title)).toEqual(["Issue 3", "Issue 2"]);
+		expect(await source.countCompleted()).toBe(1);
+	});
+
+	it("should patch the cache when closing an issue instead of re-listing", async () => {
+		stub.add(1);
+		stub.add(2);
+		stub.add(3, ["ready"], "closed");
+
+		const source = createSource();
+		expect(await source.countCompleted()).toBe(1);
+
+		const [task] = await source.getAllTasks();
+		await source.markComplete(task.id);
+
+		expect(await source.countRemaining()).toBe(1);
+		expect(await source.countCompleted()).toBe(2);
+		expect(stub.issues.find((i) => i.number === Number(task.id.split(":")[0]))?.state).toBe(
+			"closed",
+		);
+		// Only incremental polls after the first listing, and no new search for the count
+		expect(stub.fullListings).toBe(1);
+		expect(stub.requests.filter((r) => r === "GET /search/issues").length).toBe(1);
+	});
+
+	it("should resume from the on-disk cache in a new process", async () => {
+		stub.add(1);
+		stub.add(2);
+
+		await createSource().getAllTasks();
+
+		const source = createSource();
+		expect(await source.countRemaining()).toBe(2);
+		expect(stub.requests.filter((r) => r.startsWith("GET")).length).toBe(2);
+		expect(stub.requests.at(-1)).toBe("GET /repos/owner/repo/issues");
+	});
+
+	it("should count issues opened and closed between two polls as completed", async () => {
+		stub.add(1);
+
+		const source = createSource();
+		expect(await source.countCompleted()).toBe(0);
+
+		stub.add(2, ["ready"], "closed");
+		expect(await source.countCompleted()).toBe(1);
+	});
+
+	it("should list all issues again once the full listing expires", async () => {
+		stub.add(1);
+
+		const source = createSource({ fullSyncIntervalMs: 0 });
+		await source.getAllTasks();
+		await source.getAllTasks();
+
+		expect(stub.fullListings).toBe(2);
+	});
+
+	it("should keep separate caches per API host", async () => {
+		const other = new GitHubStub();
+		const otherUrl = await other.listen();
+		stub.add(1);
+		other.add(1);
+		other.add(2);
+
+		try {
+			expect(await createSource().countRemaining()).toBe(1);
+			expect(await createSource({ baseUrl: otherUrl }).countRemaining()).toBe(2);
+			expect(other.fullListings).toBe(1);
+		} finally {
+			other.close();
+		}
+	});
+});
@@ -1,23 +1,100 @@
+import { existsSync, mkdirSync, readFileSync, renameSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
 import { Octokit } from "@octokit/rest";
+import { withSpan } from "../telemetry/tracing.ts";
+import { logDebug } from "../ui/logger.ts";
 import type { Task, TaskSource } from "./types.ts";
 
+/** How often to poll GitHub for changes (30 seconds) */
+const POLL_INTERVAL_MS = 30_000;
+/** How long a full listing is trusted before issues are listed again (1 hour) */
+const FULL_SYNC_INTERVAL_MS = 60 * 60 * 1000;
+/** Full listings retried when issues leave the listing while it is paginated */
+const MAX_LISTING_ATTEMPTS = 3;
+const DEFAULT_API_URL = "https://api.github.com";
+const PER_PAGE = 100;
+const DEFAULT_CACHE_DIR = ".ralphy/github";
+const CACHE_VERSION = 1;
+const ISSUES_ROUTE = "GET /repos/{owner}/{repo}/issues";
+const SEARCH_ROUTE = "GET /search/issues";
+
+/**
+ * Issue fields returned by the REST API that we use
+ */
+interface GitHubIssue {
+	number: number;
+	title: string;
+	body?: string | null;
+	state: string;
+	updated_at: string;
+	labels: Array<string | { name?: string }>;
+}
+
+interface CachedIssue {
+	number: number;
+	title: string;
+	body?: string;
+}
+
+/**
+ * On-disk issue cache, one file per repo and label
+ */
+interface GitHubCacheFile {
+	version: number;
+	/** Open issues, newest first */
+	issues: CachedIssue[];
+	/** Incremental syncs list issues updated since this time */
+	since: string | null;
+	/** When the open issues were last listed in full (Unix ms) */
+	listedAt: number;
+	/** ETag of the last incremental listing (the URL stays the same until `since` moves) */
+	etag: string | null;
+	closedCount: number | null;
+	closedCountEtag: string | null;
+}
+
+export interface GitHubTaskSourceOptions {
+	/** Directory for the on-disk issue cache (default: .ralphy/github) */
+	cacheDir?: string;
+	/** REST API base URL, e.g. GitHub Enterprise or a local stub (default: GITHUB_API_URL) */
+	baseUrl?: string;
+	/** Minimum time between polls for changes (default: 30s) */
+	pollIntervalMs?: number;
+	/** Maximum age of the last full listing before issues are listed again (default: 1h) */
+	fullSyncIntervalMs?: number;
+}
+
 /**
- * Cached GitHub issues data
+ * GitHub API usage of a task source
  */
-interface GitHubCache {
-	openIssues: Task[];
-	closedCount: number;
-	lastFetched: number;
+export interface GitHubSyncStats {
+	/** Requests sent */
+	requests: number;
+	/** Conditional requests answered with 304 Not Modified (free against the rate limit) */
+	notModified: number;
+	/** Requests avoided compared to re-listing all open and closed issues on every poll */
+	requestsSaved: number;
+	/** Remaining core rate limit, from the last response */
+	rateLimitRemaining?: number;
+}
+
+type ResponseHeaders = Record<string, string | number | undefined>;
+
+function pageCount(items: number): number {
+	return Math.max(1, Math.ceil(items / PER_PAGE));
 }
 
-/** Cache TTL in milliseconds (30 seconds) */
-const CACHE_TTL_MS = 30_000;
+function toCachedIssue(issue: GitHubIssue): CachedIssue {
+	return { number: issue.number, title: issue.title, body: issue.body || undefined };
+}
 
 /**
  * GitHub Issues task source - reads tasks from GitHub issues
  *
- * Performance optimized: caches issue data to avoid redundant API calls.
- * Cache is invalidated after TTL or when markComplete() is called.
+ * Performance optimized: open issues are kept in an on-disk cache under .ralphy/.
+ * Polls are incremental (`since=`) conditional requests (`If-None-Match`), closing
+ * an issue patches the cache instead of re-listing, and the completed count comes
+ * from the search API's `total_count`.
  */
 export class GitHubTaskSource implements TaskSource {
 	type = "github" as const;
@@ -25,9 +102,17 @@ export class GitHubTaskSource implements TaskSource {
 	private owner: string;
 	private repo: string;
 	private label?: string;
-	private cache: GitHubCache | null = null;
+	private cachePath: string;
+	private pollIntervalMs: number;
+	private fullSyncIntervalMs: number;
+	private cache: GitHubCacheFile | null = null;
+	private lastPolled = 0;
+	/** Issues we closed, so their updates don't mark the closed count stale */
+	private closedByUs = new Set<number>();
+	private closedCountStale = false;
+	private stats: GitHubSyncStats = { requests: 0, notModified: 0, requestsSaved: 0 };
 
-	constructor(repoPath: string, label?: string) {
+	constructor(repoPath: string, label?: string, options: GitHubTaskSourceOptions = {}) {
 		// Parse owner/repo format
 		const [owner, repo] = repoPath.split("/");
 		if (!owner || !repo) {
@@ -37,59 +122,275 @@ export class GitHubTaskSource implements TaskSource {
 		this.owner = owner;
 		this.repo = repo;
 		this.label = label;
+		this.pollIntervalMs = options.pollIntervalMs ?? POLL_INTERVAL_MS;
+		this.fullSyncIntervalMs = options.fullSyncIntervalMs ?? FULL_SYNC_INTERVAL_MS;
+
+		// One cache per API host, so github.com and GHE repos with the same name don't collide
+		const baseUrl = options.baseUrl ?? process.env.GITHUB_API_URL;
+		const host = new URL(baseUrl || DEFAULT_API_URL).host;
+		const cacheName = [host, owner, repo, label].filter(Boolean).join("-").replace(/[^\w.-]/g, "_");
+		this.cachePath = join(options.cacheDir ?? DEFAULT_CACHE_DIR, `${cacheName}.json`);
 
 		// Use GITHUB_TOKEN from environment
 		this.octokit = new Octokit({
 			auth: process.env.GITHUB_TOKEN,
+			...(baseUrl ? { baseUrl } : {}),
 		});
 	}
 
 	/**
-	 * Check if cache is still valid
+	 * API usage so far
 	 */
-	private isCacheValid(): boolean {
-		if (!this.cache) return false;
-		return Date.now() - this.cache.lastFetched < CACHE_TTL_MS;
+	getSyncStats(): GitHubSyncStats {
+		return { ...this.stats };
+	}
+
+	private loadCache(): GitHubCacheFile | null {
+		if (this.cache) return this.cache;
+		if (!existsSync(this.cachePath)) return null;
+
+		try {
+			const cache = JSON.parse(readFileSync(this.cachePath, "utf-8")) as GitHubCacheFile;
+			if (cache.version === CACHE_VERSION) {
+				this.cache = cache;
+			}
+		} catch {
+			// Corrupt cache, start over with a full sync
+		}
+		return this.cache;
+	}
+
+	private saveCache(cache: GitHubCacheFile): void {
+		mkdirSync(join(this.cachePath, ".."), { recursive: true });
+		const tmpPath = `${this.cachePath}.${process.pid}.tmp`;
+		writeFileSync(tmpPath, JSON.stringify(cache), "utf-8");
+		renameSync(tmpPath, this.cachePath);
+	}
+
+	private recordRateLimit(headers: ResponseHeaders | undefined): void {
+		const remaining = headers?.["x-ratelimit-remaining"];
+		if (remaining !== undefined) {
+			this.stats.rateLimitRemaining = Number(remaining);
+		}
 	}
 
 	/**
-	 * Invalidate the cache
+	 * Send a GET request, conditional when an ETag is given.
+	 * Returns null on 304 Not Modified.
 	 */
-	private invalidateCache(): void {
-		this.cache = null;
+	private async get<T>(
+		route: string,
+		params: Record<string, unknown>,
+		etag?: string | null,
+	): Promise<{ data: T; headers: ResponseHeaders } | null> {
+		this.stats.requests++;
+		return withSpan("github.request", { route, conditional: Boolean(etag) }, async (span) => {
+			try {
+				const response = await this.octokit.request(route, {
+					...params,
+					headers: etag ? { "if-none-match": etag } : {},
+				});
+				this.recordRateLimit(response.headers);
+				return { data: response.data as T, headers: response.headers };
+			} catch (error) {
+				const { status, response } = error as {
+					status?: number;
+					response?: { headers?: ResponseHeaders };
+				};
+				if (status === 304) {
+					span.setAttribute("notModified", true);
+					this.stats.notModified++;
+					this.recordRateLimit(response?.headers);
+					return null;
+				}
+				throw error;
+			}
+		});
+	}
+
+	private matchesLabel(issue: GitHubIssue): boolean {
+		if (!this.label) return true;
+		return issue.labels.some((l) => (typeof l === "string" ? l : l.name) === this.label);
 	}
 
 	/**
-	 * Fetch and cache open issues
+	 * List all open issues. `since` is taken from the server clock before listing,
+	 * so changes made while paginating show up in the next incremental sync.
+	 *
+	 * Issues opened while paginating can show up twice and are deduplicated.
+	 * Issues closed while paginating shift later pages and can hide an unchanged
+	 * open issue, so a multi-page listing is repeated when that happened.
 	 */
-	private async fetchOpenIssues(): Promise<Task[]> {
-		if (this.isCacheValid() && this.cache) {
-			return this.cache.openIssues;
+	private async fullSync(): Promise<GitHubCacheFile> {
+		for (let attempt = 1; ; attempt++) {
+			const { issues, since, pages } = await this.listOpenIssues();
+			const retry =
+				pages > 1 && attempt < MAX_LISTING_ATTEMPTS && (await this.issuesLeftSince(since));
+			if (retry) {
+				logDebug("GitHub: issues closed while listing, listing again");
+				continue;
+			}
+
+			logDebug(`GitHub: listed ${issues.length} open issue(s) in ${this.owner}/${this.repo}`);
+			return {
+				version: CACHE_VERSION,
+				issues,
+				since,
+				listedAt: Date.now(),
+				etag: null,
+				closedCount: this.cache?.closedCount ?? null,
+				closedCountEtag: this.cache?.closedCountEtag ?? null,
+			};
 		}
+	}
+
+	private async listOpenIssues(): Promise<{
+		issues: CachedIssue[];
+		since: string | null;
+		pages: number;
+	}> {
+		const issues = new Map<number, CachedIssue>();
+		let since: string | null = null;
+		let pages = 0;
+
+		for (let page = 1; ; page++) {
+			const response = await this.get<GitHubIssue[]>(ISSUES_ROUTE, {
+				owner: this.owner,
+				repo: this.repo,
+				state: "open",
+				labels: this.label,
+				per_page: PER_PAGE,
+				page,
+			});
+			if (!response) break;
+			pages = page;
+
+			if (page === 1) {
+				const date = response.headers.date;
+				since = (date ? new Date(String(date)) : new Date()).toISOString();
+			}
+			for (const issue of response.data) {
+				issues.set(issue.number, toCachedIssue(issue));
+			}
+			if (response.data.length < PER_PAGE) break;
+		}
+
+		const sorted = [...issues.values()].sort((a, b) => b.number - a.number);
+		return { issues: sorted, since, pages };
+	}
 
-		const issues = await this.octokit.paginate(this.octokit.issues.listForRepo, {
+	/**
+	 * Whether any issue was closed or lost the label since the given time
+	 */
+	private async issuesLeftSince(since: string | null): Promise<boolean> {
+		if (!since) return false;
+		const response = await this.get<GitHubIssue[]>(ISSUES_ROUTE, {
 			owner: this.owner,
 			repo: this.repo,
-			state: "open",
-			labels: this.label,
-			per_page: 100,
+			state: "all",
+			since,
+			per_page: PER_PAGE,
 		});
+		return (response?.data ?? []).some(
+			(issue) => issue.state !== "open" || !this.matchesLabel(issue),
+		);
+	}
+
+	/**
+	 * Apply issues updated since the last sync to the cache.
+	 * Unchanged repos answer with 304 and cost nothing against the rate limit.
+	 */
+	private async incrementalSync(cache: GitHubCacheFile): Promise<void> {
+		const params = {
+			owner: this.owner,
+			repo: this.repo,
+			state: "all",
+			since: cache.since,
+			sort: "updated",
+			direction: "asc",
+			per_page: PER_PAGE,
+		};
+		const requestsBefore = this.stats.requests - this.stats.notModified;
+
+		const first = await this.get<GitHubIssue[]>(ISSUES_ROUTE, { ...params, page: 1 }, cache.etag);
+		if (first) {
+			const updated = [...first.data];
+			let last = first.data;
+			for (let page = 2; last.length === PER_PAGE; page++) {
+				const response = await this.get<GitHubIssue[]>(ISSUES_ROUTE, { ...params, page });
+				last = response?.data ?? [];
+				updated.push(...last);
+			}
+
+			const open = new Map(cache.issues.map((issue) => [issue.number, issue]));
+			let since = cache.since;
+			for (const issue of updated) {
+				const wasOpen = open.delete(issue.number);
+				const isOpen = issue.state === "open" && this.matchesLabel(issue);
+				if (isOpen) {
+					open.set(issue.number, toCachedIssue(issue));
+				}
+				// Issues opened and closed between two polls were never cached as open,
+				// so any closed issue we didn't close ourselves may change the count
+				const ownClose = issue.state === "closed" && this.closedByUs.has(issue.number);
+				if ((wasOpen !== isOpen || issue.state === "closed") && !ownClose) {
+					this.closedCountStale = true;
+				}
+				if (!since || issue.updated_at > since) {
+					since = issue.updated_at;
+				}
+			}
+
+			cache.issues = [...open.values()].sort((a, b) => b.number - a.number);
+			// Same `since` means the same URL next time, so its ETag stays usable
+			cache.etag = since === cache.since ? String(first.headers.etag ?? "") || null : null;
+			cache.since = since;
+			this.saveCache(cache);
+		}
+
+		const used = this.stats.requests - this.stats.notModified - requestsBefore;
+		this.stats.requestsSaved += pageCount(cache.issues.length) - used;
+	}
+
+	/**
+	 * Bring the cache up to date, polling at most once per poll interval
+	 */
+	private async sync(): Promise<GitHubCacheFile> {
+		const cached = this.loadCache();
+		if (cached && Date.now() - this.lastPolled < this.pollIntervalMs) {
+			return cached;
+		}
+
+		// Revalidate with a full listing now and then, in case an incremental sync missed something
+		const listingExpired =
+			!cached?.listedAt || Date.now() - cached.listedAt >= this.fullSyncIntervalMs;
 
-		const tasks = issues.map((issue) => ({
+		let cache: GitHubCacheFile;
+		if (cached?.since && !listingExpired) {
+			cache = cached;
+			await withSpan("github.sync", { mode: "incremental" }, () => this.incrementalSync(cached));
+		} else {
+			cache = await withSpan("github.sync", { mode: "full" }, () => this.fullSync());
+			this.saveCache(cache);
+			// Revalidate the closed count too (a conditional request, free if unchanged)
+			if (cached) {
+				this.closedCountStale = true;
+			}
+		}
+
+		this.cache = cache;
+		this.lastPolled = Date.now();
+		return cache;
+	}
+
+	private async fetchOpenIssues(): Promise<Task[]> {
+		const cache = await this.sync();
+		return cache.issues.map((issue) => ({
 			id: `${issue.number}:${issue.title}`,
 			title: issue.title,
-			body: issue.body || undefined,
+			body: issue.body,
 			completed: false,
 		}));
-
-		// Update cache (preserve closed count if we have it)
-		this.cache = {
-			openIssues: tasks,
-			closedCount: this.cache?.closedCount ?? -1,
-			lastFetched: Date.now(),
-		};
-
-		return tasks;
 	}
 
 	async getAllTasks(): Promise<Task[]> {
@@ -109,43 +410,61 @@ export class GitHubTaskSource implements TaskSource {
 			throw new Error(`Invalid issue ID: ${id}`);
 		}
 
-		await this.octokit.issues.update({
+		this.stats.requests++;
+		const response = await this.octokit.issues.update({
 			owner: this.owner,
 			repo: this.repo,
 			issue_number: issueNumber,
 			state: "closed",
 		});
+		this.recordRateLimit(response.headers);
 
-		// Invalidate cache after modification
-		this.invalidateCache();
+		// Patch the cached issue instead of re-listing everything
+		this.closedByUs.add(issueNumber);
+		const cache = this.loadCache();
+		if (cache) {
+			const before = cache.issues.length;
+			cache.issues = cache.issues.filter((issue) => issue.number !== issueNumber);
+			if (cache.issues.length < before && cache.closedCount !== null) {
+				cache.closedCount++;
+				// The stored ETag describes the count before our change
+				cache.closedCountEtag = null;
+			}
+			this.stats.requestsSaved += pageCount(cache.issues.length);
+			this.saveCache(cache);
+		}
 	}
 
 	async countRemaining(): Promise<number> {
-		const tasks = await this.fetchOpenIssues();
-		return tasks.length;
+		const cache = await this.sync();
+		return cache.issues.length;
 	}
 
 	async countCompleted(): Promise<number> {
-		// Check if we have a recent closed count
-		if (this.isCacheValid() && this.cache && this.cache.closedCount >= 0) {
-			return this.cache.closedCount;
+		const cache = await this.sync();
+		if (cache.closedCount !== null && !this.closedCountStale) {
+			return cache.closedCount;
 		}
 
-		const issues = await this.octokit.paginate(this.octokit.issues.listForRepo, {
-			owner: this.owner,
-			repo: this.repo,
-			state: "closed",
-			labels: this.label,
-			per_page: 100,
-		});
-
-		const closedCount = issues.length;
-
-		// Update cache with closed count
-		if (this.cache) {
-			this.cache.closedCount = closedCount;
+		const query = [`repo:${this.owner}/${this.repo}`, "is:closed"];
+		if (this.label) {
+			query.push(`label:"${this.label}"`);
+		}
+		const response = await this.get<{ total_count: number }>(
+			SEARCH_ROUTE,
+			{ q: query.join(" "), per_page: 1 },
+			cache.closedCountEtag,
+		);
+		if (response) {
+			cache.closedCount = response.data.total_count;
+			cache.closedCountEtag = String(response.headers.etag ?? "") || null;
+			this.saveCache(cache);
 		}
+		this.closedCountStale = false;
 
+		const closedCount = cache.closedCount ?? 0;
+		// Listing closed issues would take one request per page
+		this.stats.requestsSaved += pageCount(closedCount) - (response ? 1 : 0);
 		return closedCount;
 	}
 
@@ -159,6 +478,12 @@ export class GitHubTaskSource implements TaskSource {
 			return "";
 		}
 
+		const cached = this.loadCache()?.issues.find((issue) => issue.number === issueNumber);
+		if (cached) {
+			return cached.body || "";
+		}
+
+		this.stats.requests++;
 		const issue = await this.octokit.issues.get({
 			owner: this.owner,
 			repo: this.repo,
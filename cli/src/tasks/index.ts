@@ -5,6 +5,7 @@ export * from "./yaml.ts";
 export * from "./json.ts";
 export * from "./github.ts";
 export * from "./cached-task-source.ts";
+export * from "./task-index.ts";
 
 import { GitHubTaskSource } from "./github.ts";
 import { JsonTaskSource } from "./json.ts";
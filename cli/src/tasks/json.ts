@@ -1,120 +1,116 @@
 import { readFileSync, writeFileSync } from "node:fs";
+import {
+	type StructuredTask,
+	type StructuredTaskFile,
+	buildStructuredTaskFile,
+	completeStructuredTask,
+} from "./structured-tasks.ts";
+import { TaskFileIndex, type TaskQueue } from "./task-index.ts";
 import type { Task, TaskSource } from "./types.ts";
 
-interface JsonTask {
-	title: string;
-	completed?: boolean;
-	parallel_group?: number;
-	description?: string;
-}
-
 interface JsonTaskFile {
 	name?: string;
 	description?: string;
-	tasks: JsonTask[];
+	tasks: StructuredTask[];
 }
 
+function readJsonTaskFile(filePath: string): { content: string; data: JsonTaskFile } {
+	try {
+		const content = readFileSync(filePath, "utf-8");
+		return { content, data: JSON.parse(content) as JsonTaskFile };
+	} catch (error) {
+		throw new Error(
+			`Failed to read JSON task file: ${error instanceof Error ? error.message : String(error)}`,
+		);
+	}
+}
+
+/**
+ * Parse and validate a JSON task file
+ */
+function parseJsonTaskFile(filePath: string): StructuredTaskFile {
+	const { content, data } = readJsonTaskFile(filePath);
+	if (!data.tasks || !Array.isArray(data.tasks)) {
+		throw new Error("Invalid JSON task file: 'tasks' array is required");
+	}
+	const titles = new Set<string>();
+	for (const task of data.tasks) {
+		if (titles.has(task.title)) {
+			throw new Error(`Duplicate JSON task title: ${task.title}`);
+		}
+		titles.add(task.title);
+	}
+	return buildStructuredTaskFile(content, data.tasks);
+}
+
+/**
+ * JSON task source. The file is reparsed only when its mtime or size changes;
+ * completions edit the task's `completed` field in place.
+ */
 export class JsonTaskSource implements TaskSource {
 	type = "json" as const;
 	private filePath: string;
+	private index = new TaskFileIndex(parseJsonTaskFile);
 
 	constructor(filePath: string) {
 		this.filePath = filePath;
 	}
 
-	private readFile(): JsonTaskFile {
+	private writeFile(content: string): void {
 		try {
-			const content = readFileSync(this.filePath, "utf-8");
-			return JSON.parse(content) as JsonTaskFile;
+			writeFileSync(this.filePath, content, "utf-8");
 		} catch (error) {
 			throw new Error(
-				`Failed to read JSON task file: ${error instanceof Error ? error.message : String(error)}`,
+				`Failed to write JSON task file: ${error instanceof Error ? error.message : String(error)}`,
 			);
 		}
 	}
 
-	private writeFile(data: JsonTaskFile): void {
-		try {
-			writeFileSync(this.filePath, JSON.stringify(data, null, 2), "utf-8");
-		} catch (error) {
-			throw new Error(
-				`Failed to write JSON task file: ${error instanceof Error ? error.message : String(error)}`,
-			);
-		}
+	private getQueue(): TaskQueue {
+		return this.index.refresh([this.filePath]);
 	}
 
 	async getAllTasks(): Promise<Task[]> {
-		const data = this.readFile();
-		if (!data.tasks || !Array.isArray(data.tasks)) {
-			throw new Error("Invalid JSON task file: 'tasks' array is required");
-		}
-		const titles = new Set<string>();
-		for (const task of data.tasks) {
-			if (titles.has(task.title)) {
-				throw new Error(`Duplicate JSON task title: ${task.title}`);
-			}
-			titles.add(task.title);
-		}
-		return data.tasks
-			.filter((task) => !task.completed)
-			.map((task) => ({
-				id: task.title,
-				title: task.title,
-				body: task.description,
-				parallelGroup: task.parallel_group,
-				completed: false,
-			}));
+		return this.getQueue().toArray();
 	}
 
 	async getNextTask(): Promise<Task | null> {
-		const tasks = await this.getAllTasks();
-		return tasks[0] || null;
+		return this.getQueue().peek();
 	}
 
 	async markComplete(id: string): Promise<void> {
-		const data = this.readFile();
+		this.getQueue();
+		const file = this.index.getFile(this.filePath);
+		const write = (content: string) => this.writeFile(content);
+		if (file && completeStructuredTask(this.filePath, file, id, "json", write)) {
+			this.index.markDone(this.filePath, id);
+			return;
+		}
+
+		// Couldn't edit in place, rewrite the document
+		const { data } = readJsonTaskFile(this.filePath);
 		const task = data.tasks?.find((item) => item.title === id);
 		if (task) {
 			task.completed = true;
-			this.writeFile(data);
+			this.writeFile(JSON.stringify(data, null, 2));
+			this.index.invalidate();
 		}
 	}
 
 	async countRemaining(): Promise<number> {
-		const data = this.readFile();
-		if (!data.tasks || !Array.isArray(data.tasks)) {
-			throw new Error("Invalid JSON task file: 'tasks' array is required");
-		}
-		return data.tasks.filter((task) => !task.completed).length;
+		return this.getQueue().remainingCount;
 	}
 
 	async countCompleted(): Promise<number> {
-		const data = this.readFile();
-		if (!data.tasks || !Array.isArray(data.tasks)) {
-			throw new Error("Invalid JSON task file: 'tasks' array is required");
-		}
-		return data.tasks.filter((task) => task.completed).length;
+		return this.getQueue().completedCount;
 	}
 
 	async getTasksInGroup(group: number): Promise<Task[]> {
-		const data = this.readFile();
-		if (!data.tasks || !Array.isArray(data.tasks)) {
-			throw new Error("Invalid JSON task file: 'tasks' array is required");
-		}
-		return data.tasks
-			.filter((task) => !task.completed && (task.parallel_group || 0) === group)
-			.map((task) => ({
-				id: task.title,
-				title: task.title,
-				body: task.description,
-				parallelGroup: task.parallel_group,
-				completed: false,
-			}));
+		return this.getQueue().inGroup(group);
 	}
 
 	async getParallelGroup(title: string): Promise<number> {
-		const data = this.readFile();
-		const task = data.tasks?.find((item) => item.title === title);
-		return task?.parallel_group || 0;
+		this.getQueue();
+		return this.index.getFile(this.filePath)?.groups.get(title) || 0;
 	}
 }
@@ -1,6 +1,17 @@
-import { readFileSync, statSync, writeFileSync } from "node:fs";
+import { readFileSync, writeFileSync } from "node:fs";
+import {
+	type ParsedTaskFile,
+	TaskFileIndex,
+	type TaskQueue,
+	patchFileInPlace,
+} from "./task-index.ts";
 import type { Task, TaskSource } from "./types.ts";
 
+const LF = 0x0a;
+const CR = 0x0d;
+const INCOMPLETE_PREFIX = "- [ ] ";
+const COMPLETE_PREFIX = "- [x] ";
+
 /**
  * Read file content and normalize line endings to Unix format
  */
@@ -9,138 +20,127 @@ function readFileNormalized(filePath: string): string {
 }
 
 /**
- * Cached file content with task counts for performance
+ * Checkbox tasks parsed from a markdown file
+ */
+export interface MarkdownTaskFile extends ParsedTaskFile {
+	/** Byte offset of each incomplete task's line */
+	offsets: Map<string, number>;
+}
+
+/**
+ * Parse "- [ ] Task" / "- [x] Task" lines of a markdown file.
+ * Works on the raw bytes so offsets point into the file as stored (CRLF included).
  */
-interface CachedContent {
-	content: string;
-	lines: string[];
-	incompleteTasks: Task[];
-	remainingCount: number;
-	completedCount: number;
-	fileMtime: number;
+export function parseMarkdownTasks(
+	filePath: string,
+	createId: (lineNumber: number) => string,
+): MarkdownTaskFile {
+	const buffer = readFileSync(filePath);
+	const tasks: Task[] = [];
+	const offsets = new Map<string, number>();
+	let completedCount = 0;
+	let lineNumber = 0;
+	let start = 0;
+
+	while (start <= buffer.length) {
+		let end = start;
+		while (end < buffer.length && buffer[end] !== LF && buffer[end] !== CR) {
+			end++;
+		}
+		lineNumber++;
+		const line = buffer.toString("utf-8", start, end);
+
+		// Match incomplete tasks
+		const incompleteMatch = line.match(/^- \[ \] (.+)$/);
+		if (incompleteMatch) {
+			const id = createId(lineNumber);
+			tasks.push({ id, title: incompleteMatch[1].trim(), completed: false });
+			offsets.set(id, start);
+		}
+
+		// Match completed tasks
+		if (/^- \[x\] /i.test(line)) {
+			completedCount++;
+		}
+
+		if (end >= buffer.length) break;
+		start = end + (buffer[end] === CR && buffer[end + 1] === LF ? 2 : 1);
+	}
+
+	return { tasks, completedCount, offsets };
+}
+
+/**
+ * Tick a task's checkbox, in place when possible.
+ * Falls back to rewriting the file if it changed since it was indexed.
+ */
+export function completeMarkdownTask(
+	filePath: string,
+	lineNumber: number,
+	offset: number | undefined,
+): boolean {
+	if (
+		offset !== undefined &&
+		patchFileInPlace(filePath, offset, INCOMPLETE_PREFIX, COMPLETE_PREFIX)
+	) {
+		return true;
+	}
+
+	const lines = readFileNormalized(filePath).split("\n");
+	const lineIndex = lineNumber - 1;
+	if (lineIndex >= 0 && lineIndex < lines.length) {
+		// Replace "- [ ]" with "- [x]"
+		lines[lineIndex] = lines[lineIndex].replace(/^- \[ \] /, COMPLETE_PREFIX);
+		writeFileSync(filePath, lines.join("\n"), "utf-8");
+	}
+	return false;
 }
 
 /**
  * Markdown task source - reads tasks from markdown files with checkbox format
  * Format: "- [ ] Task description" (incomplete) or "- [x] Task description" (complete)
  *
- * Performance optimized: caches file content and task counts to avoid redundant reads.
+ * Performance optimized: the file is reparsed only when its mtime or size changes,
+ * and completions flip the checkbox in place.
  */
 export class MarkdownTaskSource implements TaskSource {
 	type = "markdown" as const;
 	private filePath: string;
-	private cache: CachedContent | null = null;
+	private index = new TaskFileIndex((path) =>
+		parseMarkdownTasks(path, (lineNumber) => String(lineNumber)),
+	);
 
 	constructor(filePath: string) {
 		this.filePath = filePath;
 	}
 
-	/**
-	 * Get the file's modification time
-	 */
-	private getFileMtime(): number {
-		try {
-			return statSync(this.filePath).mtimeMs;
-		} catch {
-			return 0;
-		}
-	}
-
-	/**
-	 * Load and cache file content with parsed task data
-	 */
-	private loadCache(): CachedContent {
-		const fileMtime = this.getFileMtime();
-		const content = readFileNormalized(this.filePath);
-		const lines = content.split("\n");
-		const incompleteTasks: Task[] = [];
-		let remainingCount = 0;
-		let completedCount = 0;
-
-		for (let i = 0; i < lines.length; i++) {
-			const line = lines[i];
-
-			// Match incomplete tasks
-			const incompleteMatch = line.match(/^- \[ \] (.+)$/);
-			if (incompleteMatch) {
-				incompleteTasks.push({
-					id: String(i + 1), // Line number as ID
-					title: incompleteMatch[1].trim(),
-					completed: false,
-				});
-				remainingCount++;
-			}
-
-			// Match completed tasks
-			if (/^- \[x\] /i.test(line)) {
-				completedCount++;
-			}
-		}
-
-		this.cache = {
-			content,
-			lines,
-			incompleteTasks,
-			remainingCount,
-			completedCount,
-			fileMtime,
-		};
-
-		return this.cache;
-	}
-
-	/**
-	 * Get cached content or load fresh if file was modified externally
-	 */
-	private getCache(): CachedContent {
-		if (!this.cache) {
-			return this.loadCache();
-		}
-		// Check if file was modified externally
-		const currentMtime = this.getFileMtime();
-		if (currentMtime !== this.cache.fileMtime) {
-			return this.loadCache();
-		}
-		return this.cache;
-	}
-
-	/**
-	 * Invalidate cache (call after file modifications)
-	 */
-	private invalidateCache(): void {
-		this.cache = null;
+	private getQueue(): TaskQueue {
+		return this.index.refresh([this.filePath]);
 	}
 
 	async getAllTasks(): Promise<Task[]> {
-		return [...this.getCache().incompleteTasks];
+		return this.getQueue().toArray();
 	}
 
 	async getNextTask(): Promise<Task | null> {
-		const cache = this.getCache();
-		return cache.incompleteTasks[0] || null;
+		return this.getQueue().peek();
 	}
 
 	async markComplete(id: string): Promise<void> {
-		// Force fresh read for modification to avoid stale data
-		this.invalidateCache();
-		const content = readFileNormalized(this.filePath);
-		const lines = content.split("\n");
-		const lineNumber = Number.parseInt(id, 10) - 1;
-
-		if (lineNumber >= 0 && lineNumber < lines.length) {
-			// Replace "- [ ]" with "- [x]"
-			lines[lineNumber] = lines[lineNumber].replace(/^- \[ \] /, "- [x] ");
-			writeFileSync(this.filePath, lines.join("\n"), "utf-8");
-			// Invalidate cache after modification
-			this.invalidateCache();
+		this.getQueue();
+		const offset = this.index.getFile(this.filePath)?.offsets.get(id);
+		if (completeMarkdownTask(this.filePath, Number.parseInt(id, 10), offset)) {
+			this.index.markDone(this.filePath, id);
+		} else {
+			this.index.invalidate();
 		}
 	}
 
 	async countRemaining(): Promise<number> {
-		return this.getCache().remainingCount;
+		return this.getQueue().remainingCount;
 	}
 
 	async countCompleted(): Promise<number> {
-		return this.getCache().completedCount;
+		return this.getQueue().completedCount;
 	}
 }
@@ -0,0 +1,161 @@
+import { type Document, isMap, isScalar, isSeq, parseDocument } from "yaml";
+import { type ParsedTaskFile, patchFileInPlace } from "./task-index.ts";
+import type { Task } from "./types.ts";
+
+/**
+ * A task entry in a YAML or JSON task file
+ */
+export interface StructuredTask {
+	title: string;
+	completed?: boolean;
+	parallel_group?: number;
+	description?: string;
+}
+
+/**
+ * Parsed YAML/JSON task file, kept in memory for in-place completion edits
+ */
+export interface StructuredTaskFile extends ParsedTaskFile {
+	content: string;
+	/** Index in the tasks array of the first task with each title */
+	positions: Map<string, number>;
+	/** Parallel group of the first task with each title */
+	groups: Map<string, number>;
+	/** Document with source ranges, parsed on the first in-place edit (null if unusable) */
+	document?: Document | null;
+	/** Edits applied to content since the document was parsed, in order */
+	edits: Array<{ at: number; delta: number }>;
+	/** Tasks already completed in place */
+	edited: Set<number>;
+}
+
+export function buildStructuredTaskFile(
+	content: string,
+	items: StructuredTask[],
+): StructuredTaskFile {
+	const tasks: Task[] = [];
+	const positions = new Map<string, number>();
+	const groups = new Map<string, number>();
+	let completedCount = 0;
+
+	for (const [index, item] of items.entries()) {
+		if (!positions.has(item.title)) {
+			positions.set(item.title, index);
+			groups.set(item.title, item.parallel_group || 0);
+		}
+
+		if (item.completed) {
+			completedCount++;
+			continue;
+		}
+		tasks.push({
+			id: item.title,
+			title: item.title,
+			body: item.description,
+			parallelGroup: item.parallel_group,
+			completed: false,
+		});
+	}
+
+	return { tasks, completedCount, content, positions, groups, edits: [], edited: new Set() };
+}
+
+/**
+ * Map a position in the parsed document to the current content
+ */
+function shift(file: StructuredTaskFile, position: number): number {
+	let result = position;
+	for (const edit of file.edits) {
+		if (result >= edit.at) {
+			result += edit.delta;
+		}
+	}
+	return result;
+}
+
+function splice(file: StructuredTaskFile, at: number, end: number, text: string): void {
+	file.content = file.content.slice(0, at) + text + file.content.slice(end);
+	file.edits.push({ at: end, delta: text.length - (end - at) });
+}
+
+/**
+ * Set `completed: true` on a task by editing only its lines, keeping the rest of
+ * the file (formatting, comments, key order) untouched.
+ *
+ * An existing `completed: false` is overwritten on disk as `true ` (padded to the
+ * same byte length) without rewriting the file. Any other edit changes the file
+ * size, so the edited content is passed to write and the whole file is rewritten.
+ *
+ * Returns false if the task can't be located this way (or the file changed since
+ * it was parsed) and the caller should fall back to rewriting the document.
+ */
+export function completeStructuredTask(
+	filePath: string,
+	file: StructuredTaskFile,
+	title: string,
+	format: "yaml" | "json",
+	write: (content: string) => void,
+): boolean {
+	const index = file.positions.get(title);
+	if (index === undefined) return false;
+	if (file.edited.has(index)) return true;
+
+	if (file.document === undefined) {
+		const document = parseDocument(file.content);
+		file.document = document.errors.length === 0 ? document : null;
+	}
+	const tasks = file.document?.get("tasks", true);
+	const item = isSeq(tasks) ? tasks.items[index] : undefined;
+	if (!isMap(item)) return false;
+
+	// Existing field: replace its value
+	const completed = item.get("completed", true);
+	if (isScalar(completed) && completed.range && completed.range[1] > completed.range[0]) {
+		const start = shift(file, completed.range[0]);
+		const end = shift(file, completed.range[1]);
+		if (file.content.slice(start, end) === "false") {
+			const offset = Buffer.byteLength(file.content.slice(0, start), "utf-8");
+			if (!patchFileInPlace(filePath, offset, "false", "true ")) return false;
+			splice(file, start, end, "true ");
+		} else {
+			splice(file, start, end, "true");
+			write(file.content);
+		}
+		file.edited.add(index);
+		return true;
+	}
+	if (item.has("completed")) return false;
+
+	// Missing field: add it next to the title
+	const titlePair = item.items.find((pair) => isScalar(pair.key) && pair.key.value === "title");
+	const key = titlePair?.key;
+	const value = titlePair?.value;
+	if (!isScalar(key) || !key.range || !isScalar(value) || !value.range) return false;
+
+	const keyStart = shift(file, key.range[0]);
+	const valueEnd = shift(file, value.range[1]);
+	if (file.content.slice(keyStart, valueEnd).includes("\n")) return false;
+
+	const lineStart = file.content.lastIndexOf("\n", keyStart - 1) + 1;
+	const prefix = file.content.slice(lineStart, keyStart);
+	const field = format === "json" ? '"completed": true' : "completed: true";
+
+	if (item.flow) {
+		// { "title": "x", ... } - insert after the title value
+		const text = prefix.trim() === "" ? `,\n${prefix}${field}` : `, ${field}`;
+		splice(file, valueEnd, valueEnd, text);
+	} else {
+		// Block mapping - new line after the title, aligned with the title key
+		const lineEnd = file.content.indexOf("\n", valueEnd);
+		const indent = " ".repeat(prefix.length);
+		if (lineEnd === -1) {
+			splice(file, file.content.length, file.content.length, `\n${indent}${field}`);
+		} else {
+			splice(file, lineEnd + 1, lineEnd + 1, `${indent}${field}\n`);
+		}
+	}
+
+	write(file.content);
+	file.edited.add(index);
+	return true;
+}
@@ -0,0 +1,230 @@
+import { afterEach, beforeEach, describe, expect, it } from "bun:test";
+import { existsSync, mkdirSync, readFileSync, rmSync, statSync, writeFileSync } from "node:fs";
+import { join } from "node:path";
+import { JsonTaskSource } from "./json.ts";
+import { MarkdownFolderTaskSource } from "./markdown-folder.ts";
+import { MarkdownTaskSource } from "./markdown.ts";
+import { TaskFileIndex, TaskQueue } from "./task-index.ts";
+import type { Task } from "./types.ts";
+import { YamlTaskSource } from "./yaml.ts";
+
+function makeTask(id: string, parallelGroup?: number): Task {
+	return { id, title: id, parallelGroup, completed: false };
+}
+
+describe("TaskQueue", () => {
+	it("should keep source order and group buckets through completions", () => {
+		const queue = new TaskQueue([makeTask("a", 1), makeTask("b", 2), makeTask("c", 1)], 4);
+
+		expect(queue.complete("a")?.id).toBe("a");
+		expect(queue.complete("a")).toBeUndefined();
+
+		expect(queue.peek()?.id).toBe("b");
+		expect(queue.toArray().map((t) => t.id)).toEqual(["b", "c"]);
+		expect(queue.inGroup(1).map((t) => t.id)).toEqual(["c"]);
+		expect(queue.remainingCount).toBe(2);
+		expect(queue.completedCount).toBe(5);
+	});
+});
+
+const TEST_DIR = "/tmp/ralphy-task-index-test";
+
+describe("task file sources", () => {
+	beforeEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+		mkdirSync(TEST_DIR, { recursive: true });
+	});
+
+	afterEach(() => {
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true, force: true });
+		}
+	});
+
+	it("should reparse only files whose stamp changed", () => {
+		const a = join(TEST_DIR, "a.md");
+		const b = join(TEST_DIR, "b.md");
+		writeFileSync(a, "- [ ] a1\n");
+		writeFileSync(b, "- [ ] b1\n");
+
+		const parsed: string[] = [];
+		const index = new TaskFileIndex((filePath) => {
+			parsed.push(filePath);
+			return { tasks: [makeTask(filePath)], completedCount: 0 };
+		});
+
+		index.refresh([a, b]);
+		index.refresh([a, b]);
+		writeFileSync(b, "- [ ] b1\n- [ ] b2\n");
+		index.refresh([a, b]);
+
+		expect(parsed).toEqual([a, b, b]);
+	});
+
+	it("should keep the queue once a removed file has been dropped", () => {
+		const a = join(TEST_DIR, "a.md");
+		const b = join(TEST_DIR, "b.md");
+		writeFileSync(a, "- [ ] a1\n");
+		writeFileSync(b, "- [ ] b1\n");
+
+		const index = new TaskFileIndex((filePath) => ({
+			tasks: [makeTask(filePath)],
+			completedCount: 0,
+		}));
+		index.refresh([a, b]);
+
+		const queue = index.refresh([a]);
+		expect(queue.toArray().map((t) => t.id)).toEqual([a]);
+		expect(index.refresh([a])).toBe(queue);
+	});
+
+	it("should tick markdown checkboxes in place", async () => {
+		const filePath = join(TEST_DIR, "PRD.md");
+		writeFileSync(filePath, "# Tasks\r\n- [ ] first\r\n- [ ] second\r\n- [x] done\r\n");
+		const source = new MarkdownTaskSource(filePath);
+
+		const next = await source.getNextTask();
+		expect(next?.id).toBe("2");
+		await source.markComplete("2");
+
+		expect(readFileSync(filePath, "utf-8")).toBe(
+			"# Tasks\r\n- [x] first\r\n- [ ] second\r\n- [x] done\r\n",
+		);
+		expect((await source.getNextTask())?.title).toBe("second");
+		expect(await source.countRemaining()).toBe(1);
+		expect(await source.countCompleted()).toBe(2);
+	});
+
+	it("should pick up external edits to markdown files", async () => {
+		const filePath = join(TEST_DIR, "PRD.md");
+		writeFileSync(filePath, "- [ ] first\n");
+		const source = new MarkdownTaskSource(filePath);
+		expect(await source.countRemaining()).toBe(1);
+
+		writeFileSync(filePath, "- [ ] first\n- [ ] added\n");
+
+		expect((await source.getAllTasks()).map((t) => t.title)).toEqual(["first", "added"]);
+	});
+
+	it("should complete tasks across a markdown folder", async () => {
+		writeFileSync(join(TEST_DIR, "a.md"), "- [ ] a1\n- [ ] a2\n");
+		writeFileSync(join(TEST_DIR, "b.md"), "- [ ] b1\n");
+		const source = new MarkdownFolderTaskSource(TEST_DIR);
+
+		await source.markComplete("a.md:1");
+		await source.markComplete("b.md:1");
+
+		expect((await source.getAllTasks()).map((t) => t.id)).toEqual(["a.md:2"]);
+		expect(await source.countCompleted()).toBe(2);
+		expect(readFileSync(join(TEST_DIR, "b.md"), "utf-8")).toBe("- [x] b1\n");
+	});
+
+	it("should edit YAML tasks in place", async () => {
+		const filePath = join(TEST_DIR, "tasks.yaml");
+		writeFileSync(
+			filePath,
+			[
+				"# Project tasks",
+				"tasks:",
+				"  - title: create auth # first",
+				"    completed: false",
+				"    parallel_group: 1",
+				"  - title: add dashboard",
+				"    parallel_group: 1",
+				"  - { title: write docs, parallel_group: 2 }",
+				"",
+			].join("\n"),
+		);
+		const source = new YamlTaskSource(filePath);
+
+		expect((await source.getTasksInGroup(1)).map((t) => t.id)).toEqual([
+			"create auth",
+			"add dashboard",
+		]);
+		await source.markComplete("create auth");
+		await source.markComplete("add dashboard");
+		await source.markComplete("write docs");
+
+		expect(readFileSync(filePath, "utf-8")).toBe(
+			[
+				"# Project tasks",
+				"tasks:",
+				"  - title: create auth # first",
+				"    completed: true ",
+				"    parallel_group: 1",
+				"  - title: add dashboard",
+				"    completed: true",
+				"    parallel_group: 1",
+				"  - { title: write docs, completed: true, parallel_group: 2 }",
+				"",
+			].join("\n"),
+		);
+		expect(await source.countRemaining()).toBe(0);
+		expect(await new YamlTaskSource(filePath).countCompleted()).toBe(3);
+	});
+
+	it("should reject duplicate YAML task titles", async () => {
+		const filePath = join(TEST_DIR, "tasks.yaml");
+		writeFileSync(filePath, "tasks:\n  - title: deploy\n  - title: deploy\n");
+
+		await expect(new YamlTaskSource(filePath).countRemaining()).rejects.toThrow(
+			"Duplicate YAML task title: deploy",
+		);
+	});
+
+	it("should edit JSON tasks in place", async () => {
+		const filePath = join(TEST_DIR, "PRD.json");
+		const original = {
+			name: "demo",
+			tasks: [
+				{ title: "first", completed: false, parallel_group: 1 },
+				{ title: "second", parallel_group: 1 },
+				{ title: "third" },
+			],
+		};
+		writeFileSync(filePath, JSON.stringify(original, null, 2));
+		const source = new JsonTaskSource(filePath);
+
+		await source.markComplete("second");
+		await source.markComplete("first");
+		await source.markComplete("third");
+
+		const content = readFileSync(filePath, "utf-8");
+		expect(JSON.parse(content)).toEqual({
+			name: "demo",
+			tasks: [
+				{ title: "first", completed: true, parallel_group: 1 },
+				{ title: "second", completed: true, parallel_group: 1 },
+				{ title: "third", completed: true },
+			],
+		});
+		expect(content).toContain('"title": "second",\n      "completed": true,\n');
+		expect(await source.getNextTask()).toBeNull();
+		expect(await source.countCompleted()).toBe(3);
+	});
+
+	it("should patch existing completed flags without changing the file size", async () => {
+		const filePath = join(TEST_DIR, "PRD.json");
+		const content = JSON.stringify(
+			{ tasks: [{ title: "first", completed: false }, { title: "second", completed: false }] },
+			null,
+			2,
+		);
+		writeFileSync(filePath, content);
+		const source = new JsonTaskSource(filePath);
+
+		await source.markComplete("second");
+		await source.markComplete("first");
+
+		const patched = readFileSync(filePath, "utf-8");
+		expect(patched).toBe(content.replaceAll('"completed": false', '"completed": true '));
+		expect(JSON.parse(patched).tasks).toEqual([
+			{ title: "first", completed: true },
+			{ title: "second", completed: true },
+		]);
+		expect(statSync(filePath).size).toBe(Buffer.byteLength(content));
+		expect(await new JsonTaskSource(filePath).countRemaining()).toBe(0);
+	});
+});
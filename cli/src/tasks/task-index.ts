@@ -0,0 +1,241 @@
+import { closeSync, openSync, readSync, statSync, writeSync } from "node:fs";
+import type { Task } from "./types.ts";
+
+/**
+ * Remaining tasks in source order.
+ * Lookup, completion, next task and counts are O(1); group access only touches the group.
+ */
+export class TaskQueue {
+	private remaining = new Map<string, Task>();
+	private groups = new Map<number, Map<string, Task>>();
+	private completed: number;
+
+	constructor(tasks: Iterable<Task> = [], completedCount = 0) {
+		this.completed = completedCount;
+		for (const task of tasks) {
+			this.add(task);
+		}
+	}
+
+	/**
+	 * Append a task to the end of the queue. Ids are unique per source (YAML and
+	 * JSON sources reject duplicate titles), so a repeated id is ignored.
+	 */
+	add(task: Task): void {
+		if (this.remaining.has(task.id)) return;
+
+		this.remaining.set(task.id, task);
+		const group = task.parallelGroup || 0;
+		let bucket = this.groups.get(group);
+		if (!bucket) {
+			bucket = new Map();
+			this.groups.set(group, bucket);
+		}
+		bucket.set(task.id, task);
+	}
+
+	get(id: string): Task | undefined {
+		return this.remaining.get(id);
+	}
+
+	/**
+	 * Remove a task from the queue and count it as completed.
+	 * Returns the task, or undefined if it was not remaining.
+	 */
+	complete(id: string): Task | undefined {
+		const task = this.remaining.get(id);
+		if (!task) return undefined;
+
+		this.remaining.delete(id);
+		this.groups.get(task.parallelGroup || 0)?.delete(id);
+		this.completed++;
+		return task;
+	}
+
+	/**
+	 * First remaining task
+	 */
+	peek(): Task | null {
+		for (const task of this.remaining.values()) {
+			return task;
+		}
+		return null;
+	}
+
+	toArray(): Task[] {
+		return [...this.remaining.values()];
+	}
+
+	inGroup(group: number): Task[] {
+		return [...(this.groups.get(group)?.values() ?? [])];
+	}
+
+	get remainingCount(): number {
+		return this.remaining.size;
+	}
+
+	get completedCount(): number {
+		return this.completed;
+	}
+}
+
+/**
+ * Identity of a file's contents, used to detect external changes
+ */
+export interface FileStamp {
+	mtimeMs: number;
+	size: number;
+}
+
+export function statFile(filePath: string): FileStamp | null {
+	try {
+		const stat = statSync(filePath);
+		return { mtimeMs: stat.mtimeMs, size: stat.size };
+	} catch {
+		return null;
+	}
+}
+
+function sameStamp(a: FileStamp | null, b: FileStamp | null): boolean {
+	return a?.mtimeMs === b?.mtimeMs && a?.size === b?.size;
+}
+
+/**
+ * Parsed contents of one task file
+ */
+export interface ParsedTaskFile {
+	/** Incomplete tasks in file order */
+	tasks: Task[];
+	completedCount: number;
+}
+
+interface IndexedFile<T extends ParsedTaskFile> {
+	stamp: FileStamp | null;
+	parsed: T;
+	/** Tasks completed through this index since the file was parsed */
+	done: Set<string>;
+}
+
+/**
+ * Incremental index over one or more task files.
+ *
+ * Each refresh stats the files and reparses only those whose mtime or size
+ * changed. Completions made through the index update the queue in place and
+ * record the file's new stamp, so they don't trigger a reparse.
+ */
+export class TaskFileIndex<T extends ParsedTaskFile> {
+	private parse: (filePath: string) => T;
+	private files = new Map<string, IndexedFile<T>>();
+	private queue: TaskQueue | null = null;
+
+	constructor(parse: (filePath: string) => T) {
+		this.parse = parse;
+	}
+
+	/**
+	 * Bring the index up to date with the files on disk
+	 */
+	refresh(filePaths: string[]): TaskQueue {
+		let changed = this.queue === null;
+
+		// Forget files that are gone, so the next refresh doesn't see a mismatch again
+		const current = new Set(filePaths);
+		for (const filePath of this.files.keys()) {
+			if (!current.has(filePath)) {
+				this.files.delete(filePath);
+				changed = true;
+			}
+		}
+
+		for (const filePath of filePaths) {
+			const stamp = statFile(filePath);
+			const entry = this.files.get(filePath);
+			if (entry && sameStamp(entry.stamp, stamp)) continue;
+
+			this.files.set(filePath, { stamp, parsed: this.parse(filePath), done: new Set() });
+			changed = true;
+		}
+
+		if (changed || !this.queue) {
+			this.queue = this.buildQueue(filePaths);
+		}
+		return this.queue;
+	}
+
+	private buildQueue(filePaths: string[]): TaskQueue {
+		const tasks: Task[] = [];
+		let completedCount = 0;
+
+		for (const filePath of filePaths) {
+			const entry = this.files.get(filePath);
+			if (!entry) continue;
+
+			completedCount += entry.parsed.completedCount + entry.done.size;
+			for (const task of entry.parsed.tasks) {
+				if (!entry.done.has(task.id)) {
+					tasks.push(task);
+				}
+			}
+		}
+
+		return new TaskQueue(tasks, completedCount);
+	}
+
+	/**
+	 * Parsed data of a file, as of the last refresh
+	 */
+	getFile(filePath: string): T | undefined {
+		return this.files.get(filePath)?.parsed;
+	}
+
+	/**
+	 * Record a completion written to a file by the caller
+	 */
+	markDone(filePath: string, id: string): void {
+		const entry = this.files.get(filePath);
+		if (!entry) return;
+
+		entry.stamp = statFile(filePath);
+		if (this.queue?.complete(id)) {
+			entry.done.add(id);
+		}
+	}
+
+	/**
+	 * Force a reparse of every file on the next refresh
+	 */
+	invalidate(): void {
+		this.files.clear();
+		this.queue = null;
+	}
+}
+
+/**
+ * Overwrite bytes at a known offset if the file still contains the expected bytes there.
+ * Returns false (and leaves the file alone) when the file changed underneath us.
+ */
+export function patchFileInPlace(
+	filePath: string,
+	offset: number,
+	expected: string,
+	replacement: string,
+): boolean {
+	const expectedBytes = Buffer.from(expected, "utf-8");
+	const replacementBytes = Buffer.from(replacement, "utf-8");
+	if (expectedBytes.length !== replacementBytes.length) {
+		throw new Error("In-place patches must not change the file size");
+	}
+
+	const fd = openSync(filePath, "r+");
+	try {
+		const current = Buffer.alloc(expectedBytes.length);
+		readSync(fd, current, 0, current.length, offset);
+		if (!current.equals(expectedBytes)) {
+			return false;
+		}
+		writeSync(fd, replacementBytes, 0, replacementBytes.length, offset);
+		return true;
+	} finally {
+		closeSync(fd);
+	}
+}
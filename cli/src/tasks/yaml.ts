@@ -1,16 +1,33 @@
 import { readFileSync, writeFileSync } from "node:fs";
 import YAML from "yaml";
+import {
+	type StructuredTask,
+	type StructuredTaskFile,
+	buildStructuredTaskFile,
+	completeStructuredTask,
+} from "./structured-tasks.ts";
+import { TaskFileIndex, type TaskQueue } from "./task-index.ts";
 import type { Task, TaskSource } from "./types.ts";
 
-interface YamlTask {
-	title: string;
-	completed?: boolean;
-	parallel_group?: number;
-	description?: string;
+interface YamlTaskFile {
+	tasks: StructuredTask[];
 }
 
-interface YamlTaskFile {
-	tasks: YamlTask[];
+/**
+ * Parse a YAML task file. Titles are task ids, so they must be unique.
+ */
+function parseYamlTaskFile(filePath: string): StructuredTaskFile {
+	const content = readFileSync(filePath, "utf-8");
+	const data = YAML.parse(content) as YamlTaskFile | null;
+	const tasks = data?.tasks || [];
+	const titles = new Set<string>();
+	for (const task of tasks) {
+		if (titles.has(task.title)) {
+			throw new Error(`Duplicate YAML task title: ${task.title}`);
+		}
+		titles.add(task.title);
+	}
+	return buildStructuredTaskFile(content, tasks);
 }
 
 /**
@@ -20,10 +37,14 @@ interface YamlTaskFile {
  *   - title: "Task description"
  *     completed: false
  *     parallel_group: 1  # optional
+ *
+ * The file is reparsed only when its mtime or size changes; completions edit
+ * the task's `completed` line in place.
  */
 export class YamlTaskSource implements TaskSource {
 	type = "yaml" as const;
 	private filePath: string;
+	private index = new TaskFileIndex(parseYamlTaskFile);
 
 	constructor(filePath: string) {
 		this.filePath = filePath;
@@ -38,65 +59,57 @@ export class YamlTaskSource implements TaskSource {
 		writeFileSync(this.filePath, YAML.stringify(data), "utf-8");
 	}
 
+	private getQueue(): TaskQueue {
+		return this.index.refresh([this.filePath]);
+	}
+
 	async getAllTasks(): Promise<Task[]> {
-		const data = this.readFile();
-		return (data.tasks || [])
-			.filter((t) => !t.completed)
-			.map((t, i) => ({
-				id: t.title, // Use title as ID for YAML tasks
-				title: t.title,
-				body: t.description,
-				parallelGroup: t.parallel_group,
-				completed: false,
-			}));
+		return this.getQueue().toArray();
 	}
 
 	async getNextTask(): Promise<Task | null> {
-		const tasks = await this.getAllTasks();
-		return tasks[0] || null;
+		return this.getQueue().peek();
 	}
 
 	async markComplete(id: string): Promise<void> {
+		this.getQueue();
+		const file = this.index.getFile(this.filePath);
+		const write = (content: string) => writeFileSync(this.filePath, content, "utf-8");
+		if (file && completeStructuredTask(this.filePath, file, id, "yaml", write)) {
+			this.index.markDone(this.filePath, id);
+			return;
+		}
+
+		// Couldn't edit in place, rewrite the document
 		const data = this.readFile();
 		const task = data.tasks?.find((t) => t.title === id);
 		if (task) {
 			task.completed = true;
 			this.writeFile(data);
+			this.index.invalidate();
 		}
 	}
 
 	async countRemaining(): Promise<number> {
-		const data = this.readFile();
-		return (data.tasks || []).filter((t) => !t.completed).length;
+		return this.getQueue().remainingCount;
 	}
 
 	async countCompleted(): Promise<number> {
-		const data = this.readFile();
-		return (data.tasks || []).filter((t) => t.completed).length;
+		return this.getQueue().completedCount;
 	}
 
 	/**
 	 * Get tasks in a specific parallel group
 	 */
 	async getTasksInGroup(group: number): Promise<Task[]> {
-		const data = this.readFile();
-		return (data.tasks || [])
-			.filter((t) => !t.completed && (t.parallel_group || 0) === group)
-			.map((t) => ({
-				id: t.title,
-				title: t.title,
-				body: t.description,
-				parallelGroup: t.parallel_group,
-				completed: false,
-			}));
+		return this.getQueue().inGroup(group);
 	}
 
 	/**
 	 * Get the parallel group of a task
 	 */
 	async getParallelGroup(title: string): Promise<number> {
-		const data = this.readFile();
-		const task = data.tasks?.find((t) => t.title === title);
-		return task?.parallel_group || 0;
+		this.getQueue();
+		return this.index.getFile(this.filePath)?.groups.get(title) || 0;
 	}
 }
@@ -159,3 +159,81 @@ describe("TelemetryExporter", () => {
 		expect(summary.successRate).toBe(100);
 	});
 });
+
+describe("TelemetryExporter streaming", () => {
+	const STREAM_DIR = "/tmp/ralphy-exporter-stream-test";
+
+	afterEach(async () => {
+		if (existsSync(STREAM_DIR)) {
+			await rm(STREAM_DIR, { recursive: true });
+		}
+	});
+
+	it("should export across compressed segments", async () => {
+		const writer = new TelemetryWriter(STREAM_DIR, { maxSegmentBytes: 500, compress: true });
+		for (let i = 0; i < 5; i++) {
+			const sessionId = `s${i}`;
+			await writer.write(
+				{
+					sessionId,
+					timestamp: 1000 + i * 10,
+					engine: "claude",
+					mode: "parallel",
+					cliVersion: "1.0.0",
+					platform: "linux",
+					totalTokensIn: 10,
+					totalTokensOut: 5,
+					totalDurationMs: 100,
+					taskCount: 1,
+					successCount: 1,
+					failedCount: 0,
+					toolCalls: [],
+				},
+				[
+					{
+						sessionId,
+						callIndex: 0,
+						timestamp: 1001 + i * 10,
+						toolName: i % 2 === 0 ? "Read" : "Edit",
+						durationMs: 1,
+						success: true,
+					},
+				],
+			);
+		}
+
+		const exporter = new TelemetryExporter(STREAM_DIR);
+
+		const deepevalPath = await exporter.exportDeepEval();
+		const content = await readFile(deepevalPath, "utf-8");
+		const data = JSON.parse(content);
+		expect(content).toBe(JSON.stringify(data, null, 2));
+		expect(data.test_cases).toHaveLength(5);
+		expect(data.test_cases[3].tools).toEqual(["Edit"]);
+
+		const rawPath = await exporter.exportRaw();
+		const entries = (await readFile(rawPath, "utf-8"))
+			.trim()
+			.split("\n")
+			.map((line) => JSON.parse(line));
+		expect(entries).toHaveLength(10);
+		expect(entries.map((e) => e.type).slice(0, 4)).toEqual([
+			"session",
+			"tool_call",
+			"session",
+			"tool_call",
+		]);
+
+		const summary = await exporter.getSummary();
+		expect(summary.sessionCount).toBe(5);
+		expect(summary.toolCallCount).toBe(5);
+	});
+
+	it("should export an empty DeepEval dataset", async () => {
+		const exporter = new TelemetryExporter(STREAM_DIR);
+
+		const content = await readFile(await exporter.exportDeepEval(), "utf-8");
+
+		expect(JSON.parse(content)).toEqual({ test_cases: [] });
+	});
+});
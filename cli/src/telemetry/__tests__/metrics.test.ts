@@ -0,0 +1,83 @@
+import { afterEach, describe, expect, it } from "bun:test";
+import {
+	MetricsRegistry,
+	disableMetrics,
+	getMetricsRegistry,
+	incrementMetric,
+	observeMetric,
+	startMetricsServer,
+} from "../metrics.ts";
+
+describe("MetricsRegistry", () => {
+	it("should render counters and gauges", () => {
+		const registry = new MetricsRegistry();
+		registry.increment("ralphy_tasks_total", { status: "completed" });
+		registry.increment("ralphy_tasks_total", { status: "completed" });
+		registry.increment("ralphy_tasks_total", { status: "failed" });
+		registry.set("ralphy_agents_active", 3);
+
+		const text = registry.render();
+		expect(text).toContain("# TYPE ralphy_tasks_total counter");
+		expect(text).toContain('ralphy_tasks_total{status="completed"} 2');
+		expect(text).toContain('ralphy_tasks_total{status="failed"} 1');
+		expect(text).toContain("ralphy_agents_active 3");
+		// Untouched unlabeled metrics are exported as zero
+		expect(text).toContain("ralphy_retries_total 0");
+	});
+
+	it("should render cumulative histogram buckets", () => {
+		const registry = new MetricsRegistry({
+			latency: { type: "histogram", help: "Latency", buckets: [0.1, 1] },
+		});
+		registry.observe("latency", 0.05, { phase: "merge" });
+		registry.observe("latency", 0.5, { phase: "merge" });
+		registry.observe("latency", 5, { phase: "merge" });
+
+		const text = registry.render();
+		expect(text).toContain('latency_bucket{phase="merge",le="0.1"} 1');
+		expect(text).toContain('latency_bucket{phase="merge",le="1"} 2');
+		expect(text).toContain('latency_bucket{phase="merge",le="+Inf"} 3');
+		expect(text).toContain('latency_sum{phase="merge"} 5.55');
+		expect(text).toContain('latency_count{phase="merge"} 3');
+	});
+
+	it("should escape label values", () => {
+		const registry = new MetricsRegistry();
+		registry.increment("ralphy_tasks_total", { status: 'say "hi"\n' });
+
+		expect(registry.render()).toContain('ralphy_tasks_total{status="say \\"hi\\"\\n"} 1');
+	});
+
+	it("should reject unknown metrics", () => {
+		expect(() => new MetricsRegistry().increment("nope")).toThrow("Unknown metric");
+	});
+});
+
+describe("metrics server", () => {
+	afterEach(() => {
+		disableMetrics();
+	});
+
+	it("should ignore records while disabled", () => {
+		incrementMetric("ralphy_retries_total");
+		expect(getMetricsRegistry()).toBeNull();
+	});
+
+	it("should serve /metrics", async () => {
+		const server = await startMetricsServer(0);
+		try {
+			observeMetric("ralphy_phase_duration_seconds", 0.2, { phase: "agent" });
+
+			const response = await fetch(server.url);
+			expect(response.status).toBe(200);
+			expect(response.headers.get("content-type")).toContain("text/plain");
+			const body = await response.text();
+			expect(body).toContain('ralphy_phase_duration_seconds_count{phase="agent"} 1');
+
+			const missing = await fetch(server.url.replace("/metrics", "/other"));
+			expect(missing.status).toBe(404);
+		} finally {
+			await server.close();
+		}
+	});
+});
@@ -0,0 +1,197 @@
+import { afterEach, describe, expect, it } from "bun:test";
+import { existsSync, readFileSync, rmSync } from "node:fs";
+import { toChromeTrace, toOtlpTrace, writeTraceFiles } from "../trace-export.ts";
+import {
+	Tracer,
+	detachSpan,
+	isTracingEnabled,
+	startTracing,
+	stopTracing,
+	withSpan,
+} from "../tracing.ts";
+
+const TEST_DIR = "/tmp/ralphy-tracing-test";
+
+function delay(ms: number): Promise<void> {
+	return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+describe("Tracer", () => {
+	it("should nest spans through async calls", async () => {
+		const tracer = new Tracer();
+
+		await tracer.withSpan("run", {}, async () => {
+			await tracer.withSpan("task", { agent: 1 }, async () => {
+				await delay(1);
+				await tracer.withSpan("sandbox.create", {}, async () => {});
+			});
+		});
+
+		const byName = new Map(tracer.getSpans().map((span) => [span.name, span]));
+		const run = byName.get("run");
+		const task = byName.get("task");
+		expect(run?.parentSpanId).toBeUndefined();
+		expect(task?.parentSpanId).toBe(run?.spanId);
+		expect(byName.get("sandbox.create")?.parentSpanId).toBe(task?.spanId);
+		expect(task?.attributes).toEqual({ agent: 1 });
+	});
+
+	it("should keep concurrent siblings on separate lanes", async () => {
+		const tracer = new Tracer();
+
+		await tracer.withSpan("batch", {}, () =>
+			Promise.all(
+				[1, 2, 3].map((agent) =>
+					tracer.withSpan("task", { agent }, async () => {
+						await delay(5);
+						await tracer.withSpan("phase.agent", { agent }, () => delay(1));
+					}),
+				),
+			),
+		);
+
+		const spans = tracer.getSpans();
+		const taskLanes = spans.filter((s) => s.name === "task").map((s) => s.lane);
+		expect(new Set(taskLanes).size).toBe(3);
+		for (const phase of spans.filter((s) => s.name === "phase.agent")) {
+			const task = spans.find((s) => s.spanId === phase.parentSpanId);
+			expect(phase.lane).toBe(task?.lane ?? -1);
+		}
+	});
+
+	it("should not reuse a lane while a child that outlived its parent runs there", async () => {
+		const tracer = new Tracer();
+		let background: Promise<void> = Promise.resolve();
+
+		await tracer.withSpan("task", {}, async () => {
+			await tracer.withSpan("phase.isolation", {}, async () => {
+				// Started but not awaited, like a pool warming its next sandbox
+				background = tracer.withSpan("sandbox.create", {}, () => delay(20));
+			});
+			await tracer.withSpan("phase.agent", {}, () => delay(5));
+		});
+		await background;
+
+		const byName = new Map(tracer.getSpans().map((span) => [span.name, span]));
+		const isolation = byName.get("phase.isolation");
+		const create = byName.get("sandbox.create");
+		const agent = byName.get("phase.agent");
+		expect(create?.parentSpanId).toBe(isolation?.spanId);
+		expect(create?.endTime ?? 0).toBeGreaterThan(isolation?.endTime ?? 0);
+		expect(agent?.lane).not.toBe(create?.lane);
+	});
+
+	it("should start spans inside detach() as roots", async () => {
+		const tracer = new Tracer();
+
+		await tracer.withSpan("phase.isolation", {}, () =>
+			tracer.detach(() => tracer.withSpan("sandbox.create", {}, () => delay(1))),
+		);
+
+		const byName = new Map(tracer.getSpans().map((span) => [span.name, span]));
+		expect(byName.get("sandbox.create")?.parentSpanId).toBeUndefined();
+		expect(byName.get("sandbox.create")?.lane).not.toBe(byName.get("phase.isolation")?.lane);
+	});
+
+	it("should record errors and rethrow", async () => {
+		const tracer = new Tracer();
+
+		await expect(
+			tracer.withSpan("git.merge", {}, async () => {
+				throw new Error("conflict");
+			}),
+		).rejects.toThrow("conflict");
+
+		expect(tracer.getSpans()[0].error).toBe("conflict");
+	});
+
+	it("should drop spans beyond maxSpans", async () => {
+		const tracer = new Tracer({ maxSpans: 2 });
+		for (let i = 0; i < 5; i++) {
+			await tracer.withSpan("tasks.load", {}, async () => {});
+		}
+
+		expect(tracer.getSpans()).toHaveLength(2);
+		expect(tracer.getDroppedCount()).toBe(3);
+	});
+});
+
+describe("withSpan", () => {
+	afterEach(() => {
+		stopTracing();
+		if (existsSync(TEST_DIR)) {
+			rmSync(TEST_DIR, { recursive: true });
+		}
+	});
+
+	it("should just run the function when tracing is disabled", async () => {
+		expect(isTracingEnabled()).toBe(false);
+		expect(await withSpan("prd.copy", {}, async () => 42)).toBe(42);
+		expect(detachSpan(() => 7)).toBe(7);
+	});
+
+	it("should record into the global tracer when enabled", async () => {
+		startTracing();
+		await withSpan("prd.copy", { prdSource: "yaml", skipped: undefined }, async (span) => {
+			span.setAttribute("bytes", 10);
+		});
+
+		const tracer = stopTracing();
+		expect(tracer?.getSpans()[0].attributes).toEqual({ prdSource: "yaml", bytes: 10 });
+		expect(isTracingEnabled()).toBe(false);
+	});
+
+	it("should write OTLP and Chrome trace files", async () => {
+		const tracer = startTracing();
+		await withSpan("run", {}, () => withSpan("task", { agent: 1 }, () => delay(1)));
+		stopTracing();
+
+		const files = await writeTraceFiles(tracer, TEST_DIR, { mode: "parallel" });
+
+		const otlp = JSON.parse(readFileSync(files.otlp, "utf-8"));
+		const spans = otlp.resourceSpans[0].scopeSpans[0].spans;
+		expect(spans.map((s: { name: string }) => s.name)).toEqual(["run", "task"]);
+		expect(spans[0].traceId).toBe(tracer.traceId);
+
+		const chrome = JSON.parse(readFileSync(files.chrome, "utf-8"));
+		const complete = chrome.traceEvents.filter((e: { ph: string }) => e.ph === "X");
+		expect(complete).toHaveLength(2);
+		expect(complete[0].ts).toBe(0);
+	});
+});
+
+describe("trace export", () => {
+	const span = {
+		spanId: "00f067aa0ba902b7",
+		name: "sandbox.commit",
+		startTime: 1_700_000_000_000.5,
+		endTime: 1_700_000_000_012.25,
+		attributes: { agent: 2, files: 3, ratio: 0.5, manifest: true },
+		error: "nothing to commit",
+		lane: 1,
+	};
+
+	it("should convert spans to OTLP JSON", () => {
+		const trace = toOtlpTrace("4bf92f3577b34da6a3ce929d0e0e4736", [span]);
+		const [otlpSpan] = trace.resourceSpans[0].scopeSpans[0].spans;
+
+		expect(otlpSpan.startTimeUnixNano).toBe("1700000000000500000");
+		expect(otlpSpan.endTimeUnixNano).toBe("1700000000012250000");
+		expect(otlpSpan.attributes).toContainEqual({ key: "agent", value: { intValue: "2" } });
+		expect(otlpSpan.attributes).toContainEqual({ key: "ratio", value: { doubleValue: 0.5 } });
+		expect(otlpSpan.status).toEqual({ code: 2, message: "nothing to commit" });
+		expect(trace.resourceSpans[0].resource.attributes).toContainEqual({
+			key: "service.name",
+			value: { stringValue: "ralphy" },
+		});
+	});
+
+	it("should convert spans to Chrome trace events", () => {
+		const trace = toChromeTrace([span]);
+		const event = trace.traceEvents.find((e) => e.ph === "X");
+
+		expect(event).toMatchObject({ name: "sandbox.commit", cat: "sandbox", ts: 0, dur: 11750 });
+		expect(event?.tid).toBe(1);
+		expect(event?.args?.error).toBe("nothing to commit");
+	});
+});
@@ -1,6 +1,6 @@
 import { afterEach, beforeEach, describe, expect, it } from "bun:test";
 import { existsSync } from "node:fs";
-import { mkdir, readFile, rm } from "node:fs/promises";
+import { mkdir, readFile, readdir, rm, utimes, writeFile } from "node:fs/promises";
 import { join } from "node:path";
 import type { Session, ToolCall } from "../types.ts";
 import { TelemetryWriter } from "../writer.ts";
@@ -170,3 +170,210 @@ describe("TelemetryWriter", () => {
 		expect(stats.toolCallCount).toBe(3);
 	});
 });
+
+describe("TelemetryWriter segments", () => {
+	function session(id: string, timestamp: number): Session {
+		return {
+			sessionId: id,
+			timestamp,
+			engine: "claude",
+			mode: "parallel",
+			cliVersion: "1.0.0",
+			platform: "linux",
+			totalTokensIn: 100,
+			totalTokensOut: 50,
+			totalDurationMs: 1000,
+			taskCount: 1,
+			successCount: 1,
+			failedCount: 0,
+			toolCalls: [
+				{ toolName: "Bash", callCount: 2, successCount: 2, failedCount: 0, avgDurationMs: 5 },
+			],
+		};
+	}
+
+	function toolCalls(id: string, timestamp: number): ToolCall[] {
+		return [0, 1].map((callIndex) => ({
+			sessionId: id,
+			callIndex,
+			timestamp,
+			toolName: "Bash",
+			durationMs: 5,
+			success: true,
+			parameterKeys: ["command"],
+		}));
+	}
+
+	beforeEach(async () => {
+		if (existsSync(TEST_DIR)) {
+			await rm(TEST_DIR, { recursive: true });
+		}
+	});
+
+	afterEach(async () => {
+		if (existsSync(TEST_DIR)) {
+			await rm(TEST_DIR, { recursive: true });
+		}
+	});
+
+	it("should rotate segments by size and read across them", async () => {
+		const writer = new TelemetryWriter(TEST_DIR, { maxSegmentBytes: 600 });
+		for (let i = 0; i < 6; i++) {
+			await writer.write(session(`s${i}`, 1000 + i), toolCalls(`s${i}`, 1000 + i));
+		}
+
+		const files = await readdir(TEST_DIR);
+		expect(files).toContain("sessions.000001.jsonl");
+		expect(files).toContain("tool_calls.000001.jsonl");
+
+		const sessions = await writer.readSessions();
+		expect(sessions.map((s) => s.sessionId)).toEqual(["s0", "s1", "s2", "s3", "s4", "s5"]);
+		expect(await writer.readToolCalls()).toHaveLength(12);
+
+		const calls = await writer.readSessionToolCalls("s1");
+		expect(calls.map((c) => c.callIndex)).toEqual([0, 1]);
+		expect(calls.every((c) => c.sessionId === "s1")).toBe(true);
+		expect((await writer.readSession("s4"))?.timestamp).toBe(1004);
+	});
+
+	it("should read gzip-compressed closed segments", async () => {
+		const writer = new TelemetryWriter(TEST_DIR, { maxSegmentBytes: 600, compress: true });
+		for (let i = 0; i < 4; i++) {
+			await writer.write(session(`s${i}`, 1000 + i), toolCalls(`s${i}`, 1000 + i));
+		}
+
+		expect(await readdir(TEST_DIR)).toContain("sessions.000001.jsonl.gz");
+		expect(await writer.readSessionToolCalls("s0")).toHaveLength(2);
+		expect((await writer.readSession("s0"))?.sessionId).toBe("s0");
+		expect(await writer.readSessions()).toHaveLength(4);
+	});
+
+	it("should rotate segments by age", async () => {
+		const writer = new TelemetryWriter(TEST_DIR, { maxSegmentAgeMs: 0 });
+		await writer.writeSession(session("s0", 1000));
+		await writer.writeSession(session("s1", 1001));
+
+		expect(await readdir(TEST_DIR)).toContain("sessions.000001.jsonl");
+		expect(await writer.readSessions()).toHaveLength(2);
+	});
+
+	it("should answer stats from running aggregates", async () => {
+		const writer = new TelemetryWriter(TEST_DIR);
+		await writer.write(session("s0", 2000), toolCalls("s0", 2000));
+		await writer.write(session("s1", 1000), toolCalls("s1", 1000));
+
+		// Stats don't read the segments
+		await rm(join(TEST_DIR, "sessions.jsonl"));
+
+		expect(await writer.getStats()).toEqual({
+			sessionCount: 2,
+			toolCallCount: 4,
+			totalTokensIn: 200,
+			totalTokensOut: 100,
+			oldestTimestamp: 1000,
+			newestTimestamp: 2000,
+		});
+	});
+
+	it("should index stores written without a manifest", async () => {
+		await mkdir(TEST_DIR, { recursive: true });
+		await writeFile(
+			join(TEST_DIR, "sessions.jsonl"),
+			`${JSON.stringify(session("s0", 1000))}\n${JSON.stringify(session("s1", 1001))}\n`,
+		);
+		await writeFile(
+			join(TEST_DIR, "tool_calls.jsonl"),
+			`${[...toolCalls("s0", 1000), ...toolCalls("s1", 1001)]
+				.map((call) => JSON.stringify(call))
+				.join("\n")}\n`,
+		);
+
+		const writer = new TelemetryWriter(TEST_DIR);
+		expect((await writer.getStats()).sessionCount).toBe(2);
+		expect(existsSync(join(TEST_DIR, "store.json"))).toBe(true);
+		expect(await writer.readSessionToolCalls("s1")).toHaveLength(2);
+
+		await writer.write(session("s2", 1002), toolCalls("s2", 1002));
+		expect((await writer.getStats()).sessionCount).toBe(3);
+		expect(await writer.readSessionToolCalls("s2")).toHaveLength(2);
+	});
+
+	it("should finish a rotation interrupted before the rename", async () => {
+		await new TelemetryWriter(TEST_DIR).writeSession(session("s0", 1000));
+
+		// State after a crash between saving the manifest and renaming the segment
+		const manifestPath = join(TEST_DIR, "store.json");
+		const manifest = JSON.parse(await readFile(manifestPath, "utf-8"));
+		const state = manifest.streams.sessions;
+		state.closed.push({
+			seq: state.activeSeq,
+			file: "sessions.000001.jsonl",
+			compressed: false,
+			records: 1,
+			bytes: (await readFile(join(TEST_DIR, "sessions.jsonl"))).length,
+			createdAt: state.activeCreatedAt,
+			closedAt: Date.now(),
+		});
+		state.activeSeq++;
+		await writeFile(manifestPath, JSON.stringify(manifest));
+
+		const writer = new TelemetryWriter(TEST_DIR);
+		await writer.writeSession(session("s1", 1001));
+
+		expect(await readdir(TEST_DIR)).toContain("sessions.000001.jsonl");
+		expect((await writer.readSession("s0"))?.timestamp).toBe(1000);
+		expect((await writer.readSession("s1"))?.timestamp).toBe(1001);
+	});
+
+	it("should keep the session index in memory after the first lookup", async () => {
+		const writer = new TelemetryWriter(TEST_DIR);
+		await writer.write(session("s0", 1000), toolCalls("s0", 1000));
+		expect(await writer.readSessionToolCalls("s0")).toHaveLength(2);
+
+		await writer.write(session("s1", 1001), toolCalls("s1", 1001));
+		await rm(join(TEST_DIR, "index.jsonl"));
+
+		expect((await writer.readSession("s0"))?.timestamp).toBe(1000);
+		expect(await writer.readSessionToolCalls("s1")).toHaveLength(2);
+	});
+
+	it("should keep the updates of two writers sharing a directory", async () => {
+		const first = new TelemetryWriter(TEST_DIR, { maxSegmentBytes: 600 });
+		const second = new TelemetryWriter(TEST_DIR, { maxSegmentBytes: 600 });
+		await first.write(session("s0", 1000), toolCalls("s0", 1000));
+		expect(await first.readSessionToolCalls("s0")).toHaveLength(2);
+
+		await Promise.all(
+			[1, 2, 3, 4, 5, 6].map((i) => {
+				const writer = i % 2 === 0 ? first : second;
+				return writer.write(session(`s${i}`, 1000 + i), toolCalls(`s${i}`, 1000 + i));
+			}),
+		);
+
+		expect(await readdir(TEST_DIR)).toContain("sessions.000001.jsonl");
+		expect(await readdir(TEST_DIR)).not.toContain("store.lock");
+		expect((await second.getStats()).sessionCount).toBe(7);
+		expect((await first.getStats()).toolCallCount).toBe(14);
+		const ids = (await first.readSessions()).map((s) => s.sessionId).sort();
+		expect(ids).toEqual(["s0", "s1", "s2", "s3", "s4", "s5", "s6"]);
+		expect(await second.readToolCalls()).toHaveLength(14);
+		for (let i = 0; i <= 6; i++) {
+			expect((await first.readSession(`s${i}`))?.timestamp).toBe(1000 + i);
+			expect(await second.readSessionToolCalls(`s${i}`)).toHaveLength(2);
+		}
+	});
+
+	it("should break a lock left by a crashed writer", async () => {
+		await mkdir(TEST_DIR, { recursive: true });
+		const lockPath = join(TEST_DIR, "store.lock");
+		await writeFile(lockPath, "");
+		const hourAgo = new Date(Date.now() - 60 * 60 * 1000);
+		await utimes(lockPath, hourAgo, hourAgo);
+
+		const writer = new TelemetryWriter(TEST_DIR);
+		await writer.writeSession(session("s0", 1000));
+
+		expect((await writer.getStats()).sessionCount).toBe(1);
+		expect(existsSync(lockPath)).toBe(false);
+	});
+});
@@ -7,11 +7,12 @@
  * - Raw JSONL: For custom processing
  */
 
-import { existsSync } from "node:fs";
-import { mkdir, writeFile } from "node:fs/promises";
+import { createWriteStream, existsSync } from "node:fs";
+import { mkdir } from "node:fs/promises";
 import { join } from "node:path";
+import { Readable } from "node:stream";
+import { pipeline } from "node:stream/promises";
 import type {
-	DeepEvalExport,
 	DeepEvalTestCase,
 	ExportFormat,
 	OpenAIEvalsEntry,
@@ -29,11 +30,72 @@ function isFullSession(session: Session | SessionFull): session is SessionFull {
 	return "prompt" in session || "response" in session || "filePaths" in session;
 }
 
+/**
+ * Stream chunks to a file, respecting backpressure
+ */
+async function writeChunks(filePath: string, chunks: AsyncIterable<string>): Promise<void> {
+	await pipeline(Readable.from(chunks), createWriteStream(filePath, "utf-8"));
+}
+
+/**
+ * Serialize items as `{ "<key>": [...] }`, formatted like JSON.stringify(value, null, 2)
+ */
+async function* jsonArrayChunks<T>(key: string, items: AsyncIterable<T>): AsyncGenerator<string> {
+	let first = true;
+	for await (const item of items) {
+		const body = JSON.stringify(item, null, 2).replace(/\n/g, "\n    ");
+		yield `${first ? `{\n  ${JSON.stringify(key)}: [\n` : ",\n"}    ${body}`;
+		first = false;
+	}
+	yield first ? `{\n  ${JSON.stringify(key)}: []\n}` : "\n  ]\n}";
+}
+
+/**
+ * Serialize items as JSONL. An empty export is a single newline.
+ */
+async function* jsonLineChunks<T>(items: AsyncIterable<T>): AsyncGenerator<string> {
+	let empty = true;
+	for await (const item of items) {
+		yield `${JSON.stringify(item)}\n`;
+		empty = false;
+	}
+	if (empty) {
+		yield "\n";
+	}
+}
+
+/**
+ * Merge the session and tool call streams by timestamp.
+ * Each stream is in append order, which is close to time order.
+ */
+async function* mergeByTimestamp(
+	sessions: AsyncIterable<Session | SessionFull>,
+	toolCalls: AsyncIterable<ToolCall>,
+): AsyncGenerator<RawExportEntry> {
+	const sessionIter = sessions[Symbol.asyncIterator]();
+	const callIter = toolCalls[Symbol.asyncIterator]();
+	let session = await sessionIter.next();
+	let call = await callIter.next();
+
+	while (!session.done || !call.done) {
+		if (!session.done && (call.done || session.value.timestamp <= call.value.timestamp)) {
+			yield { type: "session", data: session.value };
+			session = await sessionIter.next();
+		} else if (!call.done) {
+			yield { type: "tool_call", data: call.value };
+			call = await callIter.next();
+		}
+	}
+}
+
 /**
  * Telemetry Exporter
  *
  * Transforms and exports telemetry data to various formats
  * suitable for model provider eval pipelines.
+ *
+ * Exports stream records from the store, so memory use does not grow
+ * with the amount of collected data.
  */
 export class TelemetryExporter {
 	private writer: TelemetryWriter;
@@ -56,24 +118,28 @@ export class TelemetryExporter {
 	}
 
 	/**
-	 * Export to DeepEval JSON format
+	 * Collect the distinct tool names used in each session
 	 */
-	async exportDeepEval(outputPath?: string): Promise<string> {
-		const sessions = await this.writer.readSessions();
-		const toolCalls = await this.writer.readToolCalls();
-
-		// Group tool calls by session
-		const callsBySession = new Map<string, ToolCall[]>();
-		for (const call of toolCalls) {
-			const existing = callsBySession.get(call.sessionId) || [];
-			existing.push(call);
-			callsBySession.set(call.sessionId, existing);
+	private async toolNamesBySession(): Promise<Map<string, Set<string>>> {
+		const toolNames = new Map<string, Set<string>>();
+		for await (const call of this.writer.iterateToolCalls()) {
+			let names = toolNames.get(call.sessionId);
+			if (!names) {
+				names = new Set();
+				toolNames.set(call.sessionId, names);
+			}
+			names.add(call.toolName);
 		}
+		return toolNames;
+	}
 
-		const testCases: DeepEvalTestCase[] = sessions.map((session) => {
-			const sessionCalls = callsBySession.get(session.sessionId) || [];
-			const toolNames = [...new Set(sessionCalls.map((c) => c.toolName))];
+	/**
+	 * Stream sessions as DeepEval test cases
+	 */
+	async *deepEvalTestCases(): AsyncGenerator<DeepEvalTestCase> {
+		const toolNames = await this.toolNamesBySession();
 
+		for await (const session of this.writer.iterateSessions()) {
 			const testCase: DeepEvalTestCase = {
 				input:
 					isFullSession(session) && session.prompt
@@ -86,7 +152,7 @@ export class TelemetryExporter {
 							? "Task completed successfully"
 							: "Task failed",
 				context: isFullSession(session) && session.filePaths ? session.filePaths : [],
-				tools: toolNames,
+				tools: [...(toolNames.get(session.sessionId) ?? [])],
 				metadata: {
 					session_id: session.sessionId,
 					engine: session.engine,
@@ -97,43 +163,23 @@ export class TelemetryExporter {
 				},
 			};
 
-			return testCase;
-		});
-
-		const exportData: DeepEvalExport = { test_cases: testCases };
-
-		await this.ensureExportsDir();
-		const filePath = outputPath || join(this.exportsDir, "deepeval-dataset.json");
-		await writeFile(filePath, JSON.stringify(exportData, null, 2), "utf-8");
-
-		return filePath;
+			yield testCase;
+		}
 	}
 
 	/**
-	 * Export to OpenAI Evals JSONL format
+	 * Stream sessions as OpenAI Evals entries
 	 */
-	async exportOpenAI(outputPath?: string): Promise<string> {
-		const sessions = await this.writer.readSessions();
-		const toolCalls = await this.writer.readToolCalls();
-
-		// Group tool calls by session
-		const callsBySession = new Map<string, ToolCall[]>();
-		for (const call of toolCalls) {
-			const existing = callsBySession.get(call.sessionId) || [];
-			existing.push(call);
-			callsBySession.set(call.sessionId, existing);
-		}
-
-		const entries: string[] = sessions.map((session) => {
-			const sessionCalls = callsBySession.get(session.sessionId) || [];
-			const toolNames = [...new Set(sessionCalls.map((c) => c.toolName))];
+	async *openAIEntries(): AsyncGenerator<OpenAIEvalsEntry> {
+		const toolNames = await this.toolNamesBySession();
 
+		for await (const session of this.writer.iterateSessions()) {
 			const entry: OpenAIEvalsEntry = {
 				metadata: {
 					session_id: session.sessionId,
 					engine: session.engine,
 					mode: session.mode,
-					tools_used: toolNames,
+					tools_used: [...(toolNames.get(session.sessionId) ?? [])],
 					tokens_in: session.totalTokensIn,
 					tokens_out: session.totalTokensOut,
 					success: session.successCount > 0 && session.failedCount === 0,
@@ -156,12 +202,35 @@ export class TelemetryExporter {
 				}
 			}
 
-			return JSON.stringify(entry);
-		});
+			yield entry;
+		}
+	}
+
+	/**
+	 * Stream sessions and tool calls as raw entries, ordered by timestamp
+	 */
+	rawEntries(): AsyncGenerator<RawExportEntry> {
+		return mergeByTimestamp(this.writer.iterateSessions(), this.writer.iterateToolCalls());
+	}
 
+	/**
+	 * Export to DeepEval JSON format
+	 */
+	async exportDeepEval(outputPath?: string): Promise<string> {
+		await this.ensureExportsDir();
+		const filePath = outputPath || join(this.exportsDir, "deepeval-dataset.json");
+		await writeChunks(filePath, jsonArrayChunks("test_cases", this.deepEvalTestCases()));
+
+		return filePath;
+	}
+
+	/**
+	 * Export to OpenAI Evals JSONL format
+	 */
+	async exportOpenAI(outputPath?: string): Promise<string> {
 		await this.ensureExportsDir();
 		const filePath = outputPath || join(this.exportsDir, "openai-evals.jsonl");
-		await writeFile(filePath, `${entries.join("\n")}\n`, "utf-8");
+		await writeChunks(filePath, jsonLineChunks(this.openAIEntries()));
 
 		return filePath;
 	}
@@ -170,32 +239,9 @@ export class TelemetryExporter {
 	 * Export to raw JSONL format
 	 */
 	async exportRaw(outputPath?: string): Promise<string> {
-		const sessions = await this.writer.readSessions();
-		const toolCalls = await this.writer.readToolCalls();
-
-		const entries: RawExportEntry[] = [];
-
-		// Add sessions
-		for (const session of sessions) {
-			entries.push({ type: "session", data: session });
-		}
-
-		// Add tool calls
-		for (const call of toolCalls) {
-			entries.push({ type: "tool_call", data: call });
-		}
-
-		// Sort by timestamp
-		entries.sort((a, b) => {
-			const aTime = "timestamp" in a.data ? a.data.timestamp : 0;
-			const bTime = "timestamp" in b.data ? b.data.timestamp : 0;
-			return aTime - bTime;
-		});
-
 		await this.ensureExportsDir();
 		const filePath = outputPath || join(this.exportsDir, "raw-telemetry.jsonl");
-		const lines = `${entries.map((e) => JSON.stringify(e)).join("\n")}\n`;
-		await writeFile(filePath, lines, "utf-8");
+		await writeChunks(filePath, jsonLineChunks(this.rawEntries()));
 
 		return filePath;
 	}
@@ -242,42 +288,19 @@ export class TelemetryExporter {
 		totalTokensOut: number;
 		successRate: number;
 	}> {
-		const sessions = await this.writer.readSessions();
-		const toolCalls = await this.writer.readToolCalls();
-
-		const engines = new Set<string>();
-		const modes = new Set<string>();
-		const tools = new Set<string>();
-
-		let totalTokensIn = 0;
-		let totalTokensOut = 0;
-		let totalSuccess = 0;
-		let totalFailed = 0;
-
-		for (const session of sessions) {
-			engines.add(session.engine);
-			modes.add(session.mode);
-			totalTokensIn += session.totalTokensIn;
-			totalTokensOut += session.totalTokensOut;
-			totalSuccess += session.successCount;
-			totalFailed += session.failedCount;
-
-			for (const tc of session.toolCalls) {
-				tools.add(tc.toolName);
-			}
-		}
+		const aggregates = await this.writer.getAggregates();
 
-		const totalTasks = totalSuccess + totalFailed;
-		const successRate = totalTasks > 0 ? (totalSuccess / totalTasks) * 100 : 0;
+		const totalTasks = aggregates.successCount + aggregates.failedCount;
+		const successRate = totalTasks > 0 ? (aggregates.successCount / totalTasks) * 100 : 0;
 
 		return {
-			sessionCount: sessions.length,
-			toolCallCount: toolCalls.length,
-			engines: Array.from(engines),
-			modes: Array.from(modes),
-			toolsUsed: Array.from(tools),
-			totalTokensIn,
-			totalTokensOut,
+			sessionCount: aggregates.sessionCount,
+			toolCallCount: aggregates.toolCallRecords,
+			engines: aggregates.engines,
+			modes: aggregates.modes,
+			toolsUsed: aggregates.toolsUsed,
+			totalTokensIn: aggregates.totalTokensIn,
+			totalTokensOut: aggregates.totalTokensOut,
 			successRate: Math.round(successRate * 100) / 100,
 		};
 	}
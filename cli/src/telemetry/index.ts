@@ -45,7 +45,7 @@ export function initTelemetry(engine: string, mode: string, options: TelemetryOp
 	}
 
 	collector = new TelemetryCollector(engine, mode, options);
-	writer = new TelemetryWriter(options.outputDir);
+	writer = new TelemetryWriter(options.outputDir, options.store);
 }
 
 /**
@@ -248,7 +248,7 @@ export async function hasTelemetryData(options?: { outputDir?: string }): Promis
 
 // Re-export types and classes for advanced usage
 export { TelemetryCollector } from "./collector.js";
-export { TelemetryWriter } from "./writer.js";
+export { type TelemetryAggregates, TelemetryWriter } from "./writer.js";
 export { TelemetryExporter } from "./exporter.js";
 export type {
 	Session,
@@ -257,6 +257,7 @@ export type {
 	ToolCallSummary,
 	TelemetryLevel,
 	TelemetryOptions,
+	TelemetryStoreOptions,
 	TelemetryConfig,
 	ExportFormat,
 	DeepEvalExport,
@@ -264,3 +265,8 @@ export type {
 	OpenAIEvalsEntry,
 	RawExportEntry,
 } from "./types.js";
+
+// Span tracing and live metrics for the orchestrator itself
+export * from "./tracing.js";
+export * from "./trace-export.js";
+export * from "./metrics.js";
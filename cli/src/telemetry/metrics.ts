@@ -0,0 +1,303 @@
+/**
+ * Live Metrics
+ *
+ * Prometheus-format counters, gauges and histograms for the orchestrator
+ * (active agents, queue depth, retries, phase latencies), served from an
+ * optional local HTTP `/metrics` endpoint for long-running CI workers.
+ *
+ * Metrics are off by default; the record functions are then a single null check.
+ *
+ * Usage:
+ *   const server = await startMetricsServer(9464);
+ *   observeMetric("ralphy_phase_duration_seconds", 1.2, { phase: "merge" });
+ *   await server.close();
+ */
+
+import { type Server, createServer } from "node:http";
+import type { AddressInfo } from "node:net";
+
+export type MetricType = "counter" | "gauge" | "histogram";
+
+export interface MetricDefinition {
+	type: MetricType;
+	help: string;
+	/** Histogram bucket upper bounds (seconds) */
+	buckets?: number[];
+}
+
+export type MetricLabels = Record<string, string>;
+
+/** Latency buckets from 5ms to 10 minutes */
+export const DEFAULT_BUCKETS = [
+	0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600,
+];
+
+/**
+ * Metrics exported by ralphy
+ */
+export const RALPHY_METRICS = {
+	ralphy_agents_active: { type: "gauge", help: "Agents currently holding a slot" },
+	ralphy_queue_depth: { type: "gauge", help: "Pending tasks waiting for an agent" },
+	ralphy_tasks_total: { type: "counter", help: "Finished tasks by status" },
+	ralphy_retries_total: { type: "counter", help: "Retried attempts in withRetry" },
+	ralphy_retry_backoff_seconds_total: {
+		type: "counter",
+		help: "Time spent sleeping between retries",
+	},
+	ralphy_cleanup_retries_total: {
+		type: "counter",
+		help: "Removals retried because a file was locked",
+	},
+	ralphy_phase_duration_seconds: {
+		type: "histogram",
+		help: "Duration of execution phases",
+		buckets: DEFAULT_BUCKETS,
+	},
+} satisfies Record<string, MetricDefinition>;
+
+export type MetricName = keyof typeof RALPHY_METRICS;
+
+interface HistogramValue {
+	counts: number[];
+	sum: number;
+	count: number;
+}
+
+interface Series {
+	labels: string;
+	value: number;
+	histogram?: HistogramValue;
+}
+
+function escapeLabelValue(value: string): string {
+	return value.replace(/\\/g, "\\\\").replace(/"/g, '\\"').replace(/\n/g, "\\n");
+}
+
+/**
+ * Serialize labels as `a="1",b="2"` (sorted, so equal label sets share a series)
+ */
+function formatLabels(labels?: MetricLabels): string {
+	if (!labels) return "";
+	return Object.keys(labels)
+		.sort()
+		.map((key) => `${key}="${escapeLabelValue(labels[key])}"`)
+		.join(",");
+}
+
+function withLabels(name: string, labels: string, extra?: string): string {
+	const all = [labels, extra].filter(Boolean).join(",");
+	return all ? `${name}{${all}}` : name;
+}
+
+/**
+ * In-memory metric store rendering the Prometheus text format
+ */
+export class MetricsRegistry {
+	private definitions: Record<string, MetricDefinition>;
+	private series = new Map<string, Map<string, Series>>();
+
+	constructor(definitions: Record<string, MetricDefinition> = RALPHY_METRICS) {
+		this.definitions = definitions;
+	}
+
+	private getSeries(name: string, labels?: MetricLabels): Series {
+		if (!this.definitions[name]) {
+			throw new Error(`Unknown metric: ${name}`);
+		}
+
+		let family = this.series.get(name);
+		if (!family) {
+			family = new Map();
+			this.series.set(name, family);
+		}
+
+		const key = formatLabels(labels);
+		let series = family.get(key);
+		if (!series) {
+			series = { labels: key, value: 0 };
+			family.set(key, series);
+		}
+		return series;
+	}
+
+	/**
+	 * Add to a counter or gauge
+	 */
+	increment(name: string, labels?: MetricLabels, value = 1): void {
+		this.getSeries(name, labels).value += value;
+	}
+
+	/**
+	 * Set a gauge
+	 */
+	set(name: string, value: number, labels?: MetricLabels): void {
+		this.getSeries(name, labels).value = value;
+	}
+
+	/**
+	 * Record a histogram observation
+	 */
+	observe(name: string, value: number, labels?: MetricLabels): void {
+		const buckets = this.definitions[name]?.buckets ?? DEFAULT_BUCKETS;
+		const series = this.getSeries(name, labels);
+		if (!series.histogram) {
+			series.histogram = { counts: new Array(buckets.length).fill(0), sum: 0, count: 0 };
+		}
+
+		const histogram = series.histogram;
+		for (let i = 0; i < buckets.length; i++) {
+			if (value <= buckets[i]) {
+				histogram.counts[i]++;
+				break;
+			}
+		}
+		histogram.sum += value;
+		histogram.count++;
+	}
+
+	/**
+	 * Current value of a counter or gauge series (0 if never recorded)
+	 */
+	getValue(name: string, labels?: MetricLabels): number {
+		return this.series.get(name)?.get(formatLabels(labels))?.value ?? 0;
+	}
+
+	/**
+	 * Render all metrics in the Prometheus text exposition format (0.0.4)
+	 */
+	render(): string {
+		const lines: string[] = [];
+
+		for (const [name, definition] of Object.entries(this.definitions)) {
+			lines.push(`# HELP ${name} ${definition.help}`);
+			lines.push(`# TYPE ${name} ${definition.type}`);
+
+			const family = this.series.get(name);
+			if (!family) {
+				// Unlabeled counters and gauges start at zero
+				if (definition.type !== "histogram") lines.push(`${name} 0`);
+				continue;
+			}
+
+			for (const series of family.values()) {
+				if (definition.type !== "histogram") {
+					lines.push(`${withLabels(name, series.labels)} ${series.value}`);
+					continue;
+				}
+
+				const histogram = series.histogram;
+				if (!histogram) continue;
+				const buckets = definition.buckets ?? DEFAULT_BUCKETS;
+				let cumulative = 0;
+				for (let i = 0; i < buckets.length; i++) {
+					cumulative += histogram.counts[i];
+					const le = `le="${buckets[i]}"`;
+					lines.push(`${withLabels(`${name}_bucket`, series.labels, le)} ${cumulative}`);
+				}
+				const inf = withLabels(`${name}_bucket`, series.labels, 'le="+Inf"');
+				lines.push(`${inf} ${histogram.count}`);
+				lines.push(`${withLabels(`${name}_sum`, series.labels)} ${histogram.sum}`);
+				lines.push(`${withLabels(`${name}_count`, series.labels)} ${histogram.count}`);
+			}
+		}
+
+		return `${lines.join("\n")}\n`;
+	}
+}
+
+// Global state
+let registry: MetricsRegistry | null = null;
+
+/**
+ * Start recording metrics (keeps the current registry if already enabled)
+ */
+export function enableMetrics(): MetricsRegistry {
+	registry ??= new MetricsRegistry();
+	return registry;
+}
+
+/**
+ * Stop recording metrics and drop the registry
+ */
+export function disableMetrics(): void {
+	registry = null;
+}
+
+/**
+ * Get the active registry, or null if metrics are disabled
+ */
+export function getMetricsRegistry(): MetricsRegistry | null {
+	return registry;
+}
+
+/**
+ * Add to a counter (or gauge) when metrics are enabled
+ */
+export function incrementMetric(name: MetricName, labels?: MetricLabels, value = 1): void {
+	registry?.increment(name, labels, value);
+}
+
+/**
+ * Set a gauge when metrics are enabled
+ */
+export function setMetric(name: MetricName, value: number, labels?: MetricLabels): void {
+	registry?.set(name, value, labels);
+}
+
+/**
+ * Record a histogram observation when metrics are enabled
+ */
+export function observeMetric(name: MetricName, value: number, labels?: MetricLabels): void {
+	registry?.observe(name, value, labels);
+}
+
+export interface MetricsServer {
+	port: number;
+	url: string;
+	close(): Promise<void>;
+}
+
+/**
+ * Serve the metrics registry at http://host:port/metrics
+ *
+ * Enables metrics if they are not already. Binds to localhost by default;
+ * pass port 0 to pick a free port. The server does not keep the process alive.
+ */
+export async function startMetricsServer(
+	port: number,
+	host = "127.0.0.1",
+): Promise<MetricsServer> {
+	const metrics = enableMetrics();
+
+	const server: Server = createServer((req, res) => {
+		const path = (req.url ?? "/").split("?")[0];
+		if (req.method !== "GET" || path !== "/metrics") {
+			res.writeHead(404, { "Content-Type": "text/plain" });
+			res.end("Not found\n");
+			return;
+		}
+		res.writeHead(200, { "Content-Type": "text/plain; version=0.0.4; charset=utf-8" });
+		res.end(metrics.render());
+	});
+
+	await new Promise<void>((resolve, reject) => {
+		server.once("error", reject);
+		server.listen(port, host, () => {
+			server.off("error", reject);
+			resolve();
+		});
+	});
+
+	server.unref();
+
+	const boundPort = (server.address() as AddressInfo).port;
+	return {
+		port: boundPort,
+		url: `http://${host}:${boundPort}/metrics`,
+		close: () =>
+			new Promise<void>((resolve) => {
+				server.close(() => resolve());
+				server.closeAllConnections?.();
+			}),
+	};
+}
@@ -0,0 +1,146 @@
+/**
+ * Telemetry Segments
+ *
+ * Low-level helpers for JSONL segment files: streaming line reads with byte
+ * offsets, byte-range reads and gzip compression of closed segments.
+ */
+
+import { createReadStream, createWriteStream } from "node:fs";
+import { open, unlink } from "node:fs/promises";
+import type { Readable } from "node:stream";
+import { pipeline } from "node:stream/promises";
+import { createGunzip, createGzip } from "node:zlib";
+
+const NEWLINE = 0x0a;
+
+/**
+ * A line read from a segment, with its position in the uncompressed data
+ */
+export interface SegmentLine {
+	text: string;
+	/** Byte offset of the line */
+	offset: number;
+	/** Length in bytes, including the trailing newline */
+	length: number;
+}
+
+/**
+ * Open a segment for reading, decompressing gzip segments on the fly
+ */
+function openSegment(path: string, compressed: boolean): { source: Readable; close: () => void } {
+	const input = createReadStream(path);
+	if (!compressed) {
+		return { source: input, close: () => input.destroy() };
+	}
+
+	const gunzip = createGunzip();
+	input.on("error", (error) => gunzip.destroy(error));
+	input.pipe(gunzip);
+	return {
+		source: gunzip,
+		close: () => {
+			gunzip.destroy();
+			input.destroy();
+		},
+	};
+}
+
+/**
+ * Stream the lines of a segment without loading the whole file
+ */
+export async function* readSegmentLines(
+	path: string,
+	compressed = false,
+): AsyncGenerator<SegmentLine> {
+	const { source, close } = openSegment(path, compressed);
+	let pending: Buffer[] = [];
+	let offset = 0;
+
+	try {
+		for await (const chunk of source as AsyncIterable<Buffer>) {
+			let start = 0;
+			let end = chunk.indexOf(NEWLINE);
+
+			while (end !== -1) {
+				const piece = chunk.subarray(start, end + 1);
+				const bytes = pending.length > 0 ? Buffer.concat([...pending, piece]) : piece;
+				pending = [];
+
+				const text = bytes.toString("utf-8", 0, bytes.length - 1);
+				yield { text, offset, length: bytes.length };
+				offset += bytes.length;
+
+				start = end + 1;
+				end = chunk.indexOf(NEWLINE, start);
+			}
+
+			if (start < chunk.length) {
+				pending.push(chunk.subarray(start));
+			}
+		}
+
+		// Last line without a trailing newline
+		if (pending.length > 0) {
+			const bytes = Buffer.concat(pending);
+			yield { text: bytes.toString("utf-8"), offset, length: bytes.length };
+		}
+	} finally {
+		close();
+	}
+}
+
+/**
+ * Read a byte range of a segment's uncompressed data
+ */
+export async function readSegmentRange(
+	path: string,
+	compressed: boolean,
+	offset: number,
+	length: number,
+): Promise<string> {
+	if (!compressed) {
+		const handle = await open(path, "r");
+		try {
+			const buffer = Buffer.alloc(length);
+			const { bytesRead } = await handle.read(buffer, 0, length, offset);
+			return buffer.toString("utf-8", 0, bytesRead);
+		} finally {
+			await handle.close();
+		}
+	}
+
+	// Gzip has no random access: decompress up to the end of the range
+	const { source, close } = openSegment(path, compressed);
+	const parts: Buffer[] = [];
+	const end = offset + length;
+	let position = 0;
+
+	try {
+		for await (const chunk of source as AsyncIterable<Buffer>) {
+			const chunkEnd = position + chunk.length;
+			if (chunkEnd > offset) {
+				const from = Math.max(0, offset - position);
+				const to = Math.min(chunk.length, end - position);
+				parts.push(chunk.subarray(from, to));
+			}
+			position = chunkEnd;
+			if (position >= end) {
+				break;
+			}
+		}
+	} finally {
+		close();
+	}
+
+	return Buffer.concat(parts).toString("utf-8");
+}
+
+/**
+ * Compress a closed segment to `<path>.gz` and remove the original
+ */
+export async function gzipSegment(path: string): Promise<string> {
+	const target = `${path}.gz`;
+	await pipeline(createReadStream(path), createGzip(), createWriteStream(target));
+	await unlink(path);
+	return target;
+}
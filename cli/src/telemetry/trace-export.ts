@@ -0,0 +1,199 @@
+/**
+ * Trace Export
+ *
+ * Converts collected spans to OTLP JSON (for OpenTelemetry collectors and
+ * backends) and to Chrome trace-event JSON (for Perfetto / chrome://tracing).
+ */
+
+import { mkdir, writeFile } from "node:fs/promises";
+import { join } from "node:path";
+import type { SpanAttributeValue, SpanRecord, Tracer } from "./tracing.js";
+
+/**
+ * OTLP attribute (AnyValue subset used here)
+ */
+export interface OtlpAttribute {
+	key: string;
+	value:
+		| { stringValue: string }
+		| { intValue: string }
+		| { doubleValue: number }
+		| { boolValue: boolean };
+}
+
+export interface OtlpSpan {
+	traceId: string;
+	spanId: string;
+	parentSpanId?: string;
+	name: string;
+	/** SPAN_KIND_INTERNAL */
+	kind: 1;
+	startTimeUnixNano: string;
+	endTimeUnixNano: string;
+	attributes: OtlpAttribute[];
+	/** STATUS_CODE_UNSET (0) or STATUS_CODE_ERROR (2) */
+	status: { code: 0 | 2; message?: string };
+}
+
+/**
+ * OTLP/JSON ExportTraceServiceRequest
+ */
+export interface OtlpTrace {
+	resourceSpans: Array<{
+		resource: { attributes: OtlpAttribute[] };
+		scopeSpans: Array<{
+			scope: { name: string; version?: string };
+			spans: OtlpSpan[];
+		}>;
+	}>;
+}
+
+export interface ChromeTraceEvent {
+	name: string;
+	cat?: string;
+	/** "X" = complete event, "M" = metadata */
+	ph: "X" | "M";
+	/** Microseconds */
+	ts?: number;
+	dur?: number;
+	pid: number;
+	tid: number;
+	args?: Record<string, SpanAttributeValue>;
+}
+
+export interface ChromeTrace {
+	traceEvents: ChromeTraceEvent[];
+	displayTimeUnit: "ms";
+}
+
+function toAttribute(key: string, value: SpanAttributeValue): OtlpAttribute {
+	if (typeof value === "boolean") return { key, value: { boolValue: value } };
+	if (typeof value === "number") {
+		return Number.isInteger(value)
+			? { key, value: { intValue: String(value) } }
+			: { key, value: { doubleValue: value } };
+	}
+	return { key, value: { stringValue: value } };
+}
+
+/**
+ * Unix ms (fractional) as a nanosecond string, without losing precision
+ */
+function toUnixNano(ms: number): string {
+	const wholeMs = Math.floor(ms);
+	const nanos = Math.round((ms - wholeMs) * 1_000_000);
+	return (BigInt(wholeMs) * 1_000_000n + BigInt(nanos)).toString();
+}
+
+function byStartTime(a: SpanRecord, b: SpanRecord): number {
+	return a.startTime - b.startTime;
+}
+
+function toOtlpSpan(traceId: string, span: SpanRecord): OtlpSpan {
+	return {
+		traceId,
+		spanId: span.spanId,
+		...(span.parentSpanId && { parentSpanId: span.parentSpanId }),
+		name: span.name,
+		kind: 1,
+		startTimeUnixNano: toUnixNano(span.startTime),
+		endTimeUnixNano: toUnixNano(span.endTime),
+		attributes: Object.entries(span.attributes).map(([key, value]) => toAttribute(key, value)),
+		status: span.error ? { code: 2, message: span.error } : { code: 0 },
+	};
+}
+
+/**
+ * Convert spans to an OTLP/JSON trace
+ */
+export function toOtlpTrace(
+	traceId: string,
+	spans: SpanRecord[],
+	resource: Record<string, SpanAttributeValue> = {},
+): OtlpTrace {
+	const resourceAttributes = Object.entries({ "service.name": "ralphy", ...resource }).map(
+		([key, value]) => toAttribute(key, value),
+	);
+
+	return {
+		resourceSpans: [
+			{
+				resource: { attributes: resourceAttributes },
+				scopeSpans: [
+					{
+						scope: { name: "ralphy" },
+						spans: [...spans].sort(byStartTime).map((span) => toOtlpSpan(traceId, span)),
+					},
+				],
+			},
+		],
+	};
+}
+
+/**
+ * Convert spans to Chrome trace-event JSON, one thread per span lane
+ */
+export function toChromeTrace(spans: SpanRecord[]): ChromeTrace {
+	const pid = process.pid;
+	const sorted = [...spans].sort(byStartTime);
+	const origin = sorted[0]?.startTime ?? 0;
+	const lanes = new Set<number>();
+
+	const events: ChromeTraceEvent[] = sorted.map((span) => {
+		lanes.add(span.lane);
+		return {
+			name: span.name,
+			cat: span.name.split(".")[0],
+			ph: "X",
+			ts: Math.round((span.startTime - origin) * 1000),
+			dur: Math.max(0, Math.round((span.endTime - span.startTime) * 1000)),
+			pid,
+			tid: span.lane,
+			args: span.error ? { ...span.attributes, error: span.error } : span.attributes,
+		};
+	});
+
+	const metadata: ChromeTraceEvent[] = [
+		{ name: "process_name", ph: "M", pid, tid: 0, args: { name: "ralphy" } },
+	];
+	for (const lane of [...lanes].sort((a, b) => a - b)) {
+		metadata.push({
+			name: "thread_name",
+			ph: "M",
+			pid,
+			tid: lane,
+			args: { name: lane === 0 ? "main" : `lane ${lane}` },
+		});
+	}
+
+	return { traceEvents: [...metadata, ...events], displayTimeUnit: "ms" };
+}
+
+/**
+ * Write a tracer's spans as `<name>.otlp.json` and `<name>.trace.json`
+ *
+ * @param tracer - Tracer returned by stopTracing()
+ * @param outputDir - Directory for the trace files
+ * @param resource - Extra resource attributes (service.version, engine, mode)
+ * @returns Paths of the written files
+ */
+export async function writeTraceFiles(
+	tracer: Tracer,
+	outputDir: string,
+	resource: Record<string, SpanAttributeValue> = {},
+): Promise<{ otlp: string; chrome: string }> {
+	await mkdir(outputDir, { recursive: true });
+
+	const stamp = new Date().toISOString().replace(/[:.]/g, "-");
+	const baseName = `trace-${stamp}-${tracer.traceId.slice(0, 8)}`;
+	const otlp = join(outputDir, `${baseName}.otlp.json`);
+	const chrome = join(outputDir, `${baseName}.trace.json`);
+	const spans = tracer.getSpans();
+
+	await Promise.all([
+		writeFile(otlp, JSON.stringify(toOtlpTrace(tracer.traceId, spans, resource)), "utf-8"),
+		writeFile(chrome, JSON.stringify(toChromeTrace(spans)), "utf-8"),
+	]);
+
+	return { otlp, chrome };
+}
@@ -0,0 +1,224 @@
+/**
+ * Span Tracing
+ *
+ * Records nested spans for the orchestrator's own work (isolation, PRD
+ * copies, retries, sandbox diffs and commits, merges, cleanup, task I/O).
+ * The current span is tracked with AsyncLocalStorage, so concurrent agents
+ * each get their own subtree without passing spans around.
+ *
+ * Tracing is off by default; withSpan() is then a single null check.
+ *
+ * Usage:
+ *   startTracing();
+ *   await withSpan("sandbox.create", { agent: 2 }, () => createSandbox(options));
+ *   const tracer = stopTracing();
+ *   await writeTraceFiles(tracer, ".ralphy/traces");
+ */
+
+import { AsyncLocalStorage } from "node:async_hooks";
+import { randomBytes } from "node:crypto";
+
+export type SpanAttributeValue = string | number | boolean;
+
+/** Span attributes; undefined values are skipped */
+export type SpanAttributes = Record<string, SpanAttributeValue | undefined>;
+
+/**
+ * A finished span
+ */
+export interface SpanRecord {
+	spanId: string;
+	parentSpanId?: string;
+	name: string;
+	/** Unix time in ms (fractional) */
+	startTime: number;
+	/** Unix time in ms (fractional) */
+	endTime: number;
+	attributes: Record<string, SpanAttributeValue>;
+	/** Error message when the traced work threw */
+	error?: string;
+	/**
+	 * Display lane for trace viewers. A span shares its parent's lane unless
+	 * another span is already running there (a sibling, or a child that outlived
+	 * its own parent), so overlapping spans never share a lane unless nested.
+	 */
+	lane: number;
+}
+
+/**
+ * Handle passed to traced functions
+ */
+export interface Span {
+	setAttribute(key: string, value: SpanAttributeValue): void;
+}
+
+export interface TracerOptions {
+	/** Spans kept in memory before new ones are dropped (default: 100000) */
+	maxSpans?: number;
+	/** Clock returning Unix time in ms (default: Date.now() origin + performance.now()) */
+	now?: () => number;
+}
+
+const DEFAULT_MAX_SPANS = 100_000;
+
+const NOOP_SPAN: Span = {
+	setAttribute() {},
+};
+
+/**
+ * Collects spans for one run
+ */
+export class Tracer {
+	readonly traceId = randomBytes(16).toString("hex");
+	private storage = new AsyncLocalStorage<SpanRecord>();
+	private spans: SpanRecord[] = [];
+	private dropped = 0;
+	private maxSpans: number;
+	private now: () => number;
+	/** Running spans per lane, outermost first. Lane 0 is for root spans. */
+	private lanes = new Map<number, SpanRecord[]>();
+	private nextLane = 1;
+	private freeLanes: number[] = [];
+
+	constructor(options: TracerOptions = {}) {
+		const origin = Date.now() - performance.now();
+		this.now = options.now ?? (() => origin + performance.now());
+		this.maxSpans = options.maxSpans ?? DEFAULT_MAX_SPANS;
+	}
+
+	/**
+	 * Run fn inside a new span, a child of the current span if there is one
+	 */
+	async withSpan<T>(
+		name: string,
+		attributes: SpanAttributes,
+		fn: (span: Span) => Promise<T>,
+	): Promise<T> {
+		const parent = this.storage.getStore();
+
+		// Take the parent's lane if nothing else runs inside the parent there,
+		// otherwise a lane of our own
+		const parentLane = parent?.lane ?? 0;
+		const running = this.lanes.get(parentLane) ?? [];
+		const lane =
+			running[running.length - 1] === parent
+				? parentLane
+				: (this.freeLanes.pop() ?? this.nextLane++);
+
+		const record: SpanRecord = {
+			spanId: randomBytes(8).toString("hex"),
+			parentSpanId: parent?.spanId,
+			name,
+			startTime: this.now(),
+			endTime: 0,
+			attributes: {},
+			lane,
+		};
+		for (const [key, value] of Object.entries(attributes)) {
+			if (value !== undefined) record.attributes[key] = value;
+		}
+
+		const span: Span = {
+			setAttribute: (key, value) => {
+				record.attributes[key] = value;
+			},
+		};
+
+		const laneSpans = this.lanes.get(lane) ?? [];
+		laneSpans.push(record);
+		this.lanes.set(lane, laneSpans);
+
+		try {
+			return await this.storage.run(record, () => fn(span));
+		} catch (error) {
+			record.error = error instanceof Error ? error.message : String(error);
+			throw error;
+		} finally {
+			record.endTime = this.now();
+			laneSpans.splice(laneSpans.indexOf(record), 1);
+			if (laneSpans.length === 0) {
+				this.lanes.delete(lane);
+				if (lane !== 0) this.freeLanes.push(lane);
+			}
+
+			if (this.spans.length < this.maxSpans) {
+				this.spans.push(record);
+			} else {
+				this.dropped++;
+			}
+		}
+	}
+
+	/**
+	 * Run fn outside the current span, so spans it starts are roots. Use this for
+	 * background work that may outlive the span that started it.
+	 */
+	detach<T>(fn: () => T): T {
+		return this.storage.exit(fn);
+	}
+
+	/**
+	 * Finished spans, in the order they ended
+	 */
+	getSpans(): SpanRecord[] {
+		return this.spans;
+	}
+
+	/**
+	 * Spans dropped after maxSpans was reached
+	 */
+	getDroppedCount(): number {
+		return this.dropped;
+	}
+}
+
+// Global state
+let tracer: Tracer | null = null;
+
+/**
+ * Start collecting spans (replaces any running tracer)
+ */
+export function startTracing(options?: TracerOptions): Tracer {
+	tracer = new Tracer(options);
+	return tracer;
+}
+
+/**
+ * Stop collecting spans
+ *
+ * @returns The tracer with the collected spans, or null if tracing was off
+ */
+export function stopTracing(): Tracer | null {
+	const stopped = tracer;
+	tracer = null;
+	return stopped;
+}
+
+/**
+ * Check if tracing is enabled
+ */
+export function isTracingEnabled(): boolean {
+	return tracer !== null;
+}
+
+/**
+ * Run fn outside the current span when tracing is enabled (see Tracer.detach)
+ */
+export function detachSpan<T>(fn: () => T): T {
+	return tracer ? tracer.detach(fn) : fn();
+}
+
+/**
+ * Run fn inside a span when tracing is enabled, or just run it otherwise
+ *
+ * @param name - Span name (e.g. "sandbox.create")
+ * @param attributes - Span attributes (agent number, task title, counts)
+ * @param fn - Work to trace
+ */
+export function withSpan<T>(
+	name: string,
+	attributes: SpanAttributes,
+	fn: (span: Span) => Promise<T>,
+): Promise<T> {
+	return tracer ? tracer.withSpan(name, attributes, fn) : fn(NOOP_SPAN);
+}
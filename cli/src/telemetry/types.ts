@@ -95,6 +95,19 @@ export interface TelemetryOptions {
 	level?: TelemetryLevel;
 	outputDir?: string;
 	tags?: string[];
+	store?: TelemetryStoreOptions;
+}
+
+/**
+ * Segment rotation for the telemetry store
+ */
+export interface TelemetryStoreOptions {
+	/** Close the active segment before it grows past this size (default 64 MB) */
+	maxSegmentBytes?: number;
+	/** Close the active segment once it is this old (default 7 days) */
+	maxSegmentAgeMs?: number;
+	/** Gzip closed segments */
+	compress?: boolean;
 }
 
 /**
@@ -1,17 +1,301 @@
 /**
  * Telemetry Writer
  *
- * Persists session and tool call data to JSONL files.
+ * Persists session and tool call data to segmented JSONL files.
+ *
+ * Output directory layout:
+ * - sessions.jsonl, tool_calls.jsonl: active segments, appended to
+ * - sessions.000001.jsonl[.gz], ...: closed segments, rotated by size or age
+ * - index.jsonl: sessionId → segment and byte range of its records
+ * - store.json: segment list and running aggregates
+ *
+ * - store.lock: held while appending, rotating or rebuilding
+ *
+ * Several processes may share a store: every write takes store.lock and
+ * re-reads store.json, so updates from other writers are never overwritten.
+ * The index is kept in memory and only the lines appended since the last read
+ * are read back.
  */
 
 import { existsSync } from "node:fs";
-import { appendFile, mkdir, readFile, readdir } from "node:fs/promises";
+import {
+	appendFile,
+	mkdir,
+	open,
+	readFile,
+	readdir,
+	rename,
+	rm,
+	stat,
+	writeFile,
+} from "node:fs/promises";
 import { dirname, join } from "node:path";
-import type { Session, SessionFull, ToolCall } from "./types.js";
+import { setTimeout as sleep } from "node:timers/promises";
+import { gzipSegment, readSegmentLines, readSegmentRange } from "./segments.js";
+import type { Session, SessionFull, TelemetryStoreOptions, ToolCall } from "./types.js";
 
 const DEFAULT_OUTPUT_DIR = ".ralphy/telemetry";
 const SESSIONS_FILE = "sessions.jsonl";
 const TOOL_CALLS_FILE = "tool_calls.jsonl";
+const INDEX_FILE = "index.jsonl";
+const MANIFEST_FILE = "store.json";
+const LOCK_FILE = "store.lock";
+const STORE_VERSION = 1;
+
+const DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024;
+const DEFAULT_MAX_SEGMENT_AGE_MS = 7 * 24 * 60 * 60 * 1000;
+
+/** A lock older than this is left over from a crashed writer */
+const LOCK_STALE_MS = 60 * 1000;
+const LOCK_RETRY_MS = 10;
+
+type StreamName = "sessions" | "tool_calls";
+
+const STREAM_FILES: Record<StreamName, string> = {
+	sessions: SESSIONS_FILE,
+	tool_calls: TOOL_CALLS_FILE,
+};
+
+/**
+ * Running totals over every stored record
+ */
+export interface TelemetryAggregates {
+	sessionCount: number;
+	/** Tool calls counted from session summaries */
+	toolCallCount: number;
+	/** Records in tool_calls segments */
+	toolCallRecords: number;
+	totalTokensIn: number;
+	totalTokensOut: number;
+	successCount: number;
+	failedCount: number;
+	oldestTimestamp?: number;
+	newestTimestamp?: number;
+	engines: string[];
+	modes: string[];
+	toolsUsed: string[];
+}
+
+/**
+ * A closed segment file
+ */
+interface SegmentInfo {
+	seq: number;
+	file: string;
+	compressed: boolean;
+	records: number;
+	/** Uncompressed size */
+	bytes: number;
+	createdAt: number;
+	closedAt: number;
+}
+
+/**
+ * Segments of one stream (sessions or tool calls)
+ */
+interface StreamState {
+	activeSeq: number;
+	/** When the first record was appended to the active segment (0 if empty) */
+	activeCreatedAt: number;
+	activeRecords: number;
+	closed: SegmentInfo[];
+}
+
+interface StoreManifest {
+	version: number;
+	streams: Record<StreamName, StreamState>;
+	aggregates: TelemetryAggregates;
+}
+
+/**
+ * Sidecar index entry: the records of one session in one segment
+ */
+interface IndexEntry {
+	id: string;
+	stream: StreamName;
+	seq: number;
+	offset: number;
+	length: number;
+}
+
+function emptyAggregates(): TelemetryAggregates {
+	return {
+		sessionCount: 0,
+		toolCallCount: 0,
+		toolCallRecords: 0,
+		totalTokensIn: 0,
+		totalTokensOut: 0,
+		successCount: 0,
+		failedCount: 0,
+		engines: [],
+		modes: [],
+		toolsUsed: [],
+	};
+}
+
+function emptyManifest(): StoreManifest {
+	const stream = (): StreamState => ({
+		activeSeq: 1,
+		activeCreatedAt: 0,
+		activeRecords: 0,
+		closed: [],
+	});
+	return {
+		version: STORE_VERSION,
+		streams: { sessions: stream(), tool_calls: stream() },
+		aggregates: emptyAggregates(),
+	};
+}
+
+function addUnique(values: string[], value: string): void {
+	if (!values.includes(value)) {
+		values.push(value);
+	}
+}
+
+/**
+ * Fold a session into the running aggregates
+ */
+function addSession(aggregates: TelemetryAggregates, session: Session | SessionFull): void {
+	aggregates.sessionCount++;
+	aggregates.totalTokensIn += session.totalTokensIn;
+	aggregates.totalTokensOut += session.totalTokensOut;
+	aggregates.successCount += session.successCount;
+	aggregates.failedCount += session.failedCount;
+	addUnique(aggregates.engines, session.engine);
+	addUnique(aggregates.modes, session.mode);
+
+	for (const tc of session.toolCalls) {
+		aggregates.toolCallCount += tc.callCount;
+		addUnique(aggregates.toolsUsed, tc.toolName);
+	}
+
+	if (aggregates.oldestTimestamp === undefined || session.timestamp < aggregates.oldestTimestamp) {
+		aggregates.oldestTimestamp = session.timestamp;
+	}
+	if (aggregates.newestTimestamp === undefined || session.timestamp > aggregates.newestTimestamp) {
+		aggregates.newestTimestamp = session.timestamp;
+	}
+}
+
+/**
+ * Split serialized tool calls into per-session index entries.
+ * Consecutive calls of the same session share one byte range.
+ */
+function toolCallRanges(
+	toolCalls: ToolCall[],
+	lines: string[],
+	seq: number,
+	baseOffset: number,
+): IndexEntry[] {
+	const entries: IndexEntry[] = [];
+	let offset = baseOffset;
+
+	for (const [i, call] of toolCalls.entries()) {
+		const length = Buffer.byteLength(lines[i]) + 1;
+		const last = entries[entries.length - 1];
+		if (last && last.id === call.sessionId) {
+			last.length += length;
+		} else {
+			entries.push({ id: call.sessionId, stream: "tool_calls", seq, offset, length });
+		}
+		offset += length;
+	}
+
+	return entries;
+}
+
+/**
+ * In-memory copy of index.jsonl, up to `bytes`
+ */
+interface LoadedIndex {
+	entries: Map<string, IndexEntry[]>;
+	/** Inode of the file read, to notice when a rebuild replaced it */
+	ino: number;
+	bytes: number;
+}
+
+function addToIndex(index: Map<string, IndexEntry[]>, entry: IndexEntry): void {
+	const entries = index.get(entry.id);
+	if (entries) {
+		entries.push(entry);
+	} else {
+		index.set(entry.id, [entry]);
+	}
+}
+
+function parseLines<T>(content: string): T[] {
+	return content
+		.split("\n")
+		.filter((line) => line.trim())
+		.map((line) => JSON.parse(line) as T);
+}
+
+async function fileSize(path: string): Promise<number> {
+	try {
+		return (await stat(path)).size;
+	} catch {
+		return 0;
+	}
+}
+
+function isProcessAlive(pid: number): boolean {
+	try {
+		process.kill(pid, 0);
+		return true;
+	} catch (error) {
+		return (error as NodeJS.ErrnoException).code === "EPERM";
+	}
+}
+
+/**
+ * Whether a lock file was left behind by a writer that is gone
+ */
+async function isStaleLock(path: string): Promise<boolean> {
+	try {
+		const [info, content] = await Promise.all([stat(path), readFile(path, "utf-8")]);
+		if (Date.now() - info.mtimeMs >= LOCK_STALE_MS) {
+			return true;
+		}
+		const pid = Number.parseInt(content, 10);
+		return pid > 0 && pid !== process.pid && !isProcessAlive(pid);
+	} catch {
+		// Released in the meantime
+		return false;
+	}
+}
+
+/**
+ * Remove a stale lock. Staleness is checked again while holding a second lock,
+ * so two writers can't both break it and one remove the lock the other just took.
+ */
+async function breakStaleLock(lockPath: string): Promise<void> {
+	const breakPath = `${lockPath}.break`;
+	try {
+		await (await open(breakPath, "wx")).close();
+	} catch (error) {
+		if ((error as NodeJS.ErrnoException).code !== "EEXIST") {
+			throw error;
+		}
+		// Another writer is breaking it; one that crashed doing so expires by age
+		try {
+			if (Date.now() - (await stat(breakPath)).mtimeMs >= LOCK_STALE_MS) {
+				await rm(breakPath, { force: true });
+			}
+		} catch {
+			// Already removed
+		}
+		return;
+	}
+
+	try {
+		if (await isStaleLock(lockPath)) {
+			await rm(lockPath, { force: true });
+		}
+	} finally {
+		await rm(breakPath, { force: true });
+	}
+}
 
 /**
  * Telemetry Writer
@@ -21,10 +305,19 @@ const TOOL_CALLS_FILE = "tool_calls.jsonl";
  */
 export class TelemetryWriter {
 	private outputDir: string;
+	private options: Required<TelemetryStoreOptions>;
 	private initialized = false;
+	private pending: Promise<unknown> = Promise.resolve();
+	/** sessionId → index entries, read from index.jsonl on first lookup */
+	private index: LoadedIndex | null = null;
 
-	constructor(outputDir?: string) {
+	constructor(outputDir?: string, options: TelemetryStoreOptions = {}) {
 		this.outputDir = outputDir || DEFAULT_OUTPUT_DIR;
+		this.options = {
+			maxSegmentBytes: options.maxSegmentBytes ?? DEFAULT_MAX_SEGMENT_BYTES,
+			maxSegmentAgeMs: options.maxSegmentAgeMs ?? DEFAULT_MAX_SEGMENT_AGE_MS,
+			compress: options.compress ?? false,
+		};
 	}
 
 	/**
@@ -54,10 +347,7 @@ export class TelemetryWriter {
 	 * Append a session record to sessions.jsonl
 	 */
 	async writeSession(session: Session | SessionFull): Promise<void> {
-		await this.ensureDir();
-		const path = join(this.outputDir, SESSIONS_FILE);
-		const line = `${JSON.stringify(session)}\n`;
-		await appendFile(path, line, "utf-8");
+		await this.serialize(() => this.append(session, []));
 	}
 
 	/**
@@ -65,58 +355,518 @@ export class TelemetryWriter {
 	 */
 	async writeToolCalls(toolCalls: ToolCall[]): Promise<void> {
 		if (toolCalls.length === 0) return;
-
-		await this.ensureDir();
-		const path = join(this.outputDir, TOOL_CALLS_FILE);
-		const lines = `${toolCalls.map((call) => JSON.stringify(call)).join("\n")}\n`;
-		await appendFile(path, lines, "utf-8");
+		await this.serialize(() => this.append(null, toolCalls));
 	}
 
 	/**
 	 * Write session and tool calls together
 	 */
 	async write(session: Session | SessionFull, toolCalls: ToolCall[]): Promise<void> {
-		await Promise.all([this.writeSession(session), this.writeToolCalls(toolCalls)]);
+		await this.serialize(() => this.append(session, toolCalls));
 	}
 
 	/**
-	 * Read all sessions from the JSONL file
+	 * Writes share the manifest, so they run one at a time
 	 */
-	async readSessions(): Promise<Array<Session | SessionFull>> {
-		const path = join(this.outputDir, SESSIONS_FILE);
+	private serialize<T>(fn: () => Promise<T>): Promise<T> {
+		const run = this.pending.then(fn);
+		this.pending = run.catch(() => undefined);
+		return run;
+	}
+
+	/**
+	 * Run fn while holding store.lock, which other processes writing to the
+	 * same directory take too. Locks left by crashed writers are broken.
+	 */
+	private async withLock<T>(fn: () => Promise<T>): Promise<T> {
+		await this.ensureDir();
+		const lockPath = this.path(LOCK_FILE);
+
+		while (true) {
+			try {
+				const handle = await open(lockPath, "wx");
+				try {
+					await handle.writeFile(String(process.pid), "utf-8");
+				} finally {
+					await handle.close();
+				}
+				break;
+			} catch (error) {
+				if ((error as NodeJS.ErrnoException).code !== "EEXIST") {
+					throw error;
+				}
+				if (await isStaleLock(lockPath)) {
+					await breakStaleLock(lockPath);
+				} else {
+					await sleep(LOCK_RETRY_MS);
+				}
+			}
+		}
+
+		try {
+			return await fn();
+		} finally {
+			await rm(lockPath, { force: true });
+		}
+	}
+
+	private async append(
+		session: Session | SessionFull | null,
+		toolCalls: ToolCall[],
+	): Promise<void> {
+		await this.withLock(() => this.appendLocked(session, toolCalls));
+	}
+
+	private async appendLocked(
+		session: Session | SessionFull | null,
+		toolCalls: ToolCall[],
+	): Promise<void> {
+		const manifest = await this.lockedManifest();
+		const entries: IndexEntry[] = [];
+
+		if (session) {
+			const line = JSON.stringify(session);
+			const { seq, offset } = await this.appendToStream(manifest, "sessions", [line]);
+			entries.push({
+				id: session.sessionId,
+				stream: "sessions",
+				seq,
+				offset,
+				length: Buffer.byteLength(line) + 1,
+			});
+			addSession(manifest.aggregates, session);
+		}
+
+		if (toolCalls.length > 0) {
+			const lines = toolCalls.map((call) => JSON.stringify(call));
+			const { seq, offset } = await this.appendToStream(manifest, "tool_calls", lines);
+			entries.push(...toolCallRanges(toolCalls, lines, seq, offset));
+			manifest.aggregates.toolCallRecords += toolCalls.length;
+		}
+
+		if (entries.length > 0) {
+			const indexLines = entries.map((entry) => JSON.stringify(entry)).join("\n");
+			await appendFile(this.path(INDEX_FILE), `${indexLines}\n`, "utf-8");
+			if (this.index) {
+				await this.refreshIndex();
+			}
+		}
+		await this.saveManifest(manifest);
+	}
+
+	/**
+	 * Append lines to a stream's active segment, rotating it first if needed.
+	 * Returns the segment and byte offset the lines were written at.
+	 */
+	private async appendToStream(
+		manifest: StoreManifest,
+		stream: StreamName,
+		lines: string[],
+	): Promise<{ seq: number; offset: number }> {
+		const path = this.path(STREAM_FILES[stream]);
+		const content = `${lines.join("\n")}\n`;
+		const state = manifest.streams[stream];
+		let offset = await fileSize(path);
+
+		if (offset > 0 && this.shouldRotate(state, offset, Buffer.byteLength(content))) {
+			await this.rotate(manifest, stream, offset);
+			offset = 0;
+		}
+
+		if (state.activeCreatedAt === 0) {
+			state.activeCreatedAt = Date.now();
+		}
+		await appendFile(path, content, "utf-8");
+		state.activeRecords += lines.length;
+
+		return { seq: state.activeSeq, offset };
+	}
 
+	private shouldRotate(state: StreamState, size: number, incoming: number): boolean {
+		if (size + incoming > this.options.maxSegmentBytes) {
+			return true;
+		}
+		return (
+			state.activeCreatedAt > 0 &&
+			Date.now() - state.activeCreatedAt >= this.options.maxSegmentAgeMs
+		);
+	}
+
+	/**
+	 * Close the active segment and start a new one.
+	 *
+	 * The manifest is saved before the rename, so a crash in between leaves a
+	 * closed segment whose file is still the active one; lockedManifest() finishes
+	 * the rename instead of resolving its index entries to the new active segment.
+	 */
+	private async rotate(manifest: StoreManifest, stream: StreamName, bytes: number): Promise<void> {
+		const state = manifest.streams[stream];
+		const base = STREAM_FILES[stream].replace(/\.jsonl$/, "");
+		const segment: SegmentInfo = {
+			seq: state.activeSeq,
+			file: `${base}.${String(state.activeSeq).padStart(6, "0")}.jsonl`,
+			compressed: false,
+			records: state.activeRecords,
+			bytes,
+			createdAt: state.activeCreatedAt,
+			closedAt: Date.now(),
+		};
+		state.closed.push(segment);
+		state.activeSeq++;
+		state.activeCreatedAt = 0;
+		state.activeRecords = 0;
+
+		await this.saveManifest(manifest);
+		await rename(this.path(STREAM_FILES[stream]), this.path(segment.file));
+
+		if (this.options.compress) {
+			await gzipSegment(this.path(segment.file));
+			segment.file = `${segment.file}.gz`;
+			segment.compressed = true;
+		}
+	}
+
+	/**
+	 * Finish a rotation interrupted between saving the manifest and renaming
+	 * (or compressing) the segment
+	 */
+	private async recoverRotation(manifest: StoreManifest): Promise<boolean> {
+		let recovered = false;
+		for (const stream of Object.keys(STREAM_FILES) as StreamName[]) {
+			const last = manifest.streams[stream].closed.at(-1);
+			if (!last || last.compressed || existsSync(this.path(last.file))) continue;
+
+			const activePath = this.path(STREAM_FILES[stream]);
+			if (existsSync(this.path(`${last.file}.gz`))) {
+				last.file = `${last.file}.gz`;
+				last.compressed = true;
+				recovered = true;
+			} else if ((await fileSize(activePath)) === last.bytes && last.bytes > 0) {
+				await rename(activePath, this.path(last.file));
+				recovered = true;
+			}
+		}
+		return recovered;
+	}
+
+	private path(file: string): string {
+		return join(this.outputDir, file);
+	}
+
+	/**
+	 * Segment files of a stream, oldest first
+	 */
+	private segments(
+		manifest: StoreManifest,
+		stream: StreamName,
+	): Array<{ seq: number; file: string; compressed: boolean }> {
+		const state = manifest.streams[stream];
+		return [
+			...state.closed,
+			{ seq: state.activeSeq, file: STREAM_FILES[stream], compressed: false },
+		];
+	}
+
+	/**
+	 * Read store.json, or null if it is missing or unreadable
+	 */
+	private async readManifest(): Promise<StoreManifest | null> {
+		const path = this.path(MANIFEST_FILE);
 		if (!existsSync(path)) {
-			return [];
+			return null;
+		}
+		try {
+			const manifest = JSON.parse(await readFile(path, "utf-8")) as StoreManifest;
+			return manifest.version === STORE_VERSION ? manifest : null;
+		} catch {
+			return null;
+		}
+	}
+
+	/**
+	 * The current manifest for reading. Only rebuilt (under the lock) if missing.
+	 */
+	private async loadManifest(): Promise<StoreManifest> {
+		if (!existsSync(this.outputDir)) {
+			return emptyManifest();
+		}
+		return (
+			(await this.readManifest()) ??
+			this.serialize(() => this.withLock(() => this.lockedManifest()))
+		);
+	}
+
+	/**
+	 * The current manifest for writing; the caller holds store.lock.
+	 * Finishes interrupted rotations, and rebuilds the manifest from the
+	 * segments if it is missing or unreadable.
+	 */
+	private async lockedManifest(): Promise<StoreManifest> {
+		const manifest = await this.readManifest();
+		if (!manifest) {
+			return this.scanSegments();
+		}
+		if (await this.recoverRotation(manifest)) {
+			await this.saveManifest(manifest);
+		}
+		return manifest;
+	}
+
+	private async saveManifest(manifest: StoreManifest): Promise<void> {
+		await this.replaceFile(MANIFEST_FILE, JSON.stringify(manifest));
+	}
+
+	/**
+	 * Write-then-rename so readers never see a partial file
+	 */
+	private async replaceFile(file: string, content: string): Promise<void> {
+		const tmpPath = this.path(`${file}.${process.pid}.tmp`);
+		await writeFile(tmpPath, content, "utf-8");
+		await rename(tmpPath, this.path(file));
+	}
+
+	/**
+	 * Rebuild the manifest and index by scanning every segment.
+	 * Used to migrate stores written before segmenting, or when store.json is lost.
+	 */
+	async rebuildIndex(): Promise<TelemetryAggregates> {
+		const manifest = await this.serialize(() => this.withLock(() => this.scanSegments()));
+		return manifest.aggregates;
+	}
+
+	private async scanSegments(): Promise<StoreManifest> {
+		const manifest = emptyManifest();
+		if (!existsSync(this.outputDir)) {
+			return manifest;
+		}
+
+		// Discover closed segments from their names
+		const files = await readdir(this.outputDir);
+		for (const stream of Object.keys(STREAM_FILES) as StreamName[]) {
+			const base = STREAM_FILES[stream].replace(/\.jsonl$/, "");
+			const pattern = new RegExp(`^${base}\\.(\\d+)\\.jsonl(\\.gz)?$`);
+			const state = manifest.streams[stream];
+
+			for (const file of files) {
+				const match = pattern.exec(file);
+				if (match) {
+					const seq = Number.parseInt(match[1], 10);
+					state.closed.push({
+						seq,
+						file,
+						compressed: match[2] !== undefined,
+						records: 0,
+						bytes: 0,
+						createdAt: 0,
+						closedAt: 0,
+					});
+				}
+			}
+			state.closed.sort((a, b) => a.seq - b.seq);
+			state.activeSeq = (state.closed[state.closed.length - 1]?.seq ?? 0) + 1;
+		}
+
+		const hasSegments = (stream: StreamName) =>
+			this.segments(manifest, stream).some((segment) => existsSync(this.path(segment.file)));
+		if (!hasSegments("sessions") && !hasSegments("tool_calls")) {
+			return manifest;
+		}
+
+		const entries: string[] = [];
+		for (const stream of Object.keys(STREAM_FILES) as StreamName[]) {
+			const state = manifest.streams[stream];
+
+			for (const segment of this.segments(manifest, stream)) {
+				const path = this.path(segment.file);
+				if (!existsSync(path)) continue;
+
+				let records = 0;
+				let bytes = 0;
+				let last: IndexEntry | undefined;
+				for await (const line of readSegmentLines(path, segment.compressed)) {
+					bytes = line.offset + line.length;
+					if (!line.text.trim()) continue;
+
+					records++;
+					const record = JSON.parse(line.text) as Session | ToolCall;
+					if (stream === "sessions") {
+						addSession(manifest.aggregates, record as Session);
+					} else {
+						manifest.aggregates.toolCallRecords++;
+					}
+
+					if (last && stream === "tool_calls" && last.id === record.sessionId) {
+						last.length = line.offset + line.length - last.offset;
+						continue;
+					}
+					if (last) entries.push(JSON.stringify(last));
+					last = {
+						id: record.sessionId,
+						stream,
+						seq: segment.seq,
+						offset: line.offset,
+						length: line.length,
+					};
+				}
+				if (last) entries.push(JSON.stringify(last));
+
+				const closed = state.closed.find((info) => info.seq === segment.seq);
+				if (closed) {
+					closed.records = records;
+					closed.bytes = bytes;
+				} else {
+					state.activeRecords = records;
+					state.activeCreatedAt = records > 0 ? Date.now() : 0;
+				}
+			}
+		}
+
+		await this.replaceFile(INDEX_FILE, entries.length > 0 ? `${entries.join("\n")}\n` : "");
+		await this.saveManifest(manifest);
+		this.index = null;
+		return manifest;
+	}
+
+	/**
+	 * Stream records of a stream across all segments, oldest first
+	 */
+	private async *iterate<T>(stream: StreamName): AsyncGenerator<T> {
+		const manifest = await this.loadManifest();
+		for (const segment of this.segments(manifest, stream)) {
+			const path = this.path(segment.file);
+			if (!existsSync(path)) continue;
+
+			for await (const line of readSegmentLines(path, segment.compressed)) {
+				if (line.text.trim()) {
+					yield JSON.parse(line.text) as T;
+				}
+			}
 		}
+	}
 
-		const content = await readFile(path, "utf-8");
-		const lines = content.trim().split("\n").filter(Boolean);
+	/**
+	 * Stream all sessions without loading them into memory
+	 */
+	iterateSessions(): AsyncGenerator<Session | SessionFull> {
+		return this.iterate<Session | SessionFull>("sessions");
+	}
+
+	/**
+	 * Stream all tool calls without loading them into memory
+	 */
+	iterateToolCalls(): AsyncGenerator<ToolCall> {
+		return this.iterate<ToolCall>("tool_calls");
+	}
 
-		return lines.map((line) => JSON.parse(line) as Session | SessionFull);
+	/**
+	 * Read all sessions
+	 */
+	async readSessions(): Promise<Array<Session | SessionFull>> {
+		const sessions: Array<Session | SessionFull> = [];
+		for await (const session of this.iterateSessions()) {
+			sessions.push(session);
+		}
+		return sessions;
 	}
 
 	/**
-	 * Read all tool calls from the JSONL file
+	 * Read all tool calls
 	 */
 	async readToolCalls(): Promise<ToolCall[]> {
-		const path = join(this.outputDir, TOOL_CALLS_FILE);
+		const toolCalls: ToolCall[] = [];
+		for await (const call of this.iterateToolCalls()) {
+			toolCalls.push(call);
+		}
+		return toolCalls;
+	}
 
-		if (!existsSync(path)) {
+	/**
+	 * Bring the in-memory index up to date with index.jsonl. Only lines appended
+	 * since the last read are read, unless a rebuild replaced the file.
+	 */
+	private async refreshIndex(): Promise<Map<string, IndexEntry[]>> {
+		const path = this.path(INDEX_FILE);
+		let info: { ino: number; size: number };
+		try {
+			info = await stat(path);
+		} catch {
+			// Nothing (new) to read
+			this.index ??= { entries: new Map(), ino: 0, bytes: 0 };
+			return this.index.entries;
+		}
+
+		let index = this.index;
+		if (!index || index.ino !== info.ino || info.size < index.bytes) {
+			index = { entries: new Map(), ino: info.ino, bytes: 0 };
+			this.index = index;
+		}
+
+		if (info.size > index.bytes) {
+			const tail = await readSegmentRange(path, false, index.bytes, info.size - index.bytes);
+			// Leave a line another process is still writing for the next read
+			const complete = tail.slice(0, tail.lastIndexOf("\n") + 1);
+			for (const entry of parseLines<IndexEntry>(complete)) {
+				addToIndex(index.entries, entry);
+			}
+			index.bytes += Buffer.byteLength(complete);
+		}
+		return index.entries;
+	}
+
+	/**
+	 * Find the index entries of a session
+	 */
+	private async lookup(sessionId: string): Promise<IndexEntry[]> {
+		// In the write queue, so reading the file and updating the map don't
+		// interleave with this writer's appends
+		const index = await this.serialize(() => this.refreshIndex());
+		return index.get(sessionId) ?? [];
+	}
+
+	/**
+	 * Read the records an index entry points at
+	 */
+	private async readEntry<T>(manifest: StoreManifest, entry: IndexEntry): Promise<T[]> {
+		const segment = this.segments(manifest, entry.stream).find((s) => s.seq === entry.seq);
+		if (!segment || !existsSync(this.path(segment.file))) {
 			return [];
 		}
 
-		const content = await readFile(path, "utf-8");
-		const lines = content.trim().split("\n").filter(Boolean);
+		const content = await readSegmentRange(
+			this.path(segment.file),
+			segment.compressed,
+			entry.offset,
+			entry.length,
+		);
+		return parseLines<T>(content);
+	}
 
-		return lines.map((line) => JSON.parse(line) as ToolCall);
+	/**
+	 * Read a single session by ID
+	 */
+	async readSession(sessionId: string): Promise<Session | SessionFull | null> {
+		const manifest = await this.loadManifest();
+		for (const entry of await this.lookup(sessionId)) {
+			if (entry.stream !== "sessions") continue;
+			const [session] = await this.readEntry<Session | SessionFull>(manifest, entry);
+			if (session) {
+				return session;
+			}
+		}
+		return null;
 	}
 
 	/**
 	 * Read tool calls for a specific session
 	 */
 	async readSessionToolCalls(sessionId: string): Promise<ToolCall[]> {
-		const allCalls = await this.readToolCalls();
-		return allCalls.filter((call) => call.sessionId === sessionId);
+		const manifest = await this.loadManifest();
+		const toolCalls: ToolCall[] = [];
+		for (const entry of await this.lookup(sessionId)) {
+			if (entry.stream !== "tool_calls") continue;
+			toolCalls.push(...(await this.readEntry<ToolCall>(manifest, entry)));
+		}
+		return toolCalls;
 	}
 
 	/**
@@ -124,7 +874,17 @@ export class TelemetryWriter {
 	 */
 	async hasData(): Promise<boolean> {
 		const sessionsPath = join(this.outputDir, SESSIONS_FILE);
-		return existsSync(sessionsPath);
+		if (existsSync(sessionsPath)) {
+			return true;
+		}
+		return (await this.loadManifest()).aggregates.sessionCount > 0;
+	}
+
+	/**
+	 * Get running totals over all stored data
+	 */
+	async getAggregates(): Promise<TelemetryAggregates> {
+		return (await this.loadManifest()).aggregates;
 	}
 
 	/**
@@ -138,9 +898,9 @@ export class TelemetryWriter {
 		oldestTimestamp?: number;
 		newestTimestamp?: number;
 	}> {
-		const sessions = await this.readSessions();
+		const aggregates = await this.getAggregates();
 
-		if (sessions.length === 0) {
+		if (aggregates.sessionCount === 0) {
 			return {
 				sessionCount: 0,
 				toolCallCount: 0,
@@ -149,32 +909,13 @@ export class TelemetryWriter {
 			};
 		}
 
-		let totalTokensIn = 0;
-		let totalTokensOut = 0;
-		let toolCallCount = 0;
-		let oldestTimestamp = sessions[0].timestamp;
-		let newestTimestamp = sessions[0].timestamp;
-
-		for (const session of sessions) {
-			totalTokensIn += session.totalTokensIn;
-			totalTokensOut += session.totalTokensOut;
-			toolCallCount += session.toolCalls.reduce((sum, tc) => sum + tc.callCount, 0);
-
-			if (session.timestamp < oldestTimestamp) {
-				oldestTimestamp = session.timestamp;
-			}
-			if (session.timestamp > newestTimestamp) {
-				newestTimestamp = session.timestamp;
-			}
-		}
-
 		return {
-			sessionCount: sessions.length,
-			toolCallCount,
-			totalTokensIn,
-			totalTokensOut,
-			oldestTimestamp,
-			newestTimestamp,
+			sessionCount: aggregates.sessionCount,
+			toolCallCount: aggregates.toolCallCount,
+			totalTokensIn: aggregates.totalTokensIn,
+			totalTokensOut: aggregates.totalTokensOut,
+			oldestTimestamp: aggregates.oldestTimestamp,
+			newestTimestamp: aggregates.newestTimestamp,
 		};
 	}
 
@@ -1,6 +1,7 @@
 import pc from "picocolors";
 
 let verboseMode = false;
+let quietMode = false;
 
 /**
  * Set verbose mode
@@ -9,10 +10,18 @@ export function setVerbose(verbose: boolean): void {
 	verboseMode = verbose;
 }
 
+/**
+ * Set quiet mode (only errors are logged)
+ */
+export function setQuiet(quiet: boolean): void {
+	quietMode = quiet;
+}
+
 /**
  * Log info message
  */
 export function logInfo(...args: unknown[]): void {
+	if (quietMode) return;
 	console.log(pc.blue("[INFO]"), ...args);
 }
 
@@ -20,6 +29,7 @@ export function logInfo(...args: unknown[]): void {
  * Log success message
  */
 export function logSuccess(...args: unknown[]): void {
+	if (quietMode) return;
 	console.log(pc.green("[OK]"), ...args);
 }
 
@@ -27,6 +37,7 @@ export function logSuccess(...args: unknown[]): void {
  * Log warning message
  */
 export function logWarn(...args: unknown[]): void {
+	if (quietMode) return;
 	console.log(pc.yellow("[WARN]"), ...args);
 }
 
@@ -41,7 +52,7 @@ export function logError(...args: unknown[]): void {
  * Log debug message (only in verbose mode)
  */
 export function logDebug(...args: unknown[]): void {
-	if (verboseMode) {
+	if (verboseMode && !quietMode) {
 		console.log(pc.dim("[DEBUG]"), ...args);
 	}
 }
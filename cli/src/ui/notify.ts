@@ -1,9 +1,19 @@
 import notifier from "node-notifier";
 
+let notificationsEnabled = true;
+
+/**
+ * Enable or disable desktop notifications (e.g. for benchmarks)
+ */
+export function setNotificationsEnabled(enabled: boolean): void {
+	notificationsEnabled = enabled;
+}
+
 /**
  * Send a desktop notification
  */
 export function notify(title: string, message: string): void {
+	if (!notificationsEnabled) return;
 	notifier.notify({
 		title,
 		message,
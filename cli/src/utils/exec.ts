@@ -0,0 +1,80 @@
+import { spawn } from "node:child_process";
+
+// Check if running in Bun
+const isBun = typeof Bun !== "undefined";
+const isWindows = process.platform === "win32";
+
+/**
+ * Execute a command and return stdout
+ * @param stdinContent - Optional content to pass via stdin (useful for multi-line prompts on Windows)
+ */
+export async function execCommand(
+	command: string,
+	args: string[],
+	workDir: string,
+	env?: Record<string, string>,
+	stdinContent?: string,
+): Promise<{ stdout: string; stderr: string; exitCode: number }> {
+	if (isBun) {
+		// On Windows, run through cmd.exe to handle .cmd wrappers (npm global packages)
+		const spawnArgs = isWindows ? ["cmd.exe", "/c", command, ...args] : [command, ...args];
+		const proc = Bun.spawn(spawnArgs, {
+			cwd: workDir,
+			stdin: stdinContent ? "pipe" : "ignore",
+			stdout: "pipe",
+			stderr: "pipe",
+			env: { ...process.env, ...env },
+		});
+
+		// Write stdin content if provided
+		if (stdinContent && proc.stdin) {
+			proc.stdin.write(stdinContent);
+			proc.stdin.end();
+		}
+
+		const [stdout, stderr, exitCode] = await Promise.all([
+			new Response(proc.stdout).text(),
+			new Response(proc.stderr).text(),
+			proc.exited,
+		]);
+
+		return { stdout, stderr, exitCode };
+	}
+
+	// Node.js fallback - use shell on Windows to execute .cmd wrappers
+	return new Promise((resolve) => {
+		const proc = spawn(command, args, {
+			cwd: workDir,
+			env: { ...process.env, ...env },
+			stdio: [stdinContent ? "pipe" : "ignore", "pipe", "pipe"],
+			shell: isWindows, // Required on Windows for npm global commands (.cmd wrappers)
+		});
+
+		// Write stdin content if provided
+		if (stdinContent && proc.stdin) {
+			proc.stdin.write(stdinContent);
+			proc.stdin.end();
+		}
+
+		let stdout = "";
+		let stderr = "";
+
+		proc.stdout?.on("data", (data) => {
+			stdout += data.toString();
+		});
+
+		proc.stderr?.on("data", (data) => {
+			stderr += data.toString();
+		});
+
+		proc.on("close", (exitCode) => {
+			resolve({ stdout, stderr, exitCode: exitCode ?? 1 });
+		});
+
+		proc.on("error", (err) => {
+			// Maintain backward compatibility - don't reject, include error in stderr
+			stderr += `\nSpawn error: ${err.message}`;
+			resolve({ stdout, stderr, exitCode: 1 });
+		});
+	});
+}
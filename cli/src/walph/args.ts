@@ -56,6 +56,7 @@ export function parseWalphArgs(args: string[]): {
 	else if (opts.droid) aiEngine = "droid";
 	else if (opts.copilot) aiEngine = "copilot";
 	else if (opts.gemini) aiEngine = "gemini";
+	else if (opts.mock) aiEngine = "mock";
 
 	// Determine model override
 	const modelOverride = opts.sonnet ? "sonnet" : opts.model || undefined;